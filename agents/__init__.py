@@ -1,6 +1,6 @@
-from .customer_support_agent import customer_support_agent
-from .knowledge_agent import knowledge_agent, knowledge_base
+from .customer_support_agent import TICKETS, customer_directory, customer_support_agent, ticket_events, ticket_search_index
+from .knowledge_agent import knowledge_agent, knowledge_base, lexical_index, retriever, vector_index
 from .router_agent import customer_support_product_inquiry_team as router_agent_team
 from .workflow import IntelligentQueryResolver as Workflow
 
-__all__ = ["customer_support_agent", "knowledge_agent", "knowledge_base", "router_agent_team", "Workflow",]
\ No newline at end of file
+__all__ = ["TICKETS", "customer_directory", "customer_support_agent", "ticket_events", "ticket_search_index", "knowledge_agent", "knowledge_base", "lexical_index", "retriever", "vector_index", "router_agent_team", "Workflow",]
\ No newline at end of file
@@ -8,14 +8,20 @@ and check ticket status through a conversational AI agent interface.
 
 import os
 import logging
+import threading
 from typing import Dict, Any, Optional
 from datetime import datetime
 
 from agno.agent import Agent
-from agno.models.mistral import MistralChat
 from dotenv import load_dotenv
 
-from utils import customer_support_agent_instructions, AgentResponseOutput, get_logger
+from utils import customer_support_agent_instructions, AgentResponseOutput, ResilientMistralChat, get_stage_model, get_logger
+from utils.customer_directory import create_customer_directory
+from utils.ticket_dedup import TICKET_DEDUP_ENABLED, RecentTicketIndex
+from utils.ticket_events import TicketEventLog
+from utils.ticket_search import TicketSearchIndex
+from utils.ticket_store import DEFAULT_PAGE_SIZE, TicketStore
+from utils.tool_memo import idempotent_per_run, memoize_per_run
 
 # Configure logging
 logger = get_logger(__name__)
@@ -25,18 +31,29 @@ load_dotenv()
 
 # Configuration
 API_KEY = os.getenv("MISTRAL_API_KEY")
-LLM_MODEL = os.getenv("LLM_MODEL", "mistral-large-latest")
 
 if not API_KEY:
     raise ValueError("MISTRAL_API_KEY environment variable is required")
 
-# In-memory storage for demo purposes
+# In-memory storage for demo purposes, indexed for listing queries
 # Note: In production, use a proper database
-TICKETS: Dict[str, Dict[str, Any]] = {}
-TICKET_COUNTER = 1000
-
-# Mock customer database
-# Note: In production, this would be replaced with actual database queries
+TICKETS = TicketStore()
+# Full-text index of ticket subjects and descriptions, updated on every change
+ticket_search_index = TicketSearchIndex()
+TICKETS.subscribe(ticket_search_index.on_ticket_change)
+# Recent open tickets per customer, checked for near-duplicates before creating one
+recent_tickets = RecentTicketIndex()
+TICKETS.subscribe(recent_tickets.on_ticket_change)
+# Every ticket change goes through the event log (durable with TICKET_EVENT_LOG_PATH);
+# after a restart the tickets are rebuilt from its snapshot and the events since
+ticket_events = TicketEventLog(TICKETS)
+ticket_events.recover()
+# Makes the duplicate check, ID generation and insert one step
+_TICKET_CREATION_LOCK = threading.Lock()
+TICKET_COUNTER = max((int(ticket_id[3:]) + 1 for ticket_id in TICKETS if ticket_id[3:].isdigit()), default=1000)
+
+# Mock customer database, served by the default in-memory directory
+# Note: In production, set CUSTOMER_DB_URL to query a real database
 CUSTOMERS: Dict[str, Dict[str, Any]] = {
     "john@example.com": {
         "name": "John Silva",
@@ -54,7 +71,30 @@ CUSTOMERS: Dict[str, Dict[str, Any]] = {
     },
 }
 
+# Customer lookups go through the directory selected by CUSTOMER_DB_URL
+customer_directory = create_customer_directory(CUSTOMERS)
+
+
+VALID_PRIORITIES = ["low", "medium", "high", "urgent"]
+
+
+def _normalize_priority(priority: str) -> Optional[str]:
+    """Lowercase a ticket priority, or return None if it is not one of VALID_PRIORITIES."""
+    priority = (priority or "").lower()
+    return priority if priority in VALID_PRIORITIES else None
 
+
+def _ticket_request_key(parameters: Dict[str, Any]) -> Dict[str, Any]:
+    """Fields identifying a ticket request, as create_support_ticket normalizes them."""
+    return {
+        "customer_email": parameters["customer_email"].lower().strip(),
+        "subject": parameters["subject"].strip(),
+        "description": parameters["description"].strip(),
+        "priority": _normalize_priority(parameters["priority"]) or "medium",
+    }
+
+
+@idempotent_per_run(normalize=_ticket_request_key)
 def create_support_ticket(
     customer_email: str, subject: str, description: str, priority: str = "medium"
 ) -> Dict[str, Any]:
@@ -74,6 +114,8 @@ def create_support_ticket(
             - ticket_id (str): Generated ticket ID (if successful)
             - status (str): Ticket status (if successful)
             - priority (str): Ticket priority (if successful)
+            - duplicate (bool): True if the issue matched a recent open ticket of the
+              customer, whose ID is returned instead of creating a new ticket
 
     Raises:
         ValueError: If required parameters are missing or invalid
@@ -95,30 +137,44 @@ def create_support_ticket(
         description = description.strip()
 
         # Validate priority
-        valid_priorities = ["low", "medium", "high", "urgent"]
-        if priority.lower() not in valid_priorities:
+        if _normalize_priority(priority) is None:
             logger.warning(f"Invalid priority '{priority}', defaulting to 'medium'")
             priority = "medium"
 
-        # Generate unique ticket ID
-        ticket_id = f"TK-{TICKET_COUNTER}"
-        TICKET_COUNTER += 1
-
-        # Create ticket record
-        ticket = {
-            "ticket_id": ticket_id,
-            "customer_email": customer_email,
-            "subject": subject,
-            "description": description,
-            "priority": priority.lower(),
-            "status": "open",
-            "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            "assigned_to": "support_team",
-            "updated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-        }
+        with _TICKET_CREATION_LOCK:
+            # The same customer reporting the same problem again gets the open ticket
+            duplicate = recent_tickets.find_duplicate(customer_email, subject, description) if TICKET_DEDUP_ENABLED else None
+            if duplicate is not None and duplicate[0] in TICKETS:
+                existing = TICKETS[duplicate[0]]
+                logger.info(f"Ticket request from {customer_email} matches open ticket {existing['ticket_id']} ({duplicate[1]:.2f})")
+                return {
+                    "success": True,
+                    "message": f"An open ticket for this issue already exists: {existing['ticket_id']}",
+                    "ticket_id": existing["ticket_id"],
+                    "status": existing["status"],
+                    "priority": existing["priority"],
+                    "duplicate": True,
+                }
+
+            # Generate unique ticket ID
+            ticket_id = f"TK-{TICKET_COUNTER}"
+            TICKET_COUNTER += 1
+
+            # Create ticket record
+            ticket = {
+                "ticket_id": ticket_id,
+                "customer_email": customer_email,
+                "subject": subject,
+                "description": description,
+                "priority": priority.lower(),
+                "status": "open",
+                "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                "assigned_to": "support_team",
+                "updated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            }
 
-        # Store ticket
-        TICKETS[ticket_id] = ticket
+            # Record the creation event, which stores the ticket
+            ticket_events.create(ticket)
 
         logger.info(f"Created support ticket {ticket_id} for {customer_email}")
 
@@ -144,6 +200,7 @@ def create_support_ticket(
         }
 
 
+@memoize_per_run(normalize=lambda parameters: {"email": parameters["email"].lower().strip()})
 def lookup_customer_info(email: str) -> Dict[str, Any]:
     """
     Look up customer information by email address.
@@ -179,8 +236,8 @@ def lookup_customer_info(email: str) -> Dict[str, Any]:
             }
 
         # Look up customer
-        if email in CUSTOMERS:
-            customer = CUSTOMERS[email]
+        customer = customer_directory.lookup(email)
+        if customer is not None:
             logger.info(f"Found customer: {customer['name']} ({email})")
 
             return {
@@ -217,6 +274,7 @@ def lookup_customer_info(email: str) -> Dict[str, Any]:
         }
 
 
+@memoize_per_run(normalize=lambda parameters: {"ticket_id": parameters["ticket_id"].strip().upper()})
 def check_ticket_status(ticket_id: str) -> Dict[str, Any]:
     """
     Check the status of an existing support ticket.
@@ -282,6 +340,138 @@ def check_ticket_status(ticket_id: str) -> Dict[str, Any]:
         }
 
 
+@memoize_per_run(
+    normalize=lambda parameters: {**parameters, "customer_email": parameters["customer_email"].lower().strip()}
+)
+def list_customer_tickets(
+    customer_email: str, status: Optional[str] = None, limit: int = 10, cursor: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    List a customer's support tickets, newest first.
+
+    Args:
+        customer_email: Customer's email address (required)
+        status: Only tickets with this status - one of: open, in_progress, resolved, closed (optional)
+        limit: Maximum number of tickets to return (default: 10)
+        cursor: next_cursor from a previous call, to get the following tickets (optional)
+
+    Returns:
+        Dict[str, Any]: Dictionary containing:
+            - success (bool): Whether the listing was successful
+            - tickets (list): Ticket ID, subject, status, priority and dates of each ticket
+            - next_cursor (str): Cursor for the next tickets, or None if there are no more
+            - message (str): Status message
+
+    Raises:
+        ValueError: If customer_email is missing or the cursor is invalid
+    """
+    try:
+        if not customer_email or not customer_email.strip():
+            raise ValueError("Customer email is required")
+        customer_email = customer_email.lower().strip()
+        limit = max(1, min(int(limit or DEFAULT_PAGE_SIZE), DEFAULT_PAGE_SIZE))
+
+        tickets, next_cursor = TICKETS.query(customer_email=customer_email, status=status, limit=limit, cursor=cursor)
+        logger.info(f"Listed {len(tickets)} tickets for {customer_email}")
+
+        return {
+            "success": True,
+            "tickets": [
+                {
+                    "ticket_id": ticket["ticket_id"],
+                    "subject": ticket["subject"],
+                    "status": ticket["status"],
+                    "priority": ticket["priority"],
+                    "created_at": ticket["created_at"],
+                    "updated_at": ticket.get("updated_at", ticket["created_at"]),
+                }
+                for ticket in tickets
+            ],
+            "next_cursor": next_cursor,
+            "message": f"Found {len(tickets)} tickets for {customer_email}" + (" (more available)" if next_cursor else ""),
+        }
+
+    except ValueError as e:
+        logger.error(f"Validation error listing tickets: {str(e)}")
+        return {
+            "success": False,
+            "tickets": [],
+            "message": str(e),
+        }
+    except Exception as e:
+        logger.error(f"Unexpected error listing tickets: {str(e)}")
+        return {
+            "success": False,
+            "tickets": [],
+            "message": "An unexpected error occurred while listing tickets",
+        }
+
+
+@memoize_per_run()
+def search_tickets(query: str, status: Optional[str] = None, limit: int = 5) -> Dict[str, Any]:
+    """
+    Search past support tickets by content to spot repeat problems.
+
+    Args:
+        query: Description of the problem to look for (required), e.g. "maquininha não liga"
+        status: Only tickets with this status - one of: open, in_progress, resolved, closed (optional)
+        limit: Maximum number of tickets to return (default: 5)
+
+    Returns:
+        Dict[str, Any]: Dictionary containing:
+            - success (bool): Whether the search was successful
+            - tickets (list): Most relevant tickets first, with ticket ID, subject, status, priority,
+              creation date and relevance score
+            - message (str): Status message
+
+    Raises:
+        ValueError: If query is missing
+    """
+    try:
+        if not query or not query.strip():
+            raise ValueError("Search query is required")
+        limit = max(1, min(int(limit or 5), DEFAULT_PAGE_SIZE))
+
+        tickets = []
+        for hit in ticket_search_index.search(query.strip(), limit=limit, status=status):
+            if hit["ticket_id"] not in TICKETS:
+                continue
+            ticket = TICKETS[hit["ticket_id"]]
+            # Other customers' contact details stay out of the agent's context
+            tickets.append(
+                {
+                    "ticket_id": ticket["ticket_id"],
+                    "subject": ticket["subject"],
+                    "status": ticket["status"],
+                    "priority": ticket["priority"],
+                    "created_at": ticket["created_at"],
+                    "score": round(hit["score"], 3),
+                }
+            )
+        logger.info(f"Ticket search for '{query[:50]}' returned {len(tickets)} tickets")
+
+        return {
+            "success": True,
+            "tickets": tickets,
+            "message": f"Found {len(tickets)} matching tickets",
+        }
+
+    except ValueError as e:
+        logger.error(f"Validation error searching tickets: {str(e)}")
+        return {
+            "success": False,
+            "tickets": [],
+            "message": str(e),
+        }
+    except Exception as e:
+        logger.error(f"Unexpected error searching tickets: {str(e)}")
+        return {
+            "success": False,
+            "tickets": [],
+            "message": "An unexpected error occurred while searching tickets",
+        }
+
+
 def get_customer_support_agent() -> Agent:
     """
     Create and configure the customer support agent.
@@ -298,10 +488,10 @@ def get_customer_support_agent() -> Agent:
     try:
         agent = Agent(
             name="Customer Support Agent",
-            model=MistralChat(api_key=API_KEY, id=LLM_MODEL),
+            model=ResilientMistralChat(api_key=API_KEY, id=get_stage_model("customer_support")),
             debug_mode=True,
             show_tool_calls=True,
-            tools=[create_support_ticket, lookup_customer_info, check_ticket_status],
+            tools=[create_support_ticket, lookup_customer_info, check_ticket_status, list_customer_tickets, search_tickets],
             instructions=customer_support_agent_instructions,
             response_model=AgentResponseOutput,
         )
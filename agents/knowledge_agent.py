@@ -6,17 +6,29 @@ website content and external sources to answer product-related questions.
 """
 
 import os
-from typing import List
+from typing import List, Optional
 
 from agno.agent import Agent
 from agno.knowledge.website import WebsiteKnowledgeBase
-from agno.tools.tavily import TavilyTools
-from agno.embedder.mistral import MistralEmbedder
-from agno.models.mistral import MistralChat
+from agno.document.chunking.fixed import FixedSizeChunking
 from agno.vectordb.chroma import ChromaDb
 from dotenv import load_dotenv
 
-from utils import knowledge_agent_instructions, AgentResponseOutput, get_logger
+from utils import (
+    knowledge_agent_instructions,
+    knowledge_agent_context_instructions,
+    AgentResponseOutput,
+    CachedEmbedder,
+    CachedTavilyTools,
+    CrawlingWebsiteReader,
+    HybridRetriever,
+    LexicalIndex,
+    MemmapVectorIndex,
+    ResilientMistralChat,
+    create_embedder,
+    get_stage_model,
+    get_logger,
+)
 
 # Configure logging
 logger = get_logger(__name__)
@@ -26,8 +38,15 @@ load_dotenv()
 
 # Configuration
 COLLECTION_NAME = "infinitepay-extracted-content"
+CHROMA_DB_PATH = os.getenv("CHROMA_DB_PATH", "storage/chroma_db")
+LEXICAL_INDEX_PATH = os.getenv("LEXICAL_INDEX_PATH", "storage/tantivy_index")
+EMBEDDER_BACKEND = os.getenv("EMBEDDER_BACKEND", "mistral")
+VECTOR_STORE = os.getenv("VECTOR_STORE", "chroma")
+VECTOR_INDEX_PATH = os.getenv("VECTOR_INDEX_PATH", "storage/vector_index")
+KNOWLEDGE_SEARCH_MODE = os.getenv("KNOWLEDGE_SEARCH_MODE", "context")
+
+KNOWLEDGE_SEARCH_MODES = ("context", "tool")
 API_KEY = os.getenv("MISTRAL_API_KEY")
-LLM_MODEL = os.getenv("LLM_MODEL", "mistral-large-latest")
 TAVILY_API_KEY = os.getenv("TAVILY_API_KEY")
 
 if not API_KEY:
@@ -56,10 +75,18 @@ INFINITEPAY_URLS: List[str] = [
 ]
 
 
-def create_vector_db() -> ChromaDb:
+def create_vector_db(path: str = CHROMA_DB_PATH, backend: str = EMBEDDER_BACKEND) -> ChromaDb:
     """
     Create and configure the ChromaDB vector database for knowledge storage.
 
+    Query and document embeddings go through a ``CachedEmbedder`` so repeated
+    texts skip the embedding call. ``backend`` selects Mistral or a local CPU
+    embedder; changing it rebuilds the collection on the next load.
+
+    Args:
+        path: Directory of the persistent Chroma client
+        backend: Embedding backend (``mistral``, ``onnx`` or ``hashing``)
+
     Returns:
         ChromaDb: Configured vector database instance
 
@@ -67,13 +94,14 @@ def create_vector_db() -> ChromaDb:
         Exception: If vector database creation fails
     """
     try:
+        embedder = create_embedder(backend)
         vector_db = ChromaDb(
             collection=COLLECTION_NAME,
-            embedder=MistralEmbedder(api_key=API_KEY),
+            embedder=CachedEmbedder(embedder=embedder),
             persistent_client=True,
-            path="storage/chroma_db",
+            path=path,
         )
-        logger.info(f"Vector database initialized with collection: {COLLECTION_NAME}")
+        logger.info(f"Vector database initialized with collection: {COLLECTION_NAME} ({backend} embeddings)")
         return vector_db
     except Exception as e:
         logger.error(f"Failed to create vector database: {str(e)}")
@@ -84,6 +112,9 @@ def create_knowledge_base(vector_db: ChromaDb) -> WebsiteKnowledgeBase:
     """
     Create the website knowledge base with InfinitePay content.
 
+    Pages are fetched by a ``CrawlingWebsiteReader``, which crawls all URLs
+    concurrently over a shared connection pool with conditional requests.
+
     Args:
         vector_db: The vector database instance to use for storage
 
@@ -100,6 +131,11 @@ def create_knowledge_base(vector_db: ChromaDb) -> WebsiteKnowledgeBase:
             max_links=1,
             max_depth=1,
             vector_db=vector_db,
+            reader=CrawlingWebsiteReader(
+                max_depth=1,
+                max_links=1,
+                chunking_strategy=FixedSizeChunking(),
+            ),
         )
         logger.info(f"Knowledge base created with {len(INFINITEPAY_URLS)} URLs")
         return knowledge_base
@@ -108,12 +144,61 @@ def create_knowledge_base(vector_db: ChromaDb) -> WebsiteKnowledgeBase:
         raise
 
 
-def create_knowledge_agent(knowledge_base: WebsiteKnowledgeBase) -> Agent:
+def create_retriever(
+    vector_db: ChromaDb,
+    path: str = LEXICAL_INDEX_PATH,
+    vector_store: str = VECTOR_STORE,
+    vector_index_path: str = VECTOR_INDEX_PATH,
+) -> HybridRetriever:
+    """
+    Create the hybrid (BM25 + vector) retriever over the knowledge base.
+
+    The tantivy index lives next to the Chroma collection and is filled by
+    the ingestion pipeline. With ``vector_store="memmap"`` vector search runs
+    on a memory-mapped copy of the collection instead of the Chroma client.
+
+    Args:
+        vector_db: The vector database instance to search
+        path: Directory of the tantivy index
+        vector_store: ``chroma`` or ``memmap``
+        vector_index_path: Directory of the memory-mapped vector index
+
+    Returns:
+        HybridRetriever: Retriever fusing lexical and vector results
+
+    Raises:
+        Exception: If retriever creation fails
+    """
+    try:
+        if vector_store not in ("chroma", "memmap"):
+            raise ValueError(f"Unknown vector store '{vector_store}', expected 'chroma' or 'memmap'")
+        if vector_store == "memmap":
+            vector_db = MemmapVectorIndex(vector_index_path, embedder=vector_db.embedder)
+        retriever = HybridRetriever(vector_db=vector_db, lexical_index=LexicalIndex(path))
+        logger.info(f"Hybrid retriever initialized in '{retriever.mode}' mode over the {vector_store} vector store")
+        return retriever
+    except Exception as e:
+        logger.error(f"Failed to create retriever: {str(e)}")
+        raise
+
+
+def create_knowledge_agent(
+    knowledge_base: WebsiteKnowledgeBase,
+    retriever: Optional[HybridRetriever] = None,
+    search_mode: str = KNOWLEDGE_SEARCH_MODE,
+) -> Agent:
     """
     Create and configure the knowledge agent.
 
+    In ``context`` mode the retrieved chunks are added to the prompt before
+    the first generation (retrieval-first), so the agent answers in one LLM
+    turn. In ``tool`` mode the model decides when to call the knowledge
+    search tool, which costs an extra turn per search.
+
     Args:
         knowledge_base: The knowledge base instance to use
+        retriever: Custom retriever replacing the knowledge base vector search
+        search_mode: ``context`` (retrieval-first) or ``tool``
 
     Returns:
         Agent: Configured knowledge agent instance
@@ -122,25 +207,31 @@ def create_knowledge_agent(knowledge_base: WebsiteKnowledgeBase) -> Agent:
         Exception: If agent creation fails
     """
     try:
+        if search_mode not in KNOWLEDGE_SEARCH_MODES:
+            raise ValueError(f"Unknown knowledge search mode '{search_mode}', expected one of {KNOWLEDGE_SEARCH_MODES}")
+        retrieval_first = search_mode == "context"
+
         # Initialize tools
         tools = []
         if TAVILY_API_KEY:
-            tools.append(TavilyTools(search=""))
-            logger.info("Tavily search tool enabled")
+            tools.append(CachedTavilyTools())
+            logger.info("Tavily search tool enabled (cached, budgeted per run)")
         else:
             logger.warning("TAVILY_API_KEY not found, web search disabled")
 
         agent = Agent(
             name="KnowledgeBase Agent",
-            model=MistralChat(api_key=API_KEY, id=LLM_MODEL),
+            model=ResilientMistralChat(api_key=API_KEY, id=get_stage_model("knowledge")),
             knowledge=knowledge_base,
-            search_knowledge=True,
-            instructions=knowledge_agent_instructions,
+            retriever=retriever,
+            search_knowledge=not retrieval_first,
+            add_references=retrieval_first,
+            instructions=knowledge_agent_context_instructions if retrieval_first else knowledge_agent_instructions,
             debug_mode=True,
             tools=tools,
             response_model=AgentResponseOutput,
         )
-        logger.info("Knowledge agent initialized successfully")
+        logger.info(f"Knowledge agent initialized successfully in '{search_mode}' search mode")
         return agent
     except Exception as e:
         logger.error(f"Failed to create knowledge agent: {str(e)}")
@@ -151,7 +242,10 @@ def create_knowledge_agent(knowledge_base: WebsiteKnowledgeBase) -> Agent:
 try:
     vector_db = create_vector_db()
     knowledge_base = create_knowledge_base(vector_db)
-    knowledge_agent = create_knowledge_agent(knowledge_base)
+    retriever = create_retriever(vector_db)
+    lexical_index = retriever.lexical_index
+    vector_index = retriever.vector_db if isinstance(retriever.vector_db, MemmapVectorIndex) else None
+    knowledge_agent = create_knowledge_agent(knowledge_base, retriever)
 except Exception as e:
     logger.error(f"Failed to initialize knowledge agent components: {str(e)}")
     raise
@@ -9,11 +9,10 @@ product inquiry requests by routing them to the most suitable agent.
 import os
 
 from agno.team.team import Team
-from agno.models.mistral import MistralChat
 from dotenv import load_dotenv
 
 from agents import customer_support_agent, knowledge_agent
-from utils import router_agent_instructions, AgentResponseOutput, get_logger
+from utils import router_agent_instructions, AgentResponseOutput, ResilientMistralChat, get_stage_model, get_logger
 
 # Configure logging
 logger = get_logger(__name__)
@@ -22,7 +21,6 @@ logger = get_logger(__name__)
 load_dotenv()
 
 # Configuration
-LLM_MODEL = os.getenv("LLM_MODEL", "mistral-large-latest")
 API_KEY = os.getenv("MISTRAL_API_KEY")
 
 if not API_KEY:
@@ -43,7 +41,7 @@ def create_customer_support_team() -> Team:
         team = Team(
             name="Customer Support and Product Inquiry Team",
             mode="route",
-            model=MistralChat(api_key=API_KEY, id=LLM_MODEL),
+            model=ResilientMistralChat(api_key=API_KEY, id=get_stage_model("router")),
             members=[
                 customer_support_agent,
                 knowledge_agent,
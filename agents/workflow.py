@@ -7,18 +7,21 @@ to resolve customer queries through routing and personality enhancement.
 """
 
 import os
+import time
 import logging
 from textwrap import dedent
-from typing import Optional
+from typing import Any, Dict, Optional
 
 from agno.workflow import Workflow, RunEvent, RunResponse
 from agno.agent import Agent
-from agno.models.mistral import MistralChat
 from agno.storage.json import JsonStorage
 from dotenv import load_dotenv
 
 from agents import router_agent_team
-from utils import personality_agent_instructions, PersonalityLayerResponse, FinalResponseOutput
+from agents.customer_support_agent import check_ticket_status
+from utils import personality_agent_instructions, PersonalityLayerResponse, FinalResponseOutput, ResilientMistralChat, get_stage_model, metrics, context_sources
+from utils.fast_path import TICKET_FAST_PATH, TICKET_ID_PATTERN, match_ticket_status_query, render_ticket_status
+from utils.tool_memo import tool_run_scope
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -28,12 +31,70 @@ load_dotenv()
 
 # Configuration
 API_KEY = os.getenv("MISTRAL_API_KEY")
-LLM_MODEL = os.getenv("LLM_MODEL", "mistral-large-latest")
+FAST_PATH_AGENT_NAME = "Customer Support Specialist (fast path)"
 
 if not API_KEY:
     raise ValueError("MISTRAL_API_KEY environment variable is required")
 
 
+def count_llm_turns(response: Any) -> Dict[str, int]:
+    """
+    Count the model generations of a run, per agent or team.
+
+    Every assistant message of the run is one LLM turn; messages replayed
+    from history are ignored. Member responses of a team are counted under
+    their own agent names.
+
+    Args:
+        response: Agent or team run response
+
+    Returns:
+        Dict[str, int]: LLM turns per agent or team name
+    """
+    turns: Dict[str, int] = {}
+    name = getattr(response, "agent_name", None) or getattr(response, "team_name", None) or "unknown"
+    messages = getattr(response, "messages", None)
+    if isinstance(messages, list):
+        count = sum(1 for m in messages if getattr(m, "role", None) == "assistant" and not getattr(m, "from_history", False))
+        if count:
+            turns[str(name)] = count
+    members = getattr(response, "member_responses", None)
+    if isinstance(members, list):
+        for member in members:
+            for member_name, count in count_llm_turns(member).items():
+                turns[member_name] = turns.get(member_name, 0) + count
+    return turns
+
+
+def knowledge_references(response: Any) -> Optional[Dict[str, Any]]:
+    """
+    Describe the knowledge context injected into a run, for ``tool_calls``.
+
+    Args:
+        response: Agent or team run response
+
+    Returns:
+        Optional[Dict[str, Any]]: Query, retrieval time and sources of the
+        references added to the prompt, or None if there were none
+    """
+    responses = [response]
+    members = getattr(response, "member_responses", None)
+    if isinstance(members, list):
+        responses.extend(members)
+    for run in responses:
+        extra_data = getattr(run, "extra_data", None)
+        references = getattr(extra_data, "references", None)
+        if not isinstance(references, list) or not references:
+            continue
+        latest = references[-1]
+        return {
+            "query": latest.query,
+            "seconds": latest.time,
+            "sources": context_sources(latest.references or []),
+        }
+    return None
+
+
 class IntelligentQueryResolver(Workflow):
     """
     Main workflow class that resolves customer queries by routing them to the
@@ -71,7 +132,7 @@ class IntelligentQueryResolver(Workflow):
         try:
             self.personality_layer = Agent(
                 name="Personality AI",
-                model=MistralChat(api_key=API_KEY, id=LLM_MODEL),
+                model=ResilientMistralChat(api_key=API_KEY, id=get_stage_model("personality")),
                 description="AI agent that adds conversational personality and warmth to responses",
                 tools=[],
                 instructions=personality_agent_instructions,
@@ -104,18 +165,42 @@ class IntelligentQueryResolver(Workflow):
             query = query.strip()
             logger.info(f"Starting workflow for query: {query[:100]}...")
 
+            # Plain ticket-status questions are answered without any LLM call
+            fast_response = self._ticket_status_fast_path(query)
+            if fast_response is not None:
+                return RunResponse(
+                    content=fast_response,
+                    event=RunEvent.workflow_completed,
+                )
+
             # Step 1: Route the query to the most appropriate agent
             logger.info("Routing query to appropriate agent team...")
-            team_response = router_agent_team.run(query)
+            with tool_run_scope(self.run_id) as tool_cache:
+                team_response = router_agent_team.run(query)
 
             if not team_response or not team_response.content:
                 raise RuntimeError("Router team failed to generate response")
 
             # Extract team response data
             team_response_data = team_response.content.model_dump()
-            logger.info(
-                f"Router team response received from: {team_response_data.get('agent_workflow', {}).get('agent_name', 'Unknown')}"
-            )
+            agent_name = team_response_data.get('agent_workflow', {}).get('agent_name', 'Unknown')
+            logger.info(f"Router team response received from: {agent_name}")
+            self._record_llm_turns(team_response, agent_name)
+
+            # Retrieval-first runs do not call a search tool; report their sources instead
+            references = knowledge_references(team_response)
+            if references is not None:
+                agent_workflow = team_response_data.setdefault("agent_workflow", {})
+                tool_calls = agent_workflow.get("tool_calls") or {}
+                tool_calls["knowledge_context"] = references
+                agent_workflow["tool_calls"] = tool_calls
+
+            # Tool calls answered from the run's cache instead of executing again
+            if tool_cache.hits:
+                agent_workflow = team_response_data.setdefault("agent_workflow", {})
+                tool_calls = agent_workflow.get("tool_calls") or {}
+                tool_calls["cache_hits"] = tool_cache.hits
+                agent_workflow["tool_calls"] = tool_calls
 
             # Step 2: Apply personality layer enhancement
             logger.info("Applying personality layer enhancement...")
@@ -172,6 +257,60 @@ class IntelligentQueryResolver(Workflow):
                 messages=[f"Unexpected error: {str(e)}"],
             )
 
+    def _ticket_status_fast_path(self, query: str) -> Optional[FinalResponseOutput]:
+        """
+        Answer a plain ticket-status question with ``check_ticket_status`` and a template.
+
+        Args:
+            query: Stripped user query
+
+        Returns:
+            Optional[FinalResponseOutput]: The final response, or None when the
+            query needs the LLM path (ambiguous intent or a failed lookup)
+        """
+        if not TICKET_FAST_PATH:
+            return None
+        started = time.perf_counter()
+        match = match_ticket_status_query(query)
+        if match is None:
+            # "ambiguous": a ticket is mentioned but the intent needs the LLM
+            result = "ambiguous" if TICKET_ID_PATTERN.search(query) else "miss"
+            metrics.increment("fast_path_queries_total", result=result)
+            return None
+
+        results = {ticket_id: check_ticket_status(ticket_id) for ticket_id in match.ticket_ids}
+        if not all(result.get("success") for result in results.values()):
+            metrics.increment("fast_path_queries_total", result="lookup_failed")
+            logger.warning("Ticket lookup failed on the fast path, falling back to the agents")
+            return None
+
+        response = render_ticket_status(results, match.language)
+        elapsed = time.perf_counter() - started
+        metrics.increment("fast_path_queries_total", result="hit")
+        metrics.observe("fast_path_seconds", elapsed)
+        metrics.observe("llm_turns_per_query", 0, route=FAST_PATH_AGENT_NAME)
+        logger.info(f"Answered ticket status for {match.ticket_ids} on the fast path in {elapsed * 1000:.1f}ms")
+        return FinalResponseOutput(
+            response=response,
+            source_agent_response=response,
+            agent_workflow={
+                "agent_name": FAST_PATH_AGENT_NAME,
+                "tool_calls": {
+                    "check_ticket_status": [{"parameters": {"ticket_id": ticket_id}} for ticket_id in match.ticket_ids]
+                },
+            },
+        )
+
+    def _record_llm_turns(self, team_response: Any, agent_name: str) -> None:
+        """Export the LLM turns spent by the router team and its members on one query."""
+        turns = count_llm_turns(team_response)
+        if not turns:
+            return
+        for name, count in turns.items():
+            metrics.observe("llm_turns", count, agent=name)
+        metrics.observe("llm_turns_per_query", sum(turns.values()), route=agent_name)
+        logger.info(f"LLM turns for this query: {turns}")
+
     def health_check(self) -> bool:
         """
         Perform a health check on the workflow components.
@@ -7,18 +7,21 @@ This module provides a REST API endpoint for processing customer queries through
 an intelligent workflow that routes queries to appropriate agents and returns
 personalized responses.
 """
-import os
+import asyncio
 import logging
 from contextlib import asynccontextmanager
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 import uvicorn
 from fastapi import FastAPI, HTTPException, Depends
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 
-from agents import Workflow, knowledge_base
-from utils import FinalResponseOutput, QueryRequest, ErrorResponse
+from agents import TICKETS, Workflow, ticket_events, ticket_search_index, customer_directory, customer_support_agent, knowledge_agent, knowledge_base, lexical_index, retriever, router_agent_team, vector_index
+from utils import FinalResponseOutput, QueryRequest, TicketUpdate, ErrorResponse, metrics, circuit_breaker_states, load_knowledge_base, restore_index_snapshot
+from utils.export import GZIP_MEDIA_TYPE, NDJSON_MEDIA_TYPE, WORKFLOW_STORAGE_PATH, export_stream, iter_tickets, iter_workflow_runs, parse_export_time
+from utils.ticket_store import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from utils.warmup import WARMUP_ENABLED, readiness, warm_up
 from agno.storage.json import JsonStorage
 
 from dotenv import load_dotenv
@@ -35,7 +38,29 @@ logger = logging.getLogger(__name__)
 async def lifespan(app: FastAPI):
     """Application lifespan manager for startup and shutdown events."""
     logger.info("Starting multi-agent workflow API...")
+    # Load the knowledge index shipped with the container (INDEX_SNAPSHOT_PATH);
+    # an incompatible snapshot aborts the start-up
+    restore_index_snapshot(knowledge_base.vector_db, lexical_index=lexical_index, vector_index=vector_index)
+
+    # Warm up in the background: the server accepts requests meanwhile and
+    # /ready reports 503 until the warm-up is done. The personality layer's
+    # model shares its Mistral client with these.
+    warmup_task = None
+    if WARMUP_ENABLED:
+        warmup_task = asyncio.create_task(
+            warm_up(
+                vector_db=knowledge_base.vector_db,
+                retriever=retriever,
+                models=[router_agent_team.model, knowledge_agent.model, customer_support_agent.model],
+            )
+        )
+    else:
+        readiness.status = "ready"
     yield
+    if warmup_task is not None and not warmup_task.done():
+        warmup_task.cancel()
+    customer_directory.close()
+    ticket_events.close()
     logger.info("Shutting down multi-agent workflow API...")
 
 
@@ -58,7 +83,7 @@ app.add_middleware(
     CORSMiddleware,
     allow_origins=ALLOWED_ORIGINS,
     allow_credentials=True,
-    allow_methods=["GET", "POST"],
+    allow_methods=["GET", "POST", "PATCH"],
     allow_headers=["*"],
 )
 
@@ -74,7 +99,7 @@ def get_workflow() -> Workflow:
         HTTPException: If workflow initialization fails
     """
     try:
-        return Workflow(storage=JsonStorage("storage/workflow_data.json"))
+        return Workflow(storage=JsonStorage(WORKFLOW_STORAGE_PATH))
     except Exception as e:
         logger.error(f"Failed to initialize workflow: {str(e)}")
         raise HTTPException(
@@ -96,9 +121,37 @@ async def global_exception_handler(request, exc):
 
 
 @app.get("/health")
-async def health_check() -> Dict[str, str]:
-    """Health check endpoint."""
-    return {"status": "healthy", "service": "multi-agent-api"}
+async def health_check() -> Dict[str, Any]:
+    """
+    Health check endpoint.
+
+    Reports ``degraded`` while any model circuit breaker is open, together
+    with the state of every breaker.
+    """
+    breakers = circuit_breaker_states()
+    status = "healthy"
+    if any(breaker["state"] != "closed" for breaker in breakers.values()):
+        status = "degraded"
+    return {"status": status, "service": "multi-agent-api", "circuit_breakers": breakers}
+
+
+@app.get("/ready")
+async def readiness_check():
+    """
+    Readiness endpoint.
+
+    Returns 503 until the start-up warm-up of the knowledge indexes and model
+    connections has finished, then 200 with the outcome of each warm-up step.
+    Unlike ``/health``, load balancers should wait for this before routing
+    traffic to a new instance.
+    """
+    return JSONResponse(status_code=200 if readiness.ready else 503, content=readiness.to_dict())
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics() -> str:
+    """Expose process metrics in the Prometheus text format."""
+    return metrics.render_prometheus()
 
 @app.get(
     "/load_database",
@@ -107,27 +160,34 @@ async def health_check() -> Dict[str, str]:
         500: {"model": ErrorResponse, "description": "Internal Server Error"},
     },
 )
-async def load_database() -> Dict[str, Any]:
+async def load_database(recreate: bool = False) -> Dict[str, Any]:
     """
     Database loading endpoint.
 
+    Refreshes the knowledge base incrementally: only changed chunks are
+    embedded and chunks that disappeared from the site are deleted.
+
+    Args:
+        recreate: Drop the collection and rebuild it from scratch
+
     Returns:
-        Success message if successful, error message otherwise.
+        Success message and ingestion report if successful, error message otherwise.
 
     Raises:
         HTTPException: For various error conditions (400, 500)
     """
     try:
-        logger.info("Processing database loading activity.")
+        logger.info(f"Processing database loading activity (recreate={recreate}).")
 
-        if os.path.exists("storage/chroma_db"):
-            logger.info("Database already exists. Skipping creation.")
-            return {"status": "success", "message": "Database already exists"}
-        else:
-            # load the knowledge base
-            _ = await knowledge_base.aload(recreate=True)
-            logger.info(f"Successfully processed database loading activity.") 
-            return {"status": "success", "message": "Database loaded successfully"}
+        report = await load_knowledge_base(
+            knowledge_base, recreate=recreate, lexical_index=lexical_index, vector_index=vector_index
+        )
+        logger.info(f"Successfully processed database loading activity.") 
+        return {
+            "status": "success",
+            "message": "Database loaded successfully" if report.mode == "full" else "Database refreshed successfully",
+            "ingestion": report.to_dict(),
+        }
 
     except HTTPException:
         raise
@@ -137,6 +197,217 @@ async def load_database() -> Dict[str, Any]:
             status_code=500, detail=f"Failed to process query: {str(e)}"
         )
 
+@app.get(
+    "/tickets",
+    responses={
+        400: {"model": ErrorResponse, "description": "Bad Request"},
+    },
+)
+async def list_tickets(
+    customer_email: Optional[str] = None,
+    status: Optional[str] = None,
+    priority: Optional[str] = None,
+    created_after: Optional[str] = None,
+    created_before: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    List and search support tickets, newest first.
+
+    Filters are combined; pass the returned ``next_cursor`` as ``cursor`` to
+    get the next page.
+
+    Args:
+        customer_email: Only tickets of this customer
+        status: Only tickets with this status
+        priority: Only tickets with this priority
+        created_after: Only tickets created at or after this timestamp
+        created_before: Only tickets created before this timestamp
+        limit: Page size (1 to 100)
+        cursor: Cursor of the next page
+
+    Returns:
+        The page of tickets and the next cursor (null on the last page).
+
+    Raises:
+        HTTPException: For an invalid limit or cursor (400)
+    """
+    try:
+        tickets, next_cursor = TICKETS.query(
+            customer_email=customer_email,
+            status=status,
+            priority=priority,
+            created_after=created_after,
+            created_before=created_before,
+            limit=limit,
+            cursor=cursor,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"tickets": tickets, "count": len(tickets), "next_cursor": next_cursor}
+
+@app.get(
+    "/tickets/search",
+    responses={
+        400: {"model": ErrorResponse, "description": "Bad Request"},
+    },
+)
+async def search_tickets(
+    q: str,
+    customer_email: Optional[str] = None,
+    status: Optional[str] = None,
+    priority: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+) -> Dict[str, Any]:
+    """
+    Full-text search over ticket subjects and descriptions.
+
+    Args:
+        q: Free-text query
+        customer_email: Only tickets of this customer
+        status: Only tickets with this status
+        priority: Only tickets with this priority
+        limit: Maximum number of tickets (1 to 100)
+
+    Returns:
+        The matching tickets, most relevant first, each with its ``score``.
+
+    Raises:
+        HTTPException: For an invalid limit (400)
+    """
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {MAX_PAGE_SIZE}")
+    hits = ticket_search_index.search(q, limit=limit, customer_email=customer_email, status=status, priority=priority)
+    tickets = [{**TICKETS[hit["ticket_id"]], "score": hit["score"]} for hit in hits if hit["ticket_id"] in TICKETS]
+    return {"tickets": tickets, "count": len(tickets)}
+
+@app.patch(
+    "/tickets/{ticket_id}",
+    responses={
+        400: {"model": ErrorResponse, "description": "Bad Request"},
+        404: {"model": ErrorResponse, "description": "Not Found"},
+    },
+)
+async def update_ticket(ticket_id: str, update: TicketUpdate) -> Dict[str, Any]:
+    """
+    Change a ticket's status or assignee.
+
+    Each change is recorded as an event in the ticket's history.
+
+    Args:
+        ticket_id: Ticket to change
+        update: New status and/or assignee
+
+    Returns:
+        The updated ticket.
+
+    Raises:
+        HTTPException: For an invalid change (400) or an unknown ticket (404)
+    """
+    ticket_id = ticket_id.upper().strip()
+    if ticket_id not in TICKETS:
+        raise HTTPException(status_code=404, detail=f"Ticket {ticket_id} not found")
+    try:
+        # Each command returns None, recording nothing, when the value is unchanged
+        if update.status is not None:
+            ticket_events.change_status(ticket_id, update.status)
+        if update.assigned_to is not None:
+            ticket_events.reassign(ticket_id, update.assigned_to)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Ticket {ticket_id} not found")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return TICKETS[ticket_id]
+
+@app.get(
+    "/tickets/{ticket_id}/history",
+    responses={
+        404: {"model": ErrorResponse, "description": "Not Found"},
+    },
+)
+async def ticket_history(ticket_id: str) -> Dict[str, Any]:
+    """
+    List the events of a ticket, oldest first.
+
+    Args:
+        ticket_id: Ticket whose history to return
+
+    Returns:
+        The ticket's events: creation, status changes and reassignments.
+
+    Raises:
+        HTTPException: For an unknown ticket (404)
+    """
+    ticket_id = ticket_id.upper().strip()
+    if ticket_id not in TICKETS:
+        raise HTTPException(status_code=404, detail=f"Ticket {ticket_id} not found")
+    events = [event.to_dict() for event in ticket_events.history(ticket_id)]
+    return {"ticket_id": ticket_id, "events": events, "count": len(events)}
+
+def _export_response(dataset: str, records, compress: bool) -> StreamingResponse:
+    """Stream records as an NDJSON (or gzipped NDJSON) download."""
+    filename = f"{dataset}.ndjson.gz" if compress else f"{dataset}.ndjson"
+    return StreamingResponse(
+        export_stream(records, dataset, compress=compress),
+        media_type=GZIP_MEDIA_TYPE if compress else NDJSON_MEDIA_TYPE,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+@app.get(
+    "/export/tickets",
+    responses={
+        400: {"model": ErrorResponse, "description": "Bad Request"},
+    },
+)
+async def export_tickets(since: Optional[str] = None, until: Optional[str] = None, gzip: bool = False) -> StreamingResponse:
+    """
+    Stream every ticket created in a time range as NDJSON, newest first.
+
+    Args:
+        since: Earliest creation time, ISO date or timestamp (inclusive)
+        until: Latest creation time, ISO date or timestamp (exclusive)
+        gzip: Compress the stream
+
+    Returns:
+        One ticket per line.
+
+    Raises:
+        HTTPException: For an invalid time (400)
+    """
+    try:
+        since_time, until_time = parse_export_time(since), parse_export_time(until)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return _export_response("tickets", iter_tickets(TICKETS, since_time, until_time), gzip)
+
+@app.get(
+    "/export/runs",
+    responses={
+        400: {"model": ErrorResponse, "description": "Bad Request"},
+    },
+)
+async def export_runs(since: Optional[str] = None, until: Optional[str] = None, gzip: bool = False) -> StreamingResponse:
+    """
+    Stream every workflow run started in a time range as NDJSON.
+
+    Args:
+        since: Earliest run time, ISO date or timestamp (inclusive)
+        until: Latest run time, ISO date or timestamp (exclusive)
+        gzip: Compress the stream
+
+    Returns:
+        One run per line, with its session and user IDs, input and response.
+
+    Raises:
+        HTTPException: For an invalid time (400)
+    """
+    try:
+        since_time, until_time = parse_export_time(since), parse_export_time(until)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return _export_response("runs", iter_workflow_runs(WORKFLOW_STORAGE_PATH, since_time, until_time), gzip)
+
 @app.post(
     "/chat",
     response_model=FinalResponseOutput,
@@ -0,0 +1,188 @@
+# benchmarks/embedders.py
+"""
+Latency and retrieval-agreement benchmark for the embedding backends.
+
+Every backend in ``EMBEDDER_BACKENDS`` embeds the same corpus of knowledge
+chunks and the same queries. The report gives, per backend:
+
+- query latency: p50 / p95 / mean time to embed one query (what each
+  retrieval pays before Chroma is searched)
+- corpus throughput: chunks embedded per second, in batches
+- recall@k: share of the reference backend's top-k chunks (``mistral`` by
+  default) that the backend also ranks in its top-k, averaged over queries
+
+The corpus is read from an offline snapshot (``--snapshot``) or from the
+persistent Chroma collection. Queries come from ``results.json``.
+
+Usage:
+    python -m benchmarks.embedders --backends mistral onnx hashing --snapshot snapshots/ --k 4
+"""
+
+import argparse
+import json
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from utils.embedders import EMBEDDER_BACKENDS, create_embedder
+from utils.embedding_cache import batch_embed
+from utils.metrics import quantile
+
+REFERENCE_BACKEND = "mistral"
+CORPUS_BATCH_SIZE = 32
+
+
+def load_queries(path: str, limit: Optional[int] = None) -> List[str]:
+    """Load the distinct queries of a results file, in order."""
+    with open(path, "r", encoding="utf-8") as f:
+        queries = list(dict.fromkeys(record["query"] for record in json.load(f)))
+    return queries[:limit] if limit else queries
+
+
+def load_corpus(snapshot: Optional[str], chroma_path: str, collection: str) -> List[str]:
+    """
+    Load the chunk texts to search.
+
+    Args:
+        snapshot: Offline snapshot directory or tarball; when None the
+            persistent Chroma collection is read instead
+        chroma_path: Directory of the persistent Chroma client
+        collection: Collection name
+
+    Returns:
+        List[str]: Distinct chunk contents
+    """
+    if snapshot:
+        from utils.snapshots import read_snapshots
+
+        texts = [document.content for documents in read_snapshots(snapshot).values() for document in documents]
+    else:
+        import chromadb
+
+        client = chromadb.PersistentClient(path=chroma_path)
+        texts = client.get_collection(name=collection).get(include=["documents"])["documents"]
+    return list(dict.fromkeys(texts))
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """L2-normalize every row, leaving zero rows untouched."""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms > 0, norms, 1.0)
+
+
+def top_k(corpus: np.ndarray, query: np.ndarray, k: int) -> List[int]:
+    """Return the indexes of the k rows most cosine-similar to the query, best first."""
+    scores = corpus @ (query / (np.linalg.norm(query) or 1.0))
+    k = min(k, len(scores))
+    candidates = np.argpartition(-scores, k - 1)[:k]
+    return candidates[np.argsort(-scores[candidates])].tolist()
+
+
+def recall_at_k(candidate: List[int], reference: List[int]) -> float:
+    """Share of the reference top-k found in the candidate top-k."""
+    return len(set(candidate) & set(reference)) / len(reference) if reference else 0.0
+
+
+def run_backend(backend: str, corpus: List[str], queries: List[str], k: int) -> Dict[str, Any]:
+    """
+    Embed the corpus and queries with one backend and rank the corpus per query.
+
+    Returns:
+        Dict[str, Any]: Raw timings and the top-k chunk indexes per query
+    """
+    embedder = create_embedder(backend)
+
+    started = time.perf_counter()
+    vectors: List[List[float]] = []
+    for i in range(0, len(corpus), CORPUS_BATCH_SIZE):
+        vectors.extend(batch_embed(embedder, corpus[i:i + CORPUS_BATCH_SIZE]))
+    corpus_seconds = time.perf_counter() - started
+    matrix = normalize_rows(np.asarray(vectors, dtype=np.float32))
+
+    # Warm up lazily loaded models so the first query is not an outlier
+    embedder.get_embedding(queries[0])
+    latencies = []
+    rankings = []
+    for query in queries:
+        started = time.perf_counter()
+        vector = np.asarray(embedder.get_embedding(query), dtype=np.float32)
+        latencies.append(time.perf_counter() - started)
+        rankings.append(top_k(matrix, vector, k))
+
+    return {
+        "backend": backend,
+        "embedder": str(getattr(embedder, "id", backend)),
+        "dimensions": int(matrix.shape[1]),
+        "corpus_seconds": corpus_seconds,
+        "latencies": latencies,
+        "rankings": rankings,
+    }
+
+
+def summarise(results: List[Dict[str, Any]], corpus_size: int, k: int, reference: str = REFERENCE_BACKEND) -> List[Dict[str, Any]]:
+    """Aggregate raw backend runs into report rows, with recall against the reference backend."""
+    base = next((r for r in results if r["backend"] == reference), None)
+    summaries = []
+    for result in results:
+        latencies = result["latencies"]
+        summary = {
+            "backend": result["backend"],
+            "embedder": result["embedder"],
+            "dimensions": result["dimensions"],
+            "query_latency_p50": quantile(latencies, 0.5),
+            "query_latency_p95": quantile(latencies, 0.95),
+            "query_latency_mean": sum(latencies) / len(latencies) if latencies else float("nan"),
+            "corpus_chunks_per_second": corpus_size / result["corpus_seconds"] if result["corpus_seconds"] > 0 else 0.0,
+            f"recall@{k}": None,
+        }
+        if base is not None:
+            recalls = [recall_at_k(c, r) for c, r in zip(result["rankings"], base["rankings"])]
+            summary[f"recall@{k}"] = sum(recalls) / len(recalls) if recalls else 0.0
+        summaries.append(summary)
+    return summaries
+
+
+def print_report(summaries: List[Dict[str, Any]], k: int) -> None:
+    """Print a compact comparison table."""
+    header = f"{'backend':<10} {'dims':>5} {'p50 ms':>8} {'p95 ms':>8} {'chunks/s':>9} {f'recall@{k}':>9}"
+    print(header)
+    print("-" * len(header))
+    for s in summaries:
+        recall = s[f"recall@{k}"]
+        print(
+            f"{s['backend']:<10} {s['dimensions']:>5} {s['query_latency_p50'] * 1000:>8.1f} "
+            f"{s['query_latency_p95'] * 1000:>8.1f} {s['corpus_chunks_per_second']:>9.1f} "
+            f"{'-' if recall is None else format(recall, '.0%'):>9}"
+        )
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark embedding backends against the Mistral embedder")
+    parser.add_argument("--backends", nargs="+", default=list(EMBEDDER_BACKENDS), choices=list(EMBEDDER_BACKENDS))
+    parser.add_argument("--reference", default=REFERENCE_BACKEND, choices=list(EMBEDDER_BACKENDS))
+    parser.add_argument("--snapshot", default=None, help="Offline snapshot to build the corpus from")
+    parser.add_argument("--chroma-path", default="storage/chroma_db", help="Chroma directory used without --snapshot")
+    parser.add_argument("--collection", default="infinitepay-extracted-content")
+    parser.add_argument("--results", default="results.json", help="Queries to embed")
+    parser.add_argument("--limit", type=int, default=None, help="Only use the first N queries")
+    parser.add_argument("--k", type=int, default=4, help="Cut-off of the recall@k comparison")
+    parser.add_argument("--output", default=None, help="Write the JSON report to this path")
+    args = parser.parse_args(argv)
+
+    corpus = load_corpus(args.snapshot, args.chroma_path, args.collection)
+    queries = load_queries(args.results, args.limit)
+    if not corpus or not queries:
+        raise SystemExit("The benchmark needs a non-empty corpus and at least one query")
+
+    results = [run_backend(backend, corpus, queries, args.k) for backend in args.backends]
+    summaries = summarise(results, len(corpus), args.k, reference=args.reference)
+    print(f"{len(corpus)} chunks, {len(queries)} queries, reference backend: {args.reference}")
+    print_report(summaries, args.k)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(summaries, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+# benchmarks/knowledge_turns.py
+"""
+LLM turns per knowledge query: tool-driven search versus retrieval-first.
+
+The knowledge agent is run directly (without the router team) on the
+knowledge queries of ``results.json``, once per ``KNOWLEDGE_SEARCH_MODE``.
+Each mode runs in its own subprocess, because the agent is built once at
+import time from the environment. The report gives, per mode:
+
+- LLM turns per query (mean and max), counted as assistant messages
+- input tokens per query, as reported by the model
+- latency: p50 / p95 of the agent run
+
+Usage:
+    python -m benchmarks.knowledge_turns --modes tool context --output turns_report.json
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+from utils.metrics import quantile
+
+SEARCH_MODES = ("tool", "context")
+
+
+def load_knowledge_queries(path: str, limit: Optional[int] = None) -> List[str]:
+    """Load the distinct queries of a results file that were not routed to customer support."""
+    with open(path, "r", encoding="utf-8") as f:
+        records = json.load(f)
+    queries = [r["query"] for r in records if "support" not in r["agent_workflow"]["agent_name"].lower()]
+    queries = list(dict.fromkeys(queries))
+    return queries[:limit] if limit else queries
+
+
+def run_mode_worker(mode: str, queries: List[str], output_path: str) -> None:
+    """
+    Run every query through the knowledge agent in one search mode.
+
+    Must run in a fresh interpreter: the mode is applied through the
+    environment before the agents are imported.
+    """
+    os.environ["KNOWLEDGE_SEARCH_MODE"] = mode
+
+    from agents import knowledge_agent
+    from agents.workflow import count_llm_turns
+
+    runs = []
+    for query in queries:
+        started = time.perf_counter()
+        try:
+            response = knowledge_agent.run(query)
+        except Exception as e:
+            runs.append({"query": query, "success": False, "error": str(e), "latency": time.perf_counter() - started})
+            continue
+        elapsed = time.perf_counter() - started
+        input_tokens = (response.metrics or {}).get("input_tokens", [])
+        runs.append(
+            {
+                "query": query,
+                "success": response.content is not None,
+                "latency": elapsed,
+                "llm_turns": sum(count_llm_turns(response).values()),
+                "input_tokens": sum(input_tokens) if isinstance(input_tokens, list) else input_tokens,
+            }
+        )
+
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump({"mode": mode, "runs": runs}, f)
+
+
+def summarise_mode(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Aggregate the raw runs of one mode into report metrics."""
+    runs = [run for run in result["runs"] if run["success"]]
+    turns = [run["llm_turns"] for run in runs]
+    tokens = [run["input_tokens"] for run in runs]
+    latencies = [run["latency"] for run in runs]
+    return {
+        "mode": result["mode"],
+        "queries": len(result["runs"]),
+        "success_rate": len(runs) / len(result["runs"]) if result["runs"] else 0.0,
+        "llm_turns_mean": sum(turns) / len(turns) if turns else float("nan"),
+        "llm_turns_max": max(turns) if turns else 0,
+        "input_tokens_mean": sum(tokens) / len(tokens) if tokens else float("nan"),
+        "latency_p50": quantile(latencies, 0.5),
+        "latency_p95": quantile(latencies, 0.95),
+    }
+
+
+def print_report(summaries: List[Dict[str, Any]]) -> None:
+    """Print a compact comparison table."""
+    header = f"{'mode':<8} {'turns':>6} {'max':>4} {'in tokens':>10} {'p50 s':>7} {'p95 s':>7} {'ok':>5}"
+    print(header)
+    print("-" * len(header))
+    for s in summaries:
+        print(
+            f"{s['mode']:<8} {s['llm_turns_mean']:>6.2f} {s['llm_turns_max']:>4} {s['input_tokens_mean']:>10.0f} "
+            f"{s['latency_p50']:>7.2f} {s['latency_p95']:>7.2f} {s['success_rate']:>5.0%}"
+        )
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Compare LLM turns of the knowledge agent search modes")
+    parser.add_argument("--modes", nargs="+", default=list(SEARCH_MODES), choices=list(SEARCH_MODES))
+    parser.add_argument("--results", default="results.json", help="Reference queries")
+    parser.add_argument("--limit", type=int, default=None, help="Only run the first N queries")
+    parser.add_argument("--output", default=None, help="Write the JSON report to this path")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--mode", help=argparse.SUPPRESS)
+    parser.add_argument("--worker-output", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    queries = load_knowledge_queries(args.results, args.limit)
+    if args.worker:
+        run_mode_worker(args.mode, queries, args.worker_output)
+        return
+
+    summaries = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for mode in args.modes:
+            worker_output = os.path.join(tmp_dir, f"{mode}.json")
+            command = [
+                sys.executable, "-m", "benchmarks.knowledge_turns", "--worker",
+                "--mode", mode, "--results", args.results, "--worker-output", worker_output,
+            ]
+            if args.limit:
+                command += ["--limit", str(args.limit)]
+            subprocess.run(command, check=True)
+            with open(worker_output, "r", encoding="utf-8") as f:
+                summaries.append(summarise_mode(json.load(f)))
+
+    print_report(summaries)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(summaries, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
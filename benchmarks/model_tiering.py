@@ -0,0 +1,193 @@
+# benchmarks/model_tiering.py
+"""
+Latency and quality benchmark for the model tiering profiles.
+
+Every profile in ``MODEL_TIER_PROFILES`` is run against the queries stored in
+``results.json``. Each profile runs in its own subprocess, because the agents
+are built once at import time from the environment. The report compares each
+profile with the ``uniform`` (all large model) baseline:
+
+- latency: p50 / p95 / mean end-to-end workflow time
+- routing agreement: share of queries routed to the same specialist as the
+  reference answer
+- answer similarity: word-level similarity between the specialist answer and
+  the reference ``source_agent_response``
+
+Usage:
+    python -m benchmarks.model_tiering --profiles uniform tiered economy
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from difflib import SequenceMatcher
+from typing import Any, Dict, List, Optional
+
+from utils.metrics import quantile
+from utils.model_config import MODEL_TIER_PROFILES, get_stage_models
+
+BASELINE_PROFILE = "uniform"
+
+
+def route_of(agent_name: str) -> str:
+    """Map a free-form agent name to the route it represents."""
+    return "customer_support" if "support" in (agent_name or "").lower() else "knowledge"
+
+
+def response_similarity(candidate: str, reference: str) -> float:
+    """
+    Word-level similarity between two answers.
+
+    Args:
+        candidate: Answer produced by the benchmarked profile
+        reference: Reference answer from results.json
+
+    Returns:
+        float: Ratio between 0 (unrelated) and 1 (identical)
+    """
+    return SequenceMatcher(None, candidate.lower().split(), reference.lower().split()).ratio()
+
+
+def load_reference_queries(path: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Load the reference queries and answers from a results file."""
+    with open(path, "r", encoding="utf-8") as f:
+        records = json.load(f)
+    return records[:limit] if limit else records
+
+
+def run_profile_worker(profile: str, results_path: str, output_path: str, limit: Optional[int]) -> None:
+    """
+    Run every reference query through the workflow with one tiering profile.
+
+    Must run in a fresh interpreter: the profile is applied through the
+    environment before the agents are imported.
+    """
+    os.environ["MODEL_TIER_PROFILE"] = profile
+
+    from agno.storage.json import JsonStorage
+    from agents import Workflow
+
+    runs = []
+    with tempfile.TemporaryDirectory() as storage_dir:
+        workflow = Workflow(storage=JsonStorage(storage_dir))
+        for record in load_reference_queries(results_path, limit):
+            started = time.perf_counter()
+            response = workflow.run(query=record["query"])
+            elapsed = time.perf_counter() - started
+
+            run: Dict[str, Any] = {"query": record["query"], "latency": elapsed, "success": False}
+            if response and response.content:
+                run.update(
+                    {
+                        "success": True,
+                        "agent_name": response.content.agent_workflow.agent_name,
+                        "source_agent_response": response.content.source_agent_response,
+                    }
+                )
+            runs.append(run)
+
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump({"profile": profile, "models": get_stage_models(profile), "runs": runs}, f)
+
+
+def summarise_profile(result: Dict[str, Any], references: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Aggregate the raw runs of one profile into report metrics."""
+    by_query = {}
+    for record in references:
+        by_query.setdefault(record["query"], record)
+
+    latencies = [run["latency"] for run in result["runs"]]
+    successes = [run for run in result["runs"] if run["success"]]
+    agreements = []
+    similarities = []
+    for run in successes:
+        reference = by_query[run["query"]]
+        agreements.append(
+            route_of(run["agent_name"]) == route_of(reference["agent_workflow"]["agent_name"])
+        )
+        similarities.append(
+            response_similarity(run["source_agent_response"], reference["source_agent_response"])
+        )
+
+    return {
+        "profile": result["profile"],
+        "models": result["models"],
+        "queries": len(result["runs"]),
+        "success_rate": len(successes) / len(result["runs"]) if result["runs"] else 0.0,
+        "latency_p50": quantile(latencies, 0.5),
+        "latency_p95": quantile(latencies, 0.95),
+        "latency_mean": sum(latencies) / len(latencies) if latencies else float("nan"),
+        "routing_agreement": sum(agreements) / len(agreements) if agreements else 0.0,
+        "answer_similarity": sum(similarities) / len(similarities) if similarities else 0.0,
+    }
+
+
+def add_deltas(summaries: List[Dict[str, Any]], baseline: str = BASELINE_PROFILE) -> None:
+    """Annotate every summary with its difference to the baseline profile."""
+    base = next((s for s in summaries if s["profile"] == baseline), None)
+    if base is None:
+        return
+    for summary in summaries:
+        summary["delta_vs_" + baseline] = {
+            key: summary[key] - base[key]
+            for key in ("latency_p50", "latency_p95", "latency_mean", "routing_agreement", "answer_similarity")
+        }
+
+
+def print_report(summaries: List[Dict[str, Any]]) -> None:
+    """Print a compact comparison table."""
+    header = f"{'profile':<10} {'p50 s':>8} {'p95 s':>8} {'routing':>8} {'similarity':>10} {'Δp50 s':>8} {'Δsim':>7}"
+    print(header)
+    print("-" * len(header))
+    for s in summaries:
+        delta = s.get("delta_vs_" + BASELINE_PROFILE, {})
+        print(
+            f"{s['profile']:<10} {s['latency_p50']:>8.2f} {s['latency_p95']:>8.2f} "
+            f"{s['routing_agreement']:>8.0%} {s['answer_similarity']:>10.2f} "
+            f"{delta.get('latency_p50', 0.0):>+8.2f} {delta.get('answer_similarity', 0.0):>+7.2f}"
+        )
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark model tiering profiles against results.json")
+    parser.add_argument("--profiles", nargs="+", default=list(MODEL_TIER_PROFILES), choices=list(MODEL_TIER_PROFILES))
+    parser.add_argument("--results", default="results.json", help="Reference queries and answers")
+    parser.add_argument("--limit", type=int, default=None, help="Only run the first N queries")
+    parser.add_argument("--output", default=None, help="Write the JSON report to this path")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--profile", help=argparse.SUPPRESS)
+    parser.add_argument("--worker-output", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        run_profile_worker(args.profile, args.results, args.worker_output, args.limit)
+        return
+
+    references = load_reference_queries(args.results, args.limit)
+    summaries = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for profile in args.profiles:
+            worker_output = os.path.join(tmp_dir, f"{profile}.json")
+            command = [
+                sys.executable, "-m", "benchmarks.model_tiering", "--worker",
+                "--profile", profile, "--results", args.results, "--worker-output", worker_output,
+            ]
+            if args.limit:
+                command += ["--limit", str(args.limit)]
+            subprocess.run(command, check=True)
+            with open(worker_output, "r", encoding="utf-8") as f:
+                summaries.append(summarise_profile(json.load(f), references))
+
+    add_deltas(summaries)
+    print_report(summaries)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(summaries, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,288 @@
+# benchmarks/retrieval.py
+"""
+Retrieval quality and latency benchmark over a fixed corpus snapshot.
+
+Every retrieval configuration indexes the same offline snapshot
+(``--snapshot``, see ``scripts/ingest_snapshots.py``) into temporary indexes
+and answers the labelled queries of ``benchmarks/retrieval_dataset.json``.
+A configuration is written ``<mode>[:<backend>[:<store>]]``:
+
+    lexical                  BM25 only (tantivy)
+    vector:hashing:memmap    embeddings only, memory-mapped NumPy index
+    hybrid:onnx:chroma       both, fused with reciprocal rank fusion
+
+``--chunk-sizes`` and ``--k`` add the chunking and ``num_documents``
+dimensions. The report gives, per configuration and chunk size:
+
+- build time: embedding the chunks and writing the indexes
+- recall@k: share of labelled queries with a relevant chunk in the top k
+- MRR: mean reciprocal rank of the first relevant chunk (cut off at the largest k)
+- retrieval latency: p50 / p99 of ``HybridRetriever.search``
+
+A chunk is relevant when it comes from one of the query's ``expected_urls``
+and, if ``expected_phrases`` are given, contains one of them. Queries without
+expected URLs (out of scope for the knowledge base) count towards latency
+only. The ``hashing`` and ``onnx`` backends run without network access;
+``mistral`` calls the embeddings API.
+
+Seed a dataset to label from the queries of a results file with ``--seed``.
+
+Usage:
+    python -m benchmarks.retrieval --snapshot snapshots/ --configs lexical hybrid:hashing:memmap --k 1 4 10
+    python -m benchmarks.retrieval --seed results.json --dataset new_dataset.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from agno.document import Document
+from agno.document.chunking.fixed import FixedSizeChunking
+
+from utils.embedders import EMBEDDER_BACKENDS, create_embedder, fold_text
+from utils.ingestion import EmbeddingPipeline, as_stored_document, unique_documents, upsert_documents
+from utils.lexical_index import LexicalIndex
+from utils.metrics import quantile
+from utils.retrieval import RETRIEVAL_MODES, HybridRetriever
+from utils.vector_index import MemmapVectorIndex
+
+DEFAULT_DATASET = os.path.join(os.path.dirname(__file__), "retrieval_dataset.json")
+DEFAULT_CONFIGS = ["lexical", "vector:hashing:memmap", "hybrid:hashing:memmap", "hybrid:hashing:chroma"]
+VECTOR_STORES = ("memmap", "chroma")
+COLLECTION_NAME = "retrieval-benchmark"
+# Every query is run once before timing, so lazy model and index loading is not measured
+WARMUP_QUERIES = 1
+
+
+@dataclass
+class RetrievalConfig:
+    """One retrieval setup: search mode, embedding backend and vector store."""
+
+    mode: str
+    backend: Optional[str] = None
+    store: Optional[str] = None
+
+    @classmethod
+    def parse(cls, spec: str) -> "RetrievalConfig":
+        """Parse ``<mode>[:<backend>[:<store>]]``, defaulting to the hashing backend and memmap store."""
+        mode, *rest = spec.split(":")
+        if mode not in RETRIEVAL_MODES:
+            raise ValueError(f"Unknown retrieval mode '{mode}' in '{spec}', expected one of {RETRIEVAL_MODES}")
+        if mode == "lexical":
+            if rest:
+                raise ValueError(f"Lexical configuration '{spec}' takes no backend or store")
+            return cls(mode)
+        backend = rest[0] if rest else "hashing"
+        store = rest[1] if len(rest) > 1 else "memmap"
+        if backend not in EMBEDDER_BACKENDS:
+            raise ValueError(f"Unknown embedder backend '{backend}' in '{spec}', expected one of {EMBEDDER_BACKENDS}")
+        if store not in VECTOR_STORES:
+            raise ValueError(f"Unknown vector store '{store}' in '{spec}', expected one of {VECTOR_STORES}")
+        return cls(mode, backend, store)
+
+    @property
+    def name(self) -> str:
+        return ":".join(part for part in (self.mode, self.backend, self.store) if part)
+
+
+def load_dataset(path: str) -> List[Dict[str, Any]]:
+    """Load the labelled queries."""
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def seed_dataset(results_path: str) -> List[Dict[str, Any]]:
+    """Create unlabelled dataset entries from the distinct queries of a results file."""
+    with open(results_path, "r", encoding="utf-8") as f:
+        queries = dict.fromkeys(record["query"] for record in json.load(f))
+    return [{"query": query, "expected_urls": [], "source": os.path.basename(results_path)} for query in queries]
+
+
+def load_corpus(snapshot: str, chunk_size: int) -> List[Document]:
+    """Parse and chunk a snapshot into the distinct chunks the collection would store."""
+    from utils.snapshots import read_snapshots
+
+    sources = read_snapshots(snapshot, chunking_strategy=FixedSizeChunking(chunk_size=chunk_size))
+    documents = [document for documents in sources.values() for document in documents]
+    return [as_stored_document(document) for document in unique_documents(documents)]
+
+
+def chunk_urls(document: Document) -> List[str]:
+    """Return every page a chunk belongs to (shared blocks belong to several)."""
+    meta_data = document.meta_data or {}
+    if meta_data.get("urls"):
+        return meta_data["urls"].split(",")
+    return [meta_data["url"]] if meta_data.get("url") else []
+
+
+def is_relevant(document: Document, example: Dict[str, Any]) -> bool:
+    """Whether a retrieved chunk answers a labelled query."""
+    urls = {url.rstrip("/") for url in chunk_urls(document)}
+    if not urls & {url.rstrip("/") for url in example.get("expected_urls", [])}:
+        return False
+    phrases = example.get("expected_phrases")
+    if not phrases:
+        return True
+    content = fold_text(document.content)
+    return any(fold_text(phrase) in content for phrase in phrases)
+
+
+def first_relevant_rank(documents: List[Document], example: Dict[str, Any]) -> Optional[int]:
+    """1-based rank of the first relevant chunk, or None."""
+    for rank, document in enumerate(documents, start=1):
+        if is_relevant(document, example):
+            return rank
+    return None
+
+
+def build_retriever(config: RetrievalConfig, corpus: List[Document], directory: str) -> HybridRetriever:
+    """Index a corpus for one configuration under ``directory``."""
+    lexical_index = None
+    if config.mode != "vector":
+        lexical_index = LexicalIndex(os.path.join(directory, "tantivy_index"))
+        lexical_index.upsert(corpus)
+
+    vector_db = None
+    if config.mode != "lexical":
+        embedder = create_embedder(config.backend)
+        documents = [Document(id=d.id, content=d.content, meta_data=d.meta_data) for d in corpus]
+        report = asyncio.run(EmbeddingPipeline(embedder, rate_limit=0).embed(documents))
+        if report.failed_chunks:
+            raise RuntimeError(f"{report.failed_chunks} chunks could not be embedded: {report.errors[:3]}")
+        if config.store == "memmap":
+            vector_db = MemmapVectorIndex(os.path.join(directory, "vector_index"), embedder)
+            vector_db.build(
+                [d.id for d in documents],
+                [d.embedding for d in documents],
+                [d.content for d in documents],
+                [d.meta_data for d in documents],
+                str(embedder.id),
+            )
+        else:
+            from agno.vectordb.chroma import ChromaDb
+
+            vector_db = ChromaDb(
+                collection=COLLECTION_NAME,
+                path=os.path.join(directory, "chroma_db"),
+                persistent_client=True,
+                embedder=embedder,
+            )
+            vector_db.create()
+            upsert_documents(vector_db, documents)
+
+    return HybridRetriever(vector_db, lexical_index, mode=config.mode, token_budget=None, compress=False)
+
+
+def run_config(
+    config: RetrievalConfig, corpus: List[Document], dataset: List[Dict[str, Any]], ks: List[int]
+) -> Dict[str, Any]:
+    """
+    Build the indexes of one configuration and answer every labelled query.
+
+    Returns:
+        Dict[str, Any]: Build time, per-query ranks of the first relevant
+        chunk and retrieval latencies
+    """
+    limit = max(ks)
+    with tempfile.TemporaryDirectory() as directory:
+        started = time.perf_counter()
+        retriever = build_retriever(config, corpus, directory)
+        build_seconds = time.perf_counter() - started
+
+        for example in dataset[:WARMUP_QUERIES]:
+            retriever.search(example["query"], num_documents=limit)
+        latencies = []
+        ranks = []
+        for example in dataset:
+            started = time.perf_counter()
+            documents = retriever.search(example["query"], num_documents=limit)
+            latencies.append(time.perf_counter() - started)
+            if example.get("expected_urls"):
+                ranks.append(first_relevant_rank(documents, example))
+
+    return {"config": config.name, "build_seconds": build_seconds, "ranks": ranks, "latencies": latencies}
+
+
+def summarise(result: Dict[str, Any], ks: List[int], chunk_size: int, chunks: int) -> Dict[str, Any]:
+    """Aggregate one configuration run into report metrics."""
+    ranks = result["ranks"]
+    summary: Dict[str, Any] = {
+        "config": result["config"],
+        "chunk_size": chunk_size,
+        "chunks": chunks,
+        "build_seconds": result["build_seconds"],
+        "labelled_queries": len(ranks),
+    }
+    for k in ks:
+        hits = sum(1 for rank in ranks if rank is not None and rank <= k)
+        summary[f"recall@{k}"] = hits / len(ranks) if ranks else float("nan")
+    summary["mrr"] = sum(1 / rank for rank in ranks if rank is not None) / len(ranks) if ranks else float("nan")
+    summary["latency_p50"] = quantile(result["latencies"], 0.5)
+    summary["latency_p99"] = quantile(result["latencies"], 0.99)
+    return summary
+
+
+def print_report(summaries: List[Dict[str, Any]], ks: List[int]) -> None:
+    """Print a compact comparison table."""
+    recall_headers = " ".join(f"{f'R@{k}':>6}" for k in ks)
+    header = f"{'config':<24} {'chunk':>6} {'build s':>8} {recall_headers} {'MRR':>6} {'p50 ms':>8} {'p99 ms':>8}"
+    print(header)
+    print("-" * len(header))
+    for s in summaries:
+        recalls = " ".join(f"{s[f'recall@{k}']:>6.0%}" for k in ks)
+        print(
+            f"{s['config']:<24} {s['chunk_size']:>6} {s['build_seconds']:>8.2f} {recalls} {s['mrr']:>6.2f} "
+            f"{s['latency_p50'] * 1000:>8.2f} {s['latency_p99'] * 1000:>8.2f}"
+        )
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark retrieval quality and latency on a corpus snapshot")
+    parser.add_argument("--snapshot", help="Offline snapshot (directory or tarball of HTML pages)")
+    parser.add_argument("--dataset", default=DEFAULT_DATASET, help="Labelled queries")
+    parser.add_argument("--configs", nargs="+", default=DEFAULT_CONFIGS, help="<mode>[:<backend>[:<store>]]")
+    parser.add_argument("--chunk-sizes", nargs="+", type=int, default=[5000], help="Chunk sizes in characters")
+    parser.add_argument("--k", nargs="+", type=int, default=[1, 4, 10], help="Cut-offs of recall@k")
+    parser.add_argument("--output", default=None, help="Write the JSON report to this path")
+    parser.add_argument("--seed", default=None, help="Write unlabelled entries for the queries of this results file to --dataset and exit")
+    args = parser.parse_args(argv)
+
+    if args.seed:
+        if os.path.exists(args.dataset):
+            raise SystemExit(f"{args.dataset} exists; pass a new --dataset path to seed")
+        with open(args.dataset, "w", encoding="utf-8") as f:
+            json.dump(seed_dataset(args.seed), f, indent=2, ensure_ascii=False)
+        print(f"Wrote unlabelled queries to {args.dataset}; fill in expected_urls before benchmarking")
+        return
+    if not args.snapshot:
+        parser.error("--snapshot is required")
+
+    configs = [RetrievalConfig.parse(spec) for spec in args.configs]
+    ks = sorted(set(args.k))
+    dataset = load_dataset(args.dataset)
+    if not dataset:
+        raise SystemExit("The benchmark needs at least one query")
+
+    summaries = []
+    for chunk_size in args.chunk_sizes:
+        corpus = load_corpus(args.snapshot, chunk_size)
+        if not corpus:
+            raise SystemExit(f"No chunks found in {args.snapshot}")
+        pages = {url for document in corpus for url in chunk_urls(document)}
+        print(f"Chunk size {chunk_size}: {len(corpus)} chunks from {len(pages)} pages, {len(dataset)} queries")
+        for config in configs:
+            summaries.append(summarise(run_config(config, corpus, dataset, ks), ks, chunk_size, len(corpus)))
+
+    print_report(summaries, ks)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(summaries, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+# benchmarks/ticket_events.py
+"""
+Write throughput of the ticket event log under concurrent agents.
+
+Each of ``--writers`` threads plays a support agent. It creates tickets and
+moves each one through ``in_progress`` and ``resolved``, three events per
+ticket, all through one ``TicketEventLog``. Every durability mode is run for
+each writer count:
+
+- ``memory``: no log directory, events kept in memory
+- ``flush``: JSON-lines segments flushed to the OS on every event (default)
+- ``fsync``: every event forced to disk (``TICKET_EVENT_FSYNC=true``)
+
+The report gives events per second, p50/p99 latency of one command, and the
+time ``recover`` takes to rebuild the tickets from the snapshot and log tail.
+
+Usage:
+    python -m benchmarks.ticket_events --writers 1 4 16 --tickets 500
+"""
+
+import argparse
+import json
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from utils.metrics import quantile
+from utils.ticket_events import TicketEventLog
+from utils.ticket_store import TicketStore
+
+MODES = ("memory", "flush", "fsync")
+
+
+def make_ticket(ticket_id: str, worker: int) -> Dict[str, Any]:
+    """A synthetic open ticket."""
+    return {
+        "ticket_id": ticket_id,
+        "customer_email": f"customer{worker}@example.com",
+        "subject": f"Issue {ticket_id}",
+        "description": "Synthetic ticket",
+        "priority": "medium",
+        "status": "open",
+        "created_at": "2026-01-01 00:00:00",
+        "updated_at": "2026-01-01 00:00:00",
+        "assigned_to": "support_team",
+    }
+
+
+def run_mode(mode: str, writers: int, tickets: int, snapshot_every: int) -> Dict[str, Any]:
+    """Write ``tickets`` tickets per writer and time every command."""
+    with tempfile.TemporaryDirectory() as directory:
+        path = None if mode == "memory" else directory
+        log = TicketEventLog(TicketStore(), path=path, snapshot_every=snapshot_every, fsync=mode == "fsync")
+        latencies: List[List[float]] = [[] for _ in range(writers)]
+        start_barrier = threading.Barrier(writers)
+
+        def work(worker: int) -> None:
+            start_barrier.wait()
+            for i in range(tickets):
+                ticket_id = f"TK-{worker}-{i}"
+                for command, args in (
+                    (log.create, (make_ticket(ticket_id, worker),)),
+                    (log.change_status, (ticket_id, "in_progress")),
+                    (log.change_status, (ticket_id, "resolved")),
+                ):
+                    started = time.perf_counter()
+                    command(*args)
+                    latencies[worker].append((time.perf_counter() - started) * 1000)
+
+        threads = [threading.Thread(target=work, args=(worker,)) for worker in range(writers)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        log.close()
+
+        recover_ms = None
+        if path is not None:
+            recovered = TicketEventLog(TicketStore(), path=path, snapshot_every=snapshot_every)
+            recover_started = time.perf_counter()
+            recovered.recover()
+            recover_ms = round((time.perf_counter() - recover_started) * 1000, 2)
+            recovered.close()
+            assert len(recovered.store) == writers * tickets
+
+    all_latencies = [latency for worker_latencies in latencies for latency in worker_latencies]
+    return {
+        "mode": mode,
+        "writers": writers,
+        "events": log.seq,
+        "events_per_second": round(log.seq / elapsed),
+        "p50_ms": round(quantile(all_latencies, 0.5), 4),
+        "p99_ms": round(quantile(all_latencies, 0.99), 4),
+        "recover_ms": recover_ms,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark ticket event log writes under concurrent writers")
+    parser.add_argument("--writers", nargs="+", type=int, default=[1, 4, 16])
+    parser.add_argument("--tickets", type=int, default=500, help="Tickets created per writer")
+    parser.add_argument("--snapshot-every", type=int, default=1000, help="Events between snapshots")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--output", default=None, help="Write the JSON report to this path")
+    args = parser.parse_args(argv)
+
+    results = [
+        run_mode(mode, writers, args.tickets, args.snapshot_every) for writers in args.writers for mode in args.modes
+    ]
+    print(f"{'writers':>8} {'mode':<8} {'events':>8} {'events/s':>10} {'p50 ms':>9} {'p99 ms':>9} {'recover ms':>11}")
+    for result in results:
+        recover_ms = "-" if result["recover_ms"] is None else f"{result['recover_ms']:.2f}"
+        print(
+            f"{result['writers']:>8} {result['mode']:<8} {result['events']:>8} {result['events_per_second']:>10} "
+            f"{result['p50_ms']:>9.4f} {result['p99_ms']:>9.4f} {recover_ms:>11}"
+        )
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
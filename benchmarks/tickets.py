@@ -0,0 +1,121 @@
+# benchmarks/tickets.py
+"""
+Latency of ticket listing queries as the ticket count grows.
+
+For each store size, synthetic tickets (spread over customers, statuses,
+priorities and creation times) are loaded into a ``TicketStore`` and the
+listing queries of the ``/tickets`` endpoint are timed:
+
+- ``customer``: one customer's tickets
+- ``open_urgent``: all open urgent tickets
+- ``deep_page``: the tenth page of all tickets, following cursors
+- ``scan``: the open urgent tickets found by scanning a plain dict, the
+  way ``TICKETS`` was queried before it was indexed
+
+Indexed queries should stay flat while ``scan`` grows with the store.
+
+Usage:
+    python -m benchmarks.tickets --sizes 1000 10000 100000 --repeat 200
+"""
+
+import argparse
+import json
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+from utils.metrics import quantile
+from utils.ticket_store import TicketStore
+
+STATUSES = ["open", "in_progress", "resolved", "closed"]
+PRIORITIES = ["low", "medium", "high", "urgent"]
+PAGE_SIZE = 20
+
+
+def synthetic_tickets(count: int, customers: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """Generate tickets created one minute apart, oldest first."""
+    rng = random.Random(seed)
+    start = datetime(2026, 1, 1)
+    return [
+        {
+            "ticket_id": f"TK-{1000 + i}",
+            "customer_email": f"customer{rng.randrange(customers)}@example.com",
+            "subject": f"Issue {i}",
+            "description": "Synthetic ticket",
+            "priority": rng.choice(PRIORITIES),
+            "status": rng.choice(STATUSES),
+            "created_at": (start + timedelta(minutes=i)).strftime("%Y-%m-%d %H:%M:%S"),
+            "updated_at": (start + timedelta(minutes=i)).strftime("%Y-%m-%d %H:%M:%S"),
+            "assigned_to": "support_team",
+        }
+        for i in range(count)
+    ]
+
+
+def scan_open_urgent(tickets: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Full scan of a plain dict, newest first."""
+    matches = [t for t in tickets.values() if t["status"] == "open" and t["priority"] == "urgent"]
+    return sorted(matches, key=lambda t: (t["created_at"], t["ticket_id"]), reverse=True)[:PAGE_SIZE]
+
+
+def deep_page(store: TicketStore, pages: int = 10) -> List[Dict[str, Any]]:
+    """Follow cursors to the given page of all tickets."""
+    cursor = None
+    for _ in range(pages):
+        page, cursor = store.query(limit=PAGE_SIZE, cursor=cursor)
+        if cursor is None:
+            break
+    return page
+
+
+def time_query(function: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    """Return p50 and p99 latency in milliseconds."""
+    latencies = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        latencies.append((time.perf_counter() - started) * 1000)
+    return {"p50_ms": round(quantile(latencies, 0.5), 4), "p99_ms": round(quantile(latencies, 0.99), 4)}
+
+
+def run_size(size: int, repeat: int, customers: int) -> Dict[str, Any]:
+    """Time every query on a store of the given size."""
+    tickets = synthetic_tickets(size, customers)
+    store = TicketStore()
+    plain: Dict[str, Dict[str, Any]] = {}
+    for ticket in tickets:
+        store[ticket["ticket_id"]] = ticket
+        plain[ticket["ticket_id"]] = ticket
+    customer = tickets[-1]["customer_email"]
+
+    return {
+        "tickets": size,
+        "customer": time_query(lambda: store.query(customer_email=customer, limit=PAGE_SIZE), repeat),
+        "open_urgent": time_query(lambda: store.query(status="open", priority="urgent", limit=PAGE_SIZE), repeat),
+        "deep_page": time_query(lambda: deep_page(store), repeat),
+        "scan": time_query(lambda: scan_open_urgent(plain), max(1, repeat // 10)),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark indexed ticket listing against a full scan")
+    parser.add_argument("--sizes", nargs="+", type=int, default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=200, help="Timed runs per indexed query")
+    parser.add_argument("--customers", type=int, default=500, help="Distinct customer emails")
+    parser.add_argument("--output", default=None, help="Write the JSON report to this path")
+    args = parser.parse_args(argv)
+
+    results = [run_size(size, args.repeat, args.customers) for size in args.sizes]
+    print(f"{'tickets':>10} {'query':<12} {'p50 ms':>10} {'p99 ms':>10}")
+    for result in results:
+        for query in ("customer", "open_urgent", "deep_page", "scan"):
+            timings = result[query]
+            print(f"{result['tickets']:>10} {query:<12} {timings['p50_ms']:>10.4f} {timings['p99_ms']:>10.4f}")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
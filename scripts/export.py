@@ -0,0 +1,69 @@
+# scripts/export.py
+"""
+Export tickets or workflow runs as NDJSON, for the nightly analytics dump.
+
+Records are written as they are read, and gzip-compressed on the fly when
+the output ends in ``.gz`` or ``--gzip`` is given. Runs are read from the
+workflow session files (``WORKFLOW_STORAGE_PATH``). Tickets live in the API
+process, so this command rebuilds them, read-only, from the durable ticket
+event log (``TICKET_EVENT_LOG_PATH``). Without that log, use the API's
+``GET /export/tickets`` instead.
+
+Usage:
+    python -m scripts.export runs --since 2026-03-01 --until 2026-03-02 --output runs.ndjson.gz
+    python -m scripts.export tickets --since 2026-03-01 --output - > tickets.ndjson
+"""
+
+import argparse
+import sys
+from typing import List, Optional
+
+from utils import get_logger
+from utils.export import WORKFLOW_STORAGE_PATH, export_stream, iter_tickets, iter_workflow_runs, parse_export_time
+from utils.ticket_events import TICKET_EVENT_LOG_PATH, TicketEventLog
+from utils.ticket_store import TicketStore
+
+logger = get_logger(__name__)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Export tickets or workflow runs as NDJSON")
+    parser.add_argument("dataset", choices=["tickets", "runs"])
+    parser.add_argument("--since", default=None, help="Earliest time, ISO date or timestamp (inclusive)")
+    parser.add_argument("--until", default=None, help="Latest time, ISO date or timestamp (exclusive)")
+    parser.add_argument("--output", default="-", help="Output file, '-' for stdout")
+    parser.add_argument("--gzip", action="store_true", help="Compress the output (implied by a .gz output)")
+    parser.add_argument("--event-log", default=TICKET_EVENT_LOG_PATH, help="Ticket event log directory")
+    parser.add_argument("--sessions", default=WORKFLOW_STORAGE_PATH, help="Workflow session directory")
+    args = parser.parse_args(argv)
+
+    try:
+        since, until = parse_export_time(args.since), parse_export_time(args.until)
+        if args.dataset == "tickets":
+            if not args.event_log:
+                raise ValueError("Set TICKET_EVENT_LOG_PATH or --event-log, or use GET /export/tickets")
+            # Read-only: the API may be appending to the same log
+            log = TicketEventLog(TicketStore(), path=args.event_log)
+            log.recover(repair=False)
+            records = iter_tickets(log.store, since, until)
+        else:
+            records = iter_workflow_runs(args.sessions, since, until)
+
+        compress = args.gzip or args.output.endswith(".gz")
+        chunks = export_stream(records, args.dataset, compress=compress)
+        if args.output == "-":
+            for chunk in chunks:
+                sys.stdout.buffer.write(chunk)
+            sys.stdout.buffer.flush()
+        else:
+            with open(args.output, "wb") as f:
+                for chunk in chunks:
+                    f.write(chunk)
+    except Exception as e:
+        logger.error(f"Export of {args.dataset} failed: {str(e)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
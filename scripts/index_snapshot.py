@@ -0,0 +1,61 @@
+# scripts/index_snapshot.py
+"""
+Export the knowledge index to a portable snapshot, or import one.
+
+``export`` reads the Chroma collection (and ingest manifest) the API serves
+from; ``import`` replaces them, and rebuilds the lexical and memory-mapped
+indexes, without embedding anything. Point ``INDEX_SNAPSHOT_PATH`` at an
+exported archive to have the API import it at start-up instead.
+
+Usage:
+    python -m scripts.index_snapshot export build/index_snapshot.tar.gz
+    python -m scripts.index_snapshot import build/index_snapshot.tar.gz
+    python -m scripts.index_snapshot export out.tar.gz --chroma-path build/index/chroma_db \\
+        --manifest build/index/ingest_manifest.json
+"""
+
+import argparse
+import sys
+from typing import List, Optional
+
+from utils import LexicalIndex, MemmapVectorIndex, get_logger
+from utils.index_snapshot import export_snapshot, import_snapshot
+from utils.ingestion import INGEST_MANIFEST_PATH
+from utils.lexical_index import LEXICAL_INDEX_PATH
+from utils.vector_index import VECTOR_INDEX_PATH
+
+logger = get_logger(__name__)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Export or import a knowledge index snapshot")
+    parser.add_argument("command", choices=["export", "import"])
+    parser.add_argument("archive", help="Snapshot archive (.tar.gz)")
+    parser.add_argument("--chroma-path", default=None, help="Chroma directory (default: CHROMA_DB_PATH)")
+    parser.add_argument("--manifest", default=INGEST_MANIFEST_PATH, help="Ingest manifest")
+    parser.add_argument("--lexical-index", default=LEXICAL_INDEX_PATH, help="tantivy index rebuilt on import")
+    parser.add_argument("--vector-index", default=VECTOR_INDEX_PATH, help="Memory-mapped index rebuilt on import")
+    args = parser.parse_args(argv)
+
+    # Imported here so --help works without a configured environment
+    from agents.knowledge_agent import CHROMA_DB_PATH, create_vector_db
+
+    vector_db = create_vector_db(path=args.chroma_path or CHROMA_DB_PATH)
+    try:
+        if args.command == "export":
+            manifest = export_snapshot(vector_db, args.archive, manifest_path=args.manifest)
+            print(f"Exported {manifest['chunks']} chunks ({manifest['embedder']}) to {args.archive}")
+        else:
+            vector_index = MemmapVectorIndex(args.vector_index, vector_db.embedder)
+            manifest = import_snapshot(
+                args.archive, vector_db, LexicalIndex(args.lexical_index), vector_index, manifest_path=args.manifest
+            )
+            print(f"Imported {manifest['chunks']} chunks ({manifest['embedder']}) from {args.archive}")
+    except Exception as e:
+        logger.error(f"Snapshot {args.command} failed: {str(e)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
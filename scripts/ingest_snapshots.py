@@ -0,0 +1,132 @@
+# scripts/ingest_snapshots.py
+"""
+Build the knowledge base index from saved HTML pages, without network access
+to the website.
+
+The pages (a directory or tarball) are parsed in a process pool, chunked like
+``WebsiteKnowledgeBase`` and embedded into the ``infinitepay-extracted-content``
+collection of a Chroma database under ``--output``. The output directory is a
+ready-to-ship artifact::
+
+    <output>/chroma_db/             persistent Chroma collection
+    <output>/tantivy_index/         full-text index for hybrid retrieval
+    <output>/vector_index/          memory-mapped copy of the vectors (VECTOR_STORE=memmap)
+    <output>/ingest_manifest.json   chunk manifest for later incremental loads
+    <output>/artifact.json          build metadata
+
+Point ``CHROMA_DB_PATH``, ``LEXICAL_INDEX_PATH``, ``VECTOR_INDEX_PATH`` and ``INGEST_MANIFEST_PATH`` at these paths, or pass
+``--archive`` to also pack the directory into a tarball.
+
+Usage:
+    python -m scripts.ingest_snapshots snapshots/ --output build/index --archive build/index.tar.gz
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tarfile
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from utils import LexicalIndex, MemmapVectorIndex, get_logger, load_knowledge_base
+from utils.snapshots import DEFAULT_BASE_URL, read_snapshots
+
+logger = get_logger(__name__)
+
+
+def write_archive(directory: str, archive_path: str) -> None:
+    """Pack an index directory into a gzipped tarball."""
+    parent = os.path.dirname(archive_path)
+    if parent:
+        os.makedirs(parent, exist_ok=True)
+    with tarfile.open(archive_path, "w:gz") as archive:
+        archive.add(directory, arcname=os.path.basename(os.path.normpath(directory)))
+    logger.info(f"Wrote index archive {archive_path}")
+
+
+def build_index(
+    source: str,
+    output: str,
+    base_url: str = DEFAULT_BASE_URL,
+    workers: Optional[int] = None,
+    recreate: bool = False,
+) -> Dict[str, Any]:
+    """
+    Ingest a snapshot into a Chroma database under ``output``.
+
+    Args:
+        source: Snapshot directory or tarball of HTML pages
+        output: Artifact directory
+        base_url: URL prefix for pages without a canonical link
+        workers: Parser processes
+        recreate: Rebuild the collection instead of refreshing it
+
+    Returns:
+        Dict[str, Any]: The artifact metadata written to ``artifact.json``
+    """
+    # Imported here so parser worker processes never build the agents
+    from agents.knowledge_agent import COLLECTION_NAME, create_knowledge_base, create_vector_db
+
+    sources = read_snapshots(source, base_url=base_url, workers=workers)
+    if not sources:
+        raise ValueError(f"No pages with content found in {source}")
+
+    os.makedirs(output, exist_ok=True)
+    knowledge_base = create_knowledge_base(create_vector_db(path=os.path.join(output, "chroma_db")))
+    report = asyncio.run(
+        load_knowledge_base(
+            knowledge_base,
+            recreate=recreate,
+            manifest_path=os.path.join(output, "ingest_manifest.json"),
+            sources=sources,
+            lexical_index=LexicalIndex(os.path.join(output, "tantivy_index")),
+            vector_index=MemmapVectorIndex(os.path.join(output, "vector_index")),
+        )
+    )
+    if report.failed_chunks:
+        raise RuntimeError(f"{report.failed_chunks} chunks could not be embedded: {report.errors[:3]}")
+
+    artifact = {
+        "collection": COLLECTION_NAME,
+        "embedder": knowledge_base.vector_db.embedder.id,
+        "source": os.path.abspath(source),
+        "pages": report.urls,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "ingestion": report.to_dict(),
+    }
+    with open(os.path.join(output, "artifact.json"), "w", encoding="utf-8") as f:
+        json.dump(artifact, f, indent=2)
+    return artifact
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Ingest saved HTML pages into the knowledge base index")
+    parser.add_argument("source", help="Directory or tarball of saved HTML pages")
+    parser.add_argument("--output", default="build/index", help="Artifact directory")
+    parser.add_argument("--archive", default=None, help="Also pack the artifact into this .tar.gz")
+    parser.add_argument("--base-url", default=DEFAULT_BASE_URL, help="URL prefix for pages without a canonical link")
+    parser.add_argument("--workers", type=int, default=None, help="Parser processes (default: CPU count)")
+    parser.add_argument("--recreate", action="store_true", help="Rebuild the collection from scratch")
+    args = parser.parse_args(argv)
+
+    try:
+        artifact = build_index(args.source, args.output, args.base_url, args.workers, args.recreate)
+        if args.archive:
+            write_archive(args.output, args.archive)
+    except Exception as e:
+        logger.error(f"Offline ingestion failed: {str(e)}")
+        return 1
+
+    ingestion = artifact["ingestion"]
+    print(
+        f"Indexed {artifact['pages']} pages / {ingestion['chunks']} chunks into {args.output} "
+        f"({ingestion['embedded']} embedded, {ingestion['chunks_unchanged']} unchanged, "
+        f"{ingestion['chunks_deleted']} deleted, {ingestion['seconds']}s)"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
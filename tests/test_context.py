@@ -0,0 +1,96 @@
+# tests/test_context.py
+
+import pytest
+
+from agno.document import Document
+
+from utils.context import ContextCompressor, context_sources, estimate_tokens, jaccard, split_sentences
+
+
+class TestSplitSentences:
+
+    def test_splits_on_punctuation_and_lines(self):
+        """Test sentence boundaries"""
+        assert split_sentences("Primeira frase. Segunda?\nTerceira linha") == ["Primeira frase.", "Segunda?", "Terceira linha"]
+
+    def test_long_text_without_punctuation_is_wrapped(self):
+        """Test that menus and tables do not become one huge sentence"""
+        sentences = split_sentences(" ".join(["palavra"] * 200))
+
+        assert len(sentences) > 1
+        assert all(len(s) <= 400 for s in sentences)
+
+
+class TestContextCompressor:
+
+    def test_selects_relevant_sentences_within_budget(self):
+        """Test that the sentences matching the query are kept and the budget holds"""
+        documents = [
+            Document(
+                id="a",
+                content=(
+                    "A InfinitePay oferece diversas soluções para empreendedores. "
+                    "A taxa do Pix na maquininha é zero para vendas à vista. "
+                    "Nossa equipe atende de segunda a sexta-feira."
+                ),
+                meta_data={"url": "https://a"},
+            )
+        ]
+
+        compressed = ContextCompressor(token_budget=20).compress("qual a taxa do pix", documents)
+
+        assert [d.content for d in compressed] == ["A taxa do Pix na maquininha é zero para vendas à vista."]
+        assert sum(estimate_tokens(d.content) for d in compressed) <= 20
+
+    def test_drops_near_duplicates_and_keeps_metadata(self):
+        """Test that text repeated across chunks is kept once, attributed to its first source"""
+        repeated = "O boleto é compensado em até três dias úteis após o pagamento."
+        documents = [
+            Document(id="a", name="https://a", content=repeated, meta_data={"url": "https://a"}),
+            Document(id="b", name="https://b", content=f"{repeated} Boletos vencidos podem ser pagos no app.", meta_data={"url": "https://b"}),
+        ]
+
+        compressed = ContextCompressor(token_budget=100).compress("prazo do boleto", documents)
+
+        assert [d.id for d in compressed] == ["a", "b"]
+        assert compressed[0].content == repeated
+        assert compressed[1].content == "Boletos vencidos podem ser pagos no app."
+        assert compressed[1].meta_data == {"url": "https://b"}
+
+    def test_sentences_keep_original_order(self):
+        """Test that selected sentences are reassembled in reading order"""
+        documents = [Document(id="a", content="O cartão chega em casa. Ative o cartão pelo aplicativo.")]
+
+        compressed = ContextCompressor(token_budget=100).compress("ativar cartão", documents)
+
+        assert compressed[0].content == "O cartão chega em casa. Ative o cartão pelo aplicativo."
+
+    def test_empty_input(self):
+        """Test that chunks without usable sentences produce no context"""
+        assert ContextCompressor(token_budget=10).compress("pix", [Document(content="ok")]) == []
+
+    def test_invalid_budget(self):
+        """Test that a non-positive budget is rejected"""
+        with pytest.raises(ValueError):
+            ContextCompressor(token_budget=0)
+
+    def test_jaccard(self):
+        """Test the token set similarity"""
+        assert jaccard({"a", "b"}, {"b", "c"}) == pytest.approx(1 / 3)
+        assert jaccard(set(), set()) == 1.0
+
+
+class TestContextSources:
+
+    def test_groups_references_by_url(self):
+        """Test that context tokens are attributed to each source URL"""
+        references = [
+            {"content": "x" * 8, "meta_data": {"url": "https://a"}},
+            {"content": "x" * 4, "name": "shared-blocks", "meta_data": {}},
+            {"content": "x" * 4, "meta_data": {"url": "https://a"}},
+        ]
+
+        assert context_sources(references) == [
+            {"url": "https://a", "tokens": 3},
+            {"url": "shared-blocks", "tokens": 1},
+        ]
@@ -0,0 +1,183 @@
+# tests/test_crawler.py
+
+import asyncio
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from utils.crawler import AsyncCrawler, CrawlingWebsiteReader, primary_domain
+
+FIXTURE_PAGES = {
+    "/": '<html><body><main>Maquininha e conta digital</main><a href="/pix">Pix</a><a href="/boleto">Boleto</a><a href="/manual.pdf">PDF</a></body></html>',
+    "/pix": "<html><body><main>Pix parcelado sem juros</main></body></html>",
+    "/boleto": "<html><body><main>Boleto com baixa automatica</main></body></html>",
+    "/slow": "<html><body><main>Pagina lenta</main></body></html>",
+}
+
+
+class FixtureServer:
+    """Local stand-in for the website, with ETag support and request tracking"""
+
+    def __init__(self):
+        self.requests = []
+        self.active = 0
+        self.max_active = 0
+        self.delay = 0.0
+        self.lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with server.lock:
+                    server.requests.append((self.path, self.headers.get("If-None-Match")))
+                    server.active += 1
+                    server.max_active = max(server.max_active, server.active)
+                try:
+                    if server.delay:
+                        time.sleep(server.delay)
+                    body = FIXTURE_PAGES.get(self.path)
+                    if body is None:
+                        self.send_response(404)
+                        self.send_header("Content-Length", "0")
+                        self.end_headers()
+                        return
+                    etag = f'"{abs(hash(body))}"'
+                    if self.headers.get("If-None-Match") == etag:
+                        self.send_response(304)
+                        self.send_header("ETag", etag)
+                        self.end_headers()
+                        return
+                    data = body.encode("utf-8")
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/html; charset=utf-8")
+                    self.send_header("Content-Length", str(len(data)))
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    self.wfile.write(data)
+                finally:
+                    with server.lock:
+                        server.active -= 1
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.base_url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        self.thread = threading.Thread(target=self.httpd.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+
+    def paths(self):
+        return [path for path, _ in self.requests]
+
+
+@pytest.fixture
+def fixture_server():
+    """Serve the fixture pages on a random local port"""
+    server = FixtureServer()
+    server.thread.start()
+    yield server
+    server.httpd.shutdown()
+    server.httpd.server_close()
+
+
+def make_crawler(tmp_path, **kwargs):
+    """Create a crawler with a temporary cache and no politeness delay"""
+    options = {"cache_path": str(tmp_path / "crawl_cache.json"), "politeness_delay": 0}
+    options.update(kwargs)
+    return AsyncCrawler(**options)
+
+
+class TestAsyncCrawler:
+
+    def test_crawls_seed_and_links(self, fixture_server, tmp_path):
+        """Test that links are followed up to max_depth, skipping files"""
+        crawler = make_crawler(tmp_path, max_depth=2, max_links=10)
+
+        results = asyncio.run(crawler.crawl([fixture_server.base_url + "/"]))
+
+        pages = results[fixture_server.base_url + "/"]
+        assert set(pages) == {fixture_server.base_url + p for p in ["/", "/pix", "/boleto"]}
+        assert pages[fixture_server.base_url + "/pix"] == "Pix parcelado sem juros"
+        assert "/manual.pdf" not in fixture_server.paths()
+        assert crawler.stats.pages == 3
+        assert crawler.stats.bytes_fetched == sum(len(FIXTURE_PAGES[p].encode()) for p in ["/", "/pix", "/boleto"])
+        assert crawler.stats.pages_per_second > 0
+
+    def test_max_links_per_seed(self, fixture_server, tmp_path):
+        """Test that each seed stops after max_links pages"""
+        crawler = make_crawler(tmp_path, max_depth=2, max_links=1)
+
+        results = asyncio.run(crawler.crawl([fixture_server.base_url + "/"]))
+
+        assert list(results[fixture_server.base_url + "/"]) == [fixture_server.base_url + "/"]
+        assert fixture_server.paths() == ["/"]
+
+    def test_conditional_get_reuses_cached_pages(self, fixture_server, tmp_path):
+        """Test that unchanged pages are answered with 304 and not downloaded again"""
+        seeds = [fixture_server.base_url + "/pix", fixture_server.base_url + "/boleto"]
+        first = asyncio.run(make_crawler(tmp_path).crawl(seeds))
+
+        crawler = make_crawler(tmp_path)
+        second = asyncio.run(crawler.crawl(seeds))
+
+        assert second == first
+        assert crawler.stats.not_modified == 2
+        assert crawler.stats.bytes_fetched == 0
+        assert all(etag for _, etag in fixture_server.requests[2:])
+
+    def test_failed_seed_returns_empty(self, fixture_server, tmp_path):
+        """Test that a missing page does not break the other seeds"""
+        crawler = make_crawler(tmp_path)
+        seeds = [fixture_server.base_url + "/missing", fixture_server.base_url + "/pix"]
+
+        results = asyncio.run(crawler.crawl(seeds))
+
+        assert results[seeds[0]] == {}
+        assert results[seeds[1]]
+        assert crawler.stats.errors == 1
+
+    def test_per_host_concurrency_limit(self, fixture_server, tmp_path):
+        """Test that concurrent requests to one host are capped"""
+        fixture_server.delay = 0.1
+        crawler = make_crawler(tmp_path, per_host_concurrency=2)
+        seeds = [fixture_server.base_url + p for p in ["/", "/pix", "/boleto", "/slow"]]
+
+        asyncio.run(crawler.crawl(seeds))
+
+        assert fixture_server.max_active <= 2
+        assert len(fixture_server.requests) == 4
+
+    def test_politeness_delay(self, fixture_server, tmp_path):
+        """Test that requests to one host are spaced by the politeness delay"""
+        crawler = make_crawler(tmp_path, politeness_delay=0.1)
+        seeds = [fixture_server.base_url + p for p in ["/", "/pix", "/boleto"]]
+
+        started = time.perf_counter()
+        asyncio.run(crawler.crawl(seeds))
+
+        assert time.perf_counter() - started >= 0.2
+
+
+class TestCrawlingWebsiteReader:
+
+    def test_read_many_chunks_pages(self, fixture_server, tmp_path):
+        """Test that crawled pages become documents with their URL as metadata"""
+        reader = CrawlingWebsiteReader(crawler=make_crawler(tmp_path), max_depth=1, max_links=1)
+        seeds = [fixture_server.base_url + "/pix", fixture_server.base_url + "/boleto"]
+
+        documents = asyncio.run(reader.async_read_many(seeds))
+
+        pix = documents[seeds[0]]
+        assert len(pix) == 1
+        assert pix[0].content == "Pix parcelado sem juros"
+        assert pix[0].meta_data["url"] == seeds[0]
+        assert pix[0].name == seeds[0]
+
+
+class TestPrimaryDomain:
+
+    def test_primary_domain(self):
+        """Test that subdomains and ports are ignored"""
+        assert primary_domain("https://www.infinitepay.io/pix") == "infinitepay.io"
+        assert primary_domain("http://127.0.0.1:8000/") == "0.1"
@@ -0,0 +1,182 @@
+# tests/test_customer_directory.py
+
+import asyncio
+import threading
+
+import pytest
+
+from utils.customer_directory import (
+    CachedCustomerDirectory,
+    CustomerDirectory,
+    InMemoryCustomerDirectory,
+    SQLiteCustomerDirectory,
+    create_customer_directory,
+)
+
+CUSTOMERS = {
+    "John@Example.com": {
+        "name": "John Silva",
+        "account_type": "Business",
+        "status": "active",
+        "phone": "+55 11 99999-9999",
+        "devices": ["Maquininha Pro", "App Mobile"],
+    },
+}
+
+
+class CountingDirectory(InMemoryCustomerDirectory):
+    """In-memory directory counting backend calls"""
+
+    def __init__(self, customers):
+        super().__init__(customers)
+        self.calls = 0
+
+    async def get_customer(self, email):
+        self.calls += 1
+        return await super().get_customer(email)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestCustomerDirectory:
+
+    def test_incomplete_backend_fails_at_creation(self):
+        """Test that a backend without get_customer cannot be instantiated"""
+
+        class IncompleteDirectory(CustomerDirectory):
+            name = "incomplete"
+
+        with pytest.raises(TypeError):
+            IncompleteDirectory()
+
+
+class TestSQLiteCustomerDirectory:
+
+    def test_round_trip(self, tmp_path):
+        """Test that stored customers are found by normalized email, and unknown emails are not"""
+        directory = SQLiteCustomerDirectory(str(tmp_path / "customers.db"))
+        assert directory.upsert(CUSTOMERS) == 1
+
+        assert asyncio.run(directory.get_customer("john@example.com")) == CUSTOMERS["John@Example.com"]
+        assert directory.lookup("nobody@example.com") is None
+        directory.close()
+
+    def test_concurrent_lookups_stay_within_the_pool(self, tmp_path):
+        """Test that concurrent lookups share at most pool_size connections"""
+        directory = SQLiteCustomerDirectory(str(tmp_path / "customers.db"), pool_size=2)
+        directory.upsert(CUSTOMERS)
+
+        async def lookups():
+            return await asyncio.gather(*(directory.get_customer("john@example.com") for _ in range(20)))
+
+        results = asyncio.run(lookups())
+
+        assert all(result["name"] == "John Silva" for result in results)
+        assert directory.connections <= 2
+        directory.close()
+
+    def test_lookup_from_a_running_event_loop(self, tmp_path):
+        """Test that the synchronous lookup works inside a coroutine, like agent tools inside /chat"""
+        directory = SQLiteCustomerDirectory(str(tmp_path / "customers.db"))
+        directory.upsert(CUSTOMERS)
+
+        async def handler():
+            return directory.lookup("john@example.com")
+
+        assert asyncio.run(handler())["phone"] == "+55 11 99999-9999"
+        directory.close()
+
+    def test_times_out_when_the_pool_is_exhausted(self, tmp_path):
+        """Test that a lookup fails instead of waiting forever for a connection"""
+        directory = SQLiteCustomerDirectory(str(tmp_path / "customers.db"), pool_size=1, timeout=0.05)
+        release = threading.Event()
+        held = threading.Event()
+
+        def hold():
+            with directory._connection():
+                held.set()
+                release.wait()
+
+        worker = threading.Thread(target=hold)
+        worker.start()
+        held.wait()
+        try:
+            with pytest.raises(TimeoutError):
+                directory.lookup("john@example.com")
+        finally:
+            release.set()
+            worker.join()
+        directory.close()
+
+
+class TestCachedCustomerDirectory:
+
+    def test_caches_customers_until_the_ttl(self):
+        """Test that a found customer is served from the cache until it expires"""
+        backend = CountingDirectory({"john@example.com": CUSTOMERS["John@Example.com"]})
+        clock = FakeClock()
+        directory = CachedCustomerDirectory(backend, ttl=60, negative_ttl=5, clock=clock)
+
+        assert directory.lookup("john@example.com")["name"] == "John Silva"
+        assert directory.lookup("john@example.com")["name"] == "John Silva"
+        assert backend.calls == 1
+
+        clock.now = 61
+        directory.lookup("john@example.com")
+        assert backend.calls == 2
+
+    def test_negative_caching_uses_the_shorter_ttl(self):
+        """Test that unknown emails are cached, but only for the negative TTL"""
+        backend = CountingDirectory({})
+        clock = FakeClock()
+        directory = CachedCustomerDirectory(backend, ttl=60, negative_ttl=5, clock=clock)
+
+        assert directory.lookup("new@example.com") is None
+        assert directory.lookup("new@example.com") is None
+        assert backend.calls == 1
+
+        # The customer signs up; the next lookup after the negative TTL finds them
+        backend.customers["new@example.com"] = CUSTOMERS["John@Example.com"]
+        clock.now = 6
+        assert directory.lookup("new@example.com")["name"] == "John Silva"
+        assert backend.calls == 2
+
+    def test_invalidate(self):
+        """Test that an invalidated email is read from the backend again"""
+        backend = CountingDirectory({})
+        directory = CachedCustomerDirectory(backend)
+
+        directory.lookup("new@example.com")
+        directory.invalidate("new@example.com")
+        directory.lookup("new@example.com")
+
+        assert backend.calls == 2
+
+
+class TestCreateCustomerDirectory:
+
+    def test_memory_is_the_default(self):
+        """Test that the demo dict stays the default backend"""
+        directory = create_customer_directory(CUSTOMERS, url="memory://")
+
+        assert isinstance(directory, InMemoryCustomerDirectory)
+        assert directory.customers is CUSTOMERS
+
+    def test_sqlite_is_cached(self, tmp_path):
+        """Test that a SQLite URL creates a cached, pooled directory"""
+        directory = create_customer_directory(CUSTOMERS, url=f"sqlite:///{tmp_path / 'customers.db'}")
+
+        assert isinstance(directory, CachedCustomerDirectory)
+        assert isinstance(directory.backend, SQLiteCustomerDirectory)
+        directory.close()
+
+    def test_unsupported_url(self):
+        """Test that unknown schemes are rejected"""
+        with pytest.raises(ValueError, match="Unsupported CUSTOMER_DB_URL"):
+            create_customer_directory(CUSTOMERS, url="postgres://db/customers")
@@ -10,6 +10,7 @@ from agents.customer_support_agent import (
     check_ticket_status,
     get_customer_support_agent,
     TICKETS,
+    ticket_events,
     CUSTOMERS,
     TICKET_COUNTER
 )
@@ -260,4 +261,134 @@ class TestIntegration:
         status_result = check_ticket_status(ticket_id)
         assert status_result["success"] is True
         assert status_result["ticket_found"] is True
-        assert status_result["status"] == "open"
\ No newline at end of file
+        assert status_result["status"] == "open"
+
+class TestToolMemoization:
+
+    def setup_method(self):
+        """Clear tickets before each test"""
+        TICKETS.clear()
+
+    def test_retried_ticket_creation_in_a_run_creates_one_ticket(self):
+        """Test that the same ticket request within a run is not created twice"""
+        from utils.tool_memo import tool_run_scope
+
+        with tool_run_scope() as run:
+            first = create_support_ticket("john@example.com", "Pix failed", "Pix not received", "high")
+            second = create_support_ticket(" JOHN@example.com", "Pix failed ", "Pix not received", "HIGH")
+            status = check_ticket_status(first["ticket_id"])
+            check_ticket_status(first["ticket_id"].lower())
+
+        assert second["ticket_id"] == first["ticket_id"]
+        assert second["idempotent_replay"] is True
+        assert len(TICKETS) == 1
+        assert status["ticket_found"] is True
+        assert [hit["tool"] for hit in run.hits] == ["create_support_ticket", "check_ticket_status"]
+
+    def test_invalid_priorities_share_one_request_key(self):
+        """Test that retries with different invalid priorities replay the same ticket"""
+        from utils.tool_memo import tool_run_scope
+
+        with tool_run_scope():
+            first = create_support_ticket("john@example.com", "Pix failed", "Pix not received", "asap")
+            second = create_support_ticket("john@example.com", "Pix failed", "Pix not received", "critical")
+
+        assert first["priority"] == "medium"
+        assert second["ticket_id"] == first["ticket_id"]
+        assert second["idempotent_replay"] is True
+        assert len(TICKETS) == 1
+
+
+class TestListCustomerTickets:
+
+    def setup_method(self):
+        """Clear tickets before each test"""
+        TICKETS.clear()
+
+    def test_lists_a_customers_tickets_page_by_page(self):
+        """Test that the tool returns the customer's tickets with a cursor for the rest"""
+        from agents.customer_support_agent import list_customer_tickets
+
+        for subject in ["Pix failed", "Boleto failed", "Card declined"]:
+            create_support_ticket("john@example.com", subject, "Details")
+        create_support_ticket("maria@business.com", "Login issue", "Details")
+
+        first = list_customer_tickets("JOHN@example.com", limit=2)
+        second = list_customer_tickets("john@example.com", limit=2, cursor=first["next_cursor"])
+
+        assert first["success"] is True
+        assert len(first["tickets"]) == 2
+        assert first["next_cursor"] is not None
+        assert len(second["tickets"]) == 1
+        assert second["next_cursor"] is None
+        subjects = {ticket["subject"] for ticket in first["tickets"] + second["tickets"]}
+        assert subjects == {"Pix failed", "Boleto failed", "Card declined"}
+
+    def test_invalid_cursor(self):
+        """Test that a malformed cursor is reported as a validation error"""
+        from agents.customer_support_agent import list_customer_tickets
+
+        result = list_customer_tickets("john@example.com", cursor="bogus")
+
+        assert result["success"] is False
+        assert "Invalid cursor" in result["message"]
+
+
+class TestSearchTickets:
+
+    def setup_method(self):
+        """Clear tickets before each test"""
+        TICKETS.clear()
+
+    def test_finds_past_tickets_about_the_same_problem(self):
+        """Test that ticket search ranks matching tickets and hides other customers' emails"""
+        from agents.customer_support_agent import search_tickets
+
+        create_support_ticket("john@example.com", "Maquininha não liga", "Não liga depois da atualização")
+        create_support_ticket("maria@business.com", "Pix atrasado", "Pix não caiu na conta")
+
+        result = search_tickets("maquininha desligada")
+
+        assert result["success"] is True
+        assert [ticket["subject"] for ticket in result["tickets"]] == ["Maquininha não liga"]
+        assert "customer_email" not in result["tickets"][0]
+
+    def test_empty_query(self):
+        """Test that a search without a query is rejected"""
+        from agents.customer_support_agent import search_tickets
+
+        assert search_tickets(" ")["success"] is False
+
+
+class TestDuplicateTickets:
+
+    def setup_method(self):
+        """Clear tickets before each test"""
+        TICKETS.clear()
+
+    def test_repeat_report_returns_the_open_ticket(self):
+        """Test that the same customer reporting the same problem again gets the existing ticket"""
+        first = create_support_ticket("john@example.com", "Maquininha não liga", "A maquininha não liga depois da atualização")
+        repeat = create_support_ticket("john@example.com", "maquininha nao esta ligando", "desde a atualizacao nao liga")
+        other_customer = create_support_ticket("maria@business.com", "Maquininha não liga", "A maquininha não liga")
+
+        assert repeat["ticket_id"] == first["ticket_id"]
+        assert repeat["duplicate"] is True
+        assert "duplicate" not in other_customer
+        assert len(TICKETS) == 2
+
+
+class TestTicketEvents:
+
+    def setup_method(self):
+        """Clear tickets before each test"""
+        TICKETS.clear()
+
+    def test_created_ticket_has_history(self):
+        """Test that ticket creation goes through the event log"""
+        result = create_support_ticket("john@example.com", "Pix não cai", "Pix enviado não aparece na conta")
+        ticket_events.change_status(result["ticket_id"], "resolved")
+
+        history = ticket_events.history(result["ticket_id"])
+        assert [event.type for event in history] == ["created", "status_changed"]
+        assert TICKETS[result["ticket_id"]]["status"] == "resolved"
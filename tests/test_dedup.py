@@ -0,0 +1,148 @@
+# tests/test_dedup.py
+
+import asyncio
+from unittest.mock import Mock
+
+import pytest
+from bs4 import BeautifulSoup
+
+from utils.crawler import CrawlingWebsiteReader, extract_main_text
+from utils.dedup import SHARED_SOURCE, BoilerplateDeduplicator, normalize_block, split_blocks
+from utils.snapshots import read_snapshots
+
+NAVIGATION = ["Maquininha", "Conta digital", "Pix", "Boleto", "Link de pagamento"]
+LEGAL = "A InfinitePay é uma marca da CloudWalk, Inc. Os serviços de pagamento são prestados pela CloudWalk Instituição de Pagamento e Serviços Ltda., instituição de pagamento autorizada pelo Banco Central do Brasil, com sede em São Paulo."
+FOOTER = ["Usamos cookies para melhorar sua experiência.", "CloudWalk Instituição de Pagamento S.A.", "Todos os direitos reservados."]
+
+
+def page(*lines):
+    """Join page blocks the way extract_main_text does"""
+    return "\n".join(lines)
+
+
+def make_pages():
+    """Three pages sharing navigation and footer around their own content"""
+    return {
+        "https://a": page(*NAVIGATION, "Pix parcelado sem juros", *FOOTER),
+        "https://b": page(*NAVIGATION, "Boleto com baixa automática", "Vencimento em 3 dias", *FOOTER),
+        "https://c": page("Taxas da maquininha", *FOOTER),
+    }
+
+
+class TestBoilerplateDeduplicator:
+
+    def test_factors_out_shared_blocks(self):
+        """Test that navigation and footer are stored once with every source URL"""
+        result = BoilerplateDeduplicator(shingle_size=2, min_block_chars=20).deduplicate(make_pages())
+
+        assert result.pages == {
+            "https://a": "Pix parcelado sem juros",
+            "https://b": "Boleto com baixa automática\nVencimento em 3 dias",
+            "https://c": "Taxas da maquininha",
+        }
+        contents = {block.content: block.urls for block in result.shared_blocks}
+        assert contents == {
+            page(*NAVIGATION): ["https://a", "https://b"],
+            page(*FOOTER): ["https://a", "https://b", "https://c"],
+        }
+        assert result.removed_chars == 2 * len(page(*NAVIGATION)) + 3 * len(page(*FOOTER))
+
+    def test_short_runs_stay_in_pages(self):
+        """Test that repeated runs below min_block_chars are kept in place"""
+        pages = {"https://a": page("Pix", "Boleto", "Texto A"), "https://b": page("Pix", "Boleto", "Texto B")}
+
+        result = BoilerplateDeduplicator(shingle_size=2, min_block_chars=200).deduplicate(pages)
+
+        assert result.pages == pages
+        assert result.shared_blocks == []
+
+    def test_matching_ignores_case_and_spacing(self):
+        """Test that blocks differing only in case and whitespace are shared"""
+        pages = {"https://a": page("Fale  CONOSCO", "Ajuda e suporte", "A"), "https://b": page("fale conosco", "Ajuda e Suporte", "B")}
+
+        result = BoilerplateDeduplicator(shingle_size=2, min_block_chars=10).deduplicate(pages)
+
+        assert result.pages == {"https://a": "A", "https://b": "B"}
+        assert len(result.shared_blocks) == 1
+        assert result.shared_blocks[0].content == page("Fale  CONOSCO", "Ajuda e suporte")
+
+    def test_single_page_is_unchanged(self):
+        """Test that nothing is shared without a second page"""
+        pages = make_pages()
+        result = BoilerplateDeduplicator().deduplicate({"https://a": pages["https://a"]})
+
+        assert result.pages == {"https://a": pages["https://a"]}
+        assert result.shared_blocks == []
+
+    def test_shared_block_document_keeps_provenance(self):
+        """Test the metadata of a shared block document"""
+        result = BoilerplateDeduplicator(shingle_size=2, min_block_chars=20).deduplicate(make_pages())
+
+        document = result.shared_blocks[1].to_document()
+
+        assert document.name == SHARED_SOURCE
+        assert document.meta_data == {
+            "url": "https://a",
+            "urls": "https://a,https://b,https://c",
+            "shared": True,
+            "source_count": 3,
+        }
+
+    def test_invalid_configuration(self):
+        """Test that a block must be seen on at least two pages to be shared"""
+        with pytest.raises(ValueError):
+            BoilerplateDeduplicator(min_pages=1)
+
+    def test_block_helpers(self):
+        """Test block splitting and normalization"""
+        assert split_blocks(" Pix \n\n Boleto\n") == ["Pix", "Boleto"]
+        assert normalize_block("  Pix\tParcelado ") == "pix parcelado"
+
+
+class TestExtractMainText:
+
+    def test_keeps_one_line_per_text_node(self):
+        """Test that text nodes of the main element stay on separate lines"""
+        soup = BeautifulSoup("<html><body><nav>Menu</nav><main><h1>Pix</h1><p>Sem <b>juros</b></p></main></body></html>", "html.parser")
+
+        assert extract_main_text(soup) == "Pix\nSem\njuros"
+
+    def test_div_without_content_class_is_empty(self):
+        """Test that the WebsiteReader rule for plain div pages is kept"""
+        soup = BeautifulSoup("<html><body><div>Menu</div></body></html>", "html.parser")
+
+        assert extract_main_text(soup) == ""
+
+
+class TestDeduplicatingReaders:
+
+    def test_crawling_reader_adds_shared_source(self):
+        """Test that the reader deduplicates across seeds before chunking"""
+        pages = make_pages()
+        crawler = Mock()
+
+        async def crawl(urls):
+            return {"https://a": {"https://a": pages["https://a"], "https://c": pages["https://c"]}, "https://b": {"https://b": pages["https://b"]}}
+
+        crawler.crawl = crawl
+        reader = CrawlingWebsiteReader(crawler=crawler)
+        reader.deduplicator = BoilerplateDeduplicator(shingle_size=2, min_block_chars=20)
+
+        documents = asyncio.run(reader.async_read_many(["https://a", "https://b"]))
+
+        assert [d.content for d in documents["https://a"]] == ["Pix parcelado sem juros", "Taxas da maquininha"]
+        assert [d.content for d in documents["https://b"]] == ["Boleto com baixa automática Vencimento em 3 dias"]
+        assert len(documents[SHARED_SOURCE]) == 2
+        assert all(d.meta_data["shared"] for d in documents[SHARED_SOURCE])
+
+    def test_snapshots_are_deduplicated(self, tmp_path):
+        """Test that offline snapshots share boilerplate with the default settings"""
+        for name, text in [("pix.html", "Pix parcelado"), ("boleto.html", "Boleto bancario")]:
+            body = "".join(f"<p>{line}</p>" for line in [text, *FOOTER, LEGAL])
+            (tmp_path / name).write_text(f"<html><body><main>{body}</main></body></html>", encoding="utf-8")
+
+        sources = read_snapshots(str(tmp_path), base_url="https://site", workers=1)
+
+        assert [d.content for d in sources["https://site/pix"]] == ["Pix parcelado"]
+        assert [d.content for d in sources["https://site/boleto"]] == ["Boleto bancario"]
+        assert [d.meta_data["source_count"] for d in sources[SHARED_SOURCE]] == [2]
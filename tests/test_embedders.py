@@ -0,0 +1,103 @@
+# tests/test_embedders.py
+
+from unittest.mock import Mock, patch
+
+import numpy as np
+import pytest
+
+from agno.embedder.mistral import MistralEmbedder
+
+from utils.embedders import HashingEmbedder, OnnxEmbedder, create_embedder, fold_text
+from utils.embedding_cache import batch_embed
+
+
+def cosine(a, b):
+    """Cosine similarity of two vectors"""
+    return float(np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b)))
+
+
+class TestHashingEmbedder:
+
+    def test_vectors_are_normalized(self):
+        """Test that embeddings have the configured size and unit length"""
+        embedder = HashingEmbedder(dimensions=256)
+
+        vector = embedder.get_embedding("Pix parcelado sem juros")
+
+        assert len(vector) == 256
+        assert np.linalg.norm(vector) == pytest.approx(1.0)
+
+    def test_deterministic(self):
+        """Test that the same text always maps to the same vector"""
+        assert HashingEmbedder().get_embedding("boleto") == HashingEmbedder().get_embedding("boleto")
+
+    def test_related_texts_are_closer(self):
+        """Test that shared words and accents-insensitive forms raise similarity"""
+        embedder = HashingEmbedder()
+        query = embedder.get_embedding("cobrança automatica")
+
+        related = embedder.get_embedding("Cobrança automática de boletos")
+        unrelated = embedder.get_embedding("Maquininha com taxa zero no débito")
+
+        assert cosine(query, related) > cosine(query, unrelated)
+
+    def test_empty_text(self):
+        """Test that a text without words embeds to the zero vector"""
+        assert not any(HashingEmbedder(dimensions=8).get_embedding("  !? "))
+
+    def test_batch_embed_uses_get_embeddings(self):
+        """Test that the hashing embedder works with the ingestion batch path"""
+        embedder = HashingEmbedder(dimensions=16)
+
+        assert batch_embed(embedder, ["a", "b"]) == [embedder.get_embedding("a"), embedder.get_embedding("b")]
+
+    def test_id_reflects_configuration(self):
+        """Test that changing the vector size changes the embedder id"""
+        assert HashingEmbedder(dimensions=256).id != HashingEmbedder(dimensions=512).id
+
+    def test_invalid_dimensions(self):
+        """Test that the vector size must be positive"""
+        with pytest.raises(ValueError):
+            HashingEmbedder(dimensions=0)
+
+    def test_fold_text(self):
+        """Test lowercasing and accent removal"""
+        assert fold_text("Cobrança Automática") == "cobranca automatica"
+
+
+class TestOnnxEmbedder:
+
+    def test_model_is_loaded_lazily(self):
+        """Test that constructing the embedder does not load the model"""
+        with patch("chromadb.utils.embedding_functions.ONNXMiniLM_L6_V2") as mock_model:
+            OnnxEmbedder()
+
+        mock_model.assert_not_called()
+
+    def test_embeds_batches_with_the_model(self):
+        """Test that texts are embedded in one model call"""
+        embedder = OnnxEmbedder()
+        model = Mock(return_value=[np.ones(384, dtype=np.float32), np.zeros(384, dtype=np.float32)])
+        embedder._model = model
+
+        vectors = embedder.get_embeddings(["pix", "boleto"])
+
+        model.assert_called_once_with(["pix", "boleto"])
+        assert len(vectors) == 2
+        assert vectors[0][0] == 1.0
+        assert embedder.get_embeddings([]) == []
+
+
+class TestCreateEmbedder:
+
+    @patch.dict('os.environ', {'MISTRAL_API_KEY': 'test-api-key'})
+    def test_backends(self):
+        """Test that every backend name maps to its embedder"""
+        assert isinstance(create_embedder("mistral"), MistralEmbedder)
+        assert isinstance(create_embedder("onnx"), OnnxEmbedder)
+        assert isinstance(create_embedder("hashing"), HashingEmbedder)
+
+    def test_unknown_backend(self):
+        """Test that an unknown backend is rejected"""
+        with pytest.raises(ValueError, match="Unknown embedder backend"):
+            create_embedder("word2vec")
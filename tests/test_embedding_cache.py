@@ -0,0 +1,234 @@
+# tests/test_embedding_cache.py
+
+import os
+
+import numpy as np
+import pytest
+from unittest.mock import Mock
+
+from utils.cache import LRUCache, MISSING
+from utils.embedding_cache import (
+    CachedEmbedder,
+    batch_embed,
+    DiskEmbeddingStore,
+    embedding_key,
+    normalize_text,
+)
+
+
+class FakeClock:
+    """Manually advanced clock for TTL tests"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_embedder(dimensions=3):
+    """Create a mock embedder returning a deterministic vector"""
+    embedder = Mock()
+    embedder.id = "mock-embed"
+    embedder.dimensions = dimensions
+    embedder.get_embedding.side_effect = lambda text: [float(len(text))] * dimensions
+    embedder.get_embedding_and_usage.side_effect = lambda text: (
+        [float(len(text))] * dimensions,
+        {"total_tokens": 1},
+    )
+    return embedder
+
+
+class TestLRUCache:
+
+    def test_get_and_set(self):
+        """Test basic storage and retrieval"""
+        cache = LRUCache(maxsize=2)
+        cache.set("a", 1)
+
+        assert cache.get("a") == 1
+        assert cache.get("b") is MISSING
+        assert "a" in cache
+
+    def test_evicts_least_recently_used(self):
+        """Test that the least recently used entry is evicted"""
+        cache = LRUCache(maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert "a" in cache
+        assert "b" not in cache
+        assert len(cache) == 2
+
+    def test_ttl_expiry(self):
+        """Test that entries expire after their TTL"""
+        clock = FakeClock()
+        cache = LRUCache(maxsize=2, ttl=10, clock=clock)
+        cache.set("a", 1)
+        clock.now = 9
+        assert cache.get("a") == 1
+        clock.now = 10
+        assert cache.get("a", None) is None
+
+    def test_invalid_maxsize(self):
+        """Test that a zero-sized cache is rejected"""
+        with pytest.raises(ValueError):
+            LRUCache(maxsize=0)
+
+
+class TestNormalization:
+
+    def test_normalize_text(self):
+        """Test whitespace and unicode normalization"""
+        assert normalize_text("  taxas   do\tPix \n") == "taxas do Pix"
+        assert normalize_text("ﬁ") == "fi"
+
+    def test_embedding_key_depends_on_model(self):
+        """Test that keys differ per model but not per spacing"""
+        assert embedding_key("m1", "pix  parcelado") == embedding_key("m1", "pix parcelado")
+        assert embedding_key("m1", "pix") != embedding_key("m2", "pix")
+
+
+class TestCachedEmbedder:
+
+    def test_memory_hit_skips_inner_embedder(self):
+        """Test that repeated queries are served from memory"""
+        inner = make_embedder()
+        embedder = CachedEmbedder(embedder=inner)
+
+        first = embedder.get_embedding("taxas  maquininha")
+        second = embedder.get_embedding("taxas maquininha")
+
+        assert first == second
+        assert inner.get_embedding.call_count == 1
+        assert embedder.stats()["memory_hits"] >= 1
+
+    def test_usage_path_is_cached(self):
+        """Test that get_embedding_and_usage shares the cache"""
+        inner = make_embedder()
+        embedder = CachedEmbedder(embedder=inner)
+
+        embedder.get_embedding_and_usage("boleto")
+        embedding, usage = embedder.get_embedding_and_usage("boleto")
+
+        assert embedding == [6.0, 6.0, 6.0]
+        assert usage is None
+        assert inner.get_embedding_and_usage.call_count == 1
+
+    def test_failed_embedding_not_cached(self):
+        """Test that empty embeddings are retried next time"""
+        inner = make_embedder()
+        inner.get_embedding.side_effect = None
+        inner.get_embedding.return_value = []
+        embedder = CachedEmbedder(embedder=inner)
+
+        embedder.get_embedding("pix")
+        embedder.get_embedding("pix")
+
+        assert inner.get_embedding.call_count == 2
+
+    def test_disk_tier_shared_between_instances(self, tmp_path):
+        """Test that a second embedder (another worker) reads the disk tier"""
+        writer = CachedEmbedder(embedder=make_embedder(), cache_dir=str(tmp_path))
+        writer.get_embedding("conta digital")
+
+        reader_inner = make_embedder()
+        reader = CachedEmbedder(embedder=reader_inner, cache_dir=str(tmp_path))
+
+        assert reader.get_embedding("conta digital") == [13.0, 13.0, 13.0]
+        assert reader_inner.get_embedding.call_count == 0
+        assert reader.stats()["disk_hits"] >= 1
+
+    def test_requires_inner_embedder(self):
+        """Test that the wrapper needs an embedder"""
+        with pytest.raises(ValueError):
+            CachedEmbedder()
+
+
+class TestBatchEmbed:
+
+    def test_mistral_style_client_single_request(self):
+        """Test that a Mistral-style client embeds a batch in one request"""
+        embedder = Mock(spec=["id", "request_params", "client"])
+        embedder.id = "mistral-embed"
+        embedder.request_params = None
+        embedder.client.embeddings.create.return_value = Mock(
+            data=[Mock(index=1, embedding=[2.0]), Mock(index=0, embedding=[1.0])]
+        )
+
+        assert batch_embed(embedder, ["a", "b"]) == [[1.0], [2.0]]
+        embedder.client.embeddings.create.assert_called_once_with(inputs=["a", "b"], model="mistral-embed")
+
+    def test_missing_embeddings_raise(self):
+        """Test that incomplete responses raise so the batch can be retried"""
+        embedder = Mock(spec=["id", "request_params", "client"])
+        embedder.id = "mistral-embed"
+        embedder.request_params = None
+        embedder.client.embeddings.create.return_value = Mock(data=[Mock(index=0, embedding=[1.0])])
+
+        with pytest.raises(ValueError):
+            batch_embed(embedder, ["a", "b"])
+
+    def test_cached_embedder_sends_only_misses(self):
+        """Test that cached texts are not re-sent in a batch"""
+        inner = Mock(spec=["id", "dimensions", "get_embedding", "get_embedding_and_usage"])
+        inner.id = "mock-embed"
+        inner.dimensions = 1
+        inner.get_embedding.side_effect = lambda text: [float(len(text))]
+        embedder = CachedEmbedder(embedder=inner)
+        embedder.get_embedding("pix")
+
+        result = embedder.get_embeddings(["pix", "boleto", "boleto"])
+
+        assert result == [[3.0], [6.0], [6.0]]
+        assert inner.get_embedding.call_count == 2
+
+
+class TestDiskEmbeddingStore:
+
+    def test_put_and_get(self, tmp_path):
+        """Test round-tripping vectors through the memory map"""
+        store = DiskEmbeddingStore(str(tmp_path), "mistral-embed", 2)
+        store.put("k1", [0.5, 1.5])
+        store.put("k2", [2.0, 3.0])
+        store.put("k1", [9.0, 9.0])
+
+        assert store.get("k1") == [0.5, 1.5]
+        assert store.get("k2") == [2.0, 3.0]
+        assert store.get("k3") is None
+        assert len(store) == 2
+
+    def test_orphaned_row_does_not_shift_keys(self, tmp_path):
+        """Test that a vector written without its key by a crashed writer is dropped"""
+        store = DiskEmbeddingStore(str(tmp_path), "mistral-embed", 2)
+        store.put("a", [1.0, 1.0])
+        with open(os.path.join(store.path, "vectors.f32"), "ab") as f:
+            f.write(np.asarray([9.0, 9.0], dtype=np.float32).tobytes())
+        store.put("b", [2.0, 2.0])
+
+        reopened = DiskEmbeddingStore(str(tmp_path), "mistral-embed", 2)
+        assert store.get("b") == [2.0, 2.0]
+        assert reopened.get("a") == [1.0, 1.0]
+        assert reopened.get("b") == [2.0, 2.0]
+        assert os.path.getsize(os.path.join(store.path, "vectors.f32")) == 2 * 2 * 4
+
+    def test_reads_keys_without_row_numbers(self, tmp_path):
+        """Test that stores written with one bare key per line still resolve by line"""
+        store = DiskEmbeddingStore(str(tmp_path), "mistral-embed", 2)
+        with open(os.path.join(store.path, "vectors.f32"), "wb") as f:
+            f.write(np.asarray([[1.0, 1.0], [2.0, 2.0]], dtype=np.float32).tobytes())
+        with open(os.path.join(store.path, "keys.txt"), "w", encoding="ascii") as f:
+            f.write("a\nb\n")
+        store.put("c", [3.0, 3.0])
+
+        reopened = DiskEmbeddingStore(str(tmp_path), "mistral-embed", 2)
+        assert [reopened.get(key) for key in "abc"] == [[1.0, 1.0], [2.0, 2.0], [3.0, 3.0]]
+
+    def test_dimension_mismatch_ignored(self, tmp_path):
+        """Test that vectors of the wrong size are not stored"""
+        store = DiskEmbeddingStore(str(tmp_path), "mistral-embed", 2)
+        store.put("k1", [1.0, 2.0, 3.0])
+
+        assert store.get("k1") is None
@@ -0,0 +1,116 @@
+# tests/test_export.py
+
+import gzip
+import json
+import os
+from datetime import datetime
+
+import pytest
+
+from utils.export import export_stream, gzip_chunks, iter_tickets, iter_workflow_runs, ndjson_chunks, parse_export_time
+from utils.ticket_store import TicketStore
+
+
+def make_ticket(number, created_at):
+    """Create a ticket record"""
+    return {"ticket_id": f"TK-{number}", "customer_email": "john@example.com", "status": "open", "created_at": created_at}
+
+
+def write_session(directory, session_id, run_times, mtime=None, memory_v2=False):
+    """Write a workflow session file with one run per timestamp"""
+    runs = [{"input": {"message": f"run {i}"}, "response": {"content": "ok", "created_at": ts}} for i, ts in enumerate(run_times)]
+    memory = {"runs": {session_id: runs}} if memory_v2 else {"runs": runs}
+    path = os.path.join(directory, f"{session_id}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"session_id": session_id, "user_id": "user-1", "workflow_id": "wf", "memory": memory}, f)
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+
+
+def ts(day, hour=12):
+    """Local timestamp of a day in March 2026"""
+    return datetime(2026, 3, day, hour).timestamp()
+
+
+class TestParseExportTime:
+
+    def test_parses_dates_and_timestamps(self):
+        """Test that ISO dates and timestamps are accepted and empty values are open bounds"""
+        assert parse_export_time("2026-03-01") == datetime(2026, 3, 1)
+        assert parse_export_time("2026-03-01T12:30:00") == datetime(2026, 3, 1, 12, 30)
+        assert parse_export_time("2026-03-01 12:30:00") == datetime(2026, 3, 1, 12, 30)
+        assert parse_export_time(None) is None
+
+    def test_rejects_invalid_time(self):
+        """Test that malformed times raise ValueError"""
+        with pytest.raises(ValueError):
+            parse_export_time("yesterday")
+
+
+class TestIterTickets:
+
+    def test_pages_through_range(self):
+        """Test that every ticket in the half-open range is yielded across pages, newest first"""
+        store = TicketStore()
+        for i in range(250):
+            store[f"TK-{i}"] = make_ticket(i, f"2026-03-{1 + i // 100:02d} {i % 24:02d}:{i % 60:02d}:00")
+
+        all_tickets = list(iter_tickets(store))
+        assert len(all_tickets) == 250
+        assert all_tickets[0]["created_at"] >= all_tickets[-1]["created_at"]
+
+        in_range = list(iter_tickets(store, since=datetime(2026, 3, 2), until=datetime(2026, 3, 3)))
+        assert len(in_range) == 100
+        assert all(ticket["created_at"].startswith("2026-03-02") for ticket in in_range)
+
+
+class TestIterWorkflowRuns:
+
+    def test_yields_runs_in_range(self, tmp_path):
+        """Test that runs are flattened with their session fields and filtered by time"""
+        write_session(tmp_path, "s1", [ts(1), ts(2)])
+        write_session(tmp_path, "s2", [ts(2, 18)], memory_v2=True)
+        (tmp_path / "broken.json").write_text("{", encoding="utf-8")
+
+        runs = list(iter_workflow_runs(str(tmp_path), since=datetime(2026, 3, 2), until=datetime(2026, 3, 3)))
+        assert sorted(run["session_id"] for run in runs) == ["s1", "s2"]
+        assert all(run["created_at"].startswith("2026-03-02") for run in runs)
+        assert runs[0]["user_id"] == "user-1"
+
+    def test_skips_sessions_not_modified_since_start(self, tmp_path):
+        """Test that session files last written before the range are not read"""
+        write_session(tmp_path, "old", [ts(1)], mtime=ts(1, 13))
+        write_session(tmp_path, "new", [ts(5)], mtime=ts(5, 13))
+
+        runs = list(iter_workflow_runs(str(tmp_path), since=datetime(2026, 3, 3)))
+        assert [run["session_id"] for run in runs] == ["new"]
+
+    def test_missing_directory(self, tmp_path):
+        """Test that a missing session directory exports nothing"""
+        assert list(iter_workflow_runs(str(tmp_path / "missing"))) == []
+
+
+class TestExportStream:
+
+    def test_chunks_end_on_line_boundaries(self):
+        """Test that records are grouped into chunks of whole NDJSON lines"""
+        records = [{"ticket_id": f"TK-{i}", "subject": "Maquininha não liga"} for i in range(100)]
+        chunks = list(ndjson_chunks(records, "tickets", chunk_size=256))
+
+        assert len(chunks) > 1
+        assert all(chunk.endswith(b"\n") for chunk in chunks)
+        lines = b"".join(chunks).decode("utf-8").splitlines()
+        assert [json.loads(line) for line in lines] == records
+
+    def test_gzip_round_trip(self):
+        """Test that the gzipped stream decompresses to the NDJSON stream"""
+        records = [{"n": i} for i in range(1000)]
+        compressed = b"".join(export_stream(iter(records), "runs", compress=True))
+        plain = b"".join(export_stream(iter(records), "runs"))
+
+        assert gzip.decompress(compressed) == plain
+        assert len(compressed) < len(plain)
+
+    def test_gzip_empty_stream(self):
+        """Test that an empty export is still a valid gzip file"""
+        assert gzip.decompress(b"".join(gzip_chunks(iter([])))) == b""
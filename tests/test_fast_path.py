@@ -0,0 +1,68 @@
+# tests/test_fast_path.py
+
+import pytest
+
+from utils.fast_path import match_ticket_status_query, render_ticket_status
+
+
+class TestMatchTicketStatusQuery:
+
+    @pytest.mark.parametrize(
+        "query, ticket_ids, language",
+        [
+            ("What's the status of TK-1004?", ["TK-1004"], "en"),
+            ("any update on tk 1004 and TK-1005", ["TK-1004", "TK-1005"], "en"),
+            ("Qual a situação do meu chamado TK-1001?", ["TK-1001"], "pt"),
+            ("TK-1004?", ["TK-1004"], "en"),
+        ],
+    )
+    def test_status_questions_take_the_fast_path(self, query, ticket_ids, language):
+        """Test that plain status questions are recognised with their tickets and language"""
+        match = match_ticket_status_query(query)
+
+        assert match.ticket_ids == ticket_ids
+        assert match.language == language
+
+    @pytest.mark.parametrize(
+        "query",
+        [
+            "What's the status of my order?",
+            "Please cancel TK-1004, what's its status?",
+            "Why is TK-1004 still open? What's the status?",
+            "I paid with TK-1004 yesterday",
+            "status of TK-1001 TK-1002 TK-1003 TK-1004",
+            "Can you check TK-1004 " + "and tell me more about my account " * 5,
+        ],
+    )
+    def test_ambiguous_queries_go_to_the_llm(self, query):
+        """Test that anything beyond a plain status question is not answered deterministically"""
+        assert match_ticket_status_query(query) is None
+
+
+class TestRenderTicketStatus:
+
+    def test_renders_found_and_missing_tickets(self):
+        """Test the templated reply for each lookup outcome"""
+        results = {
+            "TK-1000": {
+                "success": True,
+                "ticket_found": True,
+                "ticket_id": "TK-1000",
+                "status": "in_progress",
+                "priority": "high",
+                "subject": "Login issue",
+                "assigned_to": "Support Team",
+                "created_at": "2026-01-01T10:00:00",
+                "updated_at": "2026-01-02T10:00:00",
+            },
+            "TK-9999": {"success": True, "ticket_found": False},
+        }
+
+        reply = render_ticket_status(results, "en")
+
+        assert reply.splitlines() == [
+            'Ticket TK-1000 ("Login issue") is in progress, with high priority, assigned to Support Team. '
+            "Last updated: 2026-01-02T10:00:00.",
+            "I couldn't find ticket TK-9999. Please double-check the number, or tell me what happened and I'll open a new one for you.",
+        ]
+        assert "está em andamento" in render_ticket_status(results, "pt")
@@ -0,0 +1,146 @@
+# tests/test_index_snapshot.py
+
+import io
+import json
+import tarfile
+
+import pytest
+
+from agno.document import Document
+from agno.vectordb.chroma import ChromaDb
+
+from utils.embedders import HashingEmbedder
+from utils.index_snapshot import (
+    SnapshotError,
+    export_snapshot,
+    import_snapshot,
+    read_snapshot,
+    restore_index_snapshot,
+)
+from utils.ingestion import upsert_documents
+from utils.lexical_index import LexicalIndex
+from utils.vector_index import MemmapVectorIndex
+
+CHUNKS = [
+    ("pix", "Receba Pix com taxa zero na conta InfinitePay."),
+    ("boleto", "Emita boleto para seus clientes pelo aplicativo."),
+    ("cartao", "O cartão de crédito não tem anuidade."),
+]
+
+
+def make_vector_db(path, dimensions=64, collection="knowledge"):
+    """Create a persistent Chroma database with a local embedder"""
+    vector_db = ChromaDb(collection=collection, path=str(path), persistent_client=True, embedder=HashingEmbedder(dimensions=dimensions))
+    vector_db.create()
+    return vector_db
+
+
+def populated_vector_db(path):
+    """Create a Chroma database holding the test chunks"""
+    vector_db = make_vector_db(path)
+    documents = [
+        Document(id=doc_id, content=content, meta_data={"url": f"https://www.infinitepay.io/{doc_id}"})
+        for doc_id, content in CHUNKS
+    ]
+    for document in documents:
+        document.embedding = vector_db.embedder.get_embedding(document.content)
+    upsert_documents(vector_db, documents)
+    return vector_db
+
+
+def export(tmp_path):
+    """Export the test collection and its manifest, returning the archive path"""
+    manifest_path = tmp_path / "ingest_manifest.json"
+    manifest_path.write_text(json.dumps({"version": 1, "collection": "knowledge"}))
+    archive = tmp_path / "snapshot.tar.gz"
+    export_snapshot(populated_vector_db(tmp_path / "source"), str(archive), manifest_path=str(manifest_path))
+    return archive
+
+
+class TestIndexSnapshot:
+
+    def test_round_trip_restores_every_index(self, tmp_path):
+        """Test that an imported snapshot serves queries without embedding the chunks again"""
+        archive = export(tmp_path)
+        target = make_vector_db(tmp_path / "target")
+        lexical_index = LexicalIndex(str(tmp_path / "tantivy"))
+        vector_index = MemmapVectorIndex(str(tmp_path / "vectors"), embedder=target.embedder)
+
+        manifest = import_snapshot(
+            str(archive), target, lexical_index, vector_index, manifest_path=str(tmp_path / "restored.json")
+        )
+
+        assert manifest["chunks"] == 3
+        assert target.get_count() == 3
+        assert "boleto" in lexical_index.search("boleto", limit=1)[0].content
+        assert vector_index.search("taxa do pix", limit=1)[0].meta_data["url"] == "https://www.infinitepay.io/pix"
+        assert json.loads((tmp_path / "restored.json").read_text())["collection"] == "knowledge"
+
+    def test_checksum_mismatch_is_detected(self, tmp_path):
+        """Test that a tampered member makes the snapshot unreadable"""
+        archive = export(tmp_path)
+        tampered = tmp_path / "tampered.tar.gz"
+        with tarfile.open(archive, "r:gz") as source, tarfile.open(tampered, "w:gz") as target:
+            for member in source.getmembers():
+                data = source.extractfile(member).read()
+                if member.name == "chunks.jsonl":
+                    data = data.replace(b"taxa zero", b"taxa alta")
+                    member.size = len(data)
+                target.addfile(member, io.BytesIO(data))
+
+        with pytest.raises(SnapshotError, match="Checksum mismatch for chunks.jsonl"):
+            read_snapshot(str(tampered))
+
+    def test_format_version_mismatch_is_detected(self, tmp_path):
+        """Test that snapshots from another format version are rejected"""
+        archive = export(tmp_path)
+        patched = tmp_path / "patched.tar.gz"
+        with tarfile.open(archive, "r:gz") as source, tarfile.open(patched, "w:gz") as target:
+            for member in source.getmembers():
+                data = source.extractfile(member).read()
+                if member.name == "snapshot.json":
+                    manifest = json.loads(data)
+                    manifest["format_version"] = 99
+                    data = json.dumps(manifest).encode()
+                    member.size = len(data)
+                target.addfile(member, io.BytesIO(data))
+
+        with pytest.raises(SnapshotError, match="format version 99"):
+            read_snapshot(str(patched))
+
+    def test_embedder_mismatch_is_detected(self, tmp_path):
+        """Test that vectors from another embedder are not imported"""
+        archive = export(tmp_path)
+        target = make_vector_db(tmp_path / "target", dimensions=128)
+
+        with pytest.raises(SnapshotError, match="embedded with 'hashing-64"):
+            import_snapshot(str(archive), target, manifest_path=str(tmp_path / "restored.json"))
+
+    def test_empty_collection_cannot_be_exported(self, tmp_path):
+        """Test that exporting nothing is an error"""
+        with pytest.raises(SnapshotError, match="empty"):
+            export_snapshot(make_vector_db(tmp_path / "empty"), str(tmp_path / "out.tar.gz"))
+
+
+class TestRestoreIndexSnapshot:
+
+    def test_restore_runs_once_per_snapshot(self, tmp_path):
+        """Test that restarts skip a snapshot that is already loaded"""
+        archive = export(tmp_path)
+        target = make_vector_db(tmp_path / "target")
+        kwargs = {
+            "path": str(archive),
+            "state_path": str(tmp_path / "state.json"),
+            "manifest_path": str(tmp_path / "restored.json"),
+        }
+
+        assert restore_index_snapshot(target, **kwargs)["chunks"] == 3
+        assert restore_index_snapshot(target, **kwargs) is None
+        assert target.get_count() == 3
+
+    def test_missing_or_unset_snapshot_is_skipped(self, tmp_path):
+        """Test that the API starts without a snapshot"""
+        target = make_vector_db(tmp_path / "target")
+
+        assert restore_index_snapshot(target, path=None) is None
+        assert restore_index_snapshot(target, path=str(tmp_path / "missing.tar.gz")) is None
@@ -0,0 +1,366 @@
+# tests/test_ingestion.py
+
+import asyncio
+import pytest
+from unittest.mock import Mock
+
+from agno.document import Document
+
+from utils.dedup import SHARED_SOURCE
+from utils.lexical_index import LexicalIndex
+from utils.vector_index import MemmapVectorIndex
+from utils.ingestion import (
+    EmbeddingPipeline,
+    IngestManifest,
+    IngestionReport,
+    document_id,
+    load_knowledge_base,
+    page_fingerprints,
+    unique_documents,
+)
+
+
+class BatchEmbedder:
+    """Embedder exposing ``get_embeddings`` that can fail on demand"""
+
+    id = "batch-embed"
+    dimensions = 2
+
+    def __init__(self, failures=None):
+        self.calls = []
+        self.failures = dict(failures or {})
+
+    def get_embeddings(self, texts):
+        self.calls.append(list(texts))
+        first = texts[0]
+        if self.failures.get(first, 0) > 0:
+            self.failures[first] -= 1
+            raise RuntimeError("upstream error")
+        return [[float(len(text)), 1.0] for text in texts]
+
+
+def make_documents(count):
+    """Create distinct chunks"""
+    return [Document(content=f"chunk {i}", meta_data={"url": "https://example.com"}) for i in range(count)]
+
+
+def make_pipeline(embedder, **kwargs):
+    """Create a pipeline without rate limiting or backoff delays"""
+    options = {"batch_size": 2, "concurrency": 2, "rate_limit": 0, "retry_backoff": 0}
+    options.update(kwargs)
+    return EmbeddingPipeline(embedder, **options)
+
+
+class TestEmbeddingPipeline:
+
+    def test_embeds_in_batches(self):
+        """Test that chunks are sent in batches of the configured size"""
+        embedder = BatchEmbedder()
+        documents = make_documents(5)
+
+        report = asyncio.run(make_pipeline(embedder).embed(documents))
+
+        assert sorted(len(call) for call in embedder.calls) == [1, 2, 2]
+        assert report.embedded == 5
+        assert report.batches == 3
+        assert all(document.embedding for document in documents)
+
+    def test_retries_only_failed_batch(self):
+        """Test that a failing batch is retried without re-sending the others"""
+        embedder = BatchEmbedder(failures={"chunk 2": 2})
+        documents = make_documents(4)
+
+        report = asyncio.run(make_pipeline(embedder).embed(documents))
+
+        assert report.retries == 2
+        assert report.failed_batches == 0
+        assert [call[0] for call in embedder.calls].count("chunk 0") == 1
+        assert [call[0] for call in embedder.calls].count("chunk 2") == 3
+
+    def test_gives_up_after_max_retries(self):
+        """Test that a batch failing every attempt is reported, not raised"""
+        embedder = BatchEmbedder(failures={"chunk 0": 10})
+        documents = make_documents(4)
+
+        report = asyncio.run(make_pipeline(embedder, max_retries=1).embed(documents))
+
+        assert report.failed_batches == 1
+        assert report.failed_chunks == 2
+        assert report.embedded == 2
+        assert documents[0].embedding is None
+        assert report.errors == ["upstream error"]
+
+    def test_invalid_configuration(self):
+        """Test that empty batches or zero concurrency are rejected"""
+        with pytest.raises(ValueError):
+            EmbeddingPipeline(BatchEmbedder(), batch_size=0)
+
+
+class TestHelpers:
+
+    def test_unique_documents(self):
+        """Test that chunks with identical content are dropped"""
+        documents = [Document(content="a"), Document(content="b"), Document(content="a")]
+
+        assert [d.content for d in unique_documents(documents)] == ["a", "b"]
+
+    def test_document_id_matches_chroma(self):
+        """Test that ids follow agno's md5-of-content scheme"""
+        assert document_id(Document(content="pix")) == "744b41f0dccd32ebf5d525bc1c64af5a"
+
+    def test_report_throughput(self):
+        """Test the chunks per second computation"""
+        report = IngestionReport(embedded=50, seconds=2.0)
+
+        assert report.chunks_per_second == 25.0
+        assert report.to_dict()["chunks_per_second"] == 25.0
+
+
+class FakeCollection:
+    """In-memory stand-in for a Chroma collection"""
+
+    def __init__(self):
+        self.records = {}
+        self.metadatas = {}
+
+    def upsert(self, ids, embeddings, documents, metadatas):
+        for id_, embedding, document, metadata in zip(ids, embeddings, documents, metadatas):
+            self.records[id_] = (embedding, document)
+            self.metadatas[id_] = metadata
+
+    def update(self, ids, metadatas):
+        self.metadatas.update(zip(ids, metadatas))
+
+    def get(self, ids=None, include=None):
+        ids = [id_ for id_ in ids if id_ in self.records] if ids is not None else list(self.records)
+        return {
+            "ids": ids,
+            "embeddings": [self.records[id_][0] for id_ in ids],
+            "documents": [self.records[id_][1] for id_ in ids],
+            "metadatas": [self.metadatas[id_] for id_ in ids],
+        }
+
+    def delete(self, ids):
+        for id_ in ids:
+            self.records.pop(id_, None)
+
+
+def make_knowledge_base(pages):
+    """Create a knowledge base whose reader serves ``pages`` (url -> chunk texts)"""
+    knowledge_base = Mock()
+    knowledge_base.urls = list(pages)
+    knowledge_base.reader = Mock(spec=["async_read"])
+    knowledge_base.vector_db.collection_name = "test-collection"
+    knowledge_base.vector_db.embedder.id = "batch-embed"
+    collection = FakeCollection()
+    knowledge_base.vector_db.client.get_collection.return_value = collection
+
+    async def async_read(url):
+        return [Document(content=text, meta_data={"url": url}) for text in pages[url]]
+
+    knowledge_base.reader.async_read = async_read
+    return knowledge_base, collection
+
+
+def load(knowledge_base, manifest_path, embedder, **kwargs):
+    """Run a load synchronously"""
+    return asyncio.run(
+        load_knowledge_base(knowledge_base, pipeline=make_pipeline(embedder), manifest_path=manifest_path, **kwargs)
+    )
+
+
+class TestLoadKnowledgeBase:
+
+    def test_full_load_writes_embedded_chunks(self, tmp_path):
+        """Test a full load with a mocked reader and collection"""
+        pages = {"https://a": ["one", "two", "three"], "https://b": ["one"]}
+        knowledge_base, collection = make_knowledge_base(pages)
+
+        report = load(knowledge_base, str(tmp_path / "manifest.json"), BatchEmbedder(), recreate=True)
+
+        knowledge_base.vector_db.drop.assert_called_once()
+        knowledge_base.vector_db.create.assert_called_once()
+        assert set(collection.records) == {document_id(Document(content=t)) for t in ["one", "two", "three"]}
+        assert report.mode == "full"
+        assert report.chunks == 3
+        assert report.embedded == 3
+
+    def test_incremental_refresh_embeds_only_changes(self, tmp_path):
+        """Test that a refresh embeds new chunks and deletes vanished ones"""
+        manifest_path = str(tmp_path / "manifest.json")
+        pages = {"https://a": ["one", "two"], "https://b": ["three"]}
+        knowledge_base, collection = make_knowledge_base(pages)
+        load(knowledge_base, manifest_path, BatchEmbedder())
+
+        pages["https://a"] = ["one", "two changed"]
+        embedder = BatchEmbedder()
+        report = load(knowledge_base, manifest_path, embedder)
+
+        knowledge_base.vector_db.drop.assert_not_called()
+        assert embedder.calls == [["two changed"]]
+        assert report.mode == "incremental"
+        assert report.chunks_unchanged == 2
+        assert report.chunks_deleted == 1
+        assert report.pages_changed == 1
+        assert document_id(Document(content="two")) not in collection.records
+        assert document_id(Document(content="two changed")) in collection.records
+
+    def test_unchanged_refresh_makes_no_embedding_calls(self, tmp_path):
+        """Test that refreshing an unchanged site costs no embedding requests"""
+        manifest_path = str(tmp_path / "manifest.json")
+        knowledge_base, _ = make_knowledge_base({"https://a": ["one", "two"]})
+        load(knowledge_base, manifest_path, BatchEmbedder())
+
+        embedder = BatchEmbedder()
+        report = load(knowledge_base, manifest_path, embedder)
+
+        assert embedder.calls == []
+        assert report.pages_changed == 0
+        assert report.chunks_deleted == 0
+
+    def test_failed_url_keeps_previous_chunks(self, tmp_path):
+        """Test that a URL that cannot be read is not wiped from the collection"""
+        manifest_path = str(tmp_path / "manifest.json")
+        pages = {"https://a": ["one"], "https://b": ["two"]}
+        knowledge_base, collection = make_knowledge_base(pages)
+        load(knowledge_base, manifest_path, BatchEmbedder())
+
+        pages["https://b"] = []
+        report = load(knowledge_base, manifest_path, BatchEmbedder())
+
+        assert report.failed_urls == 1
+        assert report.chunks_deleted == 0
+        assert document_id(Document(content="two")) in collection.records
+
+    def test_removed_source_chunks_are_deleted(self, tmp_path):
+        """Test that chunks of a URL dropped from the sources leave every index"""
+        manifest_path = str(tmp_path / "manifest.json")
+        knowledge_base, collection = make_knowledge_base({})
+        knowledge_base.vector_db.embedder.dimensions = 2
+        lexical_index = LexicalIndex(None)
+        vector_index = MemmapVectorIndex(str(tmp_path / "vector_index"))
+        indexes = {"lexical_index": lexical_index, "vector_index": vector_index}
+        alpha = Document(content="alpha", meta_data={"url": "https://a"})
+        beta = Document(content="beta", meta_data={"url": "https://b"})
+        load(knowledge_base, manifest_path, BatchEmbedder(), sources={"https://a": [alpha], "https://b": [beta]}, **indexes)
+
+        report = load(knowledge_base, manifest_path, BatchEmbedder(), sources={"https://a": [alpha]}, **indexes)
+
+        assert report.chunks_deleted == 1
+        assert set(collection.records) == {document_id(alpha)}
+        assert lexical_index.search("beta") == []
+        assert len(lexical_index) == 1
+        assert len(vector_index) == 1
+
+    def test_embedder_change_forces_rebuild(self, tmp_path):
+        """Test that a manifest from another embedder triggers a full rebuild"""
+        manifest_path = str(tmp_path / "manifest.json")
+        knowledge_base, _ = make_knowledge_base({"https://a": ["one"]})
+        load(knowledge_base, manifest_path, BatchEmbedder())
+
+        knowledge_base.vector_db.embedder.id = "other-embed"
+        report = load(knowledge_base, manifest_path, BatchEmbedder())
+
+        assert report.mode == "full"
+        knowledge_base.vector_db.drop.assert_called_once()
+
+    def test_preread_sources_skip_reader(self, tmp_path):
+        """Test loading chunks read offline without touching the reader"""
+        knowledge_base, collection = make_knowledge_base({})
+        knowledge_base.reader = Mock(spec=[])
+        sources = {"https://a": [Document(content="offline", meta_data={"url": "https://a"})]}
+
+        report = load(knowledge_base, str(tmp_path / "manifest.json"), BatchEmbedder(), sources=sources)
+
+        assert report.urls == 1
+        assert report.embedded == 1
+        assert document_id(Document(content="offline")) in collection.records
+
+    def test_shared_blocks_are_not_failed_urls(self, tmp_path):
+        """Test that shared blocks load once and vanish when no longer shared"""
+        manifest_path = str(tmp_path / "manifest.json")
+        knowledge_base, collection = make_knowledge_base({})
+        footer = Document(content="footer", meta_data={"url": "https://a", "urls": "https://a,https://b"})
+        sources = {"https://a": [Document(content="pix", meta_data={"url": "https://a"})], SHARED_SOURCE: [footer]}
+
+        report = load(knowledge_base, manifest_path, BatchEmbedder(), sources=sources)
+
+        assert report.urls == 1
+        assert report.shared_chunks == 1
+        assert document_id(footer) in collection.records
+
+        sources[SHARED_SOURCE] = []
+        report = load(knowledge_base, manifest_path, BatchEmbedder(), sources=sources)
+
+        assert report.failed_urls == 0
+        assert report.chunks_deleted == 1
+        assert document_id(footer) not in collection.records
+
+    def test_shared_block_provenance_is_updated(self, tmp_path):
+        """Test that a shared block seen on a new page gets its metadata rewritten without re-embedding"""
+        manifest_path = str(tmp_path / "manifest.json")
+        knowledge_base, collection = make_knowledge_base({})
+        page = Document(content="pix", meta_data={"url": "https://a"})
+        footer = Document(content="footer", meta_data={"url": "https://a", "urls": "https://a,https://b"})
+        load(knowledge_base, manifest_path, BatchEmbedder(), sources={"https://a": [page], SHARED_SOURCE: [footer]})
+
+        footer = Document(content="footer", meta_data={"url": "https://a", "urls": "https://a,https://b,https://c"})
+        embedder = BatchEmbedder()
+        load(knowledge_base, manifest_path, embedder, sources={"https://a": [page], SHARED_SOURCE: [footer]})
+
+        assert embedder.calls == []
+        assert collection.metadatas[document_id(footer)]["urls"] == "https://a,https://b,https://c"
+
+    def test_vector_index_rebuilt_from_collection(self, tmp_path):
+        """Test that the memory-mapped index is rebuilt after a load"""
+        knowledge_base, _ = make_knowledge_base({"https://a": ["one"]})
+        vector_index = Mock()
+
+        load(knowledge_base, str(tmp_path / "manifest.json"), BatchEmbedder(), vector_index=vector_index)
+
+        vector_index.build_from_chroma.assert_called_once_with(knowledge_base.vector_db)
+
+    def test_lexical_index_follows_collection(self, tmp_path):
+        """Test that the full-text index gets new chunks and loses stale ones"""
+        manifest_path = str(tmp_path / "manifest.json")
+        pages = {"https://a": ["pix parcelado", "boleto"]}
+        knowledge_base, _ = make_knowledge_base(pages)
+        lexical_index = LexicalIndex(None)
+        load(knowledge_base, manifest_path, BatchEmbedder(), lexical_index=lexical_index)
+
+        pages["https://a"] = ["pix parcelado", "conta digital"]
+        load(knowledge_base, manifest_path, BatchEmbedder(), lexical_index=lexical_index)
+
+        assert len(lexical_index) == 2
+        assert lexical_index.search("boleto") == []
+        assert lexical_index.search("conta")[0].id == document_id(Document(content="conta digital"))
+
+
+class TestIngestManifest:
+
+    def test_round_trip(self, tmp_path):
+        """Test saving and loading a manifest"""
+        manifest = IngestManifest(str(tmp_path / "nested" / "manifest.json"))
+        manifest.collection = "c"
+        manifest.sources = {"https://a": {"pages": {"https://a": "h"}, "chunks": ["x", "y"]}}
+        manifest.save()
+
+        loaded = IngestManifest.load(manifest.path)
+
+        assert loaded.collection == "c"
+        assert loaded.chunk_ids() == {"x", "y"}
+
+    def test_unreadable_manifest_is_empty(self, tmp_path):
+        """Test that a corrupt manifest is ignored"""
+        path = tmp_path / "manifest.json"
+        path.write_text("{not json")
+
+        assert IngestManifest.load(str(path)).sources == {}
+
+    def test_page_fingerprints_change_with_content(self):
+        """Test that page fingerprints follow chunk content"""
+        before = page_fingerprints([Document(content="a", meta_data={"url": "u"})])
+        after = page_fingerprints([Document(content="b", meta_data={"url": "u"})])
+
+        assert before.keys() == after.keys() == {"u"}
+        assert before != after
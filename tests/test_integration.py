@@ -12,9 +12,9 @@ class TestIntegration:
     @patch.dict('os.environ', {'MISTRAL_API_KEY': 'test-api-key'})
     @patch('agents.workflow.router_agent_team')
     @patch('agents.workflow.Agent')
-    @patch('agents.workflow.MistralChat')
+    @patch('agents.workflow.ResilientMistralChat')
     @patch('agents.router_agent.Team')
-    @patch('agents.router_agent.MistralChat')
+    @patch('agents.router_agent.ResilientMistralChat')
     def test_workflow_router_integration(self, router_mistral, router_team, 
                                         workflow_mistral, workflow_agent, workflow_router):
         """Test integration between workflow and router components"""
@@ -48,7 +48,7 @@ class TestIntegration:
     
     @patch.dict('os.environ', {'MISTRAL_API_KEY': 'test-api-key'})
     @patch('agents.router_agent.Team')
-    @patch('agents.router_agent.MistralChat')
+    @patch('agents.router_agent.ResilientMistralChat')
     def test_router_team_creation_in_workflow_context(self, mock_mistral, mock_team):
         """Test router team creation works in workflow context"""
         mock_team_instance = Mock()
@@ -70,7 +70,7 @@ class TestErrorHandling:
     @patch.dict('os.environ', {'MISTRAL_API_KEY': 'test-api-key'})
     @patch('agents.workflow.router_agent_team')
     @patch('agents.workflow.Agent')
-    @patch('agents.workflow.MistralChat')
+    @patch('agents.workflow.ResilientMistralChat')
     def test_workflow_handles_router_exceptions(self, mock_mistral, mock_agent, mock_router):
         """Test that workflow properly handles router exceptions"""
         mock_router.run.side_effect = Exception("Router failed")
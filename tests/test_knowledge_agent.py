@@ -1,23 +1,25 @@
 # tests/test_knowledge_agent.py
 
 import pytest
-from unittest.mock import patch, Mock, MagicMock
+from unittest.mock import patch, Mock, MagicMock, ANY
 import os
 
 from agents.knowledge_agent import (
     create_vector_db,
     create_knowledge_base,
     create_knowledge_agent,
+    create_retriever,
     INFINITEPAY_URLS,
     COLLECTION_NAME
 )
+from utils import knowledge_agent_instructions, CachedEmbedder, CrawlingWebsiteReader, HashingEmbedder, HybridRetriever, MemmapVectorIndex
 
 
 class TestCreateVectorDb:
     
     @patch.dict('os.environ', {'MISTRAL_API_KEY': 'test-api-key'})
     @patch('agents.knowledge_agent.ChromaDb')
-    @patch('agents.knowledge_agent.MistralEmbedder')
+    @patch('utils.embedders.MistralEmbedder')
     def test_create_vector_db_success(self, mock_embedder, mock_chroma):
         """Test successful vector database creation"""
         mock_chroma_instance = Mock()
@@ -31,11 +33,24 @@ class TestCreateVectorDb:
         mock_embedder.assert_called_once_with(api_key='test-api-key')
         mock_chroma.assert_called_once_with(
             collection=COLLECTION_NAME,
-            embedder=mock_embedder_instance,
+            embedder=ANY,
             persistent_client=True,
             path="storage/chroma_db"
         )
+        cached_embedder = mock_chroma.call_args[1]['embedder']
+        assert isinstance(cached_embedder, CachedEmbedder)
+        assert cached_embedder.embedder == mock_embedder_instance
     
+    @patch('agents.knowledge_agent.ChromaDb')
+    @patch('utils.embedders.MistralEmbedder')
+    def test_create_vector_db_local_backend(self, mock_embedder, mock_chroma):
+        """Test that a local backend replaces the Mistral embedder"""
+        create_vector_db(backend="hashing")
+
+        mock_embedder.assert_not_called()
+        cached_embedder = mock_chroma.call_args[1]['embedder']
+        assert isinstance(cached_embedder.embedder, HashingEmbedder)
+
     @patch.dict('os.environ', {'MISTRAL_API_KEY': 'test-api-key'})
     @patch('agents.knowledge_agent.ChromaDb', side_effect=Exception("DB creation failed"))
     def test_create_vector_db_failure(self, mock_chroma):
@@ -61,8 +76,13 @@ class TestCreateKnowledgeBase:
             num_documents=4,
             max_links=1,
             max_depth=1,
-            vector_db=mock_vector_db
+            vector_db=mock_vector_db,
+            reader=ANY,
         )
+        reader = mock_kb.call_args.kwargs["reader"]
+        assert isinstance(reader, CrawlingWebsiteReader)
+        assert reader.max_depth == 1
+        assert reader.max_links == 1
     
     @patch('agents.knowledge_agent.WebsiteKnowledgeBase', side_effect=Exception("KB creation failed"))
     def test_create_knowledge_base_failure(self, mock_kb):
@@ -73,12 +93,46 @@ class TestCreateKnowledgeBase:
             create_knowledge_base(mock_vector_db)
 
 
+class TestCreateRetriever:
+
+    def test_create_retriever_success(self, tmp_path):
+        """Test hybrid retriever creation over the vector database"""
+        mock_vector_db = Mock()
+
+        retriever = create_retriever(mock_vector_db, path=str(tmp_path / "tantivy"))
+
+        assert isinstance(retriever, HybridRetriever)
+        assert retriever.vector_db == mock_vector_db
+        assert retriever.lexical_index.path == str(tmp_path / "tantivy")
+
+    def test_create_retriever_memmap_store(self, tmp_path):
+        """Test that the memmap store replaces Chroma for vector search"""
+        mock_vector_db = Mock()
+
+        retriever = create_retriever(
+            mock_vector_db,
+            path=str(tmp_path / "tantivy"),
+            vector_store="memmap",
+            vector_index_path=str(tmp_path / "vectors"),
+        )
+
+        assert isinstance(retriever.vector_db, MemmapVectorIndex)
+        assert retriever.vector_db.path == str(tmp_path / "vectors")
+        assert retriever.vector_db.embedder == mock_vector_db.embedder
+
+    @patch('agents.knowledge_agent.HybridRetriever', side_effect=Exception("Retriever creation failed"))
+    def test_create_retriever_failure(self, mock_retriever):
+        """Test retriever creation failure"""
+        with pytest.raises(Exception, match="Retriever creation failed"):
+            create_retriever(Mock())
+
+
 class TestCreateKnowledgeAgent:
     
     @patch.dict('os.environ', {'MISTRAL_API_KEY': 'test-api-key', 'TAVILY_API_KEY': 'tavily-key'})
     @patch('agents.knowledge_agent.Agent')
-    @patch('agents.knowledge_agent.MistralChat')
-    @patch('agents.knowledge_agent.TavilyTools')
+    @patch('agents.knowledge_agent.ResilientMistralChat')
+    @patch('agents.knowledge_agent.CachedTavilyTools')
     def test_create_knowledge_agent_with_tavily(self, mock_tavily, mock_mistral, mock_agent):
         """Test knowledge agent creation with Tavily tools"""
         mock_kb = Mock()
@@ -93,7 +147,7 @@ class TestCreateKnowledgeAgent:
         
         assert result == mock_agent_instance
         mock_mistral.assert_called_once_with(api_key='test-api-key', id='mistral-large-latest')
-        mock_tavily.assert_called_once_with(search="")
+        mock_tavily.assert_called_once_with()
         mock_agent.assert_called_once()
         
         # Check agent configuration
@@ -101,13 +155,14 @@ class TestCreateKnowledgeAgent:
         assert call_args[1]['name'] == "KnowledgeBase Agent"
         assert call_args[1]['model'] == mock_mistral_instance
         assert call_args[1]['knowledge'] == mock_kb
-        assert call_args[1]['search_knowledge'] is True
+        assert call_args[1]['search_knowledge'] is False
+        assert call_args[1]['add_references'] is True
         assert call_args[1]['debug_mode'] is True
         assert mock_tavily_instance in call_args[1]['tools']
     
     @patch.dict('os.environ', {'MISTRAL_API_KEY': 'test-api-key'})
     @patch('agents.knowledge_agent.Agent')
-    @patch('agents.knowledge_agent.MistralChat')
+    @patch('agents.knowledge_agent.ResilientMistralChat')
     def test_create_knowledge_agent_without_tavily(self, mock_mistral, mock_agent):
         """Test knowledge agent creation without Tavily tools"""
         mock_kb = Mock()
@@ -123,6 +178,39 @@ class TestCreateKnowledgeAgent:
         # Check that tools list is empty when no Tavily key
         call_args = mock_agent.call_args
         assert call_args[1]['tools'] == []
+        assert call_args[1]['retriever'] is None
+
+    @patch.dict('os.environ', {'MISTRAL_API_KEY': 'test-api-key'})
+    @patch('agents.knowledge_agent.Agent')
+    @patch('agents.knowledge_agent.ResilientMistralChat')
+    def test_create_knowledge_agent_with_retriever(self, mock_mistral, mock_agent):
+        """Test that a custom retriever is handed to the agent"""
+        mock_retriever = Mock()
+
+        create_knowledge_agent(Mock(), mock_retriever)
+
+        assert mock_agent.call_args[1]['retriever'] == mock_retriever
+        assert mock_agent.call_args[1]['add_references'] is True
+
+    @patch.dict('os.environ', {'MISTRAL_API_KEY': 'test-api-key'})
+    @patch('agents.knowledge_agent.Agent')
+    @patch('agents.knowledge_agent.ResilientMistralChat')
+    def test_create_knowledge_agent_tool_mode(self, mock_mistral, mock_agent):
+        """Test that tool mode keeps the model-driven knowledge search"""
+        create_knowledge_agent(Mock(), Mock(), search_mode="tool")
+
+        call_args = mock_agent.call_args
+        assert call_args[1]['search_knowledge'] is True
+        assert call_args[1]['add_references'] is False
+        assert call_args[1]['instructions'] == knowledge_agent_instructions
+
+    @patch.dict('os.environ', {'MISTRAL_API_KEY': 'test-api-key'})
+    @patch('agents.knowledge_agent.Agent')
+    @patch('agents.knowledge_agent.ResilientMistralChat')
+    def test_create_knowledge_agent_invalid_mode(self, mock_mistral, mock_agent):
+        """Test that an unknown search mode is rejected"""
+        with pytest.raises(ValueError, match="Unknown knowledge search mode"):
+            create_knowledge_agent(Mock(), search_mode="agentic")
     
     @patch.dict('os.environ', {'MISTRAL_API_KEY': 'test-api-key'})
     @patch('agents.knowledge_agent.Agent', side_effect=Exception("Agent creation failed"))
@@ -210,11 +298,11 @@ class TestIntegration:
     
     @patch.dict('os.environ', {'MISTRAL_API_KEY': 'test-api-key', 'TAVILY_API_KEY': 'tavily-key'})
     @patch('agents.knowledge_agent.ChromaDb')
-    @patch('agents.knowledge_agent.MistralEmbedder')
+    @patch('utils.embedders.MistralEmbedder')
     @patch('agents.knowledge_agent.WebsiteKnowledgeBase')
     @patch('agents.knowledge_agent.Agent')
-    @patch('agents.knowledge_agent.MistralChat')
-    @patch('agents.knowledge_agent.TavilyTools')
+    @patch('agents.knowledge_agent.ResilientMistralChat')
+    @patch('agents.knowledge_agent.CachedTavilyTools')
     def test_full_knowledge_agent_setup(self, mock_tavily, mock_mistral, mock_agent, 
                                        mock_kb, mock_embedder, mock_chroma):
         """Test complete knowledge agent setup workflow"""
@@ -242,7 +330,8 @@ class TestIntegration:
             num_documents=4,
             max_links=1,
             max_depth=1,
-            vector_db=mock_vdb
+            vector_db=mock_vdb,
+            reader=ANY,
         )
         
         # Verify agent was created with knowledge base
@@ -0,0 +1,63 @@
+# tests/test_lexical_index.py
+
+from agno.document import Document
+
+from utils.lexical_index import LexicalIndex
+
+
+def make_index(path=None):
+    """Create an index holding a few Portuguese chunks"""
+    index = LexicalIndex(path)
+    index.upsert([
+        Document(id="pix", content="Pix parcelado em até 12 vezes com taxa de 2,99%", meta_data={"url": "https://x/pix"}),
+        Document(id="boleto", content="Boleto bancário com baixa automática", meta_data={"url": "https://x/boleto"}),
+        Document(id="conta", content="Conta digital gratuita para empresas", meta_data={"url": "https://x/conta"}),
+    ])
+    return index
+
+
+class TestLexicalIndex:
+
+    def test_portuguese_stemming_and_accents(self):
+        """Test that plurals and missing accents still match"""
+        index = make_index()
+
+        assert [d.id for d in index.search("pix parcelados")][0] == "pix"
+        assert [d.id for d in index.search("boletos automatica")][0] == "boleto"
+
+    def test_exact_numbers(self):
+        """Test that fee percentages are searchable"""
+        assert [d.id for d in make_index().search("2,99%")] == ["pix"]
+
+    def test_results_carry_metadata_and_score(self):
+        """Test that stored fields are returned"""
+        result = make_index().search("conta digital")[0]
+
+        assert result.meta_data == {"url": "https://x/conta"}
+        assert result.content == "Conta digital gratuita para empresas"
+        assert result.reranking_score > 0
+
+    def test_upsert_replaces_and_delete_removes(self):
+        """Test that chunks are keyed by id"""
+        index = make_index()
+        index.upsert([Document(id="pix", content="Pix na hora")])
+        index.delete(["boleto"])
+
+        assert len(index) == 2
+        assert index.search("parcelado") == []
+        assert index.search("boleto") == []
+
+    def test_invalid_query_syntax_is_lenient(self):
+        """Test that malformed queries do not raise"""
+        assert [d.id for d in make_index().search("taxa AND (")] == ["pix"]
+        assert make_index().search("   ") == []
+
+    def test_persistent_index_reopens(self, tmp_path):
+        """Test that an on-disk index survives reopening"""
+        make_index(str(tmp_path / "idx"))
+
+        reopened = LexicalIndex(str(tmp_path / "idx"))
+
+        assert len(reopened) == 3
+        reopened.clear()
+        assert len(reopened) == 0
@@ -0,0 +1,66 @@
+# tests/test_metrics.py
+
+import math
+
+from utils.metrics import MetricsRegistry, quantile
+
+
+class TestMetricsRegistry:
+
+    def setup_method(self):
+        """Use a fresh registry for each test"""
+        self.registry = MetricsRegistry()
+
+    def test_counter_increment(self):
+        """Test that counters accumulate per label set"""
+        self.registry.increment("requests_total", route="chat")
+        self.registry.increment("requests_total", 2, route="chat")
+        self.registry.increment("requests_total", route="health")
+
+        assert self.registry.get_counter("requests_total", route="chat") == 3
+        assert self.registry.get_counter("requests_total", route="health") == 1
+        assert self.registry.get_counter("requests_total", route="missing") == 0
+
+    def test_gauge_set(self):
+        """Test that gauges keep the last value"""
+        self.registry.set_gauge("queue_depth", 4)
+        self.registry.set_gauge("queue_depth", 2)
+
+        assert self.registry.get_gauge("queue_depth") == 2
+        assert math.isnan(self.registry.get_gauge("unknown_gauge"))
+
+    def test_summary_snapshot(self):
+        """Test that summaries report count, sum and quantiles"""
+        for value in [0.1, 0.2, 0.3, 0.4]:
+            self.registry.observe("latency_seconds", value, stage="router")
+
+        summary = self.registry.snapshot()["summaries"]["latency_seconds"]['{stage="router"}']
+        assert summary["count"] == 4
+        assert math.isclose(summary["sum"], 1.0)
+        assert summary["p50"] == 0.2
+        assert summary["p99"] == 0.4
+
+    def test_render_prometheus(self):
+        """Test the Prometheus text exposition output"""
+        self.registry.increment("calls_total", model="mistral-large-latest")
+        self.registry.observe("latency_seconds", 0.5)
+
+        text = self.registry.render_prometheus()
+        assert "# TYPE calls_total counter" in text
+        assert 'calls_total{model="mistral-large-latest"} 1.0' in text
+        assert 'latency_seconds{quantile="0.5"} 0.5' in text
+        assert "latency_seconds_count 1" in text
+
+
+class TestQuantile:
+
+    def test_quantile_empty(self):
+        """Test that an empty series yields NaN"""
+        assert math.isnan(quantile([], 0.5))
+
+    def test_quantile_values(self):
+        """Test nearest-rank quantiles"""
+        values = list(range(1, 101))
+        assert quantile(values, 0.5) == 50
+        assert quantile(values, 0.99) == 99
+        assert quantile(values, 1.0) == 100
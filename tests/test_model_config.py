@@ -0,0 +1,74 @@
+# tests/test_model_config.py
+
+import pytest
+from unittest.mock import patch
+
+from utils.model_config import (
+    get_stage_model,
+    get_stage_models,
+    get_tier_model,
+    MODEL_TIER_PROFILES,
+)
+
+
+class TestGetTierModel:
+
+    @patch.dict('os.environ', {}, clear=True)
+    def test_tier_defaults(self):
+        """Test default models for each tier"""
+        assert get_tier_model("large") == "mistral-large-latest"
+        assert get_tier_model("small") == "mistral-small-latest"
+
+    @patch.dict('os.environ', {'LLM_MODEL': 'custom-large', 'SMALL_LLM_MODEL': 'custom-small'})
+    def test_tier_from_environment(self):
+        """Test that tiers follow LLM_MODEL and SMALL_LLM_MODEL"""
+        assert get_tier_model("large") == "custom-large"
+        assert get_tier_model("small") == "custom-small"
+
+    def test_unknown_tier(self):
+        """Test that an unknown tier is rejected"""
+        with pytest.raises(ValueError, match="Unknown model tier"):
+            get_tier_model("medium")
+
+
+class TestGetStageModel:
+
+    @patch.dict('os.environ', {}, clear=True)
+    def test_tiered_profile_is_default(self):
+        """Test that routing and personality use the small model by default"""
+        assert get_stage_model("router") == "mistral-small-latest"
+        assert get_stage_model("personality") == "mistral-small-latest"
+        assert get_stage_model("customer_support") == "mistral-large-latest"
+        assert get_stage_model("knowledge") == "mistral-large-latest"
+
+    @patch.dict('os.environ', {'MODEL_TIER_PROFILE': 'uniform', 'LLM_MODEL': 'custom-model'})
+    def test_uniform_profile(self):
+        """Test that the uniform profile uses LLM_MODEL everywhere"""
+        assert set(get_stage_models().values()) == {"custom-model"}
+
+    @patch.dict('os.environ', {'ROUTER_LLM_MODEL': 'router-model', 'MODEL_TIER_PROFILE': 'uniform'})
+    def test_stage_override_wins(self):
+        """Test that a stage-specific variable overrides the profile"""
+        assert get_stage_model("router") == "router-model"
+        assert get_stage_model("router", profile="economy") == "router-model"
+
+    @patch.dict('os.environ', {}, clear=True)
+    def test_explicit_profile(self):
+        """Test resolving a profile passed as argument"""
+        assert get_stage_model("knowledge", profile="economy") == "mistral-small-latest"
+
+    def test_unknown_stage(self):
+        """Test that an unknown stage is rejected"""
+        with pytest.raises(ValueError, match="Unknown workflow stage"):
+            get_stage_model("summariser")
+
+    @patch.dict('os.environ', {'MODEL_TIER_PROFILE': 'premium'}, clear=True)
+    def test_unknown_profile(self):
+        """Test that an unknown profile is rejected"""
+        with pytest.raises(ValueError, match="Unknown model tier profile"):
+            get_stage_model("router")
+
+    def test_profiles_cover_all_stages(self):
+        """Test that every profile assigns a tier to every stage"""
+        for profile in MODEL_TIER_PROFILES.values():
+            assert set(profile) == {"router", "customer_support", "knowledge", "personality"}
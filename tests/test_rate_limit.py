@@ -0,0 +1,42 @@
+# tests/test_rate_limit.py
+
+from utils.rate_limit import RateLimiter
+
+
+class FakeClock:
+    """Manually advanced clock"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestRateLimiter:
+
+    def test_burst_then_wait(self):
+        """Test that calls beyond the burst must wait for refills"""
+        clock = FakeClock()
+        limiter = RateLimiter(rate=2, burst=2, clock=clock)
+
+        assert limiter.reserve() == 0.0
+        assert limiter.reserve() == 0.0
+        assert limiter.reserve() == 0.5
+
+    def test_refill_over_time(self):
+        """Test that tokens refill at the configured rate"""
+        clock = FakeClock()
+        limiter = RateLimiter(rate=1, burst=1, clock=clock)
+
+        assert limiter.try_acquire()
+        assert not limiter.try_acquire()
+        clock.now = 1.0
+        assert limiter.try_acquire()
+
+    def test_disabled(self):
+        """Test that a non-positive rate disables limiting"""
+        limiter = RateLimiter(rate=0)
+
+        assert all(limiter.reserve() == 0.0 for _ in range(100))
+        assert limiter.try_acquire()
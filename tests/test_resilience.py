@@ -0,0 +1,229 @@
+# tests/test_resilience.py
+
+import httpx
+import pytest
+from unittest.mock import patch, Mock
+
+from agno.exceptions import ModelProviderError
+from agno.models.mistral import MistralChat
+from mistralai.models import SDKError
+
+from utils.metrics import metrics
+from utils.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    ResilientMistralChat,
+    get_circuit_breaker,
+    circuit_breaker_states,
+    is_upstream_failure,
+)
+
+
+class FakeClock:
+    """Manually advanced clock for breaker timing tests"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestCircuitBreaker:
+
+    def setup_method(self):
+        """Create a breaker with a controllable clock"""
+        self.clock = FakeClock()
+        self.breaker = CircuitBreaker(
+            "test-model", failure_threshold=2, recovery_timeout=10, clock=self.clock
+        )
+
+    def test_starts_closed(self):
+        """Test that a new breaker allows requests"""
+        assert self.breaker.state == "closed"
+        assert self.breaker.allow_request() is True
+
+    def test_opens_after_threshold(self):
+        """Test that consecutive failures open the circuit"""
+        self.breaker.record_failure()
+        assert self.breaker.state == "closed"
+        self.breaker.record_failure()
+
+        assert self.breaker.state == "open"
+        assert self.breaker.allow_request() is False
+
+    def test_success_resets_failure_count(self):
+        """Test that a success between failures keeps the circuit closed"""
+        self.breaker.record_failure()
+        self.breaker.record_success()
+        self.breaker.record_failure()
+
+        assert self.breaker.state == "closed"
+
+    def test_half_open_after_recovery_timeout(self):
+        """Test that the breaker allows a single probe after the timeout"""
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.clock.now = 10
+
+        assert self.breaker.state == "half_open"
+        assert self.breaker.allow_request() is True
+        assert self.breaker.allow_request() is False
+
+    def test_successful_probe_closes(self):
+        """Test that a successful probe closes the circuit"""
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.clock.now = 10
+        self.breaker.allow_request()
+        self.breaker.record_success()
+
+        assert self.breaker.state == "closed"
+
+    def test_failed_probe_reopens(self):
+        """Test that a failed probe re-opens the circuit for another timeout"""
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.clock.now = 10
+        self.breaker.allow_request()
+        self.breaker.record_failure()
+
+        assert self.breaker.state == "open"
+        self.clock.now = 15
+        assert self.breaker.state == "open"
+
+    def test_state_exported_as_metric(self):
+        """Test that state changes are published to the metrics gauge"""
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+
+        assert metrics.get_gauge("circuit_breaker_state", breaker="test-model") == 2
+
+
+class TestBreakerRegistry:
+
+    def test_get_circuit_breaker_is_shared(self):
+        """Test that the same model ID returns the same breaker"""
+        assert get_circuit_breaker("shared-model") is get_circuit_breaker("shared-model")
+
+    def test_circuit_breaker_states(self):
+        """Test that registered breakers are reported"""
+        get_circuit_breaker("reported-model")
+        states = circuit_breaker_states()
+
+        assert states["reported-model"]["state"] == "closed"
+
+    def test_is_upstream_failure(self):
+        """Test that client errors do not count as upstream failures"""
+        assert is_upstream_failure(Exception("timeout")) is True
+        assert is_upstream_failure(Mock(status_code=503)) is True
+        assert is_upstream_failure(Mock(status_code=429)) is True
+        assert is_upstream_failure(Mock(status_code=400)) is False
+
+    def test_is_upstream_failure_reads_wrapped_status(self):
+        """Test that the status of the mistralai error wrapped by agno is used"""
+
+        def wrapped(status_code):
+            try:
+                raise SDKError("API error", httpx.Response(status_code, text="{}"))
+            except SDKError as e:
+                try:
+                    raise ModelProviderError(message=str(e)) from e
+                except ModelProviderError as wrapper:
+                    return wrapper
+
+        assert wrapped(400).status_code == 502
+        assert is_upstream_failure(wrapped(400)) is False
+        assert is_upstream_failure(wrapped(503)) is True
+
+
+class TestResilientMistralChat:
+
+    def setup_method(self):
+        """Reset the breakers used by these tests"""
+        get_circuit_breaker("primary-model").reset()
+        get_circuit_breaker("secondary-model").reset()
+
+    def _trip(self, name):
+        breaker = get_circuit_breaker(name)
+        for _ in range(breaker.failure_threshold):
+            breaker.record_failure()
+
+    @patch.object(MistralChat, "invoke", return_value="primary response")
+    def test_invoke_records_success(self, mock_invoke):
+        """Test that a successful call passes through the breaker"""
+        model = ResilientMistralChat(api_key="test-api-key", id="primary-model")
+
+        assert model.invoke(messages=[]) == "primary response"
+        assert get_circuit_breaker("primary-model").state == "closed"
+
+    @patch.object(MistralChat, "invoke", side_effect=Exception("upstream down"))
+    def test_invoke_failures_open_breaker(self, mock_invoke):
+        """Test that repeated failures open the breaker and then fail fast"""
+        model = ResilientMistralChat(api_key="test-api-key", id="primary-model", fallback_id=None)
+        breaker = get_circuit_breaker("primary-model")
+
+        for _ in range(breaker.failure_threshold):
+            with pytest.raises(Exception, match="upstream down"):
+                model.invoke(messages=[])
+
+        with pytest.raises(CircuitOpenError):
+            model.invoke(messages=[])
+        assert mock_invoke.call_count == breaker.failure_threshold
+
+    def test_invoke_uses_fallback_when_open(self):
+        """Test that calls are routed to the fallback model while open"""
+        model = ResilientMistralChat(
+            api_key="test-api-key", id="primary-model", fallback_id="secondary-model"
+        )
+        self._trip("primary-model")
+
+        with patch.object(
+            MistralChat, "invoke", autospec=True, return_value="fallback response"
+        ) as mock_invoke:
+            assert model.invoke(messages=[]) == "fallback response"
+
+        called_model = mock_invoke.call_args[0][0]
+        assert called_model.id == "secondary-model"
+
+    def test_fails_fast_when_fallback_also_open(self):
+        """Test that an open fallback breaker also fails fast"""
+        model = ResilientMistralChat(
+            api_key="test-api-key", id="primary-model", fallback_id="secondary-model"
+        )
+        self._trip("primary-model")
+        self._trip("secondary-model")
+
+        with pytest.raises(CircuitOpenError):
+            model.invoke(messages=[])
+
+    @patch.object(MistralChat, "invoke_stream")
+    def test_invoke_stream_records_outcome_after_last_chunk(self, mock_invoke_stream):
+        """Test that a stream failing midway counts as a failure once it is read"""
+
+        def failing_stream(*args, **kwargs):
+            yield "first chunk"
+            raise Exception("stream reset")
+
+        mock_invoke_stream.side_effect = failing_stream
+        model = ResilientMistralChat(api_key="test-api-key", id="primary-model", fallback_id=None)
+        breaker = get_circuit_breaker("primary-model")
+
+        stream = model.invoke_stream(messages=[])
+        assert next(stream) == "first chunk"
+        with pytest.raises(Exception, match="stream reset"):
+            next(stream)
+        assert breaker.to_dict()["consecutive_failures"] == 1
+
+        mock_invoke_stream.side_effect = lambda *args, **kwargs: iter(["a", "b"])
+        assert list(model.invoke_stream(messages=[])) == ["a", "b"]
+        assert breaker.to_dict()["consecutive_failures"] == 0
+
+    def test_models_share_client_per_settings(self):
+        """Test that models with the same client settings reuse one Mistral client"""
+        router = ResilientMistralChat(api_key="test-api-key", id="primary-model")
+        personality = ResilientMistralChat(api_key="test-api-key", id="secondary-model")
+        other_key = ResilientMistralChat(api_key="other-api-key", id="primary-model")
+
+        assert router.get_client() is personality.get_client()
+        assert other_key.get_client() is not router.get_client()
@@ -0,0 +1,132 @@
+# tests/test_retrieval.py
+
+import pytest
+from unittest.mock import Mock
+
+from agno.document import Document
+
+from utils.retrieval import HybridRetriever, estimate_tokens, fit_to_budget, reciprocal_rank_fusion
+
+
+def docs(*ids):
+    """Create documents with the given ids"""
+    return [Document(id=id_, content=f"content {id_}") for id_ in ids]
+
+
+def make_retriever(vector_ids, lexical_ids, **kwargs):
+    """Create a retriever over mocked vector and lexical searches"""
+    vector_db = Mock()
+    vector_db.search.return_value = docs(*vector_ids)
+    lexical_index = Mock()
+    lexical_index.search.return_value = docs(*lexical_ids)
+    return HybridRetriever(vector_db, lexical_index, **kwargs), vector_db, lexical_index
+
+
+class TestReciprocalRankFusion:
+
+    def test_documents_in_both_rankings_win(self):
+        """Test that agreement between rankings is rewarded"""
+        fused = reciprocal_rank_fusion([docs("a", "b", "c"), docs("c", "d")], k=60)
+
+        assert [d.id for d in fused] == ["c", "a", "b", "d"]
+        assert fused[0].reranking_score == pytest.approx(1 / 63 + 1 / 61)
+
+
+class TestHybridRetriever:
+
+    def test_hybrid_fuses_both_sides(self):
+        """Test that hybrid mode queries both indexes"""
+        retriever, vector_db, lexical_index = make_retriever(["a", "b"], ["b", "c"], candidates=10)
+
+        results = retriever.search("pix parcelado", num_documents=2)
+
+        assert [d.id for d in results] == ["b", "a"]
+        vector_db.search.assert_called_once_with(query="pix parcelado", limit=10)
+        lexical_index.search.assert_called_once_with("pix parcelado", limit=10)
+
+    def test_lexical_mode_skips_vector_search(self):
+        """Test that lexical-only lookups make no embedding call"""
+        retriever, vector_db, _ = make_retriever(["a"], ["c"], mode="lexical")
+
+        assert [d.id for d in retriever.search("boleto")] == ["c"]
+        vector_db.search.assert_not_called()
+
+    def test_vector_failure_falls_back_to_lexical(self):
+        """Test that hybrid mode survives an embedding outage"""
+        retriever, vector_db, _ = make_retriever([], ["c"])
+        vector_db.search.side_effect = RuntimeError("embedding API down")
+
+        assert [d.id for d in retriever.search("boleto")] == ["c"]
+
+    def test_both_failures_raise(self):
+        """Test that a search fails when no side answers"""
+        retriever, vector_db, lexical_index = make_retriever([], [])
+        vector_db.search.side_effect = RuntimeError("down")
+        lexical_index.search.side_effect = RuntimeError("down")
+
+        with pytest.raises(RuntimeError):
+            retriever.search("boleto")
+
+    def test_agent_entry_point_returns_dicts(self):
+        """Test the agno retriever signature"""
+        retriever, _, _ = make_retriever(["a"], ["a"])
+
+        assert retriever(query="pix", num_documents=1) == [{"content": "content a", "meta_data": {}}]
+
+    def test_agent_entry_point_applies_token_budget(self):
+        """Test that the chunks handed to the agent fit the token budget"""
+        retriever, _, _ = make_retriever(["a", "b", "c"], [], mode="vector", token_budget=5, compress=False)
+
+        assert [d["content"] for d in retriever(query="pix", num_documents=3)] == ["content a"]
+
+    def test_agent_entry_point_compresses_context(self):
+        """Test that the agent receives the relevant sentences with their source"""
+        vector_db = Mock()
+        vector_db.search.return_value = [
+            Document(
+                id="a",
+                content="A maquininha aceita cartões de crédito. O Pix cai na conta na hora.",
+                meta_data={"url": "https://a"},
+            )
+        ]
+        retriever = HybridRetriever(vector_db, None, mode="vector", token_budget=12)
+
+        references = retriever(query="quando o pix cai na conta", num_documents=1)
+
+        assert references == [{"content": "O Pix cai na conta na hora.", "meta_data": {"url": "https://a"}}]
+
+    def test_invalid_configuration(self):
+        """Test that unknown modes and missing indexes are rejected"""
+        with pytest.raises(ValueError, match="Unknown retrieval mode"):
+            HybridRetriever(Mock(), Mock(), mode="semantic")
+        with pytest.raises(ValueError, match="requires a lexical index"):
+            HybridRetriever(Mock(), None, mode="hybrid")
+
+
+class TestTokenBudget:
+
+    def test_keeps_ranked_chunks_within_budget(self):
+        """Test that chunks are taken in rank order until the budget is spent"""
+        documents = [Document(id=i, content="x" * 40) for i in "abc"]
+
+        assert [d.id for d in fit_to_budget(documents, 25)] == ["a", "b"]
+
+    def test_first_chunk_is_truncated_to_budget(self):
+        """Test that an oversized best chunk is cut rather than dropped"""
+        documents = [Document(id="a", content="x" * 100, meta_data={"url": "https://a"})]
+
+        kept = fit_to_budget(documents, 5)
+
+        assert kept[0].content == "x" * 20
+        assert kept[0].meta_data == {"url": "https://a"}
+
+    def test_no_budget_keeps_everything(self):
+        """Test that a missing budget disables the cut"""
+        documents = docs("a", "b")
+
+        assert fit_to_budget(documents, None) == documents
+
+    def test_estimate_tokens(self):
+        """Test the characters-per-token estimate"""
+        assert estimate_tokens("") == 0
+        assert estimate_tokens("abcde") == 2
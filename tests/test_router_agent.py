@@ -11,7 +11,7 @@ class TestCreateCustomerSupportTeam:
     
     @patch.dict('os.environ', {'MISTRAL_API_KEY': 'test-api-key'})
     @patch('agents.router_agent.Team')
-    @patch('agents.router_agent.MistralChat')
+    @patch('agents.router_agent.ResilientMistralChat')
     @patch('agents.router_agent.customer_support_agent')
     @patch('agents.router_agent.knowledge_agent')
     def test_create_customer_support_team_success(self, mock_knowledge_agent, 
@@ -28,7 +28,7 @@ class TestCreateCustomerSupportTeam:
         assert result == mock_team_instance
         mock_mistral_chat.assert_called_once_with(
             api_key='test-api-key', 
-            id='mistral-large-latest'
+            id='mistral-small-latest'
         )
         mock_team.assert_called_once()
         
@@ -85,7 +85,7 @@ class TestTeamConfiguration:
     
     @patch.dict('os.environ', {'MISTRAL_API_KEY': 'test-api-key'})
     @patch('agents.router_agent.Team')
-    @patch('agents.router_agent.MistralChat')
+    @patch('agents.router_agent.ResilientMistralChat')
     def test_team_routing_mode(self, mock_mistral_chat, mock_team):
         """Test that team is configured in routing mode"""
         mock_team_instance = Mock()
@@ -98,7 +98,7 @@ class TestTeamConfiguration:
     
     @patch.dict('os.environ', {'MISTRAL_API_KEY': 'test-api-key'})
     @patch('agents.router_agent.Team')
-    @patch('agents.router_agent.MistralChat')
+    @patch('agents.router_agent.ResilientMistralChat')
     def test_team_markdown_enabled(self, mock_mistral_chat, mock_team):
         """Test that team has markdown enabled"""
         mock_team_instance = Mock()
@@ -111,7 +111,7 @@ class TestTeamConfiguration:
     
     @patch.dict('os.environ', {'MISTRAL_API_KEY': 'test-api-key'})
     @patch('agents.router_agent.Team')
-    @patch('agents.router_agent.MistralChat')
+    @patch('agents.router_agent.ResilientMistralChat')
     def test_team_show_members_responses(self, mock_mistral_chat, mock_team):
         """Test that team shows member responses"""
         mock_team_instance = Mock()
@@ -127,7 +127,7 @@ class TestAgentMembers:
     
     @patch.dict('os.environ', {'MISTRAL_API_KEY': 'test-api-key'})
     @patch('agents.router_agent.Team')
-    @patch('agents.router_agent.MistralChat')
+    @patch('agents.router_agent.ResilientMistralChat')
     @patch('agents.router_agent.customer_support_agent')
     @patch('agents.router_agent.knowledge_agent')
     def test_team_has_correct_members(self, mock_knowledge_agent, 
@@ -148,7 +148,7 @@ class TestAgentMembers:
     
     @patch.dict('os.environ', {'MISTRAL_API_KEY': 'test-api-key'})
     @patch('agents.router_agent.Team')
-    @patch('agents.router_agent.MistralChat')
+    @patch('agents.router_agent.ResilientMistralChat')
     @patch('agents.router_agent.customer_support_agent', None)
     @patch('agents.router_agent.knowledge_agent')
     def test_team_with_missing_customer_support_agent(self, mock_knowledge_agent, 
@@ -171,7 +171,7 @@ class TestResponseModel:
     
     @patch.dict('os.environ', {'MISTRAL_API_KEY': 'test-api-key'})
     @patch('agents.router_agent.Team')
-    @patch('agents.router_agent.MistralChat')
+    @patch('agents.router_agent.ResilientMistralChat')
     @patch('agents.router_agent.AgentResponseOutput')
     def test_team_response_model(self, mock_response_output, mock_mistral_chat, mock_team):
         """Test that team uses correct response model"""
@@ -188,7 +188,7 @@ class TestInstructions:
     
     @patch.dict('os.environ', {'MISTRAL_API_KEY': 'test-api-key'})
     @patch('agents.router_agent.Team')
-    @patch('agents.router_agent.MistralChat')
+    @patch('agents.router_agent.ResilientMistralChat')
     @patch('agents.router_agent.router_agent_instructions')
     def test_team_instructions(self, mock_instructions, mock_mistral_chat, mock_team):
         """Test that team uses router agent instructions"""
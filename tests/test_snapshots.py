@@ -0,0 +1,105 @@
+# tests/test_snapshots.py
+
+import tarfile
+
+import pytest
+
+from utils.snapshots import find_snapshot_files, path_to_url, read_snapshots
+
+PIX_PAGE = '<html><head><link rel="canonical" href="https://www.infinitepay.io/pix-parcelado"></head><body><main>Pix parcelado em ate 12x</main></body></html>'
+BOLETO_PAGE = "<html><body><main>Boleto com baixa automatica</main></body></html>"
+EMPTY_PAGE = "<html><body><div>Sem conteudo principal</div></body></html>"
+
+
+@pytest.fixture
+def snapshot_dir(tmp_path):
+    """Create a small snapshot directory"""
+    root = tmp_path / "snapshot"
+    (root / "conta").mkdir(parents=True)
+    (root / "pix.html").write_text(PIX_PAGE, encoding="utf-8")
+    (root / "boleto.html").write_text(BOLETO_PAGE, encoding="utf-8")
+    (root / "conta" / "index.html").write_text(EMPTY_PAGE, encoding="utf-8")
+    (root / "notes.txt").write_text("ignored", encoding="utf-8")
+    return root
+
+
+class TestPathToUrl:
+
+    def test_page_paths(self):
+        """Test URL derivation from snapshot paths"""
+        assert path_to_url("/s/pix.html", "/s") == "https://www.infinitepay.io/pix"
+        assert path_to_url("/s/index.html", "/s") == "https://www.infinitepay.io"
+        assert path_to_url("/s/conta/index.htm", "/s", "http://example.com/") == "http://example.com/conta"
+
+
+class TestReadSnapshots:
+
+    def test_finds_html_files(self, snapshot_dir):
+        """Test that only HTML files are collected"""
+        files = find_snapshot_files(str(snapshot_dir))
+
+        assert [f[len(str(snapshot_dir)) + 1:] for f in files] == ["boleto.html", "conta/index.html", "pix.html"]
+
+    def test_reads_directory(self, snapshot_dir):
+        """Test parsing a directory, preferring canonical URLs"""
+        sources = read_snapshots(str(snapshot_dir), workers=1)
+
+        assert set(sources) == {"https://www.infinitepay.io/pix-parcelado", "https://www.infinitepay.io/boleto"}
+        boleto = sources["https://www.infinitepay.io/boleto"]
+        assert boleto[0].content == "Boleto com baixa automatica"
+        assert boleto[0].meta_data == {"url": "https://www.infinitepay.io/boleto", "chunk": 1, "chunk_size": 27}
+
+    def test_process_pool_matches_in_process(self, snapshot_dir):
+        """Test that parsing in worker processes gives the same chunks"""
+        in_process = read_snapshots(str(snapshot_dir), workers=1)
+        pooled = read_snapshots(str(snapshot_dir), workers=2)
+
+        assert {url: [d.content for d in docs] for url, docs in pooled.items()} == {
+            url: [d.content for d in docs] for url, docs in in_process.items()
+        }
+
+    def test_reads_tarball(self, snapshot_dir, tmp_path):
+        """Test that a tarball snapshot is extracted and parsed"""
+        archive = tmp_path / "snapshot.tar.gz"
+        with tarfile.open(archive, "w:gz") as tar:
+            tar.add(snapshot_dir, arcname="site")
+
+        sources = read_snapshots(str(archive), workers=1)
+
+        assert "https://www.infinitepay.io/boleto" in sources
+
+    def test_reads_tarball_without_extraction_filters(self, snapshot_dir, tmp_path, monkeypatch):
+        """Test that tarballs are still read on Python versions without tarfile.data_filter"""
+        monkeypatch.delattr(tarfile, "data_filter", raising=False)
+        archive = tmp_path / "snapshot.tar.gz"
+        with tarfile.open(archive, "w:gz") as tar:
+            tar.add(snapshot_dir, arcname="site")
+
+        sources = read_snapshots(str(archive), workers=1)
+
+        assert "https://www.infinitepay.io/boleto" in sources
+
+    def test_unsafe_tarball_rejected_without_extraction_filters(self, snapshot_dir, tmp_path, monkeypatch):
+        """Test that members escaping the extraction directory or links are refused"""
+        monkeypatch.delattr(tarfile, "data_filter", raising=False)
+        escaping = tmp_path / "escaping.tar.gz"
+        with tarfile.open(escaping, "w:gz") as tar:
+            tar.add(snapshot_dir / "pix.html", arcname="../pix.html")
+        linked = tmp_path / "linked.tar"
+        with tarfile.open(linked, "w") as tar:
+            link = tarfile.TarInfo("site/passwd.html")
+            link.type = tarfile.SYMTYPE
+            link.linkname = "/etc/passwd"
+            tar.addfile(link)
+
+        for archive in (escaping, linked):
+            with pytest.raises(ValueError):
+                read_snapshots(str(archive), workers=1)
+
+    def test_invalid_source(self, tmp_path):
+        """Test that a source that is neither a directory nor a tarball is rejected"""
+        source = tmp_path / "page.html"
+        source.write_text(BOLETO_PAGE)
+
+        with pytest.raises(ValueError):
+            read_snapshots(str(source))
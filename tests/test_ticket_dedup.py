@@ -0,0 +1,98 @@
+# tests/test_ticket_dedup.py
+
+from datetime import datetime
+
+import pytest
+
+from utils.ticket_dedup import MAX_RECENT_PER_CUSTOMER, RecentTicketIndex, jaccard, ticket_shingles
+from utils.ticket_store import TicketStore
+
+NOW = datetime(2026, 3, 1, 12, 0, 0).timestamp()
+
+
+def make_ticket(number, subject, description, minutes_ago=5, email="john@example.com", status="open"):
+    """Create a ticket record created some minutes before NOW"""
+    created = datetime.fromtimestamp(NOW - minutes_ago * 60).strftime("%Y-%m-%d %H:%M:%S")
+    return {
+        "ticket_id": f"TK-{number}",
+        "customer_email": email,
+        "subject": subject,
+        "description": description,
+        "priority": "medium",
+        "status": status,
+        "created_at": created,
+    }
+
+
+@pytest.fixture
+def store():
+    """Ticket store with a subscribed recent-ticket index, one hour window"""
+    store = TicketStore()
+    store.recent = RecentTicketIndex(window=3600, threshold=0.6, clock=lambda: NOW)
+    store.subscribe(store.recent.on_ticket_change)
+    store["TK-1"] = make_ticket(1, "Maquininha não liga", "A maquininha não liga depois da atualização")
+    return store
+
+
+class TestTicketShingles:
+
+    def test_normalizes_words(self):
+        """Test that case, accents, stop words and inflections do not change the shingles"""
+        assert ticket_shingles("Maquininha NÃO liga", "") == ticket_shingles("maquininha nao ligando", "")
+
+    def test_unrelated_reports_do_not_overlap(self):
+        """Test that different problems have low similarity"""
+        pix = ticket_shingles("Pix não caiu", "Recebi um pix e não apareceu")
+        boleto = ticket_shingles("Boleto errado", "O boleto saiu com valor errado")
+
+        assert jaccard(pix, boleto) == 0.0
+        assert jaccard(frozenset(), boleto) == 0.0
+
+
+class TestRecentTicketIndex:
+
+    def test_finds_a_rephrased_report(self, store):
+        """Test that the same problem, worded differently, matches the open ticket"""
+        ticket_id, similarity = store.recent.find_duplicate(
+            "john@example.com", "maquininha nao esta ligando", "desde a atualizacao nao liga"
+        )
+
+        assert ticket_id == "TK-1"
+        assert similarity >= 0.6
+
+    def test_different_problem_or_customer(self, store):
+        """Test that other problems and other customers' tickets never match"""
+        assert store.recent.find_duplicate("john@example.com", "Pix não caiu", "Recebi um pix e não apareceu") is None
+        assert store.recent.find_duplicate("maria@business.com", "Maquininha não liga", "A maquininha não liga") is None
+
+    def test_window_and_status(self, store):
+        """Test that old, resolved and deleted tickets no longer absorb new reports"""
+        store["TK-2"] = make_ticket(2, "Pix não caiu", "Pix não apareceu", minutes_ago=90)
+        assert store.recent.find_duplicate("john@example.com", "Pix não caiu", "Pix não apareceu") is None
+
+        store.update_ticket("TK-1", status="resolved")
+        assert store.recent.find_duplicate("john@example.com", "Maquininha não liga", "A maquininha não liga") is None
+
+        store["TK-3"] = make_ticket(3, "Boleto errado", "O boleto saiu com valor errado")
+        del store["TK-3"]
+        assert store.recent.find_duplicate("john@example.com", "Boleto errado", "O boleto saiu errado") is None
+
+    def test_numbers_keep_reports_apart(self, store):
+        """Test that reports differing only in an order number are not merged"""
+        store["TK-4"] = make_ticket(4, "Refund for order 1234", "Refund not received")
+
+        assert store.recent.find_duplicate("john@example.com", "Refund for order 5678", "Refund not received") is None
+        assert store.recent.find_duplicate("john@example.com", "Refund for order 1234", "Still no refund")[0] == "TK-4"
+
+    def test_expired_tickets_are_forgotten(self):
+        """Test that tickets aging out of the window or past the per-customer cap leave no trace"""
+        now = [NOW]
+        index = RecentTicketIndex(window=3600, threshold=0.6, clock=lambda: now[0])
+        for number in range(MAX_RECENT_PER_CUSTOMER + 1):
+            index.add(f"TK-{number}", make_ticket(number, f"Issue {number}", "Maquininha não liga"))
+        assert len(index._customer_of) == MAX_RECENT_PER_CUSTOMER
+
+        now[0] += 2 * 3600
+        assert index.find_duplicate("john@example.com", "Maquininha não liga", "A maquininha não liga") is None
+        assert index._customer_of == {}
+        assert index._recent == {}
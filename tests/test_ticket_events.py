@@ -0,0 +1,196 @@
+# tests/test_ticket_events.py
+
+import os
+import threading
+
+import pytest
+
+from utils.ticket_events import TicketEvent, TicketEventLog, apply_event
+from utils.ticket_store import TicketStore
+
+
+def make_ticket(number, status="open"):
+    """Create a ticket record"""
+    return {
+        "ticket_id": f"TK-{number}",
+        "customer_email": "john@example.com",
+        "subject": f"Issue {number}",
+        "description": "Maquininha não liga",
+        "priority": "medium",
+        "status": status,
+        "created_at": f"2026-03-01 12:00:{number % 60:02d}",
+        "updated_at": f"2026-03-01 12:00:{number % 60:02d}",
+        "assigned_to": "support_team",
+    }
+
+
+@pytest.fixture
+def log_dir(tmp_path):
+    """Directory of a durable event log"""
+    return str(tmp_path / "ticket_events")
+
+
+def open_log(log_dir, **kwargs):
+    """Open a durable event log over an empty store and recover it"""
+    log = TicketEventLog(TicketStore(), path=log_dir, **kwargs)
+    log.recover()
+    return log
+
+
+class TestTicketEventLog:
+
+    def test_commands_update_store(self):
+        """Test that every command is applied to the store"""
+        log = TicketEventLog(TicketStore(), path=None)
+        log.create(make_ticket(1000))
+        log.change_status("TK-1000", "in_progress")
+        log.reassign("TK-1000", "payments_team")
+
+        ticket = log.store["TK-1000"]
+        assert ticket["status"] == "in_progress"
+        assert ticket["assigned_to"] == "payments_team"
+        assert log.seq == 3
+
+    def test_history_records_previous_values(self):
+        """Test that a ticket's history lists its events with the replaced values"""
+        log = TicketEventLog(TicketStore(), path=None)
+        log.create(make_ticket(1000))
+        log.create(make_ticket(1001))
+        log.change_status("TK-1000", "resolved")
+
+        history = log.history("TK-1000")
+        assert [event.type for event in history] == ["created", "status_changed"]
+        assert history[1].data == {"status": "resolved", "previous": "open"}
+        assert [event.seq for event in history] == [1, 3]
+
+    def test_invalid_commands(self):
+        """Test that unknown tickets, statuses and empty assignees are rejected without an event"""
+        log = TicketEventLog(TicketStore(), path=None)
+        log.create(make_ticket(1000))
+
+        with pytest.raises(KeyError):
+            log.change_status("TK-9999", "resolved")
+        with pytest.raises(ValueError):
+            log.change_status("TK-1000", "done")
+        with pytest.raises(ValueError):
+            log.reassign("TK-1000", " ")
+        assert log.seq == 1
+
+    def test_unchanged_values_record_nothing(self):
+        """Test that setting the current status or assignee records no event"""
+        log = TicketEventLog(TicketStore(), path=None)
+        log.create(make_ticket(1000))
+
+        assert log.change_status("TK-1000", "open") is None
+        assert log.reassign("TK-1000", " support_team ") is None
+        assert log.seq == 1
+        assert log.change_status("TK-1000", "closed").data == {"status": "closed", "previous": "open"}
+
+    def test_unknown_event_type(self):
+        """Test that applying an unknown event fails"""
+        with pytest.raises(ValueError):
+            apply_event(TicketStore(), TicketEvent(seq=1, type="merged", ticket_id="TK-1000", at=""))
+
+    def test_recover_replays_log(self, log_dir):
+        """Test that a new process rebuilds the tickets from the log"""
+        log = open_log(log_dir)
+        log.create(make_ticket(1000))
+        log.create(make_ticket(1001))
+        log.change_status("TK-1001", "closed")
+        log.close()
+
+        recovered = open_log(log_dir)
+        assert recovered.seq == 3
+        assert set(recovered.store) == {"TK-1000", "TK-1001"}
+        assert recovered.store["TK-1001"]["status"] == "closed"
+        assert recovered.store.query(status="closed")[0][0]["ticket_id"] == "TK-1001"
+
+    def test_snapshot_bounds_replay(self, log_dir):
+        """Test that recovery replays only the events after the last snapshot"""
+        log = open_log(log_dir, snapshot_every=3)
+        for number in range(1000, 1004):
+            log.create(make_ticket(number))
+        log.change_status("TK-1000", "resolved")
+        log.close()
+
+        assert os.path.exists(os.path.join(log_dir, "snapshot.json"))
+        recovered = TicketEventLog(TicketStore(), path=log_dir, snapshot_every=3)
+        assert recovered.recover() == 2
+        assert len(recovered.store) == 4
+        assert recovered.store["TK-1000"]["status"] == "resolved"
+
+        recovered.change_status("TK-1001", "closed")
+        assert recovered.seq == 6
+        assert len(os.listdir(log_dir)) == 3
+
+    def test_history_survives_snapshots(self, log_dir):
+        """Test that covered segments are kept as history unless compaction is on"""
+        log = open_log(log_dir, snapshot_every=2)
+        log.create(make_ticket(1000))
+        log.change_status("TK-1000", "in_progress")
+        log.change_status("TK-1000", "resolved")
+        assert [event.seq for event in log.history("TK-1000")] == [1, 2, 3]
+
+    def test_compaction_deletes_covered_segments(self, log_dir):
+        """Test that compaction removes segments covered by a snapshot without losing state"""
+        log = open_log(log_dir, snapshot_every=2, compact=True)
+        log.create(make_ticket(1000))
+        log.create(make_ticket(1001))
+        log.change_status("TK-1000", "resolved")
+        log.close()
+
+        assert sorted(os.listdir(log_dir)) == ["events-000000000003.jsonl", "snapshot.json"]
+        recovered = open_log(log_dir)
+        assert recovered.store["TK-1000"]["status"] == "resolved"
+        assert [event.seq for event in recovered.history("TK-1000")] == [3]
+
+    def test_torn_event_is_truncated(self, log_dir):
+        """Test that a half-written last event is dropped and later appends stay readable"""
+        log = open_log(log_dir)
+        log.create(make_ticket(1000))
+        log.create(make_ticket(1001))
+        log.close()
+        segment = os.path.join(log_dir, "events-000000000001.jsonl")
+        with open(segment, "a", encoding="utf-8") as f:
+            f.write('{"seq": 3, "type": "status_ch')
+
+        recovered = open_log(log_dir)
+        assert recovered.seq == 2
+        recovered.change_status("TK-1000", "closed")
+        recovered.close()
+
+        assert open_log(log_dir).store["TK-1000"]["status"] == "closed"
+
+    def test_read_only_recovery_leaves_log_untouched(self, log_dir):
+        """Test that recovering without repair skips a torn event but does not truncate it"""
+        log = open_log(log_dir)
+        log.create(make_ticket(1000))
+        log.close()
+        segment = os.path.join(log_dir, "events-000000000001.jsonl")
+        with open(segment, "a", encoding="utf-8") as f:
+            f.write('{"seq": 2, "ty')
+        size = os.path.getsize(segment)
+
+        reader = TicketEventLog(TicketStore(), path=log_dir)
+        reader.recover(repair=False)
+        assert set(reader.store) == {"TK-1000"}
+        assert os.path.getsize(segment) == size
+
+    def test_concurrent_writers(self, log_dir):
+        """Test that concurrent writers get unique, gap-free sequence numbers"""
+        log = open_log(log_dir, snapshot_every=50)
+
+        def write(worker):
+            for i in range(25):
+                log.create(make_ticket(worker * 100 + i))
+
+        threads = [threading.Thread(target=write, args=(worker,)) for worker in range(1, 5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        log.close()
+
+        recovered = open_log(log_dir)
+        assert recovered.seq == 100
+        assert len(recovered.store) == 100
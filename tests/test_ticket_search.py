@@ -0,0 +1,66 @@
+# tests/test_ticket_search.py
+
+import pytest
+
+from utils.ticket_search import TicketSearchIndex
+from utils.ticket_store import TicketStore
+
+
+def make_ticket(number, subject, description, status="open", email="john@example.com"):
+    """Create a ticket record"""
+    return {
+        "ticket_id": f"TK-{number}",
+        "customer_email": email,
+        "subject": subject,
+        "description": description,
+        "priority": "medium",
+        "status": status,
+        "created_at": f"2026-01-01 10:{number:02d}:00",
+    }
+
+
+@pytest.fixture
+def store():
+    """Ticket store with a subscribed search index"""
+    store = TicketStore()
+    store.index = TicketSearchIndex()
+    store.subscribe(store.index.on_ticket_change)
+    store["TK-1"] = make_ticket(1, "Maquininha não liga", "A maquininha não liga depois da atualização")
+    store["TK-2"] = make_ticket(2, "Pix não caiu", "Recebi um Pix e o valor não apareceu", email="maria@business.com")
+    store["TK-3"] = make_ticket(3, "Erro no boleto", "Cliente diz que a maquininha imprimiu o boleto errado", status="resolved")
+    return store
+
+
+class TestTicketSearchIndex:
+
+    def test_ranks_by_relevance(self, store):
+        """Test that subject matches rank above description matches, with accents and inflections folded"""
+        hits = store.index.search("maquininhas ligando")
+
+        assert [hit["ticket_id"] for hit in hits][:2] == ["TK-1", "TK-3"]
+        assert hits[0]["score"] > hits[1]["score"]
+
+    def test_new_and_changed_tickets_are_searchable_immediately(self, store):
+        """Test that the index follows saves, updates and deletions in the store"""
+        store["TK-4"] = make_ticket(4, "Tap to Pay travando", "O app trava ao cobrar por aproximação")
+        assert [hit["ticket_id"] for hit in store.index.search("aproximação")] == ["TK-4"]
+
+        store.update_ticket("TK-1", status="resolved")
+        assert [hit["ticket_id"] for hit in store.index.search("maquininha", status="resolved")] == ["TK-1", "TK-3"]
+
+        del store["TK-4"]
+        store.clear()
+        assert store.index.search("maquininha") == []
+        assert len(store.index) == 0
+
+    def test_filters(self, store):
+        """Test exact filters on customer email and status"""
+        assert [hit["ticket_id"] for hit in store.index.search("pix", customer_email="MARIA@business.com")] == ["TK-2"]
+        assert store.index.search("pix", customer_email="john@example.com") == []
+        with pytest.raises(ValueError, match="Cannot filter"):
+            store.index.search("pix", subject="Pix")
+
+    def test_blank_and_malformed_queries(self, store):
+        """Test that blank queries return nothing and syntax errors are tolerated"""
+        assert store.index.search("   ") == []
+        assert [hit["ticket_id"] for hit in store.index.search('boleto "errado')][:1] == ["TK-3"]
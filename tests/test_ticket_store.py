@@ -0,0 +1,123 @@
+# tests/test_ticket_store.py
+
+import pytest
+
+from utils.ticket_store import MAX_PAGE_SIZE, TicketStore
+
+
+def make_ticket(number, email="john@example.com", status="open", priority="medium", minute=None):
+    """Create a ticket record created at the given minute"""
+    minute = number if minute is None else minute
+    return {
+        "ticket_id": f"TK-{number}",
+        "customer_email": email,
+        "subject": f"Issue {number}",
+        "description": "Something happened",
+        "priority": priority,
+        "status": status,
+        "created_at": f"2026-01-01 10:{minute:02d}:00",
+        "updated_at": f"2026-01-01 10:{minute:02d}:00",
+        "assigned_to": "support_team",
+    }
+
+
+def ids(tickets):
+    return [ticket["ticket_id"] for ticket in tickets]
+
+
+@pytest.fixture
+def store():
+    """Store with tickets for two customers"""
+    store = TicketStore()
+    store["TK-1"] = make_ticket(1, priority="urgent")
+    store["TK-2"] = make_ticket(2, email="maria@business.com", priority="urgent")
+    store["TK-3"] = make_ticket(3, status="resolved", priority="urgent")
+    store["TK-4"] = make_ticket(4, email="maria@business.com")
+    store["TK-5"] = make_ticket(5, priority="urgent")
+    return store
+
+
+class TestTicketStoreMapping:
+
+    def test_behaves_like_the_dict_it_replaces(self, store):
+        """Test item access, membership, length, deletion and clearing"""
+        assert "TK-1" in store
+        assert store["TK-1"]["subject"] == "Issue 1"
+        assert len(store) == 5
+
+        del store["TK-1"]
+        assert "TK-1" not in store
+        assert ids(store.query(limit=10)[0]) == ["TK-5", "TK-4", "TK-3", "TK-2"]
+
+        store.clear()
+        assert len(store) == 0
+        assert store.query()[0] == []
+
+    def test_returned_records_are_copies(self, store):
+        """Test that mutating a returned record cannot desynchronise the indexes"""
+        store["TK-1"]["status"] = "closed"
+
+        assert store["TK-1"]["status"] == "open"
+
+    def test_update_ticket_reindexes(self, store):
+        """Test that a status change moves the ticket between index entries"""
+        updated = store.update_ticket("TK-1", status="resolved")
+
+        assert updated["updated_at"] != "2026-01-01 10:01:00"
+        assert ids(store.query(status="resolved")[0]) == ["TK-3", "TK-1"]
+        assert "TK-1" not in ids(store.query(status="open")[0])
+
+
+class TestTicketStoreQuery:
+
+    def test_filters_are_combined(self, store):
+        """Test email, status and priority filters, newest first"""
+        assert ids(store.query(customer_email="JOHN@example.com")[0]) == ["TK-5", "TK-3", "TK-1"]
+        assert ids(store.query(status="open", priority="urgent")[0]) == ["TK-5", "TK-2", "TK-1"]
+        assert ids(store.query(customer_email="maria@business.com", priority="urgent")[0]) == ["TK-2"]
+        assert store.query(status="escalated")[0] == []
+
+    def test_created_range(self, store):
+        """Test the created_after (inclusive) and created_before (exclusive) bounds"""
+        tickets, _ = store.query(created_after="2026-01-01T10:02:00", created_before="2026-01-01 10:05:00")
+
+        assert ids(tickets) == ["TK-4", "TK-3", "TK-2"]
+
+    def test_keyset_pagination_is_stable(self, store):
+        """Test that cursors walk every ticket once, even when tickets are added in between"""
+        first, cursor = store.query(priority="urgent", limit=2)
+        store["TK-6"] = make_ticket(6, priority="urgent")
+        second, last_cursor = store.query(priority="urgent", limit=2, cursor=cursor)
+
+        assert ids(first) == ["TK-5", "TK-3"]
+        assert ids(second) == ["TK-2", "TK-1"]
+        assert last_cursor is None
+
+    def test_last_page_has_no_cursor(self, store):
+        """Test that the final page reports no next cursor"""
+        tickets, cursor = store.query(customer_email="maria@business.com", limit=5)
+
+        assert ids(tickets) == ["TK-4", "TK-2"]
+        assert cursor is None
+
+    def test_same_timestamp_tickets_are_not_skipped(self):
+        """Test that the ticket ID breaks ties between tickets created in the same second"""
+        store = TicketStore()
+        for number in range(1, 6):
+            store[f"TK-{number}"] = make_ticket(number, minute=0)
+
+        seen, cursor = [], None
+        while True:
+            page, cursor = store.query(limit=2, cursor=cursor)
+            seen += ids(page)
+            if cursor is None:
+                break
+
+        assert sorted(seen) == ["TK-1", "TK-2", "TK-3", "TK-4", "TK-5"]
+        assert len(seen) == 5
+
+    @pytest.mark.parametrize("kwargs", [{"limit": 0}, {"limit": MAX_PAGE_SIZE + 1}, {"cursor": "not-a-cursor"}])
+    def test_invalid_arguments(self, store, kwargs):
+        """Test that bad limits and cursors are rejected"""
+        with pytest.raises(ValueError):
+            store.query(**kwargs)
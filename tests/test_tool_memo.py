@@ -0,0 +1,111 @@
+# tests/test_tool_memo.py
+
+import inspect
+from unittest.mock import Mock
+
+from utils.tool_memo import idempotent_per_run, memoize_per_run, tool_run_scope
+
+
+def make_lookup():
+    """Create a memoized lookup tool backed by a mock"""
+    backend = Mock(side_effect=lambda email: {"success": True, "customer_found": True, "email": email})
+
+    @memoize_per_run(normalize=lambda parameters: {"email": parameters["email"].lower()})
+    def lookup(email: str) -> dict:
+        """Look up a customer."""
+        return backend(email)
+
+    return lookup, backend
+
+
+def make_create():
+    """Create an idempotent write tool backed by a mock"""
+    backend = Mock(side_effect=[{"success": True, "ticket_id": "TK-1000"}, {"success": True, "ticket_id": "TK-1001"}])
+
+    @idempotent_per_run()
+    def create(subject: str, priority: str = "medium") -> dict:
+        """Create a ticket."""
+        return backend(subject, priority)
+
+    return create, backend
+
+
+class TestMemoizePerRun:
+
+    def test_repeated_calls_in_a_run_are_memoized(self):
+        """Test that the same normalized call executes once per run and the hit is recorded"""
+        lookup, backend = make_lookup()
+
+        with tool_run_scope() as run:
+            first = lookup("john@example.com")
+            second = lookup(email="JOHN@example.com")
+
+        assert first == second
+        assert backend.call_count == 1
+        assert run.hits == [{"tool": "lookup", "parameters": {"email": "john@example.com"}, "cache": "memoized"}]
+
+    def test_runs_do_not_share_results(self):
+        """Test that memoization is scoped to one run, and absent outside runs"""
+        lookup, backend = make_lookup()
+
+        with tool_run_scope():
+            lookup("john@example.com")
+        with tool_run_scope():
+            lookup("john@example.com")
+        lookup("john@example.com")
+        lookup("john@example.com")
+
+        assert backend.call_count == 4
+
+    def test_failures_are_not_memoized(self):
+        """Test that a failed call is executed again"""
+        backend = Mock(return_value={"success": False})
+
+        @memoize_per_run()
+        def lookup(email: str) -> dict:
+            return backend(email)
+
+        with tool_run_scope() as run:
+            lookup("john@example.com")
+            lookup("john@example.com")
+
+        assert backend.call_count == 2
+        assert run.hits == []
+
+    def test_keeps_the_tool_signature(self):
+        """Test that agno still sees the tool's name, parameters and docstring"""
+        lookup, _ = make_lookup()
+
+        assert lookup.__name__ == "lookup"
+        assert lookup.__doc__ == "Look up a customer."
+        assert list(inspect.signature(lookup).parameters) == ["email"]
+
+
+class TestIdempotentPerRun:
+
+    def test_repeated_write_is_replayed(self):
+        """Test that a retried write returns the first result instead of writing twice"""
+        create, backend = make_create()
+
+        with tool_run_scope() as run:
+            first = create("Pix failed")
+            second = create("Pix failed", priority="medium")
+            other = create("Boleto failed")
+
+        assert first == {"success": True, "ticket_id": "TK-1000"}
+        assert second == {"success": True, "ticket_id": "TK-1000", "idempotent_replay": True}
+        assert other["ticket_id"] == "TK-1001"
+        assert backend.call_count == 2
+        assert run.hits[0]["cache"] == "idempotent_replay"
+
+    def test_write_invalidates_memoized_reads(self):
+        """Test that reads after a write in the same run execute again"""
+        lookup, lookup_backend = make_lookup()
+        create, _ = make_create()
+
+        with tool_run_scope():
+            lookup("john@example.com")
+            create("Pix failed")
+            lookup("john@example.com")
+
+        assert lookup_backend.call_count == 2
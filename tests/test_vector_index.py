@@ -0,0 +1,140 @@
+# tests/test_vector_index.py
+
+from unittest.mock import Mock
+
+import chromadb
+import numpy as np
+import pytest
+
+from utils.embedders import HashingEmbedder
+from utils.vector_index import MemmapVectorIndex, top_k_indices
+
+TEXTS = ["Pix parcelado sem juros", "Boleto com baixa automática", "Maquininha com taxa zero", "Conta digital PJ"]
+
+
+def build_index(path, embedder, dtype="float32"):
+    """Build an index of TEXTS embedded with ``embedder``"""
+    index = MemmapVectorIndex(str(path), embedder=embedder, dtype=dtype)
+    index.build(
+        ids=[f"id-{i}" for i in range(len(TEXTS))],
+        embeddings=[embedder.get_embedding(text) for text in TEXTS],
+        contents=TEXTS,
+        meta_data=[{"url": f"https://site/{i}"} for i in range(len(TEXTS))],
+        embedder_id=embedder.id,
+    )
+    return index
+
+
+class TestMemmapVectorIndex:
+
+    def test_search_returns_most_similar_first(self, tmp_path):
+        """Test that a query finds its chunk with metadata and a cosine score"""
+        index = build_index(tmp_path, HashingEmbedder(dimensions=256))
+
+        results = index.search("boleto automático", limit=2)
+
+        assert [d.id for d in results][0] == "id-1"
+        assert results[0].content == TEXTS[1]
+        assert results[0].meta_data == {"url": "https://site/1"}
+        assert results[0].reranking_score >= results[1].reranking_score
+        assert len(index) == 4
+
+    @pytest.mark.parametrize("dtype", ["float32", "float16"])
+    def test_matrix_is_memory_mapped(self, tmp_path, dtype):
+        """Test that vectors are stored normalized in the requested dtype and mapped read-only"""
+        index = build_index(tmp_path, HashingEmbedder(dimensions=64), dtype=dtype)
+
+        matrix, _ = index._load()
+
+        assert isinstance(matrix, np.memmap)
+        assert matrix.dtype == np.dtype(dtype)
+        assert not matrix.flags.writeable
+        assert np.allclose(np.linalg.norm(matrix.astype(np.float32), axis=1), 1.0, atol=1e-3)
+
+    def test_float16_ranks_like_float32(self, tmp_path):
+        """Test that half precision does not change the ranking"""
+        embedder = HashingEmbedder(dimensions=256)
+        full = build_index(tmp_path / "f32", embedder)
+        half = build_index(tmp_path / "f16", embedder, dtype="float16")
+
+        for text in TEXTS:
+            assert [d.id for d in full.search(text, 4)] == [d.id for d in half.search(text, 4)]
+
+    def test_readers_see_rebuilds(self, tmp_path):
+        """Test that another instance on the same directory picks up a new generation"""
+        embedder = HashingEmbedder(dimensions=64)
+        writer = build_index(tmp_path, embedder)
+        reader = MemmapVectorIndex(str(tmp_path), embedder=embedder)
+        assert len(reader.search("pix", 10)) == 4
+
+        writer.build(["only"], [embedder.get_embedding("pix")], ["pix"], [{}], embedder.id)
+
+        assert [d.id for d in reader.search("pix", 10)] == ["only"]
+
+    def test_rebuild_keeps_replaced_generation(self, tmp_path):
+        """Test that a rebuild keeps the generation it replaces and deletes older ones"""
+        embedder = HashingEmbedder(dimensions=64)
+
+        def generations():
+            return sorted(name.name for name in tmp_path.iterdir() if name.name.startswith("vectors-"))
+
+        index = build_index(tmp_path, embedder)
+        first = generations()
+        index.build(["second"], [embedder.get_embedding("pix")], ["pix"], [{}], embedder.id)
+        second = generations()
+        assert len(second) == 2 and set(first) < set(second)
+
+        index.build(["third"], [embedder.get_embedding("pix")], ["pix"], [{}], embedder.id)
+        third = generations()
+        assert len(third) == 2 and not set(first) & set(third)
+        assert set(second) & set(third)
+
+    def test_rejects_other_embedder(self, tmp_path):
+        """Test that vectors from another embedder are not searched"""
+        build_index(tmp_path, HashingEmbedder(dimensions=64))
+        index = MemmapVectorIndex(str(tmp_path), embedder=HashingEmbedder(dimensions=128))
+
+        with pytest.raises(ValueError, match="built with"):
+            index.search("pix")
+
+    def test_missing_index(self, tmp_path):
+        """Test that searching before any build raises a clear error"""
+        index = MemmapVectorIndex(str(tmp_path / "missing"), embedder=HashingEmbedder())
+
+        assert len(index) == 0
+        with pytest.raises(FileNotFoundError):
+            index.search("pix")
+
+    def test_invalid_dtype(self, tmp_path):
+        """Test that only float32 and float16 are accepted"""
+        with pytest.raises(ValueError):
+            MemmapVectorIndex(str(tmp_path), dtype="int8")
+
+    def test_build_from_chroma(self, tmp_path):
+        """Test copying a Chroma collection without embedding anything"""
+        embedder = HashingEmbedder(dimensions=32)
+        client = chromadb.EphemeralClient()
+        collection = client.create_collection(name="vector-index-test")
+        collection.add(
+            ids=["a", "b"],
+            embeddings=[embedder.get_embedding(TEXTS[0]), embedder.get_embedding(TEXTS[1])],
+            documents=TEXTS[:2],
+            metadatas=[{"url": "https://site/a"}, {"url": "https://site/b"}],
+        )
+        vector_db = Mock()
+        vector_db.client = client
+        vector_db.collection_name = "vector-index-test"
+        vector_db.embedder = embedder
+        index = MemmapVectorIndex(str(tmp_path), embedder=embedder)
+
+        assert index.build_from_chroma(vector_db) == 2
+        assert index.search(TEXTS[0], 1)[0].meta_data == {"url": "https://site/a"}
+        client.delete_collection("vector-index-test")
+
+    def test_top_k_indices(self):
+        """Test top-k selection order and bounds"""
+        scores = np.array([0.1, 0.9, 0.5, 0.7])
+
+        assert top_k_indices(scores, 2).tolist() == [1, 3]
+        assert top_k_indices(scores, 10).tolist() == [1, 3, 2, 0]
+        assert top_k_indices(scores, 0).tolist() == []
@@ -0,0 +1,74 @@
+# tests/test_warmup.py
+
+import asyncio
+from unittest.mock import Mock
+
+from utils.warmup import Readiness, model_clients, warm_up
+
+
+def make_vector_db(chunks=3):
+    """Create a mocked Chroma vector database"""
+    vector_db = Mock()
+    vector_db.collection_name = "knowledge"
+    vector_db.client.get_collection.return_value.count.return_value = chunks
+    return vector_db
+
+
+class TestWarmUp:
+
+    def test_runs_every_step_then_reports_ready(self):
+        """Test that the collection, retrievals and model clients are all touched"""
+        retriever = Mock()
+        retriever.search.return_value = [Mock(), Mock()]
+        client = Mock()
+        model = Mock()
+        model.get_client.return_value = client
+        target = Readiness()
+
+        asyncio.run(warm_up(make_vector_db(), retriever, [model], queries=["pix", "boleto"], target=target))
+
+        assert target.ready
+        assert target.steps["collection"]["chunks"] == 3
+        assert target.steps["retrieval"]["results"] == 4
+        assert target.steps["models"] == {"status": "ok", "clients": 1, "seconds": target.steps["models"]["seconds"]}
+        client.models.list.assert_called_once()
+
+    def test_failed_steps_do_not_block_readiness(self):
+        """Test that an unreachable dependency is reported but the service becomes ready"""
+        vector_db = make_vector_db()
+        vector_db.client.get_collection.side_effect = ValueError("Collection does not exist")
+        client = Mock()
+        client.models.list.side_effect = ConnectionError("unreachable")
+        model = Mock()
+        model.get_client.return_value = client
+        target = Readiness()
+
+        asyncio.run(warm_up(vector_db, None, [model], target=target))
+
+        assert target.ready
+        assert target.steps["collection"]["status"] == "failed"
+        assert target.steps["models"]["errors"] == ["unreachable"]
+
+    def test_in_process_vector_store(self):
+        """Test that stores without a Chroma client are counted with len()"""
+        vector_db = Mock(spec=["__len__"])
+        vector_db.__len__ = Mock(return_value=7)
+        target = Readiness()
+
+        asyncio.run(warm_up(vector_db, target=target))
+
+        assert target.steps["collection"]["chunks"] == 7
+
+    def test_readiness_starts_not_ready(self):
+        """Test the initial readiness state"""
+        assert Readiness().to_dict() == {"status": "starting", "warmup_seconds": None, "steps": {}}
+
+
+class TestModelClients:
+
+    def test_shared_clients_are_warmed_once(self):
+        """Test that models sharing a client open a single connection"""
+        shared = Mock()
+        models = [Mock(get_client=Mock(return_value=shared)), Mock(get_client=Mock(return_value=shared)), None]
+
+        assert model_clients(models) == [shared]
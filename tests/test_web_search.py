@@ -0,0 +1,128 @@
+# tests/test_web_search.py
+
+import json
+import os
+from unittest.mock import Mock
+
+from utils.rate_limit import RateLimiter
+from utils.web_search import CachedTavilyTools, DiskSearchCache, search_key
+
+
+def tavily_response(query):
+    """Create a Tavily search API response"""
+    return {
+        "answer": f"answer to {query}",
+        "results": [{"title": "InfinitePay", "url": "https://www.infinitepay.io", "content": "Pix", "score": 0.9}],
+    }
+
+
+def make_tools(**kwargs):
+    """Create cached Tavily tools over a mocked client"""
+    kwargs.setdefault("rate_limiter", RateLimiter(None))
+    tools = CachedTavilyTools(api_key="tavily-key", **kwargs)
+    tools.client = Mock()
+    tools.client.search.side_effect = lambda query, **_: tavily_response(query)
+    return tools
+
+
+class TestCachedTavilyTools:
+
+    def test_registers_search_tool(self):
+        """Test that the cached search replaces the Tavily tool"""
+        tools = make_tools()
+
+        assert list(tools.functions) == ["web_search_using_tavily"]
+
+    def test_repeated_query_is_served_from_cache(self):
+        """Test that equivalent queries hit Tavily once"""
+        tools = make_tools()
+
+        first = tools.web_search_using_tavily("Taxa do  Pix")
+        second = tools.web_search_using_tavily("taxa do pix")
+
+        assert first == second
+        assert "answer to Taxa do  Pix" in first
+        assert tools.client.search.call_count == 1
+
+    def test_search_parameters_are_part_of_the_key(self):
+        """Test that a different result count is a different search"""
+        tools = make_tools()
+
+        tools.web_search_using_tavily("pix", max_results=5)
+        tools.web_search_using_tavily("pix", max_results=3)
+
+        assert tools.client.search.call_count == 2
+        assert search_key("pix", 5, "advanced", "markdown") != search_key("pix", 3, "advanced", "markdown")
+
+    def test_disk_tier_is_shared_between_instances(self, tmp_path):
+        """Test that results persisted by one instance are reused by another"""
+        writer = make_tools(cache_dir=str(tmp_path))
+        writer.web_search_using_tavily("boleto")
+
+        reader = make_tools(cache_dir=str(tmp_path))
+        result = reader.web_search_using_tavily("boleto")
+
+        assert "answer to boleto" in result
+        reader.client.search.assert_not_called()
+
+    def test_budget_is_per_run(self):
+        """Test that searches beyond the run budget are refused"""
+        tools = make_tools(searches_per_run=1)
+        run_a, run_b = Mock(run_id="run-a"), Mock(run_id="run-b")
+
+        tools.web_search_using_tavily("pix", agent=run_a)
+        refused = tools.web_search_using_tavily("boleto", agent=run_a)
+        tools.web_search_using_tavily("boleto", agent=run_b)
+
+        assert "budget" in refused
+        assert tools.client.search.call_count == 2
+
+    def test_cache_hits_do_not_spend_budget(self):
+        """Test that a cached result is returned after the budget is spent"""
+        tools = make_tools(searches_per_run=1)
+        run = Mock(run_id="run-a")
+
+        first = tools.web_search_using_tavily("pix", agent=run)
+
+        assert tools.web_search_using_tavily("pix", agent=run) == first
+
+    def test_rate_limit_refuses_instead_of_waiting(self):
+        """Test that an empty token bucket refuses the search"""
+        limiter = RateLimiter(1, burst=1, clock=lambda: 0.0)
+        tools = make_tools(rate_limiter=limiter)
+
+        tools.web_search_using_tavily("pix")
+        refused = tools.web_search_using_tavily("boleto")
+
+        assert "rate limit" in refused
+        assert tools.client.search.call_count == 1
+
+    def test_failures_are_reported_and_not_cached(self):
+        """Test that a Tavily error is returned to the model and retried next time"""
+        tools = make_tools()
+        tools.client.search.side_effect = [RuntimeError("timeout"), tavily_response("pix")]
+
+        assert tools.web_search_using_tavily("pix") == "Web search failed: timeout"
+        assert "answer to pix" in tools.web_search_using_tavily("pix")
+
+
+class TestDiskSearchCache:
+
+    def test_expired_entries_are_removed(self, tmp_path):
+        """Test that entries older than the TTL are ignored and deleted"""
+        cache = DiskSearchCache(str(tmp_path), ttl=60)
+        cache.put("key", "pix", "result")
+        path = tmp_path / "key.json"
+        entry = json.loads(path.read_text())
+        entry["created_at"] -= 120
+        path.write_text(json.dumps(entry))
+
+        assert cache.get("key") is None
+        assert not os.path.exists(path)
+
+    def test_unreadable_entry_is_a_miss(self, tmp_path):
+        """Test that a corrupt file does not break searches"""
+        cache = DiskSearchCache(str(tmp_path), ttl=60)
+        (tmp_path / "key.json").write_text("{")
+
+        assert cache.get("key") is None
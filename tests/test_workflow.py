@@ -8,7 +8,7 @@ from textwrap import dedent
 from agno.workflow import RunEvent, RunResponse
 from agno.storage.json import JsonStorage
 
-from agents.workflow import IntelligentQueryResolver
+from agents.workflow import IntelligentQueryResolver, count_llm_turns, knowledge_references
 from utils import PersonalityLayerResponse, FinalResponseOutput
 from agno.storage.json import JsonStorage
 
@@ -17,7 +17,7 @@ class TestIntelligentQueryResolverInit:
     
     @patch.dict('os.environ', {'MISTRAL_API_KEY': 'test-api-key'})
     @patch('agents.workflow.Agent')
-    @patch('agents.workflow.MistralChat')
+    @patch('agents.workflow.ResilientMistralChat')
     def test_init_success(self, mock_mistral_chat, mock_agent):
         """Test successful workflow initialization"""
         mock_agent_instance = Mock()
@@ -31,13 +31,13 @@ class TestIntelligentQueryResolverInit:
         assert workflow.personality_layer == mock_agent_instance
         mock_mistral_chat.assert_called_once_with(
             api_key='test-api-key', 
-            id='mistral-large-latest'
+            id='mistral-small-latest'
         )
         mock_agent.assert_called_once()
     
     @patch.dict('os.environ', {'MISTRAL_API_KEY': 'test-api-key'})
     @patch('agents.workflow.Agent')
-    @patch('agents.workflow.MistralChat')
+    @patch('agents.workflow.ResilientMistralChat')
     def test_init_with_storage(self, mock_mistral_chat, mock_agent):
         """Test workflow initialization with storage"""
         mock_storage = Mock(spec=JsonStorage)
@@ -77,7 +77,7 @@ class TestIntelligentQueryResolverRun:
     @patch.dict('os.environ', {'MISTRAL_API_KEY': 'test-api-key'})
     @patch('agents.workflow.router_agent_team')
     @patch('agents.workflow.Agent')
-    @patch('agents.workflow.MistralChat')
+    @patch('agents.workflow.ResilientMistralChat')
     @patch('agents.workflow.FinalResponseOutput')
     def test_run_success(self, mock_final_response, mock_mistral_chat, 
                         mock_agent, mock_router_team):
@@ -102,7 +102,7 @@ class TestIntelligentQueryResolverRun:
     
     @patch.dict('os.environ', {'MISTRAL_API_KEY': 'test-api-key'})
     @patch('agents.workflow.Agent')
-    @patch('agents.workflow.MistralChat')
+    @patch('agents.workflow.ResilientMistralChat')
     def test_run_empty_query(self, mock_mistral_chat, mock_agent):
         """Test workflow execution with empty query"""
         workflow = IntelligentQueryResolver(storage=JsonStorage("storage/test_workflow.json"))
@@ -114,7 +114,7 @@ class TestIntelligentQueryResolverRun:
     
     @patch.dict('os.environ', {'MISTRAL_API_KEY': 'test-api-key'})
     @patch('agents.workflow.Agent')
-    @patch('agents.workflow.MistralChat')
+    @patch('agents.workflow.ResilientMistralChat')
     def test_run_whitespace_query(self, mock_mistral_chat, mock_agent):
         """Test workflow execution with whitespace-only query"""
         workflow = IntelligentQueryResolver(storage=JsonStorage("storage/test_workflow.json"))
@@ -127,7 +127,7 @@ class TestIntelligentQueryResolverRun:
     @patch.dict('os.environ', {'MISTRAL_API_KEY': 'test-api-key'})
     @patch('agents.workflow.router_agent_team')
     @patch('agents.workflow.Agent')
-    @patch('agents.workflow.MistralChat')
+    @patch('agents.workflow.ResilientMistralChat')
     def test_run_router_team_failure(self, mock_mistral_chat, mock_agent, mock_router_team):
         """Test workflow execution when router team fails"""
         mock_router_team.run.return_value = None
@@ -142,7 +142,7 @@ class TestIntelligentQueryResolverRun:
     @patch.dict('os.environ', {'MISTRAL_API_KEY': 'test-api-key'})
     @patch('agents.workflow.router_agent_team')
     @patch('agents.workflow.Agent')
-    @patch('agents.workflow.MistralChat')
+    @patch('agents.workflow.ResilientMistralChat')
     def test_run_empty_team_response(self, mock_mistral_chat, mock_agent, mock_router_team):
         """Test workflow execution when team response is empty"""
         mock_team_response = Mock()
@@ -159,7 +159,7 @@ class TestIntelligentQueryResolverRun:
     @patch.dict('os.environ', {'MISTRAL_API_KEY': 'test-api-key'})
     @patch('agents.workflow.router_agent_team')
     @patch('agents.workflow.Agent')
-    @patch('agents.workflow.MistralChat')
+    @patch('agents.workflow.ResilientMistralChat')
     def test_run_personality_layer_failure(self, mock_mistral_chat, mock_agent, mock_router_team):
         """Test workflow execution when personality layer fails"""
         mock_agent_instance = Mock()
@@ -177,7 +177,7 @@ class TestIntelligentQueryResolverRun:
     @patch.dict('os.environ', {'MISTRAL_API_KEY': 'test-api-key'})
     @patch('agents.workflow.router_agent_team')
     @patch('agents.workflow.Agent')
-    @patch('agents.workflow.MistralChat')
+    @patch('agents.workflow.ResilientMistralChat')
     def test_run_unexpected_exception(self, mock_mistral_chat, mock_agent, mock_router_team):
         """Test workflow execution with unexpected exception"""
         mock_router_team.run.side_effect = Exception("Unexpected error")
@@ -195,7 +195,7 @@ class TestIntelligentQueryResolverHealthCheck:
     @patch.dict('os.environ', {'MISTRAL_API_KEY': 'test-api-key'})
     @patch('agents.workflow.router_agent_team')
     @patch('agents.workflow.Agent')
-    @patch('agents.workflow.MistralChat')
+    @patch('agents.workflow.ResilientMistralChat')
     def test_health_check_success(self, mock_mistral_chat, mock_agent, mock_router_team):
         """Test successful health check"""
         workflow = IntelligentQueryResolver(storage=JsonStorage("storage/test_workflow.json"))
@@ -206,7 +206,7 @@ class TestIntelligentQueryResolverHealthCheck:
     @patch.dict('os.environ', {'MISTRAL_API_KEY': 'test-api-key'})
     @patch('agents.workflow.router_agent_team', None)
     @patch('agents.workflow.Agent')
-    @patch('agents.workflow.MistralChat')
+    @patch('agents.workflow.ResilientMistralChat')
     def test_health_check_router_team_unavailable(self, mock_mistral_chat, mock_agent):
         """Test health check when router team is unavailable"""
         workflow = IntelligentQueryResolver(storage=JsonStorage("storage/test_workflow.json"))
@@ -216,7 +216,7 @@ class TestIntelligentQueryResolverHealthCheck:
     
     @patch.dict('os.environ', {'MISTRAL_API_KEY': 'test-api-key'})
     @patch('agents.workflow.Agent')
-    @patch('agents.workflow.MistralChat')
+    @patch('agents.workflow.ResilientMistralChat')
     def test_health_check_personality_layer_missing(self, mock_mistral_chat, mock_agent):
         """Test health check when personality layer is missing"""
         workflow = IntelligentQueryResolver(storage=JsonStorage("storage/test_workflow.json"))
@@ -228,7 +228,7 @@ class TestIntelligentQueryResolverHealthCheck:
     @patch.dict('os.environ', {'MISTRAL_API_KEY': 'test-api-key'})
     @patch('agents.workflow.router_agent_team')
     @patch('agents.workflow.Agent')
-    @patch('agents.workflow.MistralChat')
+    @patch('agents.workflow.ResilientMistralChat')
     def test_health_check_exception(self, mock_mistral_chat, mock_agent, mock_router_team):
         """Test health check with exception"""
         workflow = IntelligentQueryResolver(storage=JsonStorage("storage/test_workflow.json"))
@@ -244,7 +244,7 @@ class TestWorkflowConfiguration:
     
     @patch.dict('os.environ', {'MISTRAL_API_KEY': 'test-api-key'})
     @patch('agents.workflow.Agent')
-    @patch('agents.workflow.MistralChat')
+    @patch('agents.workflow.ResilientMistralChat')
     def test_workflow_description(self, mock_mistral_chat, mock_agent):
         """Test workflow description is set correctly"""
         workflow = IntelligentQueryResolver(storage=JsonStorage("storage/test_workflow.json"))
@@ -253,9 +253,9 @@ class TestWorkflowConfiguration:
         assert "This workflow resolves customer queries" in workflow.description
         assert "Query routing to specialized agents" in workflow.description
     
-    @patch.dict('os.environ', {'MISTRAL_API_KEY': 'test-api-key', 'LLM_MODEL': 'custom-model'})
+    @patch.dict('os.environ', {'MISTRAL_API_KEY': 'test-api-key', 'PERSONALITY_LLM_MODEL': 'custom-model'})
     @patch('agents.workflow.Agent')
-    @patch('agents.workflow.MistralChat')
+    @patch('agents.workflow.ResilientMistralChat')
     def test_custom_llm_model(self, mock_mistral_chat, mock_agent):
         """Test workflow with custom LLM model"""
         workflow = IntelligentQueryResolver(storage=JsonStorage("storage/test_workflow.json"))
@@ -267,7 +267,7 @@ class TestWorkflowConfiguration:
     
     @patch.dict('os.environ', {'MISTRAL_API_KEY': 'test-api-key'})
     @patch('agents.workflow.Agent')
-    @patch('agents.workflow.MistralChat')
+    @patch('agents.workflow.ResilientMistralChat')
     def test_personality_layer_configuration(self, mock_mistral_chat, mock_agent):
         """Test personality layer configuration"""
         workflow = IntelligentQueryResolver(storage=JsonStorage("storage/test_workflow.json"))
@@ -285,7 +285,7 @@ class TestResponseProcessing:
     @patch.dict('os.environ', {'MISTRAL_API_KEY': 'test-api-key'})
     @patch('agents.workflow.router_agent_team')
     @patch('agents.workflow.Agent')
-    @patch('agents.workflow.MistralChat')
+    @patch('agents.workflow.ResilientMistralChat')
     @patch('agents.workflow.FinalResponseOutput')
     def test_response_swapping(self, mock_final_response, mock_mistral_chat, 
                               mock_agent, mock_router_team):
@@ -317,7 +317,7 @@ class TestResponseProcessing:
     @patch.dict('os.environ', {'MISTRAL_API_KEY': 'test-api-key'})
     @patch('agents.workflow.router_agent_team')
     @patch('agents.workflow.Agent')
-    @patch('agents.workflow.MistralChat')
+    @patch('agents.workflow.ResilientMistralChat')
     def test_empty_original_response(self, mock_mistral_chat, mock_agent, mock_router_team):
         """Test handling of empty original response"""
         mock_team_response = Mock()
@@ -334,3 +334,101 @@ class TestResponseProcessing:
         assert result.content is None
         assert result.event == RunEvent.workflow_failed
         assert "Workflow error" in result.messages[0]
+
+
+class TestCountLlmTurns:
+
+    def test_counts_assistant_messages_per_member(self):
+        """Test that leader and member generations are counted separately"""
+        def message(role, from_history=False):
+            return Mock(role=role, from_history=from_history)
+
+        member = Mock(agent_name="KnowledgeBase Agent", member_responses=None)
+        member.messages = [message("system"), message("user"), message("assistant"), message("tool"), message("assistant")]
+        team = Mock(agent_name=None, team_name="Router", member_responses=[member])
+        team.messages = [message("user"), message("assistant"), message("assistant", from_history=True)]
+
+        assert count_llm_turns(team) == {"Router": 1, "KnowledgeBase Agent": 2}
+
+    def test_ignores_responses_without_messages(self):
+        """Test that mocked or empty responses count no turns"""
+        assert count_llm_turns(Mock()) == {}
+
+
+class TestKnowledgeReferences:
+
+    def test_reports_sources_of_injected_context(self):
+        """Test that a member's references are summarised by source URL"""
+        from agno.models.message import MessageReferences
+        from agno.run.response import RunResponseExtraData
+
+        references = MessageReferences(
+            query="taxa do pix",
+            references=[
+                {"content": "x" * 40, "meta_data": {"url": "https://a"}},
+                {"content": "x" * 8, "meta_data": {"url": "https://a"}},
+                {"content": "x" * 4, "meta_data": {"url": "https://b", "shared": True}},
+            ],
+            time=0.25,
+        )
+        member = Mock(extra_data=RunResponseExtraData(references=[references]), member_responses=None)
+        team = Mock(extra_data=None, member_responses=[member])
+
+        assert knowledge_references(team) == {
+            "query": "taxa do pix",
+            "seconds": 0.25,
+            "sources": [{"url": "https://a", "tokens": 12}, {"url": "https://b", "tokens": 1, "shared": True}],
+        }
+
+    def test_no_references(self):
+        """Test that runs without injected context report nothing"""
+        assert knowledge_references(Mock(extra_data=None, member_responses=[])) is None
+
+
+class TestTicketStatusFastPath:
+
+    @patch.dict('os.environ', {'MISTRAL_API_KEY': 'test-api-key'})
+    @patch('agents.workflow.check_ticket_status')
+    @patch('agents.workflow.Agent')
+    @patch('agents.workflow.ResilientMistralChat')
+    def test_status_question_skips_the_agents(self, mock_mistral_chat, mock_agent, mock_check):
+        """Test that a plain status question is answered from the ticket lookup alone"""
+        mock_check.return_value = {
+            "success": True,
+            "ticket_found": True,
+            "ticket_id": "TK-1004",
+            "status": "open",
+            "priority": "medium",
+            "subject": "Pix não caiu",
+            "assigned_to": "Support Team",
+            "updated_at": "2026-01-02T10:00:00",
+        }
+        workflow = IntelligentQueryResolver(storage=JsonStorage("storage/test_workflow.json"))
+
+        response = workflow._ticket_status_fast_path("What's the status of TK-1004?")
+
+        assert isinstance(response, FinalResponseOutput)
+        assert response.response.startswith('Ticket TK-1004 ("Pix não caiu") is open')
+        assert response.agent_workflow.tool_calls == {"check_ticket_status": [{"parameters": {"ticket_id": "TK-1004"}}]}
+        mock_check.assert_called_once_with("TK-1004")
+
+    @patch.dict('os.environ', {'MISTRAL_API_KEY': 'test-api-key'})
+    @patch('agents.workflow.check_ticket_status')
+    @patch('agents.workflow.Agent')
+    @patch('agents.workflow.ResilientMistralChat')
+    def test_ambiguous_query_falls_back(self, mock_mistral_chat, mock_agent, mock_check):
+        """Test that a query with another intent is left to the router"""
+        workflow = IntelligentQueryResolver(storage=JsonStorage("storage/test_workflow.json"))
+
+        assert workflow._ticket_status_fast_path("Please cancel TK-1004") is None
+        mock_check.assert_not_called()
+
+    @patch.dict('os.environ', {'MISTRAL_API_KEY': 'test-api-key'})
+    @patch('agents.workflow.check_ticket_status', return_value={"success": False, "error": "boom"})
+    @patch('agents.workflow.Agent')
+    @patch('agents.workflow.ResilientMistralChat')
+    def test_failed_lookup_falls_back(self, mock_mistral_chat, mock_agent, mock_check):
+        """Test that a failed lookup is left to the support agent"""
+        workflow = IntelligentQueryResolver(storage=JsonStorage("storage/test_workflow.json"))
+
+        assert workflow._ticket_status_fast_path("status TK-1004") is None
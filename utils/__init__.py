@@ -1,11 +1,35 @@
-from .instructions import personality_agent_instructions, knowledge_agent_instructions, router_agent_instructions, customer_support_agent_instructions
-from .models import PersonalityLayerResponse, FinalResponseOutput, AgentWorkflow, AgentResponseOutput, QueryRequest, ErrorResponse
+from .instructions import personality_agent_instructions, knowledge_agent_instructions, knowledge_agent_context_instructions, router_agent_instructions, customer_support_agent_instructions
+from .models import PersonalityLayerResponse, FinalResponseOutput, AgentWorkflow, AgentResponseOutput, QueryRequest, TicketUpdate, ErrorResponse
 from .logger import get_logger
+from .metrics import metrics, MetricsRegistry
+from .model_config import get_stage_model, get_stage_models, MODEL_TIER_PROFILES
+from .cache import LRUCache
+from .embedding_cache import CachedEmbedder, DiskEmbeddingStore, batch_embed
+from .embedders import HashingEmbedder, OnnxEmbedder, create_embedder
+from .rate_limit import RateLimiter
+from .dedup import BoilerplateDeduplicator
+from .crawler import AsyncCrawler, CrawlingWebsiteReader, CrawlStats
+from .lexical_index import LexicalIndex
+from .vector_index import MemmapVectorIndex
+from .context import ContextCompressor, context_sources
+from .web_search import CachedTavilyTools
+from .ticket_store import TicketStore
+from .ticket_search import TicketSearchIndex
+from .ticket_dedup import RecentTicketIndex
+from .ticket_events import TicketEvent, TicketEventLog
+from .export import export_stream, iter_tickets, iter_workflow_runs
+from .tool_memo import ToolRunCache, tool_run_scope, memoize_per_run, idempotent_per_run
+from .customer_directory import CustomerDirectory, InMemoryCustomerDirectory, SQLiteCustomerDirectory, CachedCustomerDirectory, create_customer_directory
+from .retrieval import HybridRetriever, reciprocal_rank_fusion
+from .ingestion import EmbeddingPipeline, IngestionReport, load_knowledge_base
+from .index_snapshot import SnapshotError, export_snapshot, import_snapshot, restore_index_snapshot
+from .resilience import CircuitBreaker, CircuitOpenError, ResilientMistralChat, get_circuit_breaker, circuit_breaker_states
 
 
 __all__ = [
     "personality_agent_instructions",
     "knowledge_agent_instructions",
+    "knowledge_agent_context_instructions",
     "router_agent_instructions",
     "customer_support_agent_instructions",
     "PersonalityLayerResponse",
@@ -13,6 +37,60 @@ __all__ = [
     "AgentWorkflow",
     "AgentResponseOutput",
     "QueryRequest",
+    "TicketUpdate",
     "ErrorResponse",
     "get_logger",
+    "metrics",
+    "MetricsRegistry",
+    "CircuitBreaker",
+    "CircuitOpenError",
+    "ResilientMistralChat",
+    "get_circuit_breaker",
+    "circuit_breaker_states",
+    "get_stage_model",
+    "get_stage_models",
+    "MODEL_TIER_PROFILES",
+    "LRUCache",
+    "CachedEmbedder",
+    "DiskEmbeddingStore",
+    "batch_embed",
+    "HashingEmbedder",
+    "OnnxEmbedder",
+    "create_embedder",
+    "RateLimiter",
+    "EmbeddingPipeline",
+    "IngestionReport",
+    "load_knowledge_base",
+    "SnapshotError",
+    "export_snapshot",
+    "import_snapshot",
+    "restore_index_snapshot",
+    "AsyncCrawler",
+    "CrawlingWebsiteReader",
+    "CrawlStats",
+    "BoilerplateDeduplicator",
+    "LexicalIndex",
+    "MemmapVectorIndex",
+    "ContextCompressor",
+    "context_sources",
+    "HybridRetriever",
+    "CachedTavilyTools",
+    "TicketStore",
+    "TicketSearchIndex",
+    "RecentTicketIndex",
+    "TicketEvent",
+    "TicketEventLog",
+    "export_stream",
+    "iter_tickets",
+    "iter_workflow_runs",
+    "ToolRunCache",
+    "tool_run_scope",
+    "memoize_per_run",
+    "idempotent_per_run",
+    "CustomerDirectory",
+    "InMemoryCustomerDirectory",
+    "SQLiteCustomerDirectory",
+    "CachedCustomerDirectory",
+    "create_customer_directory",
+    "reciprocal_rank_fusion",
 ]
\ No newline at end of file
@@ -0,0 +1,97 @@
+# utils/cache.py
+"""
+Thread-safe in-process caches.
+
+``LRUCache`` bounds memory by evicting the least recently used entry and can
+optionally expire entries after a time-to-live.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional, Tuple
+
+# Sentinel distinguishing "not cached" from a cached ``None``
+MISSING = object()
+
+
+class LRUCache:
+    """
+    Least-recently-used cache with optional time-to-live.
+
+    Args:
+        maxsize: Maximum number of entries kept in memory
+        ttl: Seconds after which an entry expires (None keeps entries until evicted)
+        clock: Time source, injectable for tests
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        ttl: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._data: "OrderedDict[Hashable, Tuple[Optional[float], Any]]" = OrderedDict()
+
+    def get(self, key: Hashable, default: Any = MISSING) -> Any:
+        """
+        Return the cached value for a key and mark it as recently used.
+
+        Args:
+            key: Cache key
+            default: Value returned when the key is absent or expired
+
+        Returns:
+            Any: The cached value or ``default``
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            expires_at, value = entry
+            if expires_at is not None and self._clock() >= expires_at:
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """
+        Store a value, evicting the least recently used entry when full.
+
+        Args:
+            key: Cache key
+            value: Value to store
+            ttl: Per-entry time-to-live overriding the cache default
+        """
+        effective_ttl = self.ttl if ttl is None else ttl
+        expires_at = self._clock() + effective_ttl if effective_ttl is not None else None
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Remove a key and return its value."""
+        with self._lock:
+            entry = self._data.pop(key, None)
+            return default if entry is None else entry[1]
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        with self._lock:
+            self._data.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key) is not MISSING
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
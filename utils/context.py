@@ -0,0 +1,208 @@
+# utils/context.py
+"""
+Compression of retrieved knowledge into a fixed token budget.
+
+Retrieved chunks are up to 5000 characters each, so the context added to the
+knowledge agent's prompt varied widely from query to query. ``ContextCompressor``
+assembles the context sentence by sentence instead:
+
+1. Chunks are split into sentences.
+2. Each sentence is scored by the query terms it contains, weighted by their
+   rarity among the candidate sentences (same Portuguese analyzer as the BM25
+   index), plus a prior favouring chunks ranked higher by the retriever.
+3. Near-duplicate sentences (token Jaccard similarity above a threshold) are
+   dropped, which removes text repeated across pages and chunks.
+4. The best sentences are packed greedily into the token budget and put back
+   in their original order, grouped by source chunk, so every piece of
+   context keeps the metadata (URL) of the chunk it came from.
+"""
+
+import math
+import os
+import re
+import textwrap
+from dataclasses import dataclass
+from typing import Any, Dict, List, Set
+
+from agno.document import Document
+from dotenv import load_dotenv
+
+from .lexical_index import portuguese_analyzer
+from .logger import get_logger
+from .metrics import metrics
+
+# Configure logging
+logger = get_logger(__name__)
+
+# Load environment variables
+load_dotenv()
+
+# Configuration
+CONTEXT_COMPRESSION = os.getenv("CONTEXT_COMPRESSION", "true").lower() == "true"
+CONTEXT_DUPLICATE_THRESHOLD = float(os.getenv("CONTEXT_DUPLICATE_THRESHOLD", "0.8"))
+
+# Rough characters per token of Mistral's tokenizer on Portuguese and English text
+CHARS_PER_TOKEN = 4
+# Weight of the retriever's chunk ranking relative to query-term matches
+RANK_PRIOR = 0.5
+MIN_SENTENCE_CHARS = 12
+# Text without punctuation (menus, tables) is cut into pieces of at most this size
+MAX_SENTENCE_CHARS = 400
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+(?=[^\s])|\n+")
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of prompt tokens of a text."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split text into sentences on terminal punctuation and line breaks."""
+    sentences = []
+    for sentence in _SENTENCE_END.split(text):
+        sentence = sentence.strip()
+        if len(sentence) > MAX_SENTENCE_CHARS:
+            sentences.extend(textwrap.wrap(sentence, MAX_SENTENCE_CHARS, break_long_words=False))
+        elif sentence:
+            sentences.append(sentence)
+    return sentences
+
+
+def jaccard(a: Set[str], b: Set[str]) -> float:
+    """Jaccard similarity of two token sets."""
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+@dataclass
+class _Sentence:
+    chunk: int
+    position: int
+    text: str
+    terms: Set[str]
+    tokens: int
+    score: float = 0.0
+
+
+class ContextCompressor:
+    """
+    Selects the sentences of retrieved chunks that best answer a query.
+
+    Args:
+        token_budget: Maximum estimated tokens of the assembled context
+        duplicate_threshold: Token Jaccard similarity above which a sentence
+            counts as a near-duplicate of one already selected
+    """
+
+    def __init__(self, token_budget: int, duplicate_threshold: float = CONTEXT_DUPLICATE_THRESHOLD):
+        if token_budget < 1:
+            raise ValueError("token_budget must be positive")
+        self.token_budget = token_budget
+        self.duplicate_threshold = duplicate_threshold
+        self._analyzer = portuguese_analyzer()
+
+    def _terms(self, text: str) -> Set[str]:
+        return set(self._analyzer.analyze(text))
+
+    def _sentences(self, documents: List[Document]) -> List[_Sentence]:
+        sentences = []
+        for chunk, document in enumerate(documents):
+            for position, text in enumerate(split_sentences(document.content)):
+                if len(text) < MIN_SENTENCE_CHARS:
+                    continue
+                sentences.append(_Sentence(chunk, position, text, self._terms(text), estimate_tokens(text) + 1))
+        return sentences
+
+    def _score(self, query_terms: Set[str], sentences: List[_Sentence]) -> None:
+        document_frequency: Dict[str, int] = {}
+        for sentence in sentences:
+            for term in sentence.terms & query_terms:
+                document_frequency[term] = document_frequency.get(term, 0) + 1
+        total = len(sentences)
+        for sentence in sentences:
+            matched = sentence.terms & query_terms
+            relevance = sum(math.log(1 + total / document_frequency[term]) for term in matched)
+            # Long sentences should not win just by containing more words
+            relevance /= math.sqrt(len(sentence.terms) or 1)
+            sentence.score = relevance + RANK_PRIOR / (1 + sentence.chunk)
+
+    def compress(self, query: str, documents: List[Document]) -> List[Document]:
+        """
+        Assemble the context for a query from ranked chunks.
+
+        Args:
+            query: User query
+            documents: Retrieved chunks, best first
+
+        Returns:
+            List[Document]: One document per source chunk that contributed,
+            in retrieval order, holding its selected sentences in their
+            original order and the chunk's id and metadata
+        """
+        sentences = self._sentences(documents)
+        if not sentences:
+            return []
+        self._score(self._terms(query), sentences)
+
+        selected: List[_Sentence] = []
+        used = 0
+        duplicates = 0
+        for sentence in sorted(sentences, key=lambda s: (-s.score, s.chunk, s.position)):
+            if used + sentence.tokens > self.token_budget:
+                continue
+            if any(jaccard(sentence.terms, kept.terms) >= self.duplicate_threshold for kept in selected):
+                duplicates += 1
+                continue
+            selected.append(sentence)
+            used += sentence.tokens
+
+        by_chunk: Dict[int, List[_Sentence]] = {}
+        for sentence in sorted(selected, key=lambda s: (s.chunk, s.position)):
+            by_chunk.setdefault(sentence.chunk, []).append(sentence)
+        compressed = []
+        for chunk, chunk_sentences in by_chunk.items():
+            source = documents[chunk]
+            compressed.append(
+                Document(
+                    id=source.id,
+                    name=source.name,
+                    content=" ".join(s.text for s in chunk_sentences),
+                    meta_data=dict(source.meta_data or {}),
+                    reranking_score=source.reranking_score,
+                )
+            )
+
+        original = sum(estimate_tokens(d.content) for d in documents)
+        metrics.observe("context_tokens", used)
+        metrics.increment("context_duplicate_sentences_total", duplicates)
+        logger.debug(
+            f"Compressed {len(documents)} chunks from ~{original} to ~{used} tokens "
+            f"({len(selected)} sentences from {len(compressed)} chunks, {duplicates} near-duplicates dropped)"
+        )
+        return compressed
+
+
+def context_sources(references: List[Any]) -> List[Dict[str, Any]]:
+    """
+    Summarise retrieved references for ``agent_workflow.tool_calls``.
+
+    Args:
+        references: Chunks as handed to the agent (``Document.to_dict()``)
+
+    Returns:
+        List[Dict[str, Any]]: One entry per distinct source URL, in
+        order, with the estimated tokens of context it contributed
+    """
+    sources: Dict[str, Dict[str, Any]] = {}
+    for reference in references:
+        if not isinstance(reference, dict):
+            continue
+        meta_data = reference.get("meta_data") or {}
+        url = meta_data.get("url") or reference.get("name") or "unknown"
+        entry = sources.setdefault(url, {"url": url, "tokens": 0})
+        entry["tokens"] += estimate_tokens(reference.get("content") or "")
+        if meta_data.get("shared"):
+            entry["shared"] = True
+    return list(sources.values())
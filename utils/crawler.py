@@ -0,0 +1,401 @@
+# utils/crawler.py
+"""
+Concurrent website crawler for the knowledge base.
+
+agno's ``WebsiteReader`` opens a new client per URL and fetches pages one at a
+time with a random 1-3s pause. ``AsyncCrawler`` crawls every seed URL at once
+over a single keep-alive connection pool, while limiting concurrent requests
+and spacing them out per host. Validators (ETag / Last-Modified) of every page
+are kept in a crawl cache, so later crawls send conditional requests and reuse
+the cached content on ``304 Not Modified`` instead of downloading the page.
+
+``CrawlingWebsiteReader`` plugs the crawler into ``WebsiteKnowledgeBase`` with
+the same link-following rules and chunking as ``WebsiteReader``. Pages keep one
+line per text node so that navigation, footer and cookie blocks repeated
+across pages can be factored out by ``BoilerplateDeduplicator`` before
+chunking; chunking collapses the line breaks again.
+"""
+
+import asyncio
+import json
+import os
+import time
+from collections import defaultdict
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urljoin, urlparse
+
+import httpx
+from agno.document import Document
+from agno.document.reader.website_reader import WebsiteReader
+from bs4 import BeautifulSoup, Tag
+from dotenv import load_dotenv
+
+from .dedup import DEDUP_ENABLED, SHARED_SOURCE, BoilerplateDeduplicator
+from .logger import get_logger
+from .metrics import metrics
+
+# Configure logging
+logger = get_logger(__name__)
+
+# Load environment variables
+load_dotenv()
+
+# Configuration
+CRAWLER_MAX_CONNECTIONS = int(os.getenv("CRAWLER_MAX_CONNECTIONS", "20"))
+CRAWLER_PER_HOST_CONCURRENCY = int(os.getenv("CRAWLER_PER_HOST_CONCURRENCY", "4"))
+CRAWLER_POLITENESS_DELAY = float(os.getenv("CRAWLER_POLITENESS_DELAY", "0.25"))
+CRAWLER_TIMEOUT = float(os.getenv("CRAWLER_TIMEOUT", "10"))
+CRAWLER_CACHE_PATH = os.getenv("CRAWLER_CACHE_PATH", "storage/crawl_cache.json")
+
+USER_AGENT = "infinitepay-knowledge-crawler/1.0"
+SKIPPED_EXTENSIONS = (".pdf", ".jpg", ".png")
+CONTENT_CLASSES = ("content", "main-content", "post-content")
+CACHE_VERSION = 2
+
+
+@dataclass
+class CrawlStats:
+    """Counters of one crawl."""
+
+    pages: int = 0
+    not_modified: int = 0
+    errors: int = 0
+    bytes_fetched: int = 0
+    seconds: float = 0.0
+
+    @property
+    def pages_per_second(self) -> float:
+        return self.pages / self.seconds if self.seconds > 0 else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["pages_per_second"] = round(self.pages_per_second, 2)
+        data["seconds"] = round(self.seconds, 3)
+        return data
+
+
+@dataclass
+class FetchedPage:
+    """Main content and outgoing links of one page."""
+
+    url: str
+    content: str
+    links: List[str] = field(default_factory=list)
+    not_modified: bool = False
+
+
+def extract_main_text(soup: BeautifulSoup) -> str:
+    """
+    Extract the main content of a page, one line per text node.
+
+    Selects the same element as ``WebsiteReader._extract_main_content``, but
+    keeps text nodes on separate lines instead of joining them with spaces.
+
+    Args:
+        soup: Parsed page
+
+    Returns:
+        str: Main content, or an empty string when the page has none
+    """
+
+    def match(tag: Tag) -> bool:
+        if tag.name in ("article", "main"):
+            return True
+        return any(cls in CONTENT_CLASSES for cls in tag.get("class", []))
+
+    element = soup.find(match)
+    if element:
+        return element.get_text(strip=True, separator="\n")
+    if soup.find("div") and not any(soup.find(class_=name) for name in CONTENT_CLASSES):
+        return ""
+    return soup.get_text(strip=True, separator="\n")
+
+
+def primary_domain(url: str) -> str:
+    """Return the registrable part of a URL's host (e.g. ``infinitepay.io``)."""
+    host = urlparse(url).hostname or ""
+    return ".".join(host.split(".")[-2:])
+
+
+class AsyncCrawler:
+    """
+    Breadth-first crawler sharing one connection pool across all seed URLs.
+
+    Link-following matches ``WebsiteReader``: links stay on the seed's primary
+    domain, ``max_depth`` bounds the depth and each seed stops after
+    ``max_links`` pages with content.
+
+    Args:
+        max_depth: Maximum link depth, the seed being depth 1
+        max_links: Maximum pages with content collected per seed
+        max_connections: Size of the shared connection pool
+        per_host_concurrency: Maximum concurrent requests to one host
+        politeness_delay: Minimum seconds between request starts to one host
+        timeout: Request timeout in seconds
+        cache_path: JSON file holding validators and content (None disables it)
+        extract_content: Function returning the main text of a parsed page
+        transport: Optional httpx transport, for tests
+    """
+
+    def __init__(
+        self,
+        max_depth: int = 1,
+        max_links: int = 10,
+        max_connections: int = CRAWLER_MAX_CONNECTIONS,
+        per_host_concurrency: int = CRAWLER_PER_HOST_CONCURRENCY,
+        politeness_delay: float = CRAWLER_POLITENESS_DELAY,
+        timeout: float = CRAWLER_TIMEOUT,
+        cache_path: Optional[str] = CRAWLER_CACHE_PATH,
+        extract_content: Optional[Callable[[BeautifulSoup], str]] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.max_depth = max_depth
+        self.max_links = max_links
+        self.max_connections = max_connections
+        self.per_host_concurrency = max(1, per_host_concurrency)
+        self.politeness_delay = politeness_delay
+        self.timeout = timeout
+        self.cache_path = cache_path
+        self.extract_content = extract_content or extract_main_text
+        self.transport = transport
+        self.stats = CrawlStats()
+        self._cache: Dict[str, Dict[str, Any]] = {}
+        self._host_semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._host_locks: Dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+        self._next_slot: Dict[str, float] = {}
+
+    def _load_cache(self) -> None:
+        self._cache = {}
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            # Content extracted by an older format is not reused
+            if data.get("version") == CACHE_VERSION:
+                self._cache = data.get("pages", {})
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable crawl cache {self.cache_path}: {e}")
+
+    def _save_cache(self) -> None:
+        if not self.cache_path:
+            return
+        directory = os.path.dirname(self.cache_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.cache_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": CACHE_VERSION, "pages": self._cache}, f)
+        os.replace(tmp_path, self.cache_path)
+
+    async def _wait_for_host(self, host: str) -> None:
+        """Reserve the next request slot for a host and sleep until it comes."""
+        loop = asyncio.get_running_loop()
+        async with self._host_locks[host]:
+            now = loop.time()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.politeness_delay
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    def _parse(self, url: str, body: bytes) -> Tuple[str, List[str]]:
+        """Extract the main content and same-site links of a page."""
+        soup = BeautifulSoup(body, "html.parser")
+        content = self.extract_content(soup)
+        links = []
+        for link in soup.find_all("a", href=True):
+            if not isinstance(link, Tag):
+                continue
+            full_url = urljoin(url, str(link["href"]))
+            if not urlparse(full_url).path.endswith(SKIPPED_EXTENSIONS):
+                links.append(full_url)
+        return content, links
+
+    async def fetch(self, client: httpx.AsyncClient, url: str) -> Optional[FetchedPage]:
+        """
+        Fetch and parse one page, using a conditional request when it was seen before.
+
+        Args:
+            client: Shared HTTP client
+            url: Page URL
+
+        Returns:
+            Optional[FetchedPage]: The page, or None if it could not be fetched
+        """
+        host = urlparse(url).netloc
+        semaphore = self._host_semaphores.setdefault(host, asyncio.Semaphore(self.per_host_concurrency))
+        cached = self._cache.get(url)
+        headers = {}
+        if cached:
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+
+        async with semaphore:
+            await self._wait_for_host(host)
+            try:
+                response = await client.get(url, headers=headers, follow_redirects=True)
+                if response.status_code == 304 and cached:
+                    self.stats.pages += 1
+                    self.stats.not_modified += 1
+                    metrics.increment("crawler_pages_total", status="not_modified")
+                    return FetchedPage(url, cached.get("content", ""), cached.get("links", []), not_modified=True)
+                response.raise_for_status()
+            except httpx.HTTPError as e:
+                self.stats.errors += 1
+                metrics.increment("crawler_pages_total", status="error")
+                logger.warning(f"Failed to crawl {url}: {e}")
+                return None
+
+        body = response.content
+        self.stats.pages += 1
+        self.stats.bytes_fetched += len(body)
+        metrics.increment("crawler_pages_total", status="fetched")
+        metrics.increment("crawler_bytes_total", len(body))
+
+        content, links = await asyncio.to_thread(self._parse, url, body)
+        validators = {
+            "etag": response.headers.get("etag"),
+            "last_modified": response.headers.get("last-modified"),
+        }
+        if any(validators.values()):
+            self._cache[url] = {**validators, "content": content, "links": links}
+        else:
+            self._cache.pop(url, None)
+        return FetchedPage(url, content, links)
+
+    async def _crawl_seed(self, client: httpx.AsyncClient, seed: str) -> Dict[str, str]:
+        """Crawl one seed URL level by level, fetching each level concurrently."""
+        domain = primary_domain(seed)
+        results: Dict[str, str] = {}
+        visited = set()
+        frontier = [seed]
+        depth = 1
+        while frontier and depth <= self.max_depth and len(results) < self.max_links:
+            level = []
+            for url in frontier:
+                host = urlparse(url).hostname or ""
+                if url not in visited and host.endswith(domain):
+                    visited.add(url)
+                    level.append(url)
+            level = level[: self.max_links - len(results)]
+            pages = await asyncio.gather(*(self.fetch(client, url) for url in level))
+
+            next_frontier = []
+            for page in pages:
+                if page is None:
+                    continue
+                if page.content and len(results) < self.max_links:
+                    results[page.url] = page.content
+                next_frontier.extend(link for link in page.links if link not in visited)
+            frontier = list(dict.fromkeys(next_frontier))
+            depth += 1
+        return results
+
+    async def crawl(self, seeds: List[str]) -> Dict[str, Dict[str, str]]:
+        """
+        Crawl every seed URL concurrently.
+
+        Args:
+            seeds: Seed URLs
+
+        Returns:
+            Dict[str, Dict[str, str]]: Main content per page URL, per seed URL.
+            A seed that could not be crawled maps to an empty dict.
+        """
+        self._load_cache()
+        self.stats = CrawlStats()
+        self._host_semaphores = {}
+        self._host_locks = defaultdict(asyncio.Lock)
+        self._next_slot = {}
+        started = time.perf_counter()
+
+        limits = httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_connections,
+        )
+        try:
+            async with httpx.AsyncClient(
+                limits=limits,
+                timeout=self.timeout,
+                headers={"User-Agent": USER_AGENT},
+                transport=self.transport,
+            ) as client:
+                results = await asyncio.gather(*(self._crawl_seed(client, seed) for seed in seeds))
+        finally:
+            self.stats.seconds = time.perf_counter() - started
+            metrics.set_gauge("crawler_pages_per_second", self.stats.pages_per_second)
+            self._save_cache()
+
+        logger.info(
+            f"Crawled {self.stats.pages} pages from {len(seeds)} seeds in {self.stats.seconds:.2f}s "
+            f"({self.stats.pages_per_second:.1f} pages/s, {self.stats.not_modified} not modified, "
+            f"{self.stats.bytes_fetched} bytes, {self.stats.errors} errors)"
+        )
+        return dict(zip(seeds, results))
+
+
+class CrawlingWebsiteReader(WebsiteReader):
+    """
+    ``WebsiteReader`` whose async path crawls through ``AsyncCrawler``.
+
+    Args:
+        crawler: Crawler to use (built from ``max_depth`` / ``max_links`` when omitted)
+        deduplicate: Factor blocks repeated across pages out before chunking
+        **kwargs: ``WebsiteReader`` arguments such as ``max_depth``, ``max_links``
+            and ``chunking_strategy``
+    """
+
+    def __init__(self, crawler: Optional[AsyncCrawler] = None, deduplicate: bool = DEDUP_ENABLED, **kwargs):
+        super().__init__(**kwargs)
+        self.crawler = crawler or AsyncCrawler(
+            max_depth=self.max_depth,
+            max_links=self.max_links,
+            extract_content=extract_main_text,
+        )
+        self.deduplicator = BoilerplateDeduplicator() if deduplicate else None
+
+    def _extract_main_content(self, soup: BeautifulSoup) -> str:
+        return extract_main_text(soup)
+
+    def _chunk(self, document: Document) -> List[Document]:
+        return self.chunk_document(document) if self.chunk else [document]
+
+    def _to_documents(self, seed: str, pages: Dict[str, str]) -> List[Document]:
+        documents = []
+        for page_url, content in pages.items():
+            if not content:
+                continue
+            document = Document(name=seed, id=page_url, meta_data={"url": page_url}, content=content)
+            documents.extend(self._chunk(document))
+        return documents
+
+    async def async_read_many(self, urls: List[str]) -> Dict[str, List[Document]]:
+        """
+        Crawl and chunk several seed URLs in one crawl.
+
+        Args:
+            urls: Seed URLs
+
+        Returns:
+            Dict[str, List[Document]]: Chunks per seed URL, plus the blocks
+            shared across pages under ``SHARED_SOURCE`` when deduplicating
+        """
+        crawled = await self.crawler.crawl(urls)
+        if self.deduplicator is None:
+            return {seed: self._to_documents(seed, pages) for seed, pages in crawled.items()}
+
+        all_pages = {url: content for pages in crawled.values() for url, content in pages.items()}
+        result = self.deduplicator.deduplicate(all_pages)
+        documents = {
+            seed: self._to_documents(seed, {url: result.pages[url] for url in pages})
+            for seed, pages in crawled.items()
+        }
+        documents[SHARED_SOURCE] = [chunk for block in result.shared_blocks for chunk in self._chunk(block.to_document())]
+        return documents
+
+    async def async_read(self, url: str) -> List[Document]:
+        documents = await self.async_read_many([url])
+        return documents[url] + documents.get(SHARED_SOURCE, [])
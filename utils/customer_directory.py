@@ -0,0 +1,318 @@
+# utils/customer_directory.py
+"""
+Customer directory backends for the support tools.
+
+``lookup_customer_info`` used to read a hard-coded dict. It now asks a
+``CustomerDirectory``, whose ``get_customer`` coroutine can be backed by a
+real database without blocking an event loop:
+
+- ``InMemoryCustomerDirectory``: the demo dict (default)
+- ``SQLiteCustomerDirectory``: a SQLite database queried through a bounded
+  pool of connections on worker threads; the reference implementation for
+  SQL backends, and what the tests run against
+- ``CachedCustomerDirectory``: a read-through cache in front of another
+  directory, with a short TTL for customers and a shorter one for unknown
+  emails (negative caching), so repeated lookups within a conversation and
+  lookups of mistyped emails do not reach the database
+
+``create_customer_directory`` selects the backend from ``CUSTOMER_DB_URL``.
+Agent tools are called synchronously, so ``CustomerDirectory.lookup`` runs
+the coroutine on a background event loop shared by all directories; async
+callers await ``get_customer`` directly.
+"""
+
+import asyncio
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+from dotenv import load_dotenv
+
+from .cache import MISSING, LRUCache
+from .logger import get_logger
+from .metrics import metrics
+
+# Configure logging
+logger = get_logger(__name__)
+
+# Load environment variables
+load_dotenv()
+
+# Configuration
+CUSTOMER_DB_URL = os.getenv("CUSTOMER_DB_URL", "memory://")
+CUSTOMER_DB_POOL_SIZE = int(os.getenv("CUSTOMER_DB_POOL_SIZE", "4"))
+CUSTOMER_DB_TIMEOUT = float(os.getenv("CUSTOMER_DB_TIMEOUT", "5"))
+CUSTOMER_CACHE_SIZE = int(os.getenv("CUSTOMER_CACHE_SIZE", "1024"))
+CUSTOMER_CACHE_TTL = float(os.getenv("CUSTOMER_CACHE_TTL", "60"))
+CUSTOMER_NEGATIVE_CACHE_TTL = float(os.getenv("CUSTOMER_NEGATIVE_CACHE_TTL", "10"))
+
+CUSTOMER_FIELDS = ("name", "account_type", "status", "phone", "devices")
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+
+
+def _background_loop() -> asyncio.AbstractEventLoop:
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="customer-directory", daemon=True).start()
+        return _loop
+
+
+def run_sync(coroutine) -> Any:
+    """
+    Run a coroutine to completion from synchronous code.
+
+    The coroutine runs on a background event loop, so this also works from a
+    thread whose own loop is running (agent tools called inside ``/chat``).
+
+    Args:
+        coroutine: Coroutine to run
+
+    Returns:
+        Any: The coroutine's result
+    """
+    return asyncio.run_coroutine_threadsafe(coroutine, _background_loop()).result()
+
+
+def normalize_email(email: str) -> str:
+    """Return the lookup key of an email address."""
+    return email.strip().lower()
+
+
+class CustomerDirectory(ABC):
+    """Interface of the customer directory used by the support tools."""
+
+    name = "directory"
+
+    @abstractmethod
+    async def get_customer(self, email: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a customer by email address.
+
+        Args:
+            email: Normalized email address
+
+        Returns:
+            Optional[Dict[str, Any]]: The customer's ``CUSTOMER_FIELDS``, or
+            None if no customer has this email
+        """
+
+    def lookup(self, email: str) -> Optional[Dict[str, Any]]:
+        """Synchronous ``get_customer`` for agent tools."""
+        return run_sync(self.get_customer(email))
+
+    def close(self) -> None:
+        """Release the backend's resources."""
+
+
+class InMemoryCustomerDirectory(CustomerDirectory):
+    """
+    Directory backed by a dict of customers keyed by email.
+
+    Args:
+        customers: Customer records; read on every lookup, so later changes are seen
+    """
+
+    name = "memory"
+
+    def __init__(self, customers: Dict[str, Dict[str, Any]]):
+        self.customers = customers
+
+    async def get_customer(self, email: str) -> Optional[Dict[str, Any]]:
+        return self.customers.get(email)
+
+    def lookup(self, email: str) -> Optional[Dict[str, Any]]:
+        # Nothing to wait for, skip the event loop round trip
+        return self.customers.get(email)
+
+
+class SQLiteCustomerDirectory(CustomerDirectory):
+    """
+    Directory backed by a SQLite ``customers`` table.
+
+    Queries run on worker threads with at most ``pool_size`` connections open;
+    connections are created on first use and reused afterwards.
+
+    Args:
+        path: SQLite database file
+        pool_size: Maximum number of concurrent connections
+        timeout: Seconds to wait for a free connection
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: str, pool_size: int = CUSTOMER_DB_POOL_SIZE, timeout: float = CUSTOMER_DB_TIMEOUT):
+        if pool_size < 1:
+            raise ValueError("pool_size must be at least 1")
+        self.path = path
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(pool_size)
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._opened = 0
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connection() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS customers ("
+                "email TEXT PRIMARY KEY, name TEXT NOT NULL, account_type TEXT, status TEXT, phone TEXT, devices TEXT)"
+            )
+            connection.commit()
+
+    @property
+    def connections(self) -> int:
+        """Number of connections opened so far."""
+        return self._opened
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, timeout=self.timeout, check_same_thread=False)
+        with self._lock:
+            self._opened += 1
+        return connection
+
+    @contextmanager
+    def _connection(self) -> Iterator[sqlite3.Connection]:
+        if not self._slots.acquire(timeout=self.timeout):
+            raise TimeoutError(f"No customer database connection available after {self.timeout}s")
+        try:
+            try:
+                connection = self._idle.get_nowait()
+            except queue.Empty:
+                connection = self._connect()
+            try:
+                yield connection
+            finally:
+                self._idle.put(connection)
+        finally:
+            self._slots.release()
+
+    def _fetch(self, email: str) -> Optional[Dict[str, Any]]:
+        with self._connection() as connection:
+            row = connection.execute(
+                "SELECT name, account_type, status, phone, devices FROM customers WHERE email = ?", (email,)
+            ).fetchone()
+        if row is None:
+            return None
+        customer = dict(zip(CUSTOMER_FIELDS, row))
+        customer["devices"] = json.loads(customer["devices"] or "[]")
+        return customer
+
+    async def get_customer(self, email: str) -> Optional[Dict[str, Any]]:
+        return await asyncio.to_thread(self._fetch, email)
+
+    def upsert(self, customers: Dict[str, Dict[str, Any]]) -> int:
+        """
+        Insert or replace customer records.
+
+        Args:
+            customers: Customer records keyed by email
+
+        Returns:
+            int: Number of records written
+        """
+        rows = [
+            (
+                normalize_email(email),
+                customer["name"],
+                customer.get("account_type"),
+                customer.get("status"),
+                customer.get("phone"),
+                json.dumps(customer.get("devices", []), ensure_ascii=False),
+            )
+            for email, customer in customers.items()
+        ]
+        with self._connection() as connection:
+            connection.executemany("INSERT OR REPLACE INTO customers VALUES (?, ?, ?, ?, ?, ?)", rows)
+            connection.commit()
+        return len(rows)
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+class CachedCustomerDirectory(CustomerDirectory):
+    """
+    Read-through cache in front of another directory.
+
+    Args:
+        backend: Directory queried on a cache miss
+        maxsize: Maximum number of cached emails
+        ttl: Seconds a found customer stays cached
+        negative_ttl: Seconds an unknown email stays cached
+        clock: Time source, injectable for tests
+    """
+
+    def __init__(
+        self,
+        backend: CustomerDirectory,
+        maxsize: int = CUSTOMER_CACHE_SIZE,
+        ttl: float = CUSTOMER_CACHE_TTL,
+        negative_ttl: float = CUSTOMER_NEGATIVE_CACHE_TTL,
+        clock=time.monotonic,
+    ):
+        self.backend = backend
+        self.name = f"cached-{backend.name}"
+        self.negative_ttl = negative_ttl
+        self._cache = LRUCache(maxsize=maxsize, ttl=ttl, clock=clock)
+
+    async def get_customer(self, email: str) -> Optional[Dict[str, Any]]:
+        cached = self._cache.get(email)
+        if cached is not MISSING:
+            metrics.increment("customer_directory_cache_total", result="hit" if cached is not None else "negative_hit")
+            return cached
+        metrics.increment("customer_directory_cache_total", result="miss")
+        started = time.perf_counter()
+        customer = await self.backend.get_customer(email)
+        metrics.observe("customer_directory_seconds", time.perf_counter() - started, backend=self.backend.name)
+        if customer is None:
+            self._cache.set(email, None, ttl=self.negative_ttl)
+        else:
+            self._cache.set(email, customer)
+        return customer
+
+    def invalidate(self, email: str) -> None:
+        """Drop a cached entry, e.g. after the customer record changed."""
+        self._cache.pop(email)
+
+    def close(self) -> None:
+        self.backend.close()
+
+
+def create_customer_directory(
+    customers: Dict[str, Dict[str, Any]], url: str = CUSTOMER_DB_URL
+) -> CustomerDirectory:
+    """
+    Create the customer directory selected by a URL.
+
+    Args:
+        customers: Records served by the in-memory backend
+        url: ``memory://`` (default) or ``sqlite:///<path>``
+
+    Returns:
+        CustomerDirectory: The configured directory; database backends are cached
+
+    Raises:
+        ValueError: If the URL scheme is not supported
+    """
+    if url in ("", "memory://"):
+        return InMemoryCustomerDirectory(customers)
+    if url.startswith("sqlite:///"):
+        path = url[len("sqlite:///"):]
+        logger.info(f"Using SQLite customer directory at {path} (pool of {CUSTOMER_DB_POOL_SIZE})")
+        return CachedCustomerDirectory(SQLiteCustomerDirectory(path))
+    raise ValueError(f"Unsupported CUSTOMER_DB_URL '{url}', expected memory:// or sqlite:///<path>")
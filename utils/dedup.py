@@ -0,0 +1,194 @@
+# utils/dedup.py
+"""
+Boilerplate-aware deduplication of crawled pages.
+
+Every InfinitePay page repeats the same navigation, footer and cookie-banner
+text. Chunking each page as-is stores and embeds that text once per URL and
+lets duplicates crowd the few retrieval slots.
+
+``BoilerplateDeduplicator`` works on the text blocks of each page (one line
+per block, as produced by ``extract_main_text``):
+
+1. Each page becomes a sequence of normalized blocks, hashed into shingles of
+   ``shingle_size`` consecutive blocks.
+2. Blocks covered by a shingle that occurs on at least ``min_pages`` pages
+   are repeated content. Consecutive repeated blocks form a shared run.
+3. Shared runs of at least ``min_block_chars`` characters are cut out of the
+   pages and kept once, with the list of every URL they appeared on.
+
+Shorter runs stay in their pages, so headings that merely coincide are not
+split off into tiny chunks.
+
+Shared blocks are ingested under the ``SHARED_SOURCE`` key of the sources
+mapping. Their metadata keeps ``url`` (first page) and ``urls`` (every page,
+comma-separated, as Chroma metadata must be scalar).
+"""
+
+import hashlib
+import os
+import re
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+from agno.document import Document
+from dotenv import load_dotenv
+
+from .logger import get_logger
+from .metrics import metrics
+
+# Configure logging
+logger = get_logger(__name__)
+
+# Load environment variables
+load_dotenv()
+
+# Configuration
+DEDUP_ENABLED = os.getenv("DEDUP_ENABLED", "true").lower() == "true"
+DEDUP_SHINGLE_SIZE = int(os.getenv("DEDUP_SHINGLE_SIZE", "3"))
+DEDUP_MIN_PAGES = int(os.getenv("DEDUP_MIN_PAGES", "2"))
+DEDUP_MIN_BLOCK_CHARS = int(os.getenv("DEDUP_MIN_BLOCK_CHARS", "200"))
+
+SHARED_SOURCE = "shared-blocks"
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+@dataclass
+class SharedBlock:
+    """Text repeated across pages, stored once."""
+
+    content: str
+    urls: List[str] = field(default_factory=list)
+
+    @property
+    def block_id(self) -> str:
+        return hashlib.sha256(self.content.encode("utf-8")).hexdigest()[:16]
+
+    def to_document(self) -> Document:
+        """Return the block as a document carrying its provenance."""
+        return Document(
+            name=SHARED_SOURCE,
+            id=f"{SHARED_SOURCE}/{self.block_id}",
+            content=self.content,
+            meta_data={
+                "url": self.urls[0],
+                "urls": ",".join(self.urls),
+                "shared": True,
+                "source_count": len(self.urls),
+            },
+        )
+
+
+@dataclass
+class DedupResult:
+    """Pages with shared blocks removed, plus the shared blocks."""
+
+    pages: Dict[str, str]
+    shared_blocks: List[SharedBlock]
+    removed_chars: int = 0
+
+
+def split_blocks(text: str) -> List[str]:
+    """Split extracted page text into non-empty blocks."""
+    return [line.strip() for line in text.split("\n") if line.strip()]
+
+
+def normalize_block(block: str) -> str:
+    """Normalize a block for comparison (case and whitespace insensitive)."""
+    return _WHITESPACE.sub(" ", block).strip().lower()
+
+
+class BoilerplateDeduplicator:
+    """
+    Detects blocks repeated across pages and factors them out.
+
+    Args:
+        shingle_size: Consecutive blocks per shingle
+        min_pages: Pages a shingle must appear on to count as repeated
+        min_block_chars: Minimum size of a shared run to be factored out
+    """
+
+    def __init__(
+        self,
+        shingle_size: int = DEDUP_SHINGLE_SIZE,
+        min_pages: int = DEDUP_MIN_PAGES,
+        min_block_chars: int = DEDUP_MIN_BLOCK_CHARS,
+    ):
+        if shingle_size < 1 or min_pages < 2:
+            raise ValueError("shingle_size must be >= 1 and min_pages >= 2")
+        self.shingle_size = shingle_size
+        self.min_pages = min_pages
+        self.min_block_chars = min_block_chars
+
+    def _shingles(self, normalized: List[str]) -> List[Tuple[int, str]]:
+        """Return ``(start, digest)`` for every shingle of a page."""
+        size = min(self.shingle_size, len(normalized))
+        shingles = []
+        for start in range(len(normalized) - size + 1):
+            digest = hashlib.sha1("\x1f".join(normalized[start:start + size]).encode("utf-8")).hexdigest()
+            shingles.append((start, digest))
+        return shingles
+
+    def deduplicate(self, pages: Dict[str, str]) -> DedupResult:
+        """
+        Factor repeated blocks out of a set of pages.
+
+        Args:
+            pages: Extracted text per page URL
+
+        Returns:
+            DedupResult: Remaining text per page and the shared blocks with
+            their provenance, in first-seen order
+        """
+        blocks = {url: split_blocks(text) for url, text in pages.items()}
+        normalized = {url: [normalize_block(b) for b in page_blocks] for url, page_blocks in blocks.items()}
+
+        shingle_pages: Dict[str, set] = defaultdict(set)
+        page_shingles = {}
+        for url, page_normalized in normalized.items():
+            page_shingles[url] = self._shingles(page_normalized) if page_normalized else []
+            for _, digest in page_shingles[url]:
+                shingle_pages[digest].add(url)
+
+        remaining: Dict[str, str] = {}
+        shared: Dict[str, SharedBlock] = {}
+        removed_chars = 0
+        for url, page_blocks in blocks.items():
+            repeated = [False] * len(page_blocks)
+            size = min(self.shingle_size, len(page_blocks))
+            for start, digest in page_shingles[url]:
+                if len(shingle_pages[digest]) >= self.min_pages:
+                    for i in range(start, start + size):
+                        repeated[i] = True
+
+            kept: List[str] = []
+            i = 0
+            while i < len(page_blocks):
+                if not repeated[i]:
+                    kept.append(page_blocks[i])
+                    i += 1
+                    continue
+                end = i
+                while end < len(page_blocks) and repeated[end]:
+                    end += 1
+                run = page_blocks[i:end]
+                content = "\n".join(run)
+                if len(content) < self.min_block_chars:
+                    kept.extend(run)
+                else:
+                    key = "\n".join(normalized[url][i:end])
+                    block = shared.setdefault(key, SharedBlock(content=content))
+                    if url not in block.urls:
+                        block.urls.append(url)
+                    removed_chars += len(content)
+                i = end
+            remaining[url] = "\n".join(kept)
+
+        result = DedupResult(pages=remaining, shared_blocks=list(shared.values()), removed_chars=removed_chars)
+        metrics.increment("dedup_removed_chars_total", removed_chars)
+        logger.info(
+            f"Deduplicated {len(pages)} pages: {len(result.shared_blocks)} shared blocks, "
+            f"{removed_chars} repeated characters removed"
+        )
+        return result
@@ -0,0 +1,166 @@
+# utils/embedders.py
+"""
+Embedding backends for the knowledge base.
+
+``create_embedder`` returns the embedder selected by ``EMBEDDER_BACKEND``:
+
+    mistral  ``MistralEmbedder`` (default, 1024 dimensions, network call)
+    onnx     all-MiniLM-L6-v2 run locally with onnxruntime (384 dimensions).
+             The model ships with chromadb and is downloaded once to
+             ``~/.cache/chroma``.
+    hashing  Signed feature hashing of accent-folded words and character
+             n-grams. No model, no network; a lexical baseline.
+
+Local backends remove the Mistral round trip from every query embedding.
+Every backend has its own ``id``, which is recorded in the ingest manifest:
+switching backends makes the next ``load_knowledge_base`` drop and rebuild the
+collection, since vectors from different models are not comparable.
+"""
+
+import math
+import os
+import threading
+import unicodedata
+from dataclasses import dataclass
+from hashlib import blake2b
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from agno.embedder.base import Embedder
+from agno.embedder.mistral import MistralEmbedder
+from dotenv import load_dotenv
+
+from .logger import get_logger
+
+# Configure logging
+logger = get_logger(__name__)
+
+# Load environment variables
+load_dotenv()
+
+# Configuration
+EMBEDDER_BACKEND = os.getenv("EMBEDDER_BACKEND", "mistral")
+HASHING_EMBEDDER_DIMENSIONS = int(os.getenv("HASHING_EMBEDDER_DIMENSIONS", "1024"))
+
+EMBEDDER_BACKENDS = ("mistral", "onnx", "hashing")
+
+
+def fold_text(text: str) -> str:
+    """Lowercase and strip accents, so "Automática" and "automatica" match."""
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+@dataclass
+class HashingEmbedder(Embedder):
+    """
+    Hashing-vectorizer embedder: words and character n-grams are hashed into
+    a fixed number of signed buckets, weighted by log term frequency and L2
+    normalized.
+
+    Args:
+        dimensions: Number of hash buckets
+        ngram_range: Character n-gram sizes, computed inside word boundaries
+    """
+
+    dimensions: int = HASHING_EMBEDDER_DIMENSIONS
+    ngram_range: Tuple[int, int] = (3, 4)
+
+    def __post_init__(self):
+        if self.dimensions < 1:
+            raise ValueError("dimensions must be positive")
+        self.id: str = f"hashing-{self.dimensions}-w1c{self.ngram_range[0]}{self.ngram_range[1]}"
+
+    def _features(self, text: str) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        low, high = self.ngram_range
+        for word in "".join(c if c.isalnum() else " " for c in fold_text(text)).split():
+            counts["w:" + word] = counts.get("w:" + word, 0) + 1
+            padded = f"<{word}>"
+            for size in range(low, high + 1):
+                for start in range(len(padded) - size + 1):
+                    gram = "c:" + padded[start:start + size]
+                    counts[gram] = counts.get(gram, 0) + 1
+        return counts
+
+    def _vector(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        for feature, count in self._features(text).items():
+            digest = int.from_bytes(blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+            sign = 1.0 if digest & 1 else -1.0
+            vector[(digest >> 1) % self.dimensions] += sign * (1.0 + math.log(count))
+        norm = float(np.linalg.norm(vector))
+        return vector / norm if norm > 0 else vector
+
+    def get_embedding(self, text: str) -> List[float]:
+        return self._vector(text).tolist()
+
+    def get_embedding_and_usage(self, text: str) -> Tuple[List[float], Optional[Dict[str, Any]]]:
+        return self.get_embedding(text), None
+
+    def get_embeddings(self, texts: List[str]) -> List[List[float]]:
+        return [self.get_embedding(text) for text in texts]
+
+
+@dataclass
+class OnnxEmbedder(Embedder):
+    """
+    Local sentence embedder running all-MiniLM-L6-v2 on CPU with onnxruntime.
+
+    The model is loaded on first use, not at construction.
+
+    Args:
+        providers: onnxruntime execution providers, in order of preference
+    """
+
+    id: str = "onnx-all-MiniLM-L6-v2"
+    dimensions: int = 384
+    providers: Optional[List[str]] = None
+
+    def __post_init__(self):
+        self._model = None
+        self._lock = threading.Lock()
+
+    @property
+    def model(self):
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    from chromadb.utils.embedding_functions import ONNXMiniLM_L6_V2
+
+                    self._model = ONNXMiniLM_L6_V2(preferred_providers=self.providers or ["CPUExecutionProvider"])
+                    logger.info(f"Loaded local embedding model {self.id}")
+        return self._model
+
+    def get_embeddings(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        return [np.asarray(embedding, dtype=np.float32).tolist() for embedding in self.model(texts)]
+
+    def get_embedding(self, text: str) -> List[float]:
+        return self.get_embeddings([text])[0]
+
+    def get_embedding_and_usage(self, text: str) -> Tuple[List[float], Optional[Dict[str, Any]]]:
+        return self.get_embedding(text), None
+
+
+def create_embedder(backend: str = EMBEDDER_BACKEND) -> Embedder:
+    """
+    Create the embedder for a backend.
+
+    Args:
+        backend: ``mistral``, ``onnx`` or ``hashing``
+
+    Returns:
+        Embedder: The configured embedder (not cached; wrap it in ``CachedEmbedder``)
+
+    Raises:
+        ValueError: If the backend is unknown
+    """
+    if backend == "mistral":
+        return MistralEmbedder(api_key=os.getenv("MISTRAL_API_KEY"))
+    if backend == "onnx":
+        return OnnxEmbedder()
+    if backend == "hashing":
+        return HashingEmbedder()
+    raise ValueError(f"Unknown embedder backend '{backend}', expected one of {EMBEDDER_BACKENDS}")
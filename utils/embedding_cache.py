@@ -0,0 +1,338 @@
+# utils/embedding_cache.py
+"""
+Embedding cache for the knowledge base search path.
+
+``CachedEmbedder`` wraps any agno embedder (``MistralEmbedder`` in production)
+with two cache tiers:
+
+1. An in-process LRU keyed by embedder model and normalized text.
+2. An optional on-disk tier shared by every worker on the host. Vectors are
+   appended to a float32 file that readers memory-map, and a parallel key
+   file maps text digests to row numbers.
+
+Hit and miss counts are exported through the metrics registry.
+
+``batch_embed`` embeds many texts in a single request when the underlying
+embedder supports it, which the ingestion pipeline relies on.
+"""
+
+import hashlib
+import os
+import re
+import threading
+import unicodedata
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from agno.embedder.base import Embedder
+from dotenv import load_dotenv
+
+from .cache import LRUCache, MISSING
+from .logger import get_logger
+from .metrics import metrics
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX platforms
+    fcntl = None
+
+# Configure logging
+logger = get_logger(__name__)
+
+# Load environment variables
+load_dotenv()
+
+# Configuration
+EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "2048"))
+EMBEDDING_CACHE_DIR = os.getenv("EMBEDDING_CACHE_DIR") or None
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normalize text before it is used as a cache key.
+
+    Applies Unicode NFKC normalization and collapses whitespace, so trivially
+    different spellings of the same query share a cache entry.
+    """
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFKC", text)).strip()
+
+
+def embedding_key(model_id: str, text: str) -> str:
+    """Return the hex digest identifying a (model, normalized text) pair."""
+    return hashlib.sha256(f"{model_id}\x00{normalize_text(text)}".encode("utf-8")).hexdigest()
+
+
+def batch_embed(embedder: Embedder, texts: List[str]) -> List[List[float]]:
+    """
+    Embed several texts, in one API request when the embedder allows it.
+
+    Unlike ``Embedder.get_embedding``, failures raise instead of returning
+    empty vectors, so callers can retry the whole batch.
+
+    Args:
+        embedder: Embedder to use; ``CachedEmbedder`` and Mistral-style clients
+            exposing ``client.embeddings.create(inputs=[...])`` are batched
+        texts: Texts to embed
+
+    Returns:
+        List[List[float]]: One embedding per text, in input order
+
+    Raises:
+        ValueError: If an embedding is missing from the response
+    """
+    if not texts:
+        return []
+    if hasattr(embedder, "get_embeddings"):
+        return embedder.get_embeddings(texts)
+
+    client = getattr(embedder, "client", None)
+    if client is not None and hasattr(client, "embeddings"):
+        params: Dict[str, Any] = {"inputs": texts, "model": embedder.id}
+        params.update(getattr(embedder, "request_params", None) or {})
+        response = client.embeddings.create(**params)
+        data = sorted(response.data or [], key=lambda item: item.index or 0)
+        embeddings = [item.embedding for item in data]
+    else:
+        embeddings = [embedder.get_embedding(text) for text in texts]
+
+    if len(embeddings) != len(texts) or not all(embeddings):
+        raise ValueError(f"Expected {len(texts)} embeddings, got {sum(1 for e in embeddings if e)}")
+    return embeddings
+
+
+class DiskEmbeddingStore:
+    """
+    Append-only, memory-mapped embedding store shared across processes.
+
+    Layout inside ``<directory>/<model>/``:
+        vectors.f32  raw float32 rows of ``dimensions`` values
+        keys.txt     one ``<hex digest> <row>`` line per vector
+        .lock        advisory lock serialising writers
+
+    A vector is written before its key, so a reader that sees a key can
+    always read the matching row. A writer that crashed between the two
+    leaves a row without a key; the next writer truncates ``vectors.f32``
+    back to one row per key line before appending, so rows never shift.
+
+    Args:
+        directory: Root cache directory
+        model_id: Embedder model, used to separate incompatible vectors
+        dimensions: Length of every embedding vector
+    """
+
+    def __init__(self, directory: str, model_id: str, dimensions: int):
+        safe_model = re.sub(r"[^A-Za-z0-9_.-]", "_", model_id)
+        self.path = os.path.join(directory, safe_model)
+        os.makedirs(self.path, exist_ok=True)
+        self.dimensions = int(dimensions)
+        self._vectors_path = os.path.join(self.path, "vectors.f32")
+        self._keys_path = os.path.join(self.path, "keys.txt")
+        self._lock_path = os.path.join(self.path, ".lock")
+        self._lock = threading.Lock()
+        self._rows: Dict[str, int] = {}
+        self._key_lines = 0
+        self._keys_offset = 0
+        self._matrix: Optional[np.memmap] = None
+
+    def get(self, key: str) -> Optional[List[float]]:
+        """Return the stored vector for a key, or None."""
+        with self._lock:
+            row = self._rows.get(key)
+            if row is None:
+                self._refresh_keys()
+                row = self._rows.get(key)
+                if row is None:
+                    return None
+            matrix = self._get_matrix(row + 1)
+            if matrix is None:
+                return None
+            return matrix[row].tolist()
+
+    def put(self, key: str, vector: List[float]) -> None:
+        """Append a vector to the store unless the key is already present."""
+        values = np.asarray(vector, dtype=np.float32)
+        if values.shape != (self.dimensions,):
+            logger.warning(
+                f"Skipping disk cache write: expected {self.dimensions} dimensions, got {values.shape}"
+            )
+            return
+        with self._lock:
+            self._refresh_keys()
+            if key in self._rows:
+                return
+            with open(self._lock_path, "a") as lock_file:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    # Another worker may have appended since our last refresh
+                    self._refresh_keys()
+                    if key in self._rows:
+                        return
+                    # Drop a row orphaned by a writer that crashed before writing its key
+                    row = self._key_lines
+                    if self._row_count() > row:
+                        logger.warning(f"Truncating {self._row_count() - row} orphaned rows in {self._vectors_path}")
+                        os.truncate(self._vectors_path, row * 4 * self.dimensions)
+                        self._matrix = None
+                    with open(self._vectors_path, "ab") as f:
+                        f.write(values.tobytes())
+                    with open(self._keys_path, "a", encoding="ascii") as f:
+                        f.write(f"{key} {row}\n")
+                    self._rows[key] = row
+                    self._key_lines += 1
+                    self._keys_offset = os.path.getsize(self._keys_path)
+                finally:
+                    if fcntl is not None:
+                        fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._refresh_keys()
+            return len(self._rows)
+
+    def _row_count(self) -> int:
+        if not os.path.exists(self._vectors_path):
+            return 0
+        return os.path.getsize(self._vectors_path) // (4 * self.dimensions)
+
+    def _refresh_keys(self) -> None:
+        """Read keys appended by any process since the last refresh. Caller holds the lock."""
+        if not os.path.exists(self._keys_path):
+            return
+        size = os.path.getsize(self._keys_path)
+        if size <= self._keys_offset:
+            return
+        with open(self._keys_path, "r", encoding="ascii") as f:
+            f.seek(self._keys_offset)
+            data = f.read(size - self._keys_offset)
+        # Only consume complete lines; a partial line is picked up next time
+        end = data.rfind("\n")
+        if end < 0:
+            return
+        for line in data[:end].split("\n"):
+            key, _, row = line.partition(" ")
+            # Lines without a row number come from stores written before rows were recorded
+            self._rows.setdefault(key, int(row) if row else self._key_lines)
+            self._key_lines += 1
+        self._keys_offset += end + 1
+
+    def _get_matrix(self, min_rows: int) -> Optional[np.memmap]:
+        """Return a memory map covering at least ``min_rows`` rows. Caller holds the lock."""
+        if self._matrix is None or self._matrix.shape[0] < min_rows:
+            rows = self._row_count()
+            if rows < min_rows:
+                return None
+            self._matrix = np.memmap(
+                self._vectors_path, dtype=np.float32, mode="r", shape=(rows, self.dimensions)
+            )
+        return self._matrix
+
+
+@dataclass
+class CachedEmbedder(Embedder):
+    """
+    Embedder wrapper that caches embeddings in memory and optionally on disk.
+
+    Args:
+        embedder: The embedder doing the actual work (e.g. ``MistralEmbedder``)
+        cache_size: Maximum number of embeddings kept in the in-process LRU
+        cache_dir: Directory of the shared on-disk tier (disabled when None)
+    """
+
+    embedder: Optional[Embedder] = None
+    cache_size: int = EMBEDDING_CACHE_SIZE
+    cache_dir: Optional[str] = EMBEDDING_CACHE_DIR
+
+    def __post_init__(self):
+        if self.embedder is None:
+            raise ValueError("CachedEmbedder requires an embedder to wrap")
+        self.dimensions = self.embedder.dimensions
+        self.id: str = str(getattr(self.embedder, "id", type(self.embedder).__name__))
+        self._memory = LRUCache(maxsize=self.cache_size)
+        self._disk: Optional[DiskEmbeddingStore] = None
+        if self.cache_dir:
+            self._disk = DiskEmbeddingStore(self.cache_dir, self.id, self.dimensions)
+            logger.info(f"Disk embedding cache enabled at {self._disk.path}")
+
+    def _lookup(self, text: str) -> Tuple[str, Optional[List[float]]]:
+        """Look a text up in both tiers, promoting disk hits to memory."""
+        key = embedding_key(self.id, text)
+        cached = self._memory.get(key)
+        if cached is not MISSING:
+            metrics.increment("embedding_cache_requests_total", result="memory_hit", model=self.id)
+            return key, cached
+        if self._disk is not None:
+            stored = self._disk.get(key)
+            if stored is not None:
+                metrics.increment("embedding_cache_requests_total", result="disk_hit", model=self.id)
+                self._memory.set(key, stored)
+                return key, stored
+        metrics.increment("embedding_cache_requests_total", result="miss", model=self.id)
+        return key, None
+
+    def _store(self, key: str, embedding: List[float]) -> None:
+        # Failed embeddings come back empty and must not be cached
+        if not embedding:
+            return
+        self._memory.set(key, embedding)
+        if self._disk is not None:
+            self._disk.put(key, embedding)
+
+    def get_embedding(self, text: str) -> List[float]:
+        key, cached = self._lookup(text)
+        if cached is not None:
+            return cached
+        embedding = self.embedder.get_embedding(text)
+        self._store(key, embedding)
+        return embedding
+
+    def get_embedding_and_usage(self, text: str) -> Tuple[List[float], Optional[Dict[str, Any]]]:
+        key, cached = self._lookup(text)
+        if cached is not None:
+            return cached, None
+        embedding, usage = self.embedder.get_embedding_and_usage(text)
+        self._store(key, embedding)
+        return embedding, usage
+
+    def get_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed several texts, sending only the cache misses to the wrapped embedder.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            List[List[float]]: One embedding per text, in input order
+        """
+        results: List[Optional[List[float]]] = []
+        missing: Dict[str, List[int]] = {}
+        for position, text in enumerate(texts):
+            key, cached = self._lookup(text)
+            results.append(cached)
+            if cached is None:
+                missing.setdefault(key, []).append(position)
+
+        if missing:
+            keys = list(missing)
+            embeddings = batch_embed(self.embedder, [texts[missing[key][0]] for key in keys])
+            for key, embedding in zip(keys, embeddings):
+                self._store(key, embedding)
+                for position in missing[key]:
+                    results[position] = embedding
+        return results
+
+    def stats(self) -> Dict[str, float]:
+        """Return hit counts and the overall hit rate of this embedder's cache."""
+        memory_hits = metrics.get_counter("embedding_cache_requests_total", result="memory_hit", model=self.id)
+        disk_hits = metrics.get_counter("embedding_cache_requests_total", result="disk_hit", model=self.id)
+        misses = metrics.get_counter("embedding_cache_requests_total", result="miss", model=self.id)
+        total = memory_hits + disk_hits + misses
+        return {
+            "memory_hits": memory_hits,
+            "disk_hits": disk_hits,
+            "misses": misses,
+            "hit_rate": (memory_hits + disk_hits) / total if total else 0.0,
+        }
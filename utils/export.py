@@ -0,0 +1,219 @@
+# utils/export.py
+"""
+Streaming NDJSON export of tickets and workflow runs.
+
+Analytics takes nightly dumps of every ticket and every workflow run. Both
+datasets can be large, so nothing here builds the whole dump in memory.
+Records are read one page or one session file at a time and turned into
+newline-delimited JSON. Lines are grouped into chunks of about
+``EXPORT_CHUNK_SIZE`` bytes, and each chunk can be gzip-compressed as it is
+produced:
+
+- ``iter_tickets`` pages through a ``TicketStore`` with its keyset cursors,
+  newest first. Tickets created during the export do not shift later pages.
+- ``iter_workflow_runs`` reads the workflow session files in
+  ``WORKFLOW_STORAGE_PATH`` (agno ``JsonStorage`` keeps one JSON file per
+  session) one at a time. It yields one record per run. Files not modified
+  since the start of the range are skipped without being read.
+
+Memory use is bounded by the page size and the largest session, not by the
+dataset. The API endpoints and ``scripts/export.py`` share these functions.
+"""
+
+import json
+import os
+import zlib
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from dotenv import load_dotenv
+
+from .logger import get_logger
+from .metrics import metrics
+from .ticket_store import MAX_PAGE_SIZE, TIMESTAMP_FORMAT, TicketStore
+
+# Configure logging
+logger = get_logger(__name__)
+
+# Load environment variables
+load_dotenv()
+
+# Configuration
+WORKFLOW_STORAGE_PATH = os.getenv("WORKFLOW_STORAGE_PATH", "storage/workflow_data.json")
+
+EXPORT_CHUNK_SIZE = 64 * 1024
+GZIP_LEVEL = 6
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+GZIP_MEDIA_TYPE = "application/gzip"
+
+
+def parse_export_time(value: Optional[str]) -> Optional[datetime]:
+    """
+    Parse a range bound such as ``2026-03-01`` or ``2026-03-01T12:00:00``.
+
+    Args:
+        value: ISO date or timestamp, or None for an open bound
+
+    Returns:
+        Optional[datetime]: Naive local time, like ticket timestamps
+
+    Raises:
+        ValueError: If the value is not an ISO date or timestamp
+    """
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.strip())
+    except ValueError as e:
+        raise ValueError(f"Invalid time '{value}'; expected an ISO date or timestamp") from e
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone().replace(tzinfo=None)
+    return parsed
+
+
+def iter_tickets(
+    store: TicketStore, since: Optional[datetime] = None, until: Optional[datetime] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Yield tickets created in ``[since, until)``, newest first.
+
+    Args:
+        store: Ticket store to read
+        since: Earliest creation time (inclusive)
+        until: Latest creation time (exclusive)
+
+    Yields:
+        Dict[str, Any]: Ticket records
+    """
+    created_after = since.strftime(TIMESTAMP_FORMAT) if since else None
+    created_before = until.strftime(TIMESTAMP_FORMAT) if until else None
+    cursor = None
+    while True:
+        page, cursor = store.query(
+            created_after=created_after, created_before=created_before, limit=MAX_PAGE_SIZE, cursor=cursor
+        )
+        yield from page
+        if cursor is None:
+            return
+
+
+def _session_runs(session: Dict[str, Any]) -> List[Dict[str, Any]]:
+    runs = (session.get("memory") or {}).get("runs") or []
+    if isinstance(runs, dict):
+        # Memory v2 keeps runs per session ID
+        runs = [run for session_runs in runs.values() for run in session_runs]
+    return runs
+
+
+def iter_workflow_runs(
+    storage_dir: str = WORKFLOW_STORAGE_PATH, since: Optional[datetime] = None, until: Optional[datetime] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Yield workflow runs started in ``[since, until)``, one session file at a time.
+
+    Args:
+        storage_dir: ``JsonStorage`` directory of workflow sessions
+        since: Earliest run time (inclusive)
+        until: Latest run time (exclusive)
+
+    Yields:
+        Dict[str, Any]: Session and user IDs, run time, input and response of each run
+    """
+    if not os.path.isdir(storage_dir):
+        return
+    since_ts = since.timestamp() if since else None
+    until_ts = until.timestamp() if until else None
+    with os.scandir(storage_dir) as entries:
+        for entry in entries:
+            if not entry.name.endswith(".json") or not entry.is_file():
+                continue
+            # A session not written since the range start holds no run in it
+            if since_ts is not None and entry.stat().st_mtime < since_ts:
+                continue
+            try:
+                with open(entry.path, "r", encoding="utf-8") as f:
+                    session = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Skipping unreadable session file {entry.name}: {str(e)}")
+                continue
+            for run in _session_runs(session):
+                response = run.get("response") or {}
+                created = response.get("created_at") or run.get("created_at") or session.get("created_at")
+                if not isinstance(created, (int, float)):
+                    continue
+                if (since_ts is not None and created < since_ts) or (until_ts is not None and created >= until_ts):
+                    continue
+                yield {
+                    "session_id": session.get("session_id"),
+                    "user_id": session.get("user_id"),
+                    "workflow_id": session.get("workflow_id"),
+                    "created_at": datetime.fromtimestamp(created).strftime(TIMESTAMP_FORMAT),
+                    "input": run.get("input"),
+                    "response": response or None,
+                }
+
+
+def ndjson_chunks(
+    records: Iterable[Dict[str, Any]], dataset: str, chunk_size: int = EXPORT_CHUNK_SIZE
+) -> Iterator[bytes]:
+    """
+    Serialize records as NDJSON, grouped into chunks of about ``chunk_size`` bytes.
+
+    Args:
+        records: Records to serialize
+        dataset: Dataset name used in the ``export_records_total`` metric
+        chunk_size: Bytes buffered before a chunk is yielded
+
+    Yields:
+        bytes: UTF-8 NDJSON chunks, each ending on a line boundary
+    """
+    buffer: List[bytes] = []
+    buffered = 0
+    count = 0
+    for record in records:
+        line = (json.dumps(record, ensure_ascii=False, default=str) + "\n").encode("utf-8")
+        buffer.append(line)
+        buffered += len(line)
+        count += 1
+        if buffered >= chunk_size:
+            yield b"".join(buffer)
+            buffer, buffered = [], 0
+    if buffer:
+        yield b"".join(buffer)
+    metrics.increment("export_records_total", count, dataset=dataset)
+    logger.info(f"Exported {count} records ({dataset})")
+
+
+def gzip_chunks(chunks: Iterable[bytes], level: int = GZIP_LEVEL) -> Iterator[bytes]:
+    """
+    Gzip a stream of chunks on the fly.
+
+    Args:
+        chunks: Uncompressed chunks
+        level: zlib compression level
+
+    Yields:
+        bytes: Chunks of one gzip member
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def export_stream(records: Iterable[Dict[str, Any]], dataset: str, compress: bool = False) -> Iterator[bytes]:
+    """
+    Stream records as NDJSON, gzip-compressed if requested.
+
+    Args:
+        records: Records to export
+        dataset: Dataset name for the metrics
+        compress: Gzip the stream
+
+    Returns:
+        Iterator[bytes]: Output chunks
+    """
+    chunks = ndjson_chunks(records, dataset)
+    return gzip_chunks(chunks) if compress else chunks
@@ -0,0 +1,129 @@
+# utils/fast_path.py
+"""
+Deterministic answers to ticket-status queries.
+
+"What's the status of TK-1004?" needs one dictionary lookup, yet it went
+through the router LLM, the support agent's tool-calling loop and the
+personality layer. ``match_ticket_status_query`` recognises such queries
+with regular expressions (ticket IDs plus a status keyword, in English or
+Portuguese) so the workflow can call ``check_ticket_status`` itself and
+answer with ``render_ticket_status``.
+
+Anything less clear-cut is left to the LLM path: queries without a status
+keyword, with another support intent (cancel, escalate, complain...), with
+too many tickets, or too long to be a plain status question.
+"""
+
+import os
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from dotenv import load_dotenv
+
+from .logger import get_logger
+
+# Configure logging
+logger = get_logger(__name__)
+
+# Load environment variables
+load_dotenv()
+
+# Configuration
+TICKET_FAST_PATH = os.getenv("TICKET_FAST_PATH", "true").lower() == "true"
+
+# Longer queries usually carry more than a status question
+MAX_FAST_PATH_WORDS = 25
+MAX_FAST_PATH_TICKETS = 3
+
+TICKET_ID_PATTERN = re.compile(r"\bTK[-\s]?(\d{3,})\b", re.IGNORECASE)
+STATUS_PATTERN = re.compile(
+    r"\b(status|state|update|updates|progress|check|track|tracking|where\s+is|what'?s\s+happening|"
+    r"situa[çc][ãa]o|andamento|acompanhar|atualiza[çc][ãa]o|novidades?|como\s+est[áa]|status\s+do|verificar)\b",
+    re.IGNORECASE,
+)
+# Requests that need the support agent even when a ticket and "status" appear
+OTHER_INTENT_PATTERN = re.compile(
+    r"\b(cancel|close|reopen|escalate|urgent|complain|complaint|refund|change|update\s+my|add|why|"
+    r"cancelar|fechar|reabrir|escalar|urgente|reclama[çc][ãa]o|reembolso|estorno|alterar|mudar|por\s*que|porque)\b",
+    re.IGNORECASE,
+)
+PORTUGUESE_PATTERN = re.compile(
+    r"\b(qual|como|est[áa]|meu|minha|chamado|situa[çc][ãa]o|andamento|acompanhar|do|da|o)\b", re.IGNORECASE
+)
+
+STATUS_LABELS = {
+    "en": {"open": "open", "in_progress": "in progress", "resolved": "resolved", "closed": "closed"},
+    "pt": {"open": "aberto", "in_progress": "em andamento", "resolved": "resolvido", "closed": "fechado"},
+}
+
+
+@dataclass
+class TicketStatusQuery:
+    """A query recognised as a plain ticket-status question."""
+
+    ticket_ids: List[str]
+    language: str
+
+
+def normalize_ticket_id(number: str) -> str:
+    """Return the canonical ``TK-<number>`` form of a ticket number."""
+    return f"TK-{number}"
+
+
+def match_ticket_status_query(query: str) -> Optional[TicketStatusQuery]:
+    """
+    Recognise a plain ticket-status question.
+
+    Args:
+        query: User query
+
+    Returns:
+        Optional[TicketStatusQuery]: The tickets asked about and the reply
+        language, or None when the query should go to the LLM
+    """
+    ticket_ids = list(dict.fromkeys(normalize_ticket_id(number) for number in TICKET_ID_PATTERN.findall(query)))
+    if not ticket_ids or len(ticket_ids) > MAX_FAST_PATH_TICKETS:
+        return None
+    if len(query.split()) > MAX_FAST_PATH_WORDS:
+        return None
+    # Ticket IDs alone ("TK-1004?") are read as a status question
+    remainder = TICKET_ID_PATTERN.sub(" ", query)
+    has_words = bool(re.search(r"[^\W\d_]{3,}", remainder))
+    if has_words and not STATUS_PATTERN.search(remainder):
+        return None
+    if OTHER_INTENT_PATTERN.search(remainder):
+        return None
+    language = "pt" if len(PORTUGUESE_PATTERN.findall(remainder)) >= 2 else "en"
+    return TicketStatusQuery(ticket_ids=ticket_ids, language=language)
+
+
+def _render_one(result: Dict[str, Any], ticket_id: str, language: str) -> str:
+    if not result.get("ticket_found"):
+        if language == "pt":
+            return f"Não encontrei o chamado {ticket_id}. Confira o número ou me conte o que aconteceu que eu abro um novo para você."
+        return f"I couldn't find ticket {ticket_id}. Please double-check the number, or tell me what happened and I'll open a new one for you."
+    status = STATUS_LABELS[language].get(result["status"], result["status"])
+    if language == "pt":
+        return (
+            f"O chamado {result['ticket_id']} (\"{result['subject']}\") está {status}, com prioridade {result['priority']}, "
+            f"atribuído a {result['assigned_to']}. Última atualização: {result['updated_at']}."
+        )
+    return (
+        f"Ticket {result['ticket_id']} (\"{result['subject']}\") is {status}, with {result['priority']} priority, "
+        f"assigned to {result['assigned_to']}. Last updated: {result['updated_at']}."
+    )
+
+
+def render_ticket_status(results: Dict[str, Dict[str, Any]], language: str = "en") -> str:
+    """
+    Render ``check_ticket_status`` results as a reply.
+
+    Args:
+        results: Lookup result per ticket ID
+        language: ``en`` or ``pt``
+
+    Returns:
+        str: One sentence per ticket
+    """
+    return "\n".join(_render_one(result, ticket_id, language) for ticket_id, result in results.items())
@@ -0,0 +1,313 @@
+# utils/index_snapshot.py
+"""
+Portable snapshots of the knowledge index.
+
+``export_snapshot`` packs everything a server needs to answer knowledge
+queries into one gzipped tarball::
+
+    snapshot.json          format version, collection, embedder, chunk count
+                           and the SHA-256 of every other member
+    chunks.jsonl           one {"id", "content", "meta_data"} object per chunk
+    vectors.npy            float32 embeddings, row N belongs to line N
+    ingest_manifest.json   manifest for later incremental loads
+
+The snapshot holds records rather than the Chroma and tantivy files, whose
+on-disk formats change between library versions. ``import_snapshot``
+verifies the format version, the checksums and the embedder, then writes
+the chunks with their stored embeddings into the Chroma collection and
+rebuilds the lexical and memory-mapped indexes from them, so no chunk is
+embedded again.
+
+With ``INDEX_SNAPSHOT_PATH`` set, ``restore_index_snapshot`` runs this at
+API start-up: a container starts with a loaded knowledge base, and an
+artifact from an incompatible build stops the start-up with an error instead
+of serving from a mismatched index. The digest of the last imported
+snapshot is kept in ``INDEX_SNAPSHOT_STATE_PATH`` so restarts skip the import.
+"""
+
+import hashlib
+import io
+import json
+import os
+import tarfile
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from agno.document import Document
+from dotenv import load_dotenv
+
+from .ingestion import INGEST_MANIFEST_PATH, IngestManifest, upsert_documents
+from .lexical_index import LexicalIndex
+from .logger import get_logger
+from .vector_index import MemmapVectorIndex
+
+# Configure logging
+logger = get_logger(__name__)
+
+# Load environment variables
+load_dotenv()
+
+# Configuration
+INDEX_SNAPSHOT_PATH = os.getenv("INDEX_SNAPSHOT_PATH") or None
+INDEX_SNAPSHOT_STATE_PATH = os.getenv("INDEX_SNAPSHOT_STATE_PATH", "storage/index_snapshot.json")
+
+FORMAT_VERSION = 1
+MANIFEST_MEMBER = "snapshot.json"
+CHUNKS_MEMBER = "chunks.jsonl"
+VECTORS_MEMBER = "vectors.npy"
+INGEST_MANIFEST_MEMBER = "ingest_manifest.json"
+# Chroma rejects upserts above its maximum batch size (5461 in chromadb 1.x)
+UPSERT_BATCH_SIZE = 1000
+
+
+class SnapshotError(ValueError):
+    """Raised when a snapshot is corrupt or incompatible with this server."""
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def file_sha256(path: str) -> str:
+    """Return the SHA-256 of a file."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _embedder_id(vector_db) -> str:
+    return str(getattr(vector_db.embedder, "id", type(vector_db.embedder).__name__))
+
+
+def _add_member(archive: tarfile.TarFile, name: str, data: bytes) -> None:
+    info = tarfile.TarInfo(name)
+    info.size = len(data)
+    info.mtime = int(datetime.now(timezone.utc).timestamp())
+    archive.addfile(info, io.BytesIO(data))
+
+
+def export_snapshot(vector_db, output_path: str, manifest_path: str = INGEST_MANIFEST_PATH) -> Dict[str, Any]:
+    """
+    Write the collection behind an agno ``ChromaDb`` to a snapshot archive.
+
+    Args:
+        vector_db: Vector database to export
+        output_path: Archive to write (``.tar.gz``)
+        manifest_path: Ingest manifest to include, if it exists
+
+    Returns:
+        Dict[str, Any]: The snapshot manifest
+
+    Raises:
+        SnapshotError: If the collection is empty
+    """
+    collection = vector_db.client.get_collection(name=vector_db.collection_name)
+    stored = collection.get(include=["embeddings", "documents", "metadatas"])
+    if not stored["ids"]:
+        raise SnapshotError(f"Collection '{vector_db.collection_name}' is empty, nothing to export")
+
+    vectors = np.asarray(stored["embeddings"], dtype=np.float32)
+    metadatas = stored["metadatas"] or [{}] * len(stored["ids"])
+    chunks = "".join(
+        json.dumps({"id": doc_id, "content": content, "meta_data": meta_data or {}}, ensure_ascii=False) + "\n"
+        for doc_id, content, meta_data in zip(stored["ids"], stored["documents"], metadatas)
+    ).encode("utf-8")
+    vectors_buffer = io.BytesIO()
+    np.save(vectors_buffer, vectors)
+    members = {CHUNKS_MEMBER: chunks, VECTORS_MEMBER: vectors_buffer.getvalue()}
+    if os.path.exists(manifest_path):
+        with open(manifest_path, "rb") as f:
+            members[INGEST_MANIFEST_MEMBER] = f.read()
+
+    manifest = {
+        "format_version": FORMAT_VERSION,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "collection": vector_db.collection_name,
+        "embedder": _embedder_id(vector_db),
+        "dimensions": int(vectors.shape[1]),
+        "chunks": len(stored["ids"]),
+        "checksums": {name: _sha256(data) for name, data in members.items()},
+    }
+
+    directory = os.path.dirname(output_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{output_path}.tmp"
+    with tarfile.open(tmp_path, "w:gz") as archive:
+        # The manifest comes first so readers can check compatibility early
+        _add_member(archive, MANIFEST_MEMBER, json.dumps(manifest, indent=2).encode("utf-8"))
+        for name, data in members.items():
+            _add_member(archive, name, data)
+    os.replace(tmp_path, output_path)
+    logger.info(f"Exported {manifest['chunks']} chunks ({manifest['embedder']}) to {output_path}")
+    return manifest
+
+
+def read_snapshot(path: str) -> Dict[str, Any]:
+    """
+    Read and verify a snapshot archive.
+
+    Args:
+        path: Snapshot archive
+
+    Returns:
+        Dict[str, Any]: ``manifest``, ``documents`` (with embeddings) and the
+        raw ``ingest_manifest`` bytes, or None
+
+    Raises:
+        SnapshotError: If the format version is unsupported or a member is
+            missing or fails its checksum
+    """
+    with tarfile.open(path, "r:gz") as archive:
+        members = {}
+        for member in archive.getmembers():
+            if member.isfile():
+                members[member.name] = archive.extractfile(member).read()
+
+    if MANIFEST_MEMBER not in members:
+        raise SnapshotError(f"{path} is not an index snapshot ({MANIFEST_MEMBER} is missing)")
+    manifest = json.loads(members[MANIFEST_MEMBER])
+    if manifest.get("format_version") != FORMAT_VERSION:
+        raise SnapshotError(
+            f"Snapshot {path} has format version {manifest.get('format_version')}, this server reads version {FORMAT_VERSION}"
+        )
+    for name, checksum in manifest["checksums"].items():
+        if name not in members:
+            raise SnapshotError(f"Snapshot {path} is missing {name}")
+        if _sha256(members[name]) != checksum:
+            raise SnapshotError(f"Checksum mismatch for {name} in snapshot {path}")
+
+    vectors = np.load(io.BytesIO(members[VECTORS_MEMBER]))
+    records = [json.loads(line) for line in members[CHUNKS_MEMBER].decode("utf-8").splitlines() if line]
+    if len(records) != manifest["chunks"] or vectors.shape != (manifest["chunks"], manifest["dimensions"]):
+        raise SnapshotError(f"Snapshot {path} has {len(records)} chunks and {vectors.shape} vectors, expected {manifest['chunks']}")
+
+    documents: List[Document] = [
+        Document(id=record["id"], content=record["content"], meta_data=record["meta_data"], embedding=vector.tolist())
+        for record, vector in zip(records, vectors)
+    ]
+    return {"manifest": manifest, "documents": documents, "ingest_manifest": members.get(INGEST_MANIFEST_MEMBER)}
+
+
+def import_snapshot(
+    path: str,
+    vector_db,
+    lexical_index: Optional[LexicalIndex] = None,
+    vector_index: Optional[MemmapVectorIndex] = None,
+    manifest_path: str = INGEST_MANIFEST_PATH,
+) -> Dict[str, Any]:
+    """
+    Replace the knowledge index with the contents of a snapshot.
+
+    Args:
+        path: Snapshot archive
+        vector_db: Vector database to load; its embedder must match the snapshot's
+        lexical_index: Full-text index to rebuild from the chunks
+        vector_index: Memory-mapped index to rebuild from the vectors
+        manifest_path: Where to write the snapshot's ingest manifest
+
+    Returns:
+        Dict[str, Any]: The snapshot manifest
+
+    Raises:
+        SnapshotError: If the snapshot is corrupt, has another format version,
+            or was built for another collection or embedder
+    """
+    snapshot = read_snapshot(path)
+    manifest = snapshot["manifest"]
+    embedder_id = _embedder_id(vector_db)
+    if manifest["embedder"] != embedder_id:
+        raise SnapshotError(
+            f"Snapshot {path} was embedded with '{manifest['embedder']}', this server queries with '{embedder_id}'"
+        )
+    if manifest["collection"] != vector_db.collection_name:
+        raise SnapshotError(f"Snapshot {path} is for collection '{manifest['collection']}', not '{vector_db.collection_name}'")
+
+    documents = snapshot["documents"]
+    vector_db.drop()
+    vector_db.create()
+    for start in range(0, len(documents), UPSERT_BATCH_SIZE):
+        upsert_documents(vector_db, documents[start:start + UPSERT_BATCH_SIZE])
+    if lexical_index is not None:
+        lexical_index.clear()
+        lexical_index.upsert(documents)
+    if vector_index is not None:
+        vector_index.build(
+            [d.id for d in documents],
+            [d.embedding for d in documents],
+            [d.content for d in documents],
+            [d.meta_data for d in documents],
+            embedder_id,
+        )
+
+    if snapshot["ingest_manifest"] is not None:
+        directory = os.path.dirname(manifest_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(manifest_path, "wb") as f:
+            f.write(snapshot["ingest_manifest"])
+    else:
+        # Without a manifest the next /load_database rebuilds the collection
+        IngestManifest(manifest_path).save()
+
+    logger.info(f"Imported {manifest['chunks']} chunks from snapshot {path} (created {manifest['created_at']})")
+    return manifest
+
+
+def restore_index_snapshot(
+    vector_db,
+    lexical_index: Optional[LexicalIndex] = None,
+    vector_index: Optional[MemmapVectorIndex] = None,
+    path: Optional[str] = INDEX_SNAPSHOT_PATH,
+    state_path: str = INDEX_SNAPSHOT_STATE_PATH,
+    manifest_path: str = INGEST_MANIFEST_PATH,
+) -> Optional[Dict[str, Any]]:
+    """
+    Import the configured snapshot at start-up unless it is already loaded.
+
+    Args:
+        vector_db: Vector database to load
+        lexical_index: Full-text index to rebuild
+        vector_index: Memory-mapped index to rebuild
+        path: Snapshot archive (None disables the restore)
+        state_path: Record of the last imported snapshot
+        manifest_path: Where to write the snapshot's ingest manifest
+
+    Returns:
+        Optional[Dict[str, Any]]: The imported snapshot manifest, or None if
+        nothing was imported
+
+    Raises:
+        SnapshotError: If the snapshot is corrupt or incompatible
+    """
+    if not path:
+        return None
+    if not os.path.exists(path):
+        logger.warning(f"Index snapshot {path} not found, starting with the existing knowledge base")
+        return None
+
+    digest = file_sha256(path)
+    try:
+        with open(state_path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        state = {}
+    if state.get("sha256") == digest and state.get("format_version") == FORMAT_VERSION and vector_db.exists():
+        logger.info(f"Index snapshot {path} already imported, skipping")
+        return None
+
+    try:
+        manifest = import_snapshot(path, vector_db, lexical_index, vector_index, manifest_path)
+    except Exception as e:
+        logger.error(f"Failed to restore index snapshot {path}: {str(e)}")
+        raise
+
+    directory = os.path.dirname(state_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(state_path, "w", encoding="utf-8") as f:
+        json.dump({"path": os.path.abspath(path), "sha256": digest, **manifest}, f, indent=2)
+    return manifest
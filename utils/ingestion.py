@@ -0,0 +1,501 @@
+# utils/ingestion.py
+"""
+Knowledge base ingestion pipeline.
+
+Replaces ``AgentKnowledge.aload`` for the website knowledge base. agno embeds
+chunks one request at a time; this pipeline instead:
+
+1. Reads every URL concurrently with the knowledge base's own reader, so
+   chunking is unchanged.
+2. Embeds chunks in batches of ``EMBEDDING_BATCH_SIZE`` with up to
+   ``EMBEDDING_CONCURRENCY`` batches in flight, throttled by a token bucket
+   (``EMBEDDING_RATE_LIMIT`` requests per second).
+3. Retries failed batches only, with exponential backoff.
+4. Upserts the vectors into the Chroma collection with the same document ids
+   agno uses, so searches and later loads see identical records.
+5. Keeps the tantivy ``LexicalIndex`` in sync with the collection, and
+   rebuilds the memory-mapped ``MemmapVectorIndex`` from it, when given.
+
+Loads are incremental by default. Chunk ids are content hashes, so a chunk
+whose text is unchanged keeps its id and its stored embedding; only new ids
+are embedded, and ids that vanished from a page are deleted. What each seed URL
+contributed is tracked in an ingest manifest (``INGEST_MANIFEST_PATH``).
+
+Throughput is reported as chunks per second in the returned report and in the
+metrics registry.
+"""
+
+import asyncio
+import json
+import os
+import time
+from dataclasses import asdict, dataclass, field
+from hashlib import md5, sha256
+from typing import Any, Dict, List, Optional
+
+from agno.document import Document
+from agno.embedder.base import Embedder
+from dotenv import load_dotenv
+
+from .dedup import SHARED_SOURCE
+from .embedding_cache import batch_embed
+from .lexical_index import LexicalIndex
+from .logger import get_logger
+from .metrics import metrics
+from .rate_limit import RateLimiter
+from .vector_index import MemmapVectorIndex
+
+# Configure logging
+logger = get_logger(__name__)
+
+# Load environment variables
+load_dotenv()
+
+# Configuration
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "32"))
+EMBEDDING_CONCURRENCY = int(os.getenv("EMBEDDING_CONCURRENCY", "4"))
+EMBEDDING_RATE_LIMIT = float(os.getenv("EMBEDDING_RATE_LIMIT", "5"))
+EMBEDDING_MAX_RETRIES = int(os.getenv("EMBEDDING_MAX_RETRIES", "3"))
+EMBEDDING_RETRY_BACKOFF = float(os.getenv("EMBEDDING_RETRY_BACKOFF", "1.0"))
+INGEST_MANIFEST_PATH = os.getenv("INGEST_MANIFEST_PATH", "storage/ingest_manifest.json")
+
+
+@dataclass
+class IngestionReport:
+    """Outcome of one ingestion run."""
+
+    urls: int = 0
+    chunks: int = 0
+    embedded: int = 0
+    batches: int = 0
+    retries: int = 0
+    failed_batches: int = 0
+    failed_chunks: int = 0
+    failed_urls: int = 0
+    mode: str = "full"
+    pages: int = 0
+    pages_changed: int = 0
+    chunks_unchanged: int = 0
+    chunks_deleted: int = 0
+    shared_chunks: int = 0
+    seconds: float = 0.0
+    errors: List[str] = field(default_factory=list)
+    crawl: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def chunks_per_second(self) -> float:
+        return self.embedded / self.seconds if self.seconds > 0 else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["chunks_per_second"] = round(self.chunks_per_second, 2)
+        data["seconds"] = round(self.seconds, 3)
+        return data
+
+
+def document_id(document: Document) -> str:
+    """Return the id agno's ChromaDb assigns to a document."""
+    return md5(clean_content(document).encode()).hexdigest()
+
+
+def clean_content(document: Document) -> str:
+    """Return the document content as ChromaDb stores it."""
+    return document.content.replace("\x00", "\ufffd")
+
+
+def as_stored_document(document: Document) -> Document:
+    """Return a copy of a chunk with the id and content the collection stores."""
+    return Document(
+        id=document_id(document),
+        content=clean_content(document),
+        meta_data=dict(document.meta_data or {}),
+    )
+
+
+def unique_documents(documents: List[Document]) -> List[Document]:
+    """Drop chunks whose content (and therefore id) was already seen."""
+    seen = set()
+    unique = []
+    for document in documents:
+        doc_id = document_id(document)
+        if doc_id not in seen:
+            seen.add(doc_id)
+            unique.append(document)
+    return unique
+
+
+class EmbeddingPipeline:
+    """
+    Embeds documents in concurrent, rate-limited batches.
+
+    Args:
+        embedder: Embedder used for every batch
+        batch_size: Chunks per embedding request
+        concurrency: Maximum number of requests in flight
+        rate_limit: Embedding requests per second (<= 0 disables the limit)
+        max_retries: Retries per failed batch before giving up on it
+        retry_backoff: Base delay in seconds, doubled after every retry
+    """
+
+    def __init__(
+        self,
+        embedder: Embedder,
+        batch_size: int = EMBEDDING_BATCH_SIZE,
+        concurrency: int = EMBEDDING_CONCURRENCY,
+        rate_limit: float = EMBEDDING_RATE_LIMIT,
+        max_retries: int = EMBEDDING_MAX_RETRIES,
+        retry_backoff: float = EMBEDDING_RETRY_BACKOFF,
+    ):
+        if batch_size < 1 or concurrency < 1:
+            raise ValueError("batch_size and concurrency must be at least 1")
+        self.embedder = embedder
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.rate_limiter = RateLimiter(rate_limit, burst=concurrency)
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+
+    async def _embed_batch(self, batch: List[Document], report: IngestionReport) -> bool:
+        """Embed one batch in place, retrying it on failure. Returns True on success."""
+        texts = [document.content for document in batch]
+        for attempt in range(self.max_retries + 1):
+            await self.rate_limiter.acquire_async()
+            started = time.perf_counter()
+            try:
+                embeddings = await asyncio.to_thread(batch_embed, self.embedder, texts)
+            except Exception as e:
+                metrics.observe("ingestion_batch_seconds", time.perf_counter() - started, result="error")
+                if attempt == self.max_retries:
+                    logger.error(f"Embedding batch of {len(batch)} chunks failed after {attempt + 1} attempts: {e}")
+                    report.errors.append(str(e))
+                    return False
+                delay = self.retry_backoff * (2 ** attempt)
+                logger.warning(f"Embedding batch failed ({e}), retrying in {delay:.1f}s")
+                report.retries += 1
+                metrics.increment("ingestion_batch_retries_total")
+                await asyncio.sleep(delay)
+                continue
+
+            metrics.observe("ingestion_batch_seconds", time.perf_counter() - started, result="success")
+            for document, embedding in zip(batch, embeddings):
+                document.embedding = embedding
+            return True
+        return False
+
+    async def embed(self, documents: List[Document], report: Optional[IngestionReport] = None, on_batch=None) -> IngestionReport:
+        """
+        Embed documents, setting ``document.embedding`` on every success.
+
+        Args:
+            documents: Chunks to embed
+            report: Report to update (a new one is created when omitted)
+            on_batch: Optional coroutine function called with each embedded batch
+
+        Returns:
+            IngestionReport: Counts, retries and failures of the run
+        """
+        report = report or IngestionReport()
+        semaphore = asyncio.Semaphore(self.concurrency)
+        batches = [documents[i:i + self.batch_size] for i in range(0, len(documents), self.batch_size)]
+
+        async def run(batch: List[Document]) -> None:
+            async with semaphore:
+                ok = await self._embed_batch(batch, report)
+                report.batches += 1
+                if not ok:
+                    report.failed_batches += 1
+                    report.failed_chunks += len(batch)
+                    metrics.increment("ingestion_failed_batches_total")
+                    return
+                report.embedded += len(batch)
+                metrics.increment("ingestion_chunks_total", len(batch))
+                if on_batch is not None:
+                    await on_batch(batch)
+
+        await asyncio.gather(*(run(batch) for batch in batches))
+        return report
+
+
+async def read_sources(knowledge_base, urls: Optional[List[str]] = None) -> Dict[str, List[Document]]:
+    """
+    Read and chunk every URL of a website knowledge base concurrently.
+
+    Args:
+        knowledge_base: ``WebsiteKnowledgeBase`` whose reader and URLs are used
+        urls: URLs to read instead of ``knowledge_base.urls``
+
+    Returns:
+        Dict[str, List[Document]]: Chunks per seed URL, in URL order. A URL
+        that could not be read maps to an empty list.
+    """
+    reader = knowledge_base.reader
+    urls = urls or knowledge_base.urls
+
+    # Readers that crawl all seeds in one pass (``CrawlingWebsiteReader``)
+    if hasattr(reader, "async_read_many"):
+        try:
+            return await reader.async_read_many(urls)
+        except Exception as e:
+            logger.error(f"Error crawling {len(urls)} URLs: {e}")
+            return {url: [] for url in urls}
+
+    async def read(url: str) -> List[Document]:
+        try:
+            return await reader.async_read(url=url)
+        except Exception as e:
+            logger.error(f"Error reading {url}: {e}")
+            return []
+
+    document_lists = await asyncio.gather(*(read(url) for url in urls))
+    return dict(zip(urls, document_lists))
+
+
+def page_fingerprints(documents: List[Document]) -> Dict[str, str]:
+    """
+    Fingerprint every crawled page from its chunks.
+
+    Args:
+        documents: Chunks read from one seed URL
+
+    Returns:
+        Dict[str, str]: SHA-256 of the ordered chunk contents, per page URL
+    """
+    digests: Dict[str, Any] = {}
+    for document in documents:
+        page = (document.meta_data or {}).get("url") or document.name or ""
+        digests.setdefault(page, sha256()).update(document_id(document).encode())
+    return {page: digest.hexdigest() for page, digest in digests.items()}
+
+
+class IngestManifest:
+    """
+    Record of what the last ingestion wrote to the collection.
+
+    Stored as JSON::
+
+        {"version": 1, "collection": ..., "embedder": ...,
+         "sources": {seed_url: {"pages": {page_url: fingerprint}, "chunks": [ids]}}}
+
+    Args:
+        path: Location of the manifest file
+    """
+
+    VERSION = 1
+
+    def __init__(self, path: str = INGEST_MANIFEST_PATH):
+        self.path = path
+        self.collection: Optional[str] = None
+        self.embedder: Optional[str] = None
+        self.sources: Dict[str, Dict[str, Any]] = {}
+
+    @classmethod
+    def load(cls, path: str = INGEST_MANIFEST_PATH) -> "IngestManifest":
+        """Load a manifest, returning an empty one if it is missing or unreadable."""
+        manifest = cls(path)
+        if not os.path.exists(path):
+            return manifest
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == cls.VERSION:
+                manifest.collection = data.get("collection")
+                manifest.embedder = data.get("embedder")
+                manifest.sources = data.get("sources", {})
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable ingest manifest {path}: {e}")
+        return manifest
+
+    def save(self) -> None:
+        """Write the manifest atomically."""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        data = {
+            "version": self.VERSION,
+            "collection": self.collection,
+            "embedder": self.embedder,
+            "sources": self.sources,
+        }
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def chunk_ids(self) -> set:
+        """Return every chunk id recorded for any source."""
+        return {chunk for source in self.sources.values() for chunk in source.get("chunks", [])}
+
+
+def upsert_documents(vector_db, documents: List[Document]) -> None:
+    """Write embedded documents to the Chroma collection behind an agno ``ChromaDb``."""
+    if not documents:
+        return
+    collection = vector_db.client.get_collection(name=vector_db.collection_name)
+    collection.upsert(
+        ids=[document_id(document) for document in documents],
+        embeddings=[document.embedding for document in documents],
+        documents=[clean_content(document) for document in documents],
+        metadatas=[document.meta_data or {} for document in documents],
+    )
+
+
+def update_metadata(vector_db, documents: List[Document]) -> None:
+    """Rewrite the metadata of stored chunks without re-embedding them."""
+    if not documents:
+        return
+    collection = vector_db.client.get_collection(name=vector_db.collection_name)
+    collection.update(
+        ids=[document_id(document) for document in documents],
+        metadatas=[document.meta_data or {} for document in documents],
+    )
+
+
+def existing_ids(vector_db, ids: List[str]) -> set:
+    """Return the subset of ids already stored in the collection."""
+    if not ids:
+        return set()
+    collection = vector_db.client.get_collection(name=vector_db.collection_name)
+    return set(collection.get(ids=ids, include=[])["ids"])
+
+
+def delete_ids(vector_db, ids: List[str]) -> None:
+    """Delete chunks from the collection by id."""
+    if not ids:
+        return
+    collection = vector_db.client.get_collection(name=vector_db.collection_name)
+    collection.delete(ids=ids)
+
+
+async def load_knowledge_base(
+    knowledge_base,
+    recreate: bool = False,
+    pipeline: Optional[EmbeddingPipeline] = None,
+    manifest_path: str = INGEST_MANIFEST_PATH,
+    sources: Optional[Dict[str, List[Document]]] = None,
+    lexical_index: Optional[LexicalIndex] = None,
+    vector_index: Optional[MemmapVectorIndex] = None,
+) -> IngestionReport:
+    """
+    Load or refresh a website knowledge base in its vector database.
+
+    Without ``recreate`` the load is incremental: pages are fingerprinted,
+    only chunks missing from the collection are embedded, and chunks that
+    disappeared from a successfully read URL, or belong to a URL no longer
+    among the sources, are deleted. URLs that fail to read keep their
+    previous chunks. A full rebuild happens when requested,
+    or when the manifest was written for another collection or embedder.
+
+    Args:
+        knowledge_base: ``WebsiteKnowledgeBase`` with a Chroma vector database
+        recreate: Drop the collection and rebuild it from scratch
+        pipeline: Embedding pipeline (defaults to one using the vector db embedder)
+        manifest_path: Location of the ingest manifest
+        sources: Chunks already read per source URL (e.g. from an offline
+            snapshot); when given, the knowledge base reader and URLs are not used
+        lexical_index: Full-text index kept in sync with the collection
+        vector_index: Memory-mapped copy of the collection, rebuilt after the load
+
+    Returns:
+        IngestionReport: Ingestion statistics, including chunks per second
+    """
+    vector_db = knowledge_base.vector_db
+    pipeline = pipeline or EmbeddingPipeline(vector_db.embedder)
+    urls = [url for url in sources if url != SHARED_SOURCE] if sources is not None else knowledge_base.urls
+    report = IngestionReport(urls=len(urls))
+    started = time.perf_counter()
+
+    try:
+        manifest = IngestManifest.load(manifest_path)
+        embedder_id = str(getattr(vector_db.embedder, "id", type(vector_db.embedder).__name__))
+        if manifest.collection not in (None, vector_db.collection_name) or manifest.embedder not in (None, embedder_id):
+            logger.info("Ingest manifest belongs to another collection or embedder, rebuilding")
+            recreate = True
+        if recreate:
+            vector_db.drop()
+            if lexical_index is not None:
+                lexical_index.clear()
+            manifest = IngestManifest(manifest_path)
+        vector_db.create()
+        report.mode = "full" if recreate else "incremental"
+
+        if sources is None:
+            sources = await read_sources(knowledge_base)
+            crawler = getattr(knowledge_base.reader, "crawler", None)
+            if crawler is not None and hasattr(crawler.stats, "to_dict"):
+                report.crawl = crawler.stats.to_dict()
+        previous_ids = manifest.chunk_ids()
+        # A URL dropped from the seeds or snapshot (or the shared blocks, when
+        # deduplication is off) is no longer a source: its chunks are stale
+        for url in set(manifest.sources) - set(sources):
+            del manifest.sources[url]
+        for url, documents in sources.items():
+            if url == SHARED_SOURCE:
+                # Blocks repeated across pages; an empty list just means none were found
+                report.shared_chunks = len(documents)
+                manifest.sources[url] = {"pages": {}, "chunks": sorted({document_id(d) for d in documents})}
+                continue
+            if not documents:
+                logger.warning(f"No content read from {url}, keeping its previous chunks")
+                report.failed_urls += 1
+                continue
+            old_pages = manifest.sources.get(url, {}).get("pages", {})
+            pages = page_fingerprints(documents)
+            report.pages += len(pages)
+            report.pages_changed += sum(1 for page, digest in pages.items() if old_pages.get(page) != digest)
+            manifest.sources[url] = {
+                "pages": pages,
+                "chunks": sorted({document_id(document) for document in documents}),
+            }
+
+        # Chunk ids are content hashes: unchanged chunks keep their id and embedding
+        documents = unique_documents([d for documents in sources.values() for d in documents])
+        present = existing_ids(vector_db, [document_id(d) for d in documents])
+        to_embed = [d for d in documents if document_id(d) not in present]
+        stale = sorted(previous_ids - manifest.chunk_ids())
+        report.chunks = len(documents)
+        report.chunks_unchanged = len(documents) - len(to_embed)
+
+        logger.info(
+            f"{report.mode.capitalize()} load: {len(to_embed)} chunks to embed, "
+            f"{report.chunks_unchanged} unchanged, {len(stale)} to delete "
+            f"(batch size {pipeline.batch_size}, concurrency {pipeline.concurrency})"
+        )
+
+        write_lock = asyncio.Lock()
+
+        async def write(batch: List[Document]) -> None:
+            async with write_lock:
+                await asyncio.to_thread(upsert_documents, vector_db, batch)
+
+        await pipeline.embed(to_embed, report, on_batch=write)
+        # Shared blocks keep their id when the set of pages they appear on changes
+        shared = [d for d in sources.get(SHARED_SOURCE, []) if document_id(d) in present]
+        await asyncio.to_thread(update_metadata, vector_db, unique_documents(shared))
+        await asyncio.to_thread(delete_ids, vector_db, stale)
+        report.chunks_deleted = len(stale)
+
+        if lexical_index is not None:
+            # Index every chunk stored in the collection; this needs no embedding
+            stored = [d for d in documents if document_id(d) in present or d.embedding]
+            await asyncio.to_thread(lexical_index.upsert, [as_stored_document(d) for d in stored])
+            await asyncio.to_thread(lexical_index.delete, stale)
+        if vector_index is not None:
+            await asyncio.to_thread(vector_index.build_from_chroma, vector_db)
+
+        manifest.collection = vector_db.collection_name
+        manifest.embedder = embedder_id
+        manifest.save()
+    except Exception as e:
+        logger.error(f"Knowledge base ingestion failed: {str(e)}")
+        raise
+    finally:
+        report.seconds = time.perf_counter() - started
+        metrics.set_gauge("ingestion_chunks_per_second", report.chunks_per_second)
+        metrics.increment("ingestion_chunks_deleted_total", report.chunks_deleted)
+
+    logger.info(
+        f"Ingested {report.embedded}/{len(to_embed)} changed chunks in {report.seconds:.2f}s "
+        f"({report.chunks_per_second:.1f} chunks/s, {report.chunks_unchanged} unchanged, "
+        f"{report.chunks_deleted} deleted, {report.retries} retries, {report.failed_batches} failed batches)"
+    )
+    return report
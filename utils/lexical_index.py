@@ -0,0 +1,193 @@
+# utils/lexical_index.py
+"""
+BM25 full-text index of the knowledge base chunks, backed by tantivy.
+
+Vector search misses exact-term queries such as "pix parcelado", "boleto" or
+a specific fee percentage. ``LexicalIndex`` keeps every chunk of the Chroma
+collection in a tantivy index next to it, under the same document id, so both
+result lists can be fused. Text is analysed for Portuguese: lowercased,
+accent-folded, stop words removed and stemmed, so "parcelados" matches
+"parcelado" and "automatica" matches "automática".
+
+Searching needs no embedding call.
+"""
+
+import json
+import os
+import shutil
+import threading
+from typing import Iterable, List, Optional
+
+import tantivy
+from agno.document import Document
+from dotenv import load_dotenv
+
+from .logger import get_logger
+
+# Configure logging
+logger = get_logger(__name__)
+
+# Load environment variables
+load_dotenv()
+
+# Configuration
+LEXICAL_INDEX_PATH = os.getenv("LEXICAL_INDEX_PATH", "storage/tantivy_index")
+
+TOKENIZER_NAME = "pt_folded_stem"
+WRITER_HEAP_SIZE = 15_000_000
+
+
+def portuguese_analyzer() -> tantivy.TextAnalyzer:
+    """Build the Portuguese text analyzer used for indexing and queries."""
+    return (
+        tantivy.TextAnalyzerBuilder(tantivy.Tokenizer.simple())
+        .filter(tantivy.Filter.lowercase())
+        .filter(tantivy.Filter.ascii_fold())
+        .filter(tantivy.Filter.stopword("portuguese"))
+        .filter(tantivy.Filter.stemmer("portuguese"))
+        .build()
+    )
+
+
+def build_schema() -> tantivy.Schema:
+    """Schema: exact-match id, analysed content and stored metadata."""
+    builder = tantivy.SchemaBuilder()
+    builder.add_text_field("id", stored=True, tokenizer_name="raw")
+    builder.add_text_field("content", stored=True, tokenizer_name=TOKENIZER_NAME)
+    builder.add_text_field("meta_data", stored=True, index_option="basic", tokenizer_name="raw")
+    return builder.build()
+
+
+def _delete_by_id(writer: tantivy.IndexWriter, doc_id: str, field: str = "id") -> None:
+    # ``delete_documents`` was renamed in tantivy-py 0.25
+    delete = getattr(writer, "delete_documents_by_term", None) or writer.delete_documents
+    delete(field, doc_id)
+
+
+class LexicalIndex:
+    """
+    tantivy index of knowledge base chunks.
+
+    Args:
+        path: Index directory; None keeps the index in memory
+    """
+
+    def __init__(self, path: Optional[str] = LEXICAL_INDEX_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._tantivy_index: Optional[tantivy.Index] = None
+
+    @property
+    def _index(self) -> tantivy.Index:
+        # Opened lazily so importing the agents does not touch the disk
+        if self._tantivy_index is None:
+            with self._lock:
+                if self._tantivy_index is None:
+                    self._tantivy_index = self._open()
+        return self._tantivy_index
+
+    def _open(self) -> tantivy.Index:
+        schema = build_schema()
+        if self.path is None:
+            index = tantivy.Index(schema)
+        else:
+            os.makedirs(self.path, exist_ok=True)
+            try:
+                index = tantivy.Index(schema, path=self.path, reuse=True)
+            except ValueError as e:
+                logger.warning(f"Rebuilding incompatible lexical index at {self.path}: {e}")
+                shutil.rmtree(self.path)
+                os.makedirs(self.path)
+                index = tantivy.Index(schema, path=self.path, reuse=False)
+        index.register_tokenizer(TOKENIZER_NAME, portuguese_analyzer())
+        return index
+
+    def upsert(self, documents: Iterable[Document]) -> int:
+        """
+        Add or replace chunks, keyed by ``document.id``.
+
+        Args:
+            documents: Chunks whose ``id`` matches their Chroma id
+
+        Returns:
+            int: Number of chunks written
+        """
+        count = 0
+        index = self._index
+        with self._lock:
+            writer = index.writer(heap_size=WRITER_HEAP_SIZE, num_threads=1)
+            try:
+                for document in documents:
+                    _delete_by_id(writer, document.id)
+                    writer.add_document(
+                        tantivy.Document(
+                            id=document.id,
+                            content=document.content,
+                            meta_data=json.dumps(document.meta_data or {}, ensure_ascii=False),
+                        )
+                    )
+                    count += 1
+                writer.commit()
+            except Exception:
+                writer.rollback()
+                raise
+            finally:
+                writer.wait_merging_threads()
+        return count
+
+    def delete(self, ids: Iterable[str]) -> None:
+        """Remove chunks by id."""
+        index = self._index
+        with self._lock:
+            writer = index.writer(heap_size=WRITER_HEAP_SIZE, num_threads=1)
+            try:
+                for doc_id in ids:
+                    _delete_by_id(writer, doc_id)
+                writer.commit()
+            finally:
+                writer.wait_merging_threads()
+
+    def clear(self) -> None:
+        """Remove every chunk."""
+        index = self._index
+        with self._lock:
+            writer = index.writer(heap_size=WRITER_HEAP_SIZE, num_threads=1)
+            try:
+                writer.delete_all_documents()
+                writer.commit()
+            finally:
+                writer.wait_merging_threads()
+
+    def __len__(self) -> int:
+        self._index.reload()
+        return self._index.searcher().num_docs
+
+    def search(self, query: str, limit: int = 5) -> List[Document]:
+        """
+        BM25 search over the chunk contents.
+
+        Args:
+            query: Free-text query; query syntax errors are ignored
+            limit: Maximum number of chunks
+
+        Returns:
+            List[Document]: Best chunks first, with their BM25 score as
+            ``reranking_score``
+        """
+        if not query.strip():
+            return []
+        self._index.reload()
+        parsed, _ = self._index.parse_query_lenient(query, ["content"])
+        searcher = self._index.searcher()
+        results = []
+        for score, address in searcher.search(parsed, limit).hits:
+            stored = searcher.doc(address)
+            results.append(
+                Document(
+                    id=stored["id"][0],
+                    content=stored["content"][0],
+                    meta_data=json.loads(stored["meta_data"][0]),
+                    reranking_score=score,
+                )
+            )
+        return results
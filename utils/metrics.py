@@ -0,0 +1,163 @@
+# utils/metrics.py
+"""
+Lightweight in-process metrics registry.
+
+This module keeps counters, gauges and latency summaries for the running
+process and renders them in the Prometheus text exposition format, so the
+API can expose them without pulling in an extra client dependency.
+"""
+
+import math
+import threading
+from collections import deque
+from typing import Deque, Dict, List, Tuple
+
+LabelSet = Tuple[Tuple[str, str], ...]
+
+# Quantiles reported for every summary metric
+SUMMARY_QUANTILES: Tuple[float, ...] = (0.5, 0.9, 0.99)
+
+# Number of recent observations kept per summary to estimate quantiles
+SUMMARY_WINDOW = 1024
+
+
+def _label_key(labels: Dict[str, str]) -> LabelSet:
+    """Convert a label dictionary into a hashable, ordered key."""
+    return tuple(sorted((str(k), str(v)) for k, v in labels.items()))
+
+
+def _format_labels(labels: LabelSet, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+    """Render a label set in Prometheus format."""
+    items = labels + extra
+    if not items:
+        return ""
+    rendered = ",".join(f'{k}="{v}"' for k, v in items)
+    return "{" + rendered + "}"
+
+
+def quantile(values: List[float], q: float) -> float:
+    """
+    Compute a quantile of a list of values using nearest-rank interpolation.
+
+    Args:
+        values: Observed values
+        q: Quantile between 0 and 1
+
+    Returns:
+        float: The estimated quantile, or NaN when there are no values
+    """
+    if not values:
+        return math.nan
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))
+    return ordered[index]
+
+
+class MetricsRegistry:
+    """
+    Thread-safe registry of counters, gauges and summaries.
+
+    Metric names follow Prometheus conventions; labels are passed as keyword
+    arguments when recording values.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[LabelSet, float]] = {}
+        self._gauges: Dict[str, Dict[LabelSet, float]] = {}
+        self._summaries: Dict[str, Dict[LabelSet, Tuple[int, float, Deque[float]]]] = {}
+
+    def increment(self, name: str, value: float = 1.0, **labels: str) -> None:
+        """Increase a counter by the given value."""
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + value
+
+    def set_gauge(self, name: str, value: float, **labels: str) -> None:
+        """Set a gauge to the given value."""
+        key = _label_key(labels)
+        with self._lock:
+            self._gauges.setdefault(name, {})[key] = float(value)
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        """Record an observation (typically a latency in seconds) for a summary."""
+        key = _label_key(labels)
+        with self._lock:
+            series = self._summaries.setdefault(name, {})
+            count, total, window = series.get(key, (0, 0.0, deque(maxlen=SUMMARY_WINDOW)))
+            window.append(float(value))
+            series[key] = (count + 1, total + float(value), window)
+
+    def get_counter(self, name: str, **labels: str) -> float:
+        """Return the current value of a counter (0 if never incremented)."""
+        with self._lock:
+            return self._counters.get(name, {}).get(_label_key(labels), 0.0)
+
+    def get_gauge(self, name: str, **labels: str) -> float:
+        """Return the current value of a gauge (NaN if never set)."""
+        with self._lock:
+            return self._gauges.get(name, {}).get(_label_key(labels), math.nan)
+
+    def snapshot(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """
+        Return a JSON-serialisable view of all metrics.
+
+        Returns:
+            Dict: Mapping of metric type to metric name to rendered label set and value
+        """
+        with self._lock:
+            result: Dict[str, Dict[str, Dict[str, float]]] = {
+                "counters": {},
+                "gauges": {},
+                "summaries": {},
+            }
+            for name, series in self._counters.items():
+                result["counters"][name] = {_format_labels(k): v for k, v in series.items()}
+            for name, series in self._gauges.items():
+                result["gauges"][name] = {_format_labels(k): v for k, v in series.items()}
+            for name, series in self._summaries.items():
+                rendered = {}
+                for key, (count, total, window) in series.items():
+                    values = list(window)
+                    rendered[_format_labels(key)] = {
+                        "count": count,
+                        "sum": total,
+                        **{f"p{int(q * 100)}": quantile(values, q) for q in SUMMARY_QUANTILES},
+                    }
+                result["summaries"][name] = rendered
+            return result
+
+    def render_prometheus(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        lines: List[str] = []
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                lines.append(f"# TYPE {name} counter")
+                for key, value in series.items():
+                    lines.append(f"{name}{_format_labels(key)} {value}")
+            for name, series in sorted(self._gauges.items()):
+                lines.append(f"# TYPE {name} gauge")
+                for key, value in series.items():
+                    lines.append(f"{name}{_format_labels(key)} {value}")
+            for name, series in sorted(self._summaries.items()):
+                lines.append(f"# TYPE {name} summary")
+                for key, (count, total, window) in series.items():
+                    values = list(window)
+                    for q in SUMMARY_QUANTILES:
+                        labels = _format_labels(key, (("quantile", str(q)),))
+                        lines.append(f"{name}{labels} {quantile(values, q)}")
+                    lines.append(f"{name}_sum{_format_labels(key)} {total}")
+                    lines.append(f"{name}_count{_format_labels(key)} {count}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        """Clear every recorded metric. Intended for tests."""
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._summaries.clear()
+
+
+# Process-wide registry used by all components
+metrics = MetricsRegistry()
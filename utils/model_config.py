@@ -0,0 +1,108 @@
+# utils/model_config.py
+"""
+Per-stage model configuration for the agent pipeline.
+
+Each stage of the workflow (router team, customer support agent, knowledge
+agent and personality layer) resolves its own model ID. Routing and tone
+rewriting do not need a large model, so the default ``tiered`` profile runs
+them on a small model while the specialists keep ``LLM_MODEL``.
+
+Resolution order for a stage:
+    1. The stage-specific environment variable (e.g. ``ROUTER_LLM_MODEL``)
+    2. The tier assigned to the stage by ``MODEL_TIER_PROFILE``
+"""
+
+import os
+from typing import Dict, Optional
+
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+DEFAULT_LARGE_MODEL = "mistral-large-latest"
+DEFAULT_SMALL_MODEL = "mistral-small-latest"
+DEFAULT_TIER_PROFILE = "tiered"
+
+# Environment variable overriding the model of each stage
+STAGE_MODEL_ENV_VARS: Dict[str, str] = {
+    "router": "ROUTER_LLM_MODEL",
+    "customer_support": "SUPPORT_LLM_MODEL",
+    "knowledge": "KNOWLEDGE_LLM_MODEL",
+    "personality": "PERSONALITY_LLM_MODEL",
+}
+
+# Model tier ("large" or "small") used by each stage in every profile
+MODEL_TIER_PROFILES: Dict[str, Dict[str, str]] = {
+    "uniform": {
+        "router": "large",
+        "customer_support": "large",
+        "knowledge": "large",
+        "personality": "large",
+    },
+    "tiered": {
+        "router": "small",
+        "customer_support": "large",
+        "knowledge": "large",
+        "personality": "small",
+    },
+    "economy": {
+        "router": "small",
+        "customer_support": "small",
+        "knowledge": "small",
+        "personality": "small",
+    },
+}
+
+
+def get_tier_model(tier: str) -> str:
+    """
+    Return the model ID configured for a tier.
+
+    Args:
+        tier: Either "large" (``LLM_MODEL``) or "small" (``SMALL_LLM_MODEL``)
+
+    Returns:
+        str: The model ID for the tier
+
+    Raises:
+        ValueError: If the tier is unknown
+    """
+    if tier == "large":
+        return os.getenv("LLM_MODEL", DEFAULT_LARGE_MODEL)
+    if tier == "small":
+        return os.getenv("SMALL_LLM_MODEL", DEFAULT_SMALL_MODEL)
+    raise ValueError(f"Unknown model tier: {tier}")
+
+
+def get_stage_model(stage: str, profile: Optional[str] = None) -> str:
+    """
+    Resolve the model ID for a workflow stage.
+
+    Args:
+        stage: One of "router", "customer_support", "knowledge", "personality"
+        profile: Tier profile name; defaults to ``MODEL_TIER_PROFILE`` (or "tiered")
+
+    Returns:
+        str: The model ID the stage should use
+
+    Raises:
+        ValueError: If the stage or profile is unknown
+    """
+    if stage not in STAGE_MODEL_ENV_VARS:
+        raise ValueError(f"Unknown workflow stage: {stage}")
+
+    override = os.getenv(STAGE_MODEL_ENV_VARS[stage])
+    if override:
+        return override
+
+    profile_name = profile or os.getenv("MODEL_TIER_PROFILE", DEFAULT_TIER_PROFILE)
+    if profile_name not in MODEL_TIER_PROFILES:
+        raise ValueError(f"Unknown model tier profile: {profile_name}")
+
+    return get_tier_model(MODEL_TIER_PROFILES[profile_name][stage])
+
+
+def get_stage_models(profile: Optional[str] = None) -> Dict[str, str]:
+    """Return the resolved model ID of every stage for a profile."""
+    return {stage: get_stage_model(stage, profile) for stage in STAGE_MODEL_ENV_VARS}
@@ -106,6 +106,13 @@ class QueryRequest(BaseModel):
     user_id: str = Field(description="Unique user identifier")
 
 
+class TicketUpdate(BaseModel):
+    """Request model for ticket changes; omitted fields are left as they are."""
+
+    status: Optional[str] = Field(None, description="New status: open, in_progress, resolved or closed")
+    assigned_to: Optional[str] = Field(None, description="New assignee")
+
+
 class ErrorResponse(BaseModel):
     """Error response model."""
 
@@ -0,0 +1,83 @@
+# utils/rate_limit.py
+"""
+Token bucket rate limiting for calls to external APIs.
+
+A ``RateLimiter`` refills ``rate`` tokens per second up to ``burst`` tokens.
+It can be shared between threads (``acquire``) and coroutines
+(``acquire_async``).
+"""
+
+import asyncio
+import threading
+import time
+from typing import Callable, Optional
+
+
+class RateLimiter:
+    """
+    Token bucket rate limiter.
+
+    Args:
+        rate: Tokens added per second (None or <= 0 disables limiting)
+        burst: Maximum number of tokens the bucket holds (defaults to ``max(1, rate)``)
+        clock: Time source, injectable for tests
+    """
+
+    def __init__(
+        self,
+        rate: Optional[float],
+        burst: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.rate = rate if rate and rate > 0 else None
+        self.burst = float(burst) if burst else max(1.0, self.rate or 1.0)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._tokens = self.burst
+        self._updated = clock()
+
+    def reserve(self, tokens: float = 1.0) -> float:
+        """
+        Take tokens from the bucket, going into debt if necessary.
+
+        Args:
+            tokens: Number of tokens to take
+
+        Returns:
+            float: Seconds the caller must wait before proceeding
+        """
+        if self.rate is None:
+            return 0.0
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= tokens
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        """Take tokens only if they are available right now."""
+        if self.rate is None:
+            return True
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens < tokens:
+                return False
+            self._tokens -= tokens
+            return True
+
+    def acquire(self, tokens: float = 1.0) -> None:
+        """Block the current thread until the tokens are available."""
+        delay = self.reserve(tokens)
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire_async(self, tokens: float = 1.0) -> None:
+        """Wait without blocking the event loop until the tokens are available."""
+        delay = self.reserve(tokens)
+        if delay > 0:
+            await asyncio.sleep(delay)
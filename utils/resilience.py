@@ -0,0 +1,333 @@
+# utils/resilience.py
+"""
+Circuit breakers and fallback routing for Mistral chat models.
+
+Every configured model ID gets its own circuit breaker. When a model keeps
+failing its breaker opens and calls are rejected immediately (or routed to a
+configured fallback model) instead of waiting for the upstream timeout. After
+a cool-down period the breaker lets a limited number of probe calls through
+(half-open) and closes again once a probe succeeds.
+
+Models with the same client settings share one Mistral client, and with it
+one HTTP connection pool, so connections opened by the start-up warm-up (or
+any earlier call) are reused by every agent and workflow instance.
+"""
+
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from agno.models.mistral import MistralChat
+from dotenv import load_dotenv
+from mistralai.models import HTTPValidationError
+
+from .logger import get_logger
+from .metrics import metrics
+
+# Configure logging
+logger = get_logger(__name__)
+
+# Load environment variables
+load_dotenv()
+
+# Configuration
+LLM_FALLBACK_MODEL = os.getenv("LLM_FALLBACK_MODEL") or None
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+CIRCUIT_RECOVERY_TIMEOUT = float(os.getenv("CIRCUIT_RECOVERY_TIMEOUT", "30"))
+CIRCUIT_HALF_OPEN_MAX_CALLS = int(os.getenv("CIRCUIT_HALF_OPEN_MAX_CALLS", "1"))
+
+# Numeric encoding of breaker states for the metrics gauge
+STATE_VALUES: Dict[str, int] = {"closed": 0, "half_open": 1, "open": 2}
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised when a call is rejected because its circuit breaker is open."""
+
+    def __init__(self, name: str):
+        super().__init__(f"Circuit breaker for '{name}' is open; failing fast")
+        self.name = name
+
+
+class CircuitBreaker:
+    """
+    Thread-safe circuit breaker with closed, open and half-open states.
+
+    Args:
+        name: Identifier of the protected resource (the model ID)
+        failure_threshold: Consecutive failures that open the circuit
+        recovery_timeout: Seconds to stay open before allowing probe calls
+        half_open_max_calls: Concurrent probe calls allowed while half-open
+        clock: Time source, injectable for tests
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+        recovery_timeout: float = CIRCUIT_RECOVERY_TIMEOUT,
+        half_open_max_calls: int = CIRCUIT_HALF_OPEN_MAX_CALLS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = max(1, half_open_max_calls)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = "closed"
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._half_open_calls = 0
+        self._publish_state()
+
+    @property
+    def state(self) -> str:
+        """Current state, moving from open to half-open once the timeout elapsed."""
+        with self._lock:
+            self._maybe_half_open()
+            return self._state
+
+    def allow_request(self) -> bool:
+        """
+        Decide whether a call may proceed.
+
+        Returns:
+            bool: True if the call should be attempted, False if it must be rejected
+        """
+        with self._lock:
+            self._maybe_half_open()
+            if self._state == "closed":
+                return True
+            if self._state == "half_open" and self._half_open_calls < self.half_open_max_calls:
+                self._half_open_calls += 1
+                return True
+            metrics.increment("circuit_breaker_rejected_total", breaker=self.name)
+            return False
+
+    def record_success(self) -> None:
+        """Record a successful call, closing the circuit if it was probing."""
+        with self._lock:
+            if self._state != "closed":
+                logger.info(f"Circuit breaker '{self.name}' closed after successful probe")
+            self._failures = 0
+            self._half_open_calls = 0
+            self._opened_at = None
+            self._set_state("closed")
+
+    def record_failure(self) -> None:
+        """Record a failed call, opening the circuit when the threshold is hit."""
+        with self._lock:
+            self._failures += 1
+            metrics.increment("circuit_breaker_failures_total", breaker=self.name)
+            if self._state == "half_open" or self._failures >= self.failure_threshold:
+                if self._state != "open":
+                    logger.warning(
+                        f"Circuit breaker '{self.name}' opened after {self._failures} failure(s)"
+                    )
+                self._opened_at = self._clock()
+                self._half_open_calls = 0
+                self._set_state("open")
+
+    def reset(self) -> None:
+        """Force the breaker back to the closed state."""
+        with self._lock:
+            self._failures = 0
+            self._half_open_calls = 0
+            self._opened_at = None
+            self._set_state("closed")
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return a serialisable view of the breaker state."""
+        with self._lock:
+            self._maybe_half_open()
+            return {
+                "state": self._state,
+                "consecutive_failures": self._failures,
+                "failure_threshold": self.failure_threshold,
+                "recovery_timeout": self.recovery_timeout,
+            }
+
+    def _maybe_half_open(self) -> None:
+        """Move from open to half-open once the recovery timeout elapsed. Caller holds the lock."""
+        if (
+            self._state == "open"
+            and self._opened_at is not None
+            and self._clock() - self._opened_at >= self.recovery_timeout
+        ):
+            self._half_open_calls = 0
+            self._set_state("half_open")
+
+    def _set_state(self, state: str) -> None:
+        """Update the state and its metrics gauge. Caller holds the lock."""
+        self._state = state
+        self._publish_state()
+
+    def _publish_state(self) -> None:
+        metrics.set_gauge("circuit_breaker_state", STATE_VALUES[self._state], breaker=self.name)
+
+
+# Registry of breakers keyed by model ID
+_BREAKERS: Dict[str, CircuitBreaker] = {}
+_BREAKERS_LOCK = threading.Lock()
+
+
+def get_circuit_breaker(name: str) -> CircuitBreaker:
+    """
+    Return the shared circuit breaker for a model ID, creating it on first use.
+
+    Args:
+        name: The model ID (or other resource name) to protect
+
+    Returns:
+        CircuitBreaker: The breaker shared by every caller using that name
+    """
+    with _BREAKERS_LOCK:
+        breaker = _BREAKERS.get(name)
+        if breaker is None:
+            breaker = CircuitBreaker(name)
+            _BREAKERS[name] = breaker
+        return breaker
+
+
+def circuit_breaker_states() -> Dict[str, Dict[str, Any]]:
+    """Return the state of every registered circuit breaker."""
+    with _BREAKERS_LOCK:
+        breakers = list(_BREAKERS.values())
+    return {breaker.name: breaker.to_dict() for breaker in breakers}
+
+
+# Mistral clients keyed by their constructor parameters
+_CLIENTS: Dict[Tuple[Tuple[str, str], ...], Any] = {}
+_CLIENTS_LOCK = threading.Lock()
+
+
+def is_upstream_failure(error: BaseException) -> bool:
+    """
+    Decide whether an exception should count against the circuit breaker.
+
+    Client-side errors (4xx other than 429) indicate a bad request rather than
+    an unhealthy upstream, so they do not trip the breaker. agno wraps the
+    mistralai errors in a ``ModelProviderError`` whose own status defaults to
+    502, so the status of the wrapped error is preferred.
+    """
+    cause = getattr(error, "__cause__", None)
+    if isinstance(cause, HTTPValidationError):
+        status_code = 422
+    else:
+        status_code = getattr(cause, "status_code", None)
+    if not isinstance(status_code, int):
+        status_code = getattr(error, "status_code", None)
+    if isinstance(status_code, int) and 400 <= status_code < 500 and status_code != 429:
+        return False
+    return True
+
+
+@dataclass
+class ResilientMistralChat(MistralChat):
+    """
+    MistralChat model guarded by a per-model circuit breaker.
+
+    When the breaker for ``id`` is open, calls are routed to ``fallback_id``
+    (guarded by its own breaker) or rejected with ``CircuitOpenError``.
+    """
+
+    fallback_id: Optional[str] = LLM_FALLBACK_MODEL
+
+    def get_client(self):
+        """Return the Mistral client shared by every model with the same client settings."""
+        if self.mistral_client:
+            return self.mistral_client
+        from mistralai import Mistral as MistralClient
+
+        client_params = self._get_client_params()
+        key = tuple(sorted((name, repr(value)) for name, value in client_params.items()))
+        with _CLIENTS_LOCK:
+            client = _CLIENTS.get(key)
+            if client is None:
+                client = MistralClient(**client_params)
+                _CLIENTS[key] = client
+        self.mistral_client = client
+        return client
+
+    def _get_fallback_model(self) -> "ResilientMistralChat":
+        """Return a chat model for the fallback ID, or fail fast if none is configured."""
+        if not self.fallback_id or self.fallback_id == self.id:
+            raise CircuitOpenError(self.id)
+        fallback = getattr(self, "_fallback_model", None)
+        if fallback is None or fallback.id != self.fallback_id:
+            fallback = ResilientMistralChat(
+                id=self.fallback_id,
+                api_key=self.api_key,
+                endpoint=self.endpoint,
+                max_retries=self.max_retries,
+                timeout=self.timeout,
+                client_params=self.client_params,
+                fallback_id=None,
+            )
+            self._fallback_model = fallback
+        logger.warning(f"Circuit for '{self.id}' is open, falling back to '{self.fallback_id}'")
+        metrics.increment("llm_fallback_calls_total", model=self.id, fallback=self.fallback_id)
+        return fallback
+
+    def _record_outcome(self, breaker: CircuitBreaker, error: Optional[BaseException]) -> None:
+        if error is None:
+            breaker.record_success()
+        elif is_upstream_failure(error):
+            breaker.record_failure()
+        else:
+            # The upstream answered; a bad request says nothing about its health
+            breaker.record_success()
+
+    def invoke(self, *args, **kwargs) -> Any:
+        breaker = get_circuit_breaker(self.id)
+        if not breaker.allow_request():
+            return self._get_fallback_model().invoke(*args, **kwargs)
+        try:
+            response = super().invoke(*args, **kwargs)
+        except Exception as e:
+            self._record_outcome(breaker, e)
+            raise
+        self._record_outcome(breaker, None)
+        return response
+
+    async def ainvoke(self, *args, **kwargs) -> Any:
+        breaker = get_circuit_breaker(self.id)
+        if not breaker.allow_request():
+            return await self._get_fallback_model().ainvoke(*args, **kwargs)
+        try:
+            response = await super().ainvoke(*args, **kwargs)
+        except Exception as e:
+            self._record_outcome(breaker, e)
+            raise
+        self._record_outcome(breaker, None)
+        return response
+
+    def invoke_stream(self, *args, **kwargs) -> Any:
+        breaker = get_circuit_breaker(self.id)
+        if not breaker.allow_request():
+            yield from self._get_fallback_model().invoke_stream(*args, **kwargs)
+            return
+        try:
+            # Errors can surface while the chunks are read, not only on the call
+            for chunk in super().invoke_stream(*args, **kwargs):
+                yield chunk
+        except Exception as e:
+            self._record_outcome(breaker, e)
+            raise
+        self._record_outcome(breaker, None)
+
+    async def ainvoke_stream(self, *args, **kwargs) -> Any:
+        breaker = get_circuit_breaker(self.id)
+        if not breaker.allow_request():
+            async for chunk in self._get_fallback_model().ainvoke_stream(*args, **kwargs):
+                yield chunk
+            return
+        try:
+            async for chunk in super().ainvoke_stream(*args, **kwargs):
+                yield chunk
+        except Exception as e:
+            self._record_outcome(breaker, e)
+            raise
+        self._record_outcome(breaker, None)
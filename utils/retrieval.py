@@ -0,0 +1,205 @@
+# utils/retrieval.py
+"""
+Hybrid retrieval for the knowledge agent.
+
+``HybridRetriever`` is passed to the agno ``Agent`` as ``retriever`` and
+replaces the plain vector search of the knowledge base. It queries the
+Chroma collection and the tantivy ``LexicalIndex`` and merges both rankings
+with reciprocal rank fusion (RRF):
+
+    score(doc) = sum over rankings of 1 / (RRF_K + rank)
+
+Modes (``RETRIEVAL_MODE``):
+    hybrid   vector + lexical, fused with RRF (default)
+    vector   Chroma only
+    lexical  tantivy only, no embedding call
+
+In hybrid mode a failing side degrades to the other one instead of failing
+the search.
+
+When the agent injects the retrieved chunks into its prompt (instead of
+calling a search tool), ``RETRIEVAL_TOKEN_BUDGET`` caps how much context one
+query can add. With ``CONTEXT_COMPRESSION`` the budget is filled with the
+most relevant sentences of the chunks rather than with whole chunks.
+"""
+
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+from agno.document import Document
+from dotenv import load_dotenv
+
+from .context import CHARS_PER_TOKEN, CONTEXT_COMPRESSION, ContextCompressor, estimate_tokens
+from .lexical_index import LexicalIndex
+from .logger import get_logger
+from .metrics import metrics
+
+# Configure logging
+logger = get_logger(__name__)
+
+# Load environment variables
+load_dotenv()
+
+# Configuration
+RETRIEVAL_MODE = os.getenv("RETRIEVAL_MODE", "hybrid")
+RRF_K = int(os.getenv("RRF_K", "60"))
+RETRIEVAL_CANDIDATES = int(os.getenv("RETRIEVAL_CANDIDATES", "10"))
+RETRIEVAL_TOKEN_BUDGET = int(os.getenv("RETRIEVAL_TOKEN_BUDGET", "1500"))
+
+RETRIEVAL_MODES = ("hybrid", "vector", "lexical")
+
+
+def fit_to_budget(documents: List[Document], max_tokens: Optional[int]) -> List[Document]:
+    """
+    Keep the best chunks that fit in a token budget.
+
+    Chunks are taken in rank order. The first chunk is always kept, cut to
+    the budget if needed, so a query never ends up without context.
+
+    Args:
+        documents: Ranked chunks, best first
+        max_tokens: Token budget; None or 0 keeps every chunk
+
+    Returns:
+        List[Document]: The chunks that fit
+    """
+    if not max_tokens:
+        return documents
+    kept: List[Document] = []
+    used = 0
+    for document in documents:
+        tokens = estimate_tokens(document.content)
+        if used + tokens > max_tokens:
+            if not kept:
+                kept.append(
+                    Document(
+                        id=document.id,
+                        name=document.name,
+                        content=document.content[: max_tokens * CHARS_PER_TOKEN],
+                        meta_data=document.meta_data,
+                        reranking_score=document.reranking_score,
+                    )
+                )
+            break
+        kept.append(document)
+        used += tokens
+    return kept
+
+
+def reciprocal_rank_fusion(rankings: List[List[Document]], k: int = RRF_K) -> List[Document]:
+    """
+    Merge rankings of documents with reciprocal rank fusion.
+
+    Documents are identified by ``id``; the first occurrence is kept and its
+    fused score stored as ``reranking_score``.
+
+    Args:
+        rankings: Ranked lists, best first
+        k: RRF constant damping the weight of the top ranks
+
+    Returns:
+        List[Document]: Documents ordered by fused score
+    """
+    scores: Dict[str, float] = {}
+    documents: Dict[str, Document] = {}
+    for ranking in rankings:
+        for rank, document in enumerate(ranking, start=1):
+            key = document.id or document.content
+            scores[key] = scores.get(key, 0.0) + 1.0 / (k + rank)
+            documents.setdefault(key, document)
+    ordered = sorted(scores, key=lambda key: scores[key], reverse=True)
+    for key in ordered:
+        documents[key].reranking_score = scores[key]
+    return [documents[key] for key in ordered]
+
+
+class HybridRetriever:
+    """
+    Knowledge retriever fusing vector and BM25 results.
+
+    Args:
+        vector_db: agno vector database (``ChromaDb``)
+        lexical_index: tantivy index of the same chunks
+        mode: ``hybrid``, ``vector`` or ``lexical``
+        candidates: Results fetched from each side before fusion
+        rrf_k: Reciprocal rank fusion constant
+        num_documents: Results returned when the agent does not ask for a number
+        token_budget: Maximum estimated tokens of the chunks handed to the agent
+        compress: Fill the budget with the most relevant sentences instead of
+            whole chunks
+    """
+
+    def __init__(
+        self,
+        vector_db: Any,
+        lexical_index: Optional[LexicalIndex],
+        mode: str = RETRIEVAL_MODE,
+        candidates: int = RETRIEVAL_CANDIDATES,
+        rrf_k: int = RRF_K,
+        num_documents: int = 4,
+        token_budget: Optional[int] = RETRIEVAL_TOKEN_BUDGET,
+        compress: bool = CONTEXT_COMPRESSION,
+    ):
+        if mode not in RETRIEVAL_MODES:
+            raise ValueError(f"Unknown retrieval mode '{mode}', expected one of {RETRIEVAL_MODES}")
+        if mode != "vector" and lexical_index is None:
+            raise ValueError(f"Retrieval mode '{mode}' requires a lexical index")
+        self.vector_db = vector_db
+        self.lexical_index = lexical_index
+        self.mode = mode
+        self.candidates = candidates
+        self.rrf_k = rrf_k
+        self.num_documents = num_documents
+        self.token_budget = token_budget
+        self.compressor = ContextCompressor(token_budget) if compress and token_budget else None
+
+    def _vector_search(self, query: str, limit: int) -> List[Document]:
+        return self.vector_db.search(query=query, limit=limit)
+
+    def _lexical_search(self, query: str, limit: int) -> List[Document]:
+        return self.lexical_index.search(query, limit=limit)
+
+    def search(self, query: str, num_documents: Optional[int] = None) -> List[Document]:
+        """
+        Retrieve the most relevant chunks for a query.
+
+        Args:
+            query: User query
+            num_documents: Number of chunks to return
+
+        Returns:
+            List[Document]: Best chunks first
+        """
+        limit = num_documents or self.num_documents
+        started = time.perf_counter()
+        mode = self.mode
+        try:
+            if mode == "vector":
+                return self._vector_search(query, limit)
+            if mode == "lexical":
+                return self._lexical_search(query, limit)
+
+            candidates = max(limit, self.candidates)
+            rankings = []
+            for name, search in (("vector", self._vector_search), ("lexical", self._lexical_search)):
+                try:
+                    rankings.append(search(query, candidates))
+                except Exception as e:
+                    logger.warning(f"{name.capitalize()} search failed, continuing with the other retriever: {e}")
+                    metrics.increment("retrieval_fallbacks_total", failed=name)
+            if not rankings:
+                raise RuntimeError("Both vector and lexical search failed")
+            return reciprocal_rank_fusion(rankings, k=self.rrf_k)[:limit]
+        finally:
+            metrics.observe("retrieval_seconds", time.perf_counter() - started, mode=mode)
+
+    def __call__(self, query: str, num_documents: Optional[int] = None, **kwargs) -> Optional[List[Dict[str, Any]]]:
+        """agno retriever entry point: returns the context, within the token budget, as dictionaries."""
+        documents = self.search(query, num_documents)
+        compressed = self.compressor.compress(query, documents) if self.compressor is not None else []
+        # Chunks too short to split into sentences are passed through whole
+        documents = compressed or fit_to_budget(documents, self.token_budget)
+        if not documents:
+            return None
+        return [document.to_dict() for document in documents]
@@ -0,0 +1,198 @@
+# utils/snapshots.py
+"""
+Offline knowledge base sources: saved HTML pages instead of a live crawl.
+
+A snapshot is a directory or tarball of ``.html`` files. Each file becomes one
+page whose URL is its canonical link (or ``og:url``), falling back to the
+file path relative to the snapshot root joined to a base URL. Main content is
+extracted and deduplicated as ``CrawlingWebsiteReader`` does and chunked with
+the same ``FixedSizeChunking`` used by ``WebsiteKnowledgeBase``.
+
+BeautifulSoup parsing is CPU-bound, so files are parsed in a process pool.
+"""
+
+import os
+import tarfile
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from agno.document import Document
+from agno.document.chunking.fixed import FixedSizeChunking
+from agno.document.chunking.strategy import ChunkingStrategy
+from bs4 import BeautifulSoup
+
+from .crawler import extract_main_text
+from .dedup import DEDUP_ENABLED, SHARED_SOURCE, BoilerplateDeduplicator
+from .logger import get_logger
+
+# Configure logging
+logger = get_logger(__name__)
+
+DEFAULT_BASE_URL = "https://www.infinitepay.io"
+HTML_EXTENSIONS = (".html", ".htm")
+TARBALL_EXTENSIONS = (".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tar.xz")
+
+
+def _checked_members(archive: tarfile.TarFile, destination: str) -> List[tarfile.TarInfo]:
+    """
+    Return the archive members, refusing any the ``data`` extraction filter would.
+
+    Raises:
+        ValueError: If a member is a link, device or FIFO, or would land outside ``destination``
+    """
+    root = os.path.realpath(destination)
+    for member in archive.getmembers():
+        if not (member.isfile() or member.isdir()):
+            raise ValueError(f"Snapshot tarball member is not a regular file or directory: {member.name}")
+        target = os.path.realpath(os.path.join(root, member.name))
+        if os.path.commonpath([root, target]) != root:
+            raise ValueError(f"Snapshot tarball member escapes the extraction directory: {member.name}")
+    return archive.getmembers()
+
+
+@contextmanager
+def snapshot_root(source: str) -> Iterator[str]:
+    """
+    Yield a directory holding the snapshot pages.
+
+    Tarballs are extracted to a temporary directory that is removed on exit.
+
+    Args:
+        source: Snapshot directory or tarball
+
+    Raises:
+        ValueError: If the source is neither a directory nor a tarball
+    """
+    if os.path.isdir(source):
+        yield source
+        return
+    if not source.endswith(TARBALL_EXTENSIONS) or not os.path.isfile(source):
+        raise ValueError(f"Snapshot source must be a directory or tarball: {source}")
+    with tempfile.TemporaryDirectory(prefix="snapshot-") as tmp_dir:
+        with tarfile.open(source) as archive:
+            if hasattr(tarfile, "data_filter"):
+                archive.extractall(tmp_dir, filter="data")
+            else:
+                # Extraction filters arrived in Python 3.11.4
+                archive.extractall(tmp_dir, members=_checked_members(archive, tmp_dir))
+        # Tarballs usually wrap the pages in a single top-level directory
+        entries = os.listdir(tmp_dir)
+        if len(entries) == 1 and os.path.isdir(os.path.join(tmp_dir, entries[0])):
+            yield os.path.join(tmp_dir, entries[0])
+        else:
+            yield tmp_dir
+
+
+def find_snapshot_files(root: str) -> List[str]:
+    """Return every HTML file below a directory, sorted for stable output."""
+    files = []
+    for directory, _, names in os.walk(root):
+        files.extend(os.path.join(directory, name) for name in names if name.lower().endswith(HTML_EXTENSIONS))
+    return sorted(files)
+
+
+def path_to_url(path: str, root: str, base_url: str = DEFAULT_BASE_URL) -> str:
+    """
+    Derive a page URL from its location in the snapshot.
+
+    ``index.html`` maps to its directory and the extension is dropped, so
+    ``pix.html`` under ``https://www.infinitepay.io`` becomes
+    ``https://www.infinitepay.io/pix``.
+    """
+    relative = os.path.relpath(path, root).replace(os.sep, "/")
+    stem, _ = os.path.splitext(relative)
+    if stem == "index":
+        stem = ""
+    elif stem.endswith("/index"):
+        stem = stem[: -len("/index")]
+    return base_url.rstrip("/") + ("/" + stem if stem else "")
+
+
+def snapshot_url(soup: BeautifulSoup) -> Optional[str]:
+    """Return the URL a saved page declares for itself, if any."""
+    canonical = soup.find("link", rel="canonical", href=True)
+    if canonical:
+        return str(canonical["href"])
+    og_url = soup.find("meta", property="og:url", content=True)
+    if og_url:
+        return str(og_url["content"])
+    return None
+
+
+def parse_snapshot(args: Tuple[str, str, str]) -> Tuple[str, str]:
+    """
+    Parse one saved page. Runs in a worker process.
+
+    Args:
+        args: ``(path, root, base_url)``
+
+    Returns:
+        Tuple[str, str]: Page URL and main content (empty when nothing was found)
+    """
+    path, root, base_url = args
+    with open(path, "rb") as f:
+        soup = BeautifulSoup(f.read(), "html.parser")
+    url = snapshot_url(soup) or path_to_url(path, root, base_url)
+    return url, extract_main_text(soup)
+
+
+def read_snapshots(
+    source: str,
+    base_url: str = DEFAULT_BASE_URL,
+    workers: Optional[int] = None,
+    chunking_strategy: Optional[ChunkingStrategy] = None,
+    deduplicate: bool = DEDUP_ENABLED,
+) -> Dict[str, List[Document]]:
+    """
+    Parse and chunk every page of a snapshot.
+
+    Args:
+        source: Snapshot directory or tarball
+        base_url: URL prefix for pages without a canonical link
+        workers: Parser processes (defaults to the CPU count; 1 parses in-process)
+        chunking_strategy: Chunking strategy (defaults to ``FixedSizeChunking()``,
+            as in ``WebsiteKnowledgeBase``)
+        deduplicate: Factor blocks repeated across pages out before chunking
+
+    Returns:
+        Dict[str, List[Document]]: Chunks per page URL, plus the shared blocks
+        under ``SHARED_SOURCE`` when deduplicating, in the shape expected by
+        ``load_knowledge_base(sources=...)``
+    """
+    chunking_strategy = chunking_strategy or FixedSizeChunking()
+    with snapshot_root(source) as root:
+        files = find_snapshot_files(root)
+        logger.info(f"Parsing {len(files)} snapshot pages from {source}")
+        tasks = [(path, root, base_url) for path in files]
+        if workers == 1 or len(files) <= 1:
+            parsed = [parse_snapshot(task) for task in tasks]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                parsed = list(executor.map(parse_snapshot, tasks, chunksize=8))
+
+    pages: Dict[str, str] = {}
+    for url, content in parsed:
+        if not content:
+            logger.warning(f"No main content found for {url}")
+            continue
+        if url in pages:
+            logger.warning(f"Duplicate snapshot page for {url}, keeping the first one")
+            continue
+        pages[url] = content
+
+    shared: List[Document] = []
+    if deduplicate and pages:
+        result = BoilerplateDeduplicator().deduplicate(pages)
+        pages = result.pages
+        shared = [chunk for block in result.shared_blocks for chunk in chunking_strategy.chunk(block.to_document())]
+
+    sources: Dict[str, List[Document]] = {}
+    for url, content in pages.items():
+        if content:
+            document = Document(name=url, id=url, meta_data={"url": url}, content=content)
+            sources[url] = chunking_strategy.chunk(document)
+    if shared:
+        sources[SHARED_SOURCE] = shared
+    return sources
@@ -0,0 +1,207 @@
+# utils/ticket_dedup.py
+"""
+Near-duplicate detection for new support tickets.
+
+Customers often report the same problem several times within an hour, and
+every report used to open a ticket. Before a ticket is created,
+``RecentTicketIndex.find_duplicate`` compares it with the same customer's
+open tickets from the last ``TICKET_DEDUP_WINDOW`` seconds:
+
+1. Subject and description are normalized (lowercased, accent-folded),
+   split into words, stop words and words under three letters dropped, and
+   each word cut to ``STEM_LENGTH`` characters, a crude stemmer that makes
+   "ligando" and "liga" the same shingle. Numbers are kept whole.
+2. Reports that both mention numbers (order, device or transaction IDs) but
+   share none are about different things and never match.
+3. The Jaccard similarity of the two shingle sets is compared with
+   ``TICKET_DEDUP_THRESHOLD``; the most similar ticket above it wins.
+
+The index holds only recent open tickets, per customer, with their shingles
+precomputed, so a check compares a handful of small sets. It subscribes to
+the ``TicketStore`` and drops tickets that are resolved, closed or deleted.
+"""
+
+import os
+import re
+import threading
+import time
+import unicodedata
+from datetime import datetime
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+from .logger import get_logger
+from .metrics import metrics
+from .ticket_store import TIMESTAMP_FORMAT
+
+# Configure logging
+logger = get_logger(__name__)
+
+# Load environment variables
+load_dotenv()
+
+# Configuration
+TICKET_DEDUP_ENABLED = os.getenv("TICKET_DEDUP_ENABLED", "true").lower() == "true"
+TICKET_DEDUP_WINDOW = float(os.getenv("TICKET_DEDUP_WINDOW", "3600"))
+TICKET_DEDUP_THRESHOLD = float(os.getenv("TICKET_DEDUP_THRESHOLD", "0.6"))
+
+STEM_LENGTH = 4
+MAX_RECENT_PER_CUSTOMER = 50
+OPEN_STATUSES = {"open", "in_progress"}
+STOP_WORDS = {
+    "the", "and", "for", "not", "with", "from", "that", "this", "have", "has", "was", "are", "but", "again",
+    "nao", "que", "com", "para", "por", "uma", "uns", "dos", "das", "meu", "minha", "esta", "estou", "foi",
+    "mas", "mais", "depois", "desde", "apos", "ainda", "pelo", "pela", "isso", "ele", "ela",
+}
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def ticket_shingles(subject: str, description: str) -> FrozenSet[str]:
+    """
+    Return the word shingles compared between tickets.
+
+    Args:
+        subject: Ticket subject
+        description: Ticket description
+
+    Returns:
+        FrozenSet[str]: Normalized, truncated content words
+    """
+    text = unicodedata.normalize("NFKD", f"{subject} {description}".lower())
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    return frozenset(
+        word if word.isdigit() else word[:STEM_LENGTH]
+        for word in _WORD.findall(text)
+        if word.isdigit() or (len(word) > 2 and word not in STOP_WORDS)
+    )
+
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    """Jaccard similarity of two sets (0 when both are empty)."""
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def _numbers(shingles: FrozenSet[str]) -> FrozenSet[str]:
+    return frozenset(shingle for shingle in shingles if shingle.isdigit())
+
+
+def _created_timestamp(ticket: Dict[str, Any]) -> Optional[float]:
+    try:
+        return datetime.strptime(ticket["created_at"], TIMESTAMP_FORMAT).timestamp()
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+class RecentTicketIndex:
+    """
+    Per-customer index of recent open tickets.
+
+    Args:
+        window: Seconds after creation during which a ticket can absorb duplicates
+        threshold: Minimum Jaccard similarity of a duplicate
+        clock: Wall-clock time source, injectable for tests
+    """
+
+    def __init__(
+        self,
+        window: float = TICKET_DEDUP_WINDOW,
+        threshold: float = TICKET_DEDUP_THRESHOLD,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.window = window
+        self.threshold = threshold
+        self._clock = clock
+        self._lock = threading.Lock()
+        # customer email -> [(created timestamp, ticket ID, shingles)], oldest first
+        self._recent: Dict[str, List[Tuple[float, str, FrozenSet[str]]]] = {}
+        self._customer_of: Dict[str, str] = {}
+
+    def _prune(self, customer_email: str) -> List[Tuple[float, str, FrozenSet[str]]]:
+        cutoff = self._clock() - self.window
+        entries = []
+        for entry in self._recent.get(customer_email, []):
+            if entry[0] >= cutoff:
+                entries.append(entry)
+            else:
+                self._customer_of.pop(entry[1], None)
+        if entries:
+            self._recent[customer_email] = entries
+        else:
+            self._recent.pop(customer_email, None)
+        return entries
+
+    def add(self, ticket_id: str, ticket: Dict[str, Any]) -> None:
+        """Index an open ticket created within the window."""
+        created = _created_timestamp(ticket)
+        customer_email = str(ticket.get("customer_email", "")).lower().strip()
+        if created is None or not customer_email:
+            return
+        shingles = ticket_shingles(ticket.get("subject", ""), ticket.get("description", ""))
+        with self._lock:
+            entries = [entry for entry in self._prune(customer_email) if entry[1] != ticket_id]
+            entries.append((created, ticket_id, shingles))
+            entries.sort()
+            self._customer_of[ticket_id] = customer_email
+            for _, dropped_id, _ in entries[:-MAX_RECENT_PER_CUSTOMER]:
+                self._customer_of.pop(dropped_id, None)
+            self._recent[customer_email] = entries[-MAX_RECENT_PER_CUSTOMER:]
+
+    def remove(self, ticket_id: str) -> None:
+        """Forget a ticket."""
+        with self._lock:
+            customer_email = self._customer_of.pop(ticket_id, None)
+            if customer_email is None:
+                return
+            entries = [entry for entry in self._recent.get(customer_email, []) if entry[1] != ticket_id]
+            if entries:
+                self._recent[customer_email] = entries
+            else:
+                self._recent.pop(customer_email, None)
+
+    def clear(self) -> None:
+        """Forget every ticket."""
+        with self._lock:
+            self._recent.clear()
+            self._customer_of.clear()
+
+    def on_ticket_change(self, event: str, ticket_id: Optional[str], ticket: Optional[Dict[str, Any]]) -> None:
+        """``TicketStore`` listener keeping only open tickets indexed."""
+        if event == "saved" and ticket.get("status") in OPEN_STATUSES:
+            self.add(ticket_id, ticket)
+        elif event in ("saved", "deleted"):
+            self.remove(ticket_id)
+        elif event == "cleared":
+            self.clear()
+
+    def find_duplicate(self, customer_email: str, subject: str, description: str) -> Optional[Tuple[str, float]]:
+        """
+        Find the customer's recent open ticket most similar to a new report.
+
+        Args:
+            customer_email: Normalized customer email
+            subject: Subject of the new ticket
+            description: Description of the new ticket
+
+        Returns:
+            Optional[Tuple[str, float]]: Ticket ID and similarity of the best
+            match at or above the threshold, or None
+        """
+        started = time.perf_counter()
+        shingles = ticket_shingles(subject, description)
+        numbers = _numbers(shingles)
+        best: Optional[Tuple[str, float]] = None
+        with self._lock:
+            for _, ticket_id, existing in self._prune(customer_email):
+                existing_numbers = _numbers(existing)
+                if numbers and existing_numbers and not numbers & existing_numbers:
+                    continue
+                similarity = jaccard(shingles, existing)
+                if similarity >= self.threshold and (best is None or similarity > best[1]):
+                    best = (ticket_id, similarity)
+        metrics.observe("ticket_dedup_seconds", time.perf_counter() - started)
+        metrics.increment("ticket_dedup_total", result="duplicate" if best else "new")
+        return best
@@ -0,0 +1,331 @@
+# utils/ticket_events.py
+"""
+Event-sourced ticket history.
+
+Ticket changes are recorded as an append-only log of events, and the
+``TicketStore`` is the state obtained by applying them in order::
+
+    {"seq": 7, "type": "status_changed", "ticket_id": "TK-1003",
+     "at": "2026-03-01 12:00:00", "data": {"status": "resolved", "previous": "open"}}
+
+Event types are ``created`` (``data.ticket`` is the full record),
+``status_changed`` and ``reassigned``. ``TicketEventLog`` is the only write
+path: each command appends its event and applies it to the store under one
+lock, so the log order is the state order. Reads go to the store and stay
+O(1).
+
+With ``TICKET_EVENT_LOG_PATH`` set the log is durable. Events are appended
+to JSON-lines segment files, ``events-<first seq>.jsonl``. Every
+``TICKET_SNAPSHOT_EVERY`` events the whole state is written to
+``snapshot.json`` and a new segment is started. ``recover`` loads the
+snapshot and replays only the segments written after it, so start-up time
+is bounded by the snapshot interval rather than the age of the log. A line
+torn by a crash is cut off. Covered segments are kept as the ticket history
+unless ``TICKET_EVENT_COMPACT`` deletes them after each snapshot; the history
+of older changes is then gone. Without a path the log lives in memory.
+"""
+
+import json
+import os
+import threading
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from dotenv import load_dotenv
+
+from .logger import get_logger
+from .metrics import metrics
+from .ticket_store import TIMESTAMP_FORMAT, TicketStore
+
+# Configure logging
+logger = get_logger(__name__)
+
+# Load environment variables
+load_dotenv()
+
+# Configuration
+TICKET_EVENT_LOG_PATH = os.getenv("TICKET_EVENT_LOG_PATH") or None
+TICKET_SNAPSHOT_EVERY = int(os.getenv("TICKET_SNAPSHOT_EVERY", "1000"))
+TICKET_EVENT_FSYNC = os.getenv("TICKET_EVENT_FSYNC", "false").lower() == "true"
+TICKET_EVENT_COMPACT = os.getenv("TICKET_EVENT_COMPACT", "false").lower() == "true"
+
+EVENT_TYPES = ("created", "status_changed", "reassigned")
+TICKET_STATUSES = ("open", "in_progress", "resolved", "closed")
+SNAPSHOT_FILE = "snapshot.json"
+SEGMENT_PREFIX = "events-"
+SEGMENT_SUFFIX = ".jsonl"
+
+
+@dataclass
+class TicketEvent:
+    """One change to one ticket."""
+
+    seq: int
+    type: str
+    ticket_id: str
+    at: str
+    data: Dict[str, Any] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def apply_event(store: TicketStore, event: TicketEvent) -> None:
+    """
+    Apply an event to the ticket state.
+
+    Args:
+        store: Ticket state
+        event: Event to apply
+
+    Raises:
+        ValueError: If the event type is unknown
+    """
+    if event.type == "created":
+        store[event.ticket_id] = event.data["ticket"]
+    elif event.type == "status_changed":
+        store.update_ticket(event.ticket_id, status=event.data["status"], updated_at=event.at)
+    elif event.type == "reassigned":
+        store.update_ticket(event.ticket_id, assigned_to=event.data["assigned_to"], updated_at=event.at)
+    else:
+        raise ValueError(f"Unknown ticket event type '{event.type}'")
+
+
+def _segment_name(first_seq: int) -> str:
+    return f"{SEGMENT_PREFIX}{first_seq:012d}{SEGMENT_SUFFIX}"
+
+
+def _segment_first_seq(name: str) -> int:
+    return int(name[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)])
+
+
+class TicketEventLog:
+    """
+    Append-only ticket event log materialized into a ``TicketStore``.
+
+    Args:
+        store: Ticket state the events are applied to
+        path: Directory of the segments and snapshot (None keeps events in memory)
+        snapshot_every: Events between snapshots
+        fsync: Force every event to disk before it is applied
+        compact: Delete segments covered by a snapshot
+    """
+
+    def __init__(
+        self,
+        store: TicketStore,
+        path: Optional[str] = TICKET_EVENT_LOG_PATH,
+        snapshot_every: int = TICKET_SNAPSHOT_EVERY,
+        fsync: bool = TICKET_EVENT_FSYNC,
+        compact: bool = TICKET_EVENT_COMPACT,
+    ):
+        if snapshot_every < 1:
+            raise ValueError("snapshot_every must be at least 1")
+        self.store = store
+        self.path = path
+        self.snapshot_every = snapshot_every
+        self.fsync = fsync
+        self.compact = compact
+        self.seq = 0
+        self._lock = threading.Lock()
+        self._events: List[TicketEvent] = []
+        self._segment = None
+        self._since_snapshot = 0
+        if path is not None:
+            os.makedirs(path, exist_ok=True)
+
+    # Commands
+
+    def create(self, ticket: Dict[str, Any]) -> TicketEvent:
+        """Record a new ticket."""
+        return self._record("created", ticket["ticket_id"], {"ticket": dict(ticket)}, at=ticket.get("created_at"))
+
+    def change_status(self, ticket_id: str, status: str) -> Optional[TicketEvent]:
+        """
+        Record a status change.
+
+        Returns:
+            Optional[TicketEvent]: The event, or None if the ticket already has the status
+
+        Raises:
+            KeyError: If the ticket does not exist
+            ValueError: If the status is not one of ``TICKET_STATUSES``
+        """
+        if status not in TICKET_STATUSES:
+            raise ValueError(f"Invalid status '{status}'; expected one of {', '.join(TICKET_STATUSES)}")
+        return self._record("status_changed", ticket_id, {"status": status}, previous_field="status")
+
+    def reassign(self, ticket_id: str, assigned_to: str) -> Optional[TicketEvent]:
+        """
+        Record a new assignee.
+
+        Returns:
+            Optional[TicketEvent]: The event, or None if the ticket already has the assignee
+
+        Raises:
+            KeyError: If the ticket does not exist
+            ValueError: If the assignee is empty
+        """
+        if not assigned_to or not assigned_to.strip():
+            raise ValueError("Assignee is required")
+        assigned_to = assigned_to.strip()
+        return self._record("reassigned", ticket_id, {"assigned_to": assigned_to}, previous_field="assigned_to")
+
+    def _record(
+        self,
+        event_type: str,
+        ticket_id: str,
+        data: Dict[str, Any],
+        at: Optional[str] = None,
+        previous_field: Optional[str] = None,
+    ) -> Optional[TicketEvent]:
+        with self._lock:
+            if previous_field is not None:
+                previous = self.store[ticket_id].get(previous_field)
+                # Compared under the lock, so concurrent identical changes record one event
+                if previous == data[previous_field]:
+                    return None
+                data = {**data, "previous": previous}
+            event = TicketEvent(
+                seq=self.seq + 1,
+                type=event_type,
+                ticket_id=ticket_id,
+                at=at or datetime.now().strftime(TIMESTAMP_FORMAT),
+                data=data,
+            )
+            # Write ahead: the event is durable before the state changes
+            self._append(event)
+            apply_event(self.store, event)
+            self.seq = event.seq
+            metrics.increment("ticket_events_total", type=event_type)
+            self._since_snapshot += 1
+            if self.path is not None and self._since_snapshot >= self.snapshot_every:
+                self._snapshot()
+            return event
+
+    # Storage
+
+    def _append(self, event: TicketEvent) -> None:
+        if self.path is None:
+            self._events.append(event)
+            return
+        if self._segment is None:
+            self._segment = open(os.path.join(self.path, _segment_name(event.seq)), "a", encoding="utf-8")
+        self._segment.write(json.dumps(event.to_dict(), ensure_ascii=False) + "\n")
+        self._segment.flush()
+        if self.fsync:
+            os.fsync(self._segment.fileno())
+
+    def _segments(self) -> List[str]:
+        names = [name for name in os.listdir(self.path) if name.startswith(SEGMENT_PREFIX) and name.endswith(SEGMENT_SUFFIX)]
+        return sorted(names, key=_segment_first_seq)
+
+    def _snapshot(self) -> None:
+        tickets = {ticket_id: self.store[ticket_id] for ticket_id in self.store}
+        snapshot_path = os.path.join(self.path, SNAPSHOT_FILE)
+        tmp_path = f"{snapshot_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"seq": self.seq, "tickets": tickets}, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, snapshot_path)
+        # The next event starts a new segment, so older segments are fully covered
+        if self._segment is not None:
+            self._segment.close()
+            self._segment = None
+        self._since_snapshot = 0
+        metrics.increment("ticket_snapshots_total")
+        logger.info(f"Ticket snapshot written at event {self.seq} ({len(tickets)} tickets)")
+        if self.compact:
+            for name in self._segments():
+                if _segment_first_seq(name) <= self.seq:
+                    os.remove(os.path.join(self.path, name))
+
+    def _read_segment(self, name: str, repair: bool = False) -> List[TicketEvent]:
+        segment_path = os.path.join(self.path, name)
+        events = []
+        good_bytes = 0
+        with open(segment_path, "rb") as f:
+            for line in f:
+                try:
+                    events.append(TicketEvent(**json.loads(line)))
+                except (ValueError, TypeError):
+                    # Only the last line can be torn by a crash; drop it and what follows
+                    if repair:
+                        logger.warning(f"Truncating torn ticket event in {name} after {len(events)} events")
+                        with open(segment_path, "r+b") as writable:
+                            writable.truncate(good_bytes)
+                    break
+                good_bytes += len(line)
+        return events
+
+    def recover(self, repair: bool = True) -> int:
+        """
+        Rebuild the ticket state from the snapshot and the events after it.
+
+        Args:
+            repair: Truncate a torn last event and append to the recovered
+                segment; pass False to only read a log another process writes
+
+        Returns:
+            int: Number of events replayed after the snapshot
+
+        Raises:
+            ValueError: If the log contains an unknown event type
+        """
+        if self.path is None:
+            return 0
+        with self._lock:
+            self.store.clear()
+            self.seq = 0
+            snapshot_path = os.path.join(self.path, SNAPSHOT_FILE)
+            if os.path.exists(snapshot_path):
+                with open(snapshot_path, "r", encoding="utf-8") as f:
+                    snapshot = json.load(f)
+                for ticket_id, ticket in snapshot["tickets"].items():
+                    self.store[ticket_id] = ticket
+                self.seq = snapshot["seq"]
+
+            replayed = 0
+            tail = None
+            for name in self._segments():
+                if _segment_first_seq(name) <= self.seq:
+                    continue
+                tail = name
+                for event in self._read_segment(name, repair=repair):
+                    if event.seq <= self.seq:
+                        continue
+                    apply_event(self.store, event)
+                    self.seq = event.seq
+                    replayed += 1
+            self._since_snapshot = replayed
+            # Keep appending to the segment written since the snapshot
+            if repair:
+                if self._segment is not None:
+                    self._segment.close()
+                self._segment = open(os.path.join(self.path, tail), "a", encoding="utf-8") if tail else None
+            logger.info(f"Recovered {len(self.store)} tickets at event {self.seq} ({replayed} events replayed)")
+            return replayed
+
+    def history(self, ticket_id: str) -> List[TicketEvent]:
+        """
+        Return every retained event of a ticket, oldest first.
+
+        Reads the segments from disk; current state should be read from the store.
+        """
+        with self._lock:
+            if self.path is None:
+                return [event for event in self._events if event.ticket_id == ticket_id]
+            if self._segment is not None:
+                self._segment.flush()
+            return [
+                event for name in self._segments() for event in self._read_segment(name) if event.ticket_id == ticket_id
+            ]
+
+    def close(self) -> None:
+        """Close the open segment."""
+        with self._lock:
+            if self._segment is not None:
+                self._segment.close()
+                self._segment = None
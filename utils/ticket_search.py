@@ -0,0 +1,147 @@
+# utils/ticket_search.py
+"""
+Full-text search over support tickets, backed by an in-memory tantivy index.
+
+The support agent looks for past tickets about the same problem
+("maquininha not turning on") to spot repeat issues. ``TicketSearchIndex``
+keeps ticket subjects and descriptions in an inverted index analysed like
+the knowledge base (lowercased, accent-folded, stemmed), with the subject
+weighted above the description. Customer email, status and priority are
+indexed as exact terms so searches can be filtered without a scan.
+
+The index subscribes to the ``TicketStore`` and is updated on every saved or
+deleted ticket. A tantivy commit costs milliseconds, so changes are buffered
+in the writer and committed by the next search: ticket creation does not
+wait for the index, and new tickets are still searchable immediately.
+Tickets live in memory, so the index does too.
+"""
+
+import threading
+from typing import Any, Dict, Iterable, List, Optional
+
+import tantivy
+
+from .lexical_index import TOKENIZER_NAME, WRITER_HEAP_SIZE, _delete_by_id, portuguese_analyzer
+from .logger import get_logger
+
+# Configure logging
+logger = get_logger(__name__)
+
+SEARCH_FIELDS = ["subject", "description"]
+FIELD_BOOSTS = {"subject": 2.0, "description": 1.0}
+FILTER_FIELDS = ("customer_email", "status", "priority")
+
+
+def build_ticket_schema() -> tantivy.Schema:
+    """Schema: exact-match ticket id and filters, analysed subject and description."""
+    builder = tantivy.SchemaBuilder()
+    builder.add_text_field("ticket_id", stored=True, tokenizer_name="raw")
+    builder.add_text_field("subject", stored=False, tokenizer_name=TOKENIZER_NAME)
+    builder.add_text_field("description", stored=False, tokenizer_name=TOKENIZER_NAME)
+    for field in FILTER_FIELDS:
+        builder.add_text_field(field, stored=False, tokenizer_name="raw")
+    return builder.build()
+
+
+class TicketSearchIndex:
+    """In-memory BM25 index of ticket subjects and descriptions."""
+
+    def __init__(self):
+        self._schema = build_ticket_schema()
+        self._index = tantivy.Index(self._schema)
+        self._index.register_tokenizer(TOKENIZER_NAME, portuguese_analyzer())
+        self._writer = self._index.writer(heap_size=WRITER_HEAP_SIZE, num_threads=1)
+        self._lock = threading.Lock()
+        self._pending = False
+
+    def _add(self, ticket_id: str, ticket: Dict[str, Any]) -> None:
+        _delete_by_id(self._writer, ticket_id, field="ticket_id")
+        self._writer.add_document(
+            tantivy.Document(
+                ticket_id=ticket_id,
+                subject=str(ticket.get("subject", "")),
+                description=str(ticket.get("description", "")),
+                **{field: str(ticket.get(field) or "").strip().lower() for field in FILTER_FIELDS},
+            )
+        )
+
+    def upsert(self, tickets: Dict[str, Dict[str, Any]]) -> int:
+        """
+        Add or replace tickets.
+
+        Args:
+            tickets: Ticket records keyed by ticket ID
+
+        Returns:
+            int: Number of tickets written
+        """
+        with self._lock:
+            for ticket_id, ticket in tickets.items():
+                self._add(ticket_id, ticket)
+            self._pending = True
+        return len(tickets)
+
+    def delete(self, ticket_ids: Iterable[str]) -> None:
+        """Remove tickets by ID."""
+        with self._lock:
+            for ticket_id in ticket_ids:
+                _delete_by_id(self._writer, ticket_id, field="ticket_id")
+            self._pending = True
+
+    def clear(self) -> None:
+        """Remove every ticket."""
+        with self._lock:
+            self._writer.delete_all_documents()
+            self._pending = True
+
+    def _refresh(self) -> None:
+        # Commit buffered changes so the searcher sees them
+        with self._lock:
+            if self._pending:
+                self._writer.commit()
+                self._pending = False
+        self._index.reload()
+
+    def __len__(self) -> int:
+        self._refresh()
+        return self._index.searcher().num_docs
+
+    def on_ticket_change(self, event: str, ticket_id: Optional[str], ticket: Optional[Dict[str, Any]]) -> None:
+        """``TicketStore`` listener keeping the index in sync."""
+        if event == "saved":
+            self.upsert({ticket_id: ticket})
+        elif event == "deleted":
+            self.delete([ticket_id])
+        elif event == "cleared":
+            self.clear()
+
+    def search(self, query: str, limit: int = 5, **filters: Optional[str]) -> List[Dict[str, Any]]:
+        """
+        Rank tickets by relevance to a free-text query.
+
+        Args:
+            query: Free-text query; query syntax errors are ignored
+            limit: Maximum number of tickets
+            **filters: Exact ``customer_email``, ``status`` or ``priority`` values
+
+        Returns:
+            List[Dict[str, Any]]: ``ticket_id`` and BM25 ``score``, best first
+
+        Raises:
+            ValueError: If a filter field is not indexed
+        """
+        if not query.strip():
+            return []
+        unknown = set(filters) - set(FILTER_FIELDS)
+        if unknown:
+            raise ValueError(f"Cannot filter tickets by {', '.join(sorted(unknown))}")
+        self._refresh()
+        parsed, _ = self._index.parse_query_lenient(query, SEARCH_FIELDS, field_boosts=FIELD_BOOSTS)
+        clauses = [(tantivy.Occur.Must, parsed)]
+        for field, value in filters.items():
+            if value:
+                term = tantivy.Query.term_query(self._schema, field, value.strip().lower())
+                clauses.append((tantivy.Occur.Must, term))
+        searcher = self._index.searcher()
+        hits = searcher.search(tantivy.Query.boolean_query(clauses), limit).hits
+        return [{"ticket_id": searcher.doc(address)["ticket_id"][0], "score": score} for score, address in hits]
@@ -0,0 +1,266 @@
+# utils/ticket_store.py
+"""
+Indexed in-memory ticket storage.
+
+``TicketStore`` is the mapping behind ``TICKETS``: ticket records keyed by
+ticket ID, like the plain dict it replaces, plus secondary indexes for the
+listing queries support staff need ("all open urgent tickets", "tickets for
+maria@business.com"):
+
+- one list of ``(created_at, ticket_id)`` keys over all tickets
+- one such list per customer email, status and priority value
+
+The lists are kept sorted, so ``query`` can use the most selective index,
+binary-search to the page start and walk newest to oldest until the page is
+full. Pages are keyset-paginated: the cursor is the key of the last ticket
+returned, so a page costs the same however deep it is and tickets created
+between requests do not shift later pages. Without a filter narrower than
+the chosen index, a page reads about ``limit`` tickets whatever the store's
+size.
+
+Records are copied in and out; change a stored ticket with ``update_ticket``
+(or assign it again) so its index entries follow. Derived structures kept
+outside the store, such as the full-text ticket index, ``subscribe`` to its
+changes.
+"""
+
+import base64
+import binascii
+import json
+import threading
+from bisect import bisect_left, insort
+from collections.abc import MutableMapping
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from .logger import get_logger
+
+# Configure logging
+logger = get_logger(__name__)
+
+INDEXED_FIELDS = ("customer_email", "status", "priority")
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+SortKey = Tuple[str, str]
+# Called with ("saved", ticket_id, ticket), ("deleted", ticket_id, None) or ("cleared", None, None)
+TicketListener = Callable[[str, Optional[str], Optional[Dict[str, Any]]], None]
+
+
+def _index_value(field: str, value: Any) -> str:
+    return str(value or "").strip().lower()
+
+
+def _timestamp(value: str) -> str:
+    # Accept ISO timestamps ("2026-01-02T10:00:00") as well as the stored format
+    return value.strip().replace("T", " ")
+
+
+def encode_cursor(key: SortKey) -> str:
+    """Encode a ticket's sort key as an opaque page cursor."""
+    return base64.urlsafe_b64encode(json.dumps(list(key)).encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> SortKey:
+    """
+    Decode a page cursor.
+
+    Args:
+        cursor: Cursor returned with a previous page
+
+    Returns:
+        SortKey: ``(created_at, ticket_id)`` of the last ticket of that page
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        created_at, ticket_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return str(created_at), str(ticket_id)
+    except (binascii.Error, UnicodeError, ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+class TicketStore(MutableMapping):
+    """Ticket records keyed by ticket ID, with secondary indexes for listing."""
+
+    def __init__(self):
+        self._tickets: Dict[str, Dict[str, Any]] = {}
+        self._by_created: List[SortKey] = []
+        self._indexes: Dict[str, Dict[str, List[SortKey]]] = {field: {} for field in INDEXED_FIELDS}
+        self._lock = threading.RLock()
+        self._listeners: List[TicketListener] = []
+
+    def subscribe(self, listener: TicketListener) -> None:
+        """
+        Call a listener after every change to the store.
+
+        Args:
+            listener: Receives the event, ticket ID and saved ticket; its
+                errors are logged and do not fail the change
+        """
+        self._listeners.append(listener)
+
+    def _notify(self, event: str, ticket_id: Optional[str] = None, ticket: Optional[Dict[str, Any]] = None) -> None:
+        for listener in self._listeners:
+            try:
+                listener(event, ticket_id, dict(ticket) if ticket is not None else None)
+            except Exception as e:
+                logger.error(f"Ticket store listener failed on {event} {ticket_id or ''}: {str(e)}")
+
+    @staticmethod
+    def _sort_key(ticket_id: str, ticket: Dict[str, Any]) -> SortKey:
+        return (str(ticket.get("created_at", "")), ticket_id)
+
+    def _add_to_indexes(self, ticket_id: str, ticket: Dict[str, Any]) -> None:
+        key = self._sort_key(ticket_id, ticket)
+        insort(self._by_created, key)
+        for field in INDEXED_FIELDS:
+            insort(self._indexes[field].setdefault(_index_value(field, ticket.get(field)), []), key)
+
+    def _remove_from_indexes(self, ticket_id: str, ticket: Dict[str, Any]) -> None:
+        key = self._sort_key(ticket_id, ticket)
+        self._remove_key(self._by_created, key)
+        for field in INDEXED_FIELDS:
+            value = _index_value(field, ticket.get(field))
+            keys = self._indexes[field].get(value)
+            if keys is not None:
+                self._remove_key(keys, key)
+                if not keys:
+                    del self._indexes[field][value]
+
+    @staticmethod
+    def _remove_key(keys: List[SortKey], key: SortKey) -> None:
+        position = bisect_left(keys, key)
+        if position < len(keys) and keys[position] == key:
+            del keys[position]
+
+    def __getitem__(self, ticket_id: str) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._tickets[ticket_id])
+
+    def __setitem__(self, ticket_id: str, ticket: Dict[str, Any]) -> None:
+        with self._lock:
+            previous = self._tickets.get(ticket_id)
+            if previous is not None:
+                self._remove_from_indexes(ticket_id, previous)
+            self._tickets[ticket_id] = dict(ticket)
+            self._add_to_indexes(ticket_id, ticket)
+            self._notify("saved", ticket_id, ticket)
+
+    def __delitem__(self, ticket_id: str) -> None:
+        with self._lock:
+            ticket = self._tickets.pop(ticket_id)
+            self._remove_from_indexes(ticket_id, ticket)
+            self._notify("deleted", ticket_id)
+
+    def __iter__(self) -> Iterator[str]:
+        with self._lock:
+            return iter(list(self._tickets))
+
+    def __len__(self) -> int:
+        return len(self._tickets)
+
+    def __contains__(self, ticket_id: object) -> bool:
+        return ticket_id in self._tickets
+
+    def clear(self) -> None:
+        with self._lock:
+            self._tickets.clear()
+            self._by_created.clear()
+            self._indexes = {field: {} for field in INDEXED_FIELDS}
+            self._notify("cleared")
+
+    def update_ticket(self, ticket_id: str, **fields: Any) -> Dict[str, Any]:
+        """
+        Change fields of a stored ticket and re-index it.
+
+        Args:
+            ticket_id: Ticket to change
+            **fields: New field values; ``updated_at`` defaults to now
+
+        Returns:
+            Dict[str, Any]: The updated ticket
+
+        Raises:
+            KeyError: If the ticket does not exist
+        """
+        with self._lock:
+            ticket = {**self._tickets[ticket_id], **fields}
+            if "updated_at" not in fields:
+                ticket["updated_at"] = datetime.now().strftime(TIMESTAMP_FORMAT)
+            self[ticket_id] = ticket
+            return dict(ticket)
+
+    def query(
+        self,
+        customer_email: Optional[str] = None,
+        status: Optional[str] = None,
+        priority: Optional[str] = None,
+        created_after: Optional[str] = None,
+        created_before: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        List tickets newest first, one keyset-paginated page at a time.
+
+        Args:
+            customer_email: Only tickets of this customer
+            status: Only tickets with this status
+            priority: Only tickets with this priority
+            created_after: Only tickets created at or after this timestamp
+            created_before: Only tickets created before this timestamp
+            limit: Page size (1 to ``MAX_PAGE_SIZE``)
+            cursor: ``next_cursor`` of the previous page
+
+        Returns:
+            Tuple[List[Dict[str, Any]], Optional[str]]: The page and the cursor
+            of the next one (None on the last page)
+
+        Raises:
+            ValueError: If the limit is out of range or the cursor is invalid
+        """
+        if not 1 <= limit <= MAX_PAGE_SIZE:
+            raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+        filters = {
+            field: _index_value(field, value)
+            for field, value in (("customer_email", customer_email), ("status", status), ("priority", priority))
+            if value
+        }
+        after_key = decode_cursor(cursor) if cursor else None
+
+        with self._lock:
+            # Walk the most selective index; the other filters are checked per ticket
+            keys = self._by_created
+            for field, value in filters.items():
+                candidates = self._indexes[field].get(value, [])
+                if len(candidates) < len(keys):
+                    keys = candidates
+
+            end = len(keys)
+            if after_key is not None:
+                end = bisect_left(keys, after_key)
+            if created_before:
+                end = min(end, bisect_left(keys, (_timestamp(created_before),)))
+            lower = _timestamp(created_after) if created_after else None
+
+            page: List[Dict[str, Any]] = []
+            last_key: Optional[SortKey] = None
+            position = end - 1
+            while position >= 0 and len(page) < limit:
+                key = keys[position]
+                if lower is not None and key[0] < lower:
+                    break
+                ticket = self._tickets[key[1]]
+                if all(_index_value(field, ticket.get(field)) == value for field, value in filters.items()):
+                    page.append(dict(ticket))
+                    last_key = key
+                position -= 1
+
+            exhausted = position < 0 or (lower is not None and keys[position][0] < lower)
+            next_cursor = None
+            if len(page) == limit and not exhausted:
+                next_cursor = encode_cursor(last_key)
+            return page, next_cursor
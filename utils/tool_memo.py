@@ -0,0 +1,182 @@
+# utils/tool_memo.py
+"""
+Per-run memoization and idempotency for agent tools.
+
+Within one workflow run the support agent often repeats a tool call across
+tool-loop iterations: ``lookup_customer_info`` for an email it already
+looked up, or ``create_support_ticket`` again when a model turn is retried.
+``tool_run_scope`` opens a ``ToolRunCache`` for the duration of a run, and
+the decorators use it:
+
+- ``memoize_per_run`` returns the earlier result of a read-only tool called
+  again with the same (normalized) arguments
+- ``idempotent_per_run`` derives an idempotency key from a write tool's
+  arguments and replays the first result instead of writing twice
+
+A write clears the run's memoized reads, so a lookup after creating a ticket
+sees the new ticket. Hits are collected in ``ToolRunCache.hits`` for the
+workflow's ``tool_calls``. Outside a scope, for instance when a tool is
+called directly, the decorated functions behave exactly as before.
+"""
+
+import copy
+import functools
+import hashlib
+import inspect
+import json
+import os
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from dotenv import load_dotenv
+
+from .logger import get_logger
+from .metrics import metrics
+
+# Configure logging
+logger = get_logger(__name__)
+
+# Load environment variables
+load_dotenv()
+
+# Configuration
+TOOL_MEMOIZATION = os.getenv("TOOL_MEMOIZATION", "true").lower() == "true"
+
+
+class ToolRunCache:
+    """
+    Tool results of one workflow run.
+
+    Args:
+        run_id: Identifier of the run, for logging
+    """
+
+    def __init__(self, run_id: Optional[str] = None):
+        self.run_id = run_id or str(uuid.uuid4())
+        self.results: Dict[str, Any] = {}
+        self.writes: Dict[str, Any] = {}
+        self.hits: List[Dict[str, Any]] = []
+
+    def record_hit(self, tool: str, parameters: Dict[str, Any], kind: str) -> None:
+        self.hits.append({"tool": tool, "parameters": parameters, "cache": kind})
+        metrics.increment("tool_memo_total", tool=tool, result=kind)
+
+
+_current_run: ContextVar[Optional[ToolRunCache]] = ContextVar("tool_run_cache", default=None)
+
+
+@contextmanager
+def tool_run_scope(run_id: Optional[str] = None) -> Iterator[ToolRunCache]:
+    """
+    Memoize tool calls made until the block exits.
+
+    Args:
+        run_id: Identifier of the run, for logging
+
+    Yields:
+        ToolRunCache: The run's cache, whose ``hits`` list the reused results
+    """
+    cache = ToolRunCache(run_id)
+    token = _current_run.set(cache if TOOL_MEMOIZATION else None)
+    try:
+        yield cache
+    finally:
+        _current_run.reset(token)
+
+
+def current_tool_run() -> Optional[ToolRunCache]:
+    """Return the cache of the active run, if any."""
+    return _current_run.get()
+
+
+def _call_key(name: str, parameters: Dict[str, Any]) -> str:
+    payload = json.dumps([name, parameters], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _parameters(function: Callable, normalize: Optional[Callable], args, kwargs) -> Dict[str, Any]:
+    bound = inspect.signature(function).bind(*args, **kwargs)
+    bound.apply_defaults()
+    parameters = dict(bound.arguments)
+    return normalize(parameters) if normalize else parameters
+
+
+def memoize_per_run(normalize: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None) -> Callable:
+    """
+    Reuse a read-only tool's successful results within a run.
+
+    Args:
+        normalize: Maps the call's parameters to the ones that identify the
+            result (e.g. a lower-cased email)
+
+    Returns:
+        Callable: Decorator keeping the tool's name, signature and docstring
+    """
+
+    def decorator(function: Callable) -> Callable:
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            run = _current_run.get()
+            if run is None:
+                return function(*args, **kwargs)
+            try:
+                parameters = _parameters(function, normalize, args, kwargs)
+            except Exception:
+                # Invalid arguments: let the tool report them
+                return function(*args, **kwargs)
+            key = _call_key(function.__name__, parameters)
+            if key in run.results:
+                run.record_hit(function.__name__, parameters, "memoized")
+                return copy.deepcopy(run.results[key])
+            result = function(*args, **kwargs)
+            metrics.increment("tool_memo_total", tool=function.__name__, result="miss")
+            if isinstance(result, dict) and result.get("success"):
+                run.results[key] = copy.deepcopy(result)
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+def idempotent_per_run(normalize: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None) -> Callable:
+    """
+    Make a write tool idempotent within a run.
+
+    The idempotency key is a hash of the normalized parameters; a repeated
+    call returns the first successful result with ``idempotent_replay`` set.
+
+    Args:
+        normalize: Maps the call's parameters to the ones that identify the write
+
+    Returns:
+        Callable: Decorator keeping the tool's name, signature and docstring
+    """
+
+    def decorator(function: Callable) -> Callable:
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            run = _current_run.get()
+            if run is None:
+                return function(*args, **kwargs)
+            try:
+                parameters = _parameters(function, normalize, args, kwargs)
+            except Exception:
+                return function(*args, **kwargs)
+            key = _call_key(function.__name__, parameters)
+            if key in run.writes:
+                run.record_hit(function.__name__, parameters, "idempotent_replay")
+                logger.info(f"Replaying {function.__name__} for run {run.run_id} instead of writing again")
+                return {**copy.deepcopy(run.writes[key]), "idempotent_replay": True}
+            result = function(*args, **kwargs)
+            if isinstance(result, dict) and result.get("success"):
+                run.writes[key] = copy.deepcopy(result)
+                # Earlier reads may no longer be current
+                run.results.clear()
+            return result
+
+        return wrapper
+
+    return decorator
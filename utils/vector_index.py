@@ -0,0 +1,273 @@
+# utils/vector_index.py
+"""
+In-process vector index backed by a memory-mapped NumPy matrix.
+
+The knowledge corpus is a few thousand chunks, small enough that an exact
+search (one matrix-vector product and a top-k selection) is faster than an
+HNSW query through the Chroma client, and needs no SQLite at start-up.
+
+``MemmapVectorIndex`` is a read-optimized copy of the Chroma collection:
+
+- ``vectors-<generation>.npy``: L2-normalized embeddings, one row per chunk,
+  as float32 or float16 (``VECTOR_INDEX_DTYPE``, half the memory)
+- ``records.json``: ids, contents and metadata of the rows, the embedder id
+  and the name of the current vectors file
+
+The matrix is opened with ``mmap_mode="r"``, so every uvicorn worker maps the
+same file and shares its pages through the OS page cache. A rebuild writes a
+new generation and then swaps ``records.json`` atomically; readers notice the
+change on their next search. The generation it replaces is kept until the
+following rebuild, so a reader that read the old records just before the swap
+can still open its matrix. Chroma stays the source of truth: the index is
+rebuilt from the collection after every load, without embedding anything.
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from agno.document import Document
+from agno.embedder.base import Embedder
+from dotenv import load_dotenv
+
+from .logger import get_logger
+from .metrics import metrics
+
+# Configure logging
+logger = get_logger(__name__)
+
+# Load environment variables
+load_dotenv()
+
+# Configuration
+VECTOR_INDEX_PATH = os.getenv("VECTOR_INDEX_PATH", "storage/vector_index")
+VECTOR_INDEX_DTYPE = os.getenv("VECTOR_INDEX_DTYPE", "float32")
+
+VECTOR_INDEX_DTYPES = ("float32", "float16")
+RECORDS_FILE = "records.json"
+FORMAT_VERSION = 1
+# float16 rows are scored in blocks converted to float32 (NumPy has no fast float16 matmul)
+SCORE_BLOCK_ROWS = 4096
+
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """Return the indices of the k highest scores, best first."""
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    candidates = np.argpartition(-scores, k - 1)[:k]
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+
+class MemmapVectorIndex:
+    """
+    Exact cosine-similarity index over a memory-mapped embedding matrix.
+
+    Exposes ``search(query, limit)`` like agno's ``ChromaDb``, so it can be
+    passed to ``HybridRetriever`` as its vector database.
+
+    Args:
+        path: Index directory
+        embedder: Embedder for queries; must be the one that produced the vectors
+        dtype: Storage type of new builds, ``float32`` or ``float16``
+    """
+
+    def __init__(self, path: str = VECTOR_INDEX_PATH, embedder: Optional[Embedder] = None, dtype: str = VECTOR_INDEX_DTYPE):
+        if dtype not in VECTOR_INDEX_DTYPES:
+            raise ValueError(f"Unknown vector index dtype '{dtype}', expected one of {VECTOR_INDEX_DTYPES}")
+        self.path = path
+        self.embedder = embedder
+        self.dtype = dtype
+        self._lock = threading.Lock()
+        self._loaded: Optional[Tuple[Tuple[int, int], np.ndarray, Dict[str, Any]]] = None
+
+    @property
+    def _records_path(self) -> str:
+        return os.path.join(self.path, RECORDS_FILE)
+
+    def _load(self) -> Tuple[np.ndarray, Dict[str, Any]]:
+        """Return the mapped matrix and its records, reopening them after a rebuild."""
+        try:
+            stat = os.stat(self._records_path)
+            # A rebuild replaces the file, so its inode changes even within one mtime tick
+            stamp = (stat.st_ino, stat.st_mtime_ns)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"No vector index at {self.path}; load the knowledge base first") from None
+        loaded = self._loaded
+        if loaded is not None and loaded[0] == stamp:
+            return loaded[1], loaded[2]
+        with self._lock:
+            if self._loaded is None or self._loaded[0] != stamp:
+                with open(self._records_path, "r", encoding="utf-8") as f:
+                    records = json.load(f)
+                if records.get("version") != FORMAT_VERSION:
+                    raise ValueError(f"Unsupported vector index format in {self.path}")
+                if records["count"]:
+                    matrix = np.load(os.path.join(self.path, records["vectors_file"]), mmap_mode="r")
+                else:
+                    matrix = np.zeros((0, records["dimensions"]), dtype=np.float32)
+                self._loaded = (stamp, matrix, records)
+                logger.info(f"Opened vector index at {self.path}: {records['count']} vectors ({records['dtype']})")
+            return self._loaded[1], self._loaded[2]
+
+    def __len__(self) -> int:
+        try:
+            return self._load()[1]["count"]
+        except FileNotFoundError:
+            return 0
+
+    def build(
+        self,
+        ids: List[str],
+        embeddings: Any,
+        contents: List[str],
+        meta_data: List[Dict[str, Any]],
+        embedder_id: Optional[str] = None,
+    ) -> int:
+        """
+        Write a new generation of the index.
+
+        Args:
+            ids: Chunk ids
+            embeddings: One embedding per chunk (any 2-D array-like)
+            contents: Chunk texts
+            meta_data: Chunk metadata
+            embedder_id: Id of the embedder that produced the vectors
+
+        Returns:
+            int: Number of vectors written
+        """
+        matrix = np.asarray(embeddings, dtype=np.float32)
+        if matrix.ndim != 2 or not (len(ids) == len(matrix) == len(contents) == len(meta_data)):
+            raise ValueError("ids, embeddings, contents and meta_data must have one row per chunk")
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        matrix = (matrix / np.where(norms > 0, norms, 1.0)).astype(self.dtype)
+
+        os.makedirs(self.path, exist_ok=True)
+        previous_file = None
+        try:
+            with open(self._records_path, "r", encoding="utf-8") as f:
+                previous_file = json.load(f).get("vectors_file")
+        except (OSError, ValueError):
+            pass
+        generation = time.time_ns()
+        vectors_file = f"vectors-{generation}.npy"
+        np.save(os.path.join(self.path, vectors_file), matrix)
+        records = {
+            "version": FORMAT_VERSION,
+            "embedder": embedder_id,
+            "dtype": self.dtype,
+            "dimensions": int(matrix.shape[1]),
+            "count": len(ids),
+            "vectors_file": vectors_file,
+            "ids": list(ids),
+            "contents": list(contents),
+            "meta_data": [dict(m or {}) for m in meta_data],
+        }
+        tmp_path = f"{self._records_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(records, f, ensure_ascii=False)
+        os.replace(tmp_path, self._records_path)
+
+        # Keep the replaced generation for readers that have not reopened yet;
+        # older ones are no longer referenced by any records file
+        for name in os.listdir(self.path):
+            if name.startswith("vectors-") and name not in (vectors_file, previous_file):
+                os.remove(os.path.join(self.path, name))
+        logger.info(f"Built vector index at {self.path}: {len(ids)} vectors ({self.dtype})")
+        return len(ids)
+
+    def build_from_chroma(self, vector_db) -> int:
+        """
+        Rebuild the index from the Chroma collection behind an agno ``ChromaDb``.
+
+        Args:
+            vector_db: Vector database whose stored embeddings are copied
+
+        Returns:
+            int: Number of vectors written
+        """
+        collection = vector_db.client.get_collection(name=vector_db.collection_name)
+        stored = collection.get(include=["embeddings", "documents", "metadatas"])
+        embeddings = stored["embeddings"]
+        if embeddings is None or len(embeddings) == 0:
+            dimensions = getattr(vector_db.embedder, "dimensions", None) or 0
+            embeddings = np.zeros((0, dimensions), dtype=np.float32)
+        embedder_id = str(getattr(vector_db.embedder, "id", type(vector_db.embedder).__name__))
+        return self.build(stored["ids"], embeddings, stored["documents"], stored["metadatas"] or [{}] * len(stored["ids"]), embedder_id)
+
+    def _scores(self, matrix: np.ndarray, query: np.ndarray) -> np.ndarray:
+        if matrix.dtype == np.float32:
+            return matrix @ query
+        scores = np.empty(len(matrix), dtype=np.float32)
+        for start in range(0, len(matrix), SCORE_BLOCK_ROWS):
+            block = matrix[start:start + SCORE_BLOCK_ROWS]
+            scores[start:start + len(block)] = block.astype(np.float32) @ query
+        return scores
+
+    def search_vector(self, vector: List[float], limit: int = 5) -> List[Document]:
+        """
+        Return the chunks most similar to an embedding.
+
+        Args:
+            vector: Query embedding
+            limit: Maximum number of chunks
+
+        Returns:
+            List[Document]: Best chunks first, with their cosine similarity as
+            ``reranking_score``
+        """
+        matrix, records = self._load()
+        if not records["count"]:
+            return []
+        query = np.asarray(vector, dtype=np.float32)
+        if query.shape != (records["dimensions"],):
+            raise ValueError(
+                f"Query embedding has {query.size} dimensions, the vector index has {records['dimensions']}"
+            )
+        norm = float(np.linalg.norm(query))
+        if norm == 0:
+            return []
+        scores = self._scores(matrix, query / norm)
+        return [
+            Document(
+                id=records["ids"][i],
+                content=records["contents"][i],
+                meta_data=records["meta_data"][i],
+                reranking_score=float(scores[i]),
+            )
+            for i in top_k_indices(scores, limit)
+        ]
+
+    def search(self, query: str, limit: int = 5, filters: Optional[Dict[str, Any]] = None) -> List[Document]:
+        """
+        Embed a query and return the most similar chunks.
+
+        Args:
+            query: Query text
+            limit: Maximum number of chunks
+            filters: Unsupported; accepted for ``ChromaDb`` compatibility
+
+        Returns:
+            List[Document]: Best chunks first
+
+        Raises:
+            ValueError: If the query cannot be embedded, or the index was
+                built with another embedder
+        """
+        if self.embedder is None:
+            raise ValueError("MemmapVectorIndex needs an embedder to search by text")
+        _, records = self._load()
+        embedder_id = str(getattr(self.embedder, "id", type(self.embedder).__name__))
+        if records.get("embedder") not in (None, embedder_id):
+            raise ValueError(f"Vector index was built with '{records['embedder']}', not '{embedder_id}'")
+        vector = self.embedder.get_embedding(query)
+        if not vector:
+            raise ValueError("Failed to embed the query")
+        started = time.perf_counter()
+        documents = self.search_vector(vector, limit)
+        metrics.observe("vector_index_search_seconds", time.perf_counter() - started)
+        return documents
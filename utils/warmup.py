@@ -0,0 +1,165 @@
+# utils/warmup.py
+"""
+Start-up warm-up and readiness.
+
+After a deploy the first ``/chat`` paid for everything that is set up lazily:
+opening the Chroma collection and loading its HNSW segments, opening the
+tantivy and memory-mapped indexes, and the TLS connections to Mistral. The
+warm-up does that work before traffic arrives:
+
+1. ``collection``: open the Chroma collection and count its chunks
+2. ``retrieval``: run ``WARMUP_QUERIES`` through the retriever (query
+   embedding, vector and lexical search)
+3. ``models``: open a connection for every distinct model client with a
+   ``models.list`` request, which costs no tokens
+
+``readiness`` tracks the outcome for the ``/ready`` endpoint: ``starting``,
+``warming``, then ``ready``. A failed step is logged and reported but does
+not hold readiness back; the service works, only the first request is slower.
+"""
+
+import asyncio
+import os
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+from dotenv import load_dotenv
+
+from .logger import get_logger
+from .metrics import metrics
+
+# Configure logging
+logger = get_logger(__name__)
+
+# Load environment variables
+load_dotenv()
+
+# Configuration
+WARMUP_ENABLED = os.getenv("WARMUP_ENABLED", "true").lower() == "true"
+WARMUP_QUERIES = [
+    query.strip()
+    for query in os.getenv("WARMUP_QUERIES", "taxas da maquininha;pix parcelado;como emitir boleto").split(";")
+    if query.strip()
+]
+
+
+class Readiness:
+    """Warm-up progress reported by the readiness endpoint."""
+
+    def __init__(self):
+        self.status = "starting"
+        self.steps: Dict[str, Dict[str, Any]] = {}
+        self.started_at: Optional[float] = None
+        self.seconds: Optional[float] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.status == "ready"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"status": self.status, "warmup_seconds": self.seconds, "steps": self.steps}
+
+
+readiness = Readiness()
+
+
+def _touch_collection(vector_db) -> Dict[str, Any]:
+    if hasattr(vector_db, "client") and hasattr(vector_db, "collection_name"):
+        collection = vector_db.client.get_collection(name=vector_db.collection_name)
+        return {"chunks": collection.count()}
+    # MemmapVectorIndex and other in-process stores
+    return {"chunks": len(vector_db)}
+
+
+def _run_retrievals(retriever, queries: List[str]) -> Dict[str, Any]:
+    results = 0
+    for query in queries:
+        results += len(retriever.search(query))
+    return {"queries": len(queries), "results": results}
+
+
+def _open_connection(client) -> None:
+    client.models.list()
+
+
+async def _step(name: str, target: Readiness, function, *args) -> None:
+    started = time.perf_counter()
+    try:
+        details = await asyncio.to_thread(function, *args)
+        target.steps[name] = {"status": "ok", **(details or {})}
+    except Exception as e:
+        logger.warning(f"Warm-up step '{name}' failed: {str(e)}")
+        target.steps[name] = {"status": "failed", "error": str(e)}
+    elapsed = time.perf_counter() - started
+    target.steps[name]["seconds"] = round(elapsed, 3)
+    metrics.observe("warmup_step_seconds", elapsed, step=name, status=target.steps[name]["status"])
+
+
+def model_clients(models: Iterable[Any]) -> List[Any]:
+    """Return the distinct clients behind a set of chat models."""
+    clients: Dict[int, Any] = {}
+    for model in models:
+        if model is None or not hasattr(model, "get_client"):
+            continue
+        client = model.get_client()
+        clients.setdefault(id(client), client)
+    return list(clients.values())
+
+
+async def warm_up(
+    vector_db=None,
+    retriever=None,
+    models: Iterable[Any] = (),
+    queries: Optional[List[str]] = None,
+    target: Optional[Readiness] = None,
+) -> Readiness:
+    """
+    Warm up the knowledge indexes and model connections, then mark the service ready.
+
+    Args:
+        vector_db: Vector store whose collection is opened
+        retriever: Retriever used for the synthetic queries
+        models: Chat models whose clients should hold an open connection
+        queries: Synthetic retrieval queries (defaults to ``WARMUP_QUERIES``)
+        target: Readiness state to update (defaults to the module's ``readiness``)
+
+    Returns:
+        Readiness: The updated readiness state
+    """
+    target = target or readiness
+    queries = WARMUP_QUERIES if queries is None else queries
+    target.status = "warming"
+    target.started_at = time.time()
+    started = time.perf_counter()
+    logger.info("Warming up knowledge indexes and model connections...")
+
+    if vector_db is not None:
+        await _step("collection", target, _touch_collection, vector_db)
+    if retriever is not None and queries:
+        await _step("retrieval", target, _run_retrievals, retriever, queries)
+
+    clients = model_clients(models)
+    if clients:
+        model_started = time.perf_counter()
+        outcomes = await asyncio.gather(
+            *(asyncio.to_thread(_open_connection, client) for client in clients), return_exceptions=True
+        )
+        errors = [str(outcome) for outcome in outcomes if isinstance(outcome, Exception)]
+        for error in errors:
+            logger.warning(f"Warm-up step 'models' failed: {error}")
+        target.steps["models"] = {
+            "status": "failed" if errors else "ok",
+            "clients": len(clients),
+            "seconds": round(time.perf_counter() - model_started, 3),
+        }
+        if errors:
+            target.steps["models"]["errors"] = errors
+        metrics.observe(
+            "warmup_step_seconds", time.perf_counter() - model_started, step="models", status=target.steps["models"]["status"]
+        )
+
+    target.seconds = round(time.perf_counter() - started, 3)
+    target.status = "ready"
+    metrics.set_gauge("ready", 1)
+    logger.info(f"Warm-up finished in {target.seconds}s: {target.steps}")
+    return target
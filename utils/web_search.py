@@ -0,0 +1,222 @@
+# utils/web_search.py
+"""
+Cached, budgeted Tavily web search for the knowledge agent.
+
+Every Tavily search is an external call of one to several seconds, and the
+same questions come back minutes apart. ``CachedTavilyTools`` wraps
+``TavilyTools`` with:
+
+- an in-process LRU cache with a time-to-live (``TAVILY_CACHE_TTL``), keyed
+  by the normalized query and the search parameters
+- an optional on-disk tier (``TAVILY_CACHE_DIR``) shared by every worker on
+  the host and kept across restarts, one JSON file per query
+- a per-run budget (``TAVILY_SEARCHES_PER_RUN``): searches beyond it are
+  refused so the model answers with what it already has
+- a process-wide token bucket (``TAVILY_RATE_LIMIT`` searches per second)
+  shared by all instances; a search that would have to wait is refused
+  instead of stalling the agent
+
+Cache hits do not count against the rate limit. Refusals and failures are
+returned to the model as text, like any other tool result.
+"""
+
+import hashlib
+import json
+import os
+import time
+from typing import Any, Dict, Literal, Optional
+
+from agno.tools.tavily import TavilyTools
+from dotenv import load_dotenv
+
+from .cache import LRUCache, MISSING
+from .embedding_cache import normalize_text
+from .logger import get_logger
+from .metrics import metrics
+from .rate_limit import RateLimiter
+
+# Configure logging
+logger = get_logger(__name__)
+
+# Load environment variables
+load_dotenv()
+
+# Configuration
+TAVILY_CACHE_SIZE = int(os.getenv("TAVILY_CACHE_SIZE", "256"))
+TAVILY_CACHE_TTL = float(os.getenv("TAVILY_CACHE_TTL", "3600"))
+TAVILY_CACHE_DIR = os.getenv("TAVILY_CACHE_DIR") or None
+TAVILY_SEARCHES_PER_RUN = int(os.getenv("TAVILY_SEARCHES_PER_RUN", "2"))
+TAVILY_RATE_LIMIT = float(os.getenv("TAVILY_RATE_LIMIT", "1"))
+
+# Searches allowed back to back before the rate limit applies
+TAVILY_RATE_BURST = 5
+# Runs whose search count is remembered; older runs are forgotten first
+TRACKED_RUNS = 1024
+
+# Shared by every CachedTavilyTools in the process
+_rate_limiter = RateLimiter(TAVILY_RATE_LIMIT, burst=TAVILY_RATE_BURST)
+
+
+def search_key(query: str, max_results: int, search_depth: str, output_format: str) -> str:
+    """Return the hex digest identifying a search request."""
+    normalized = normalize_text(query).casefold()
+    return hashlib.sha256(f"{normalized}\x00{max_results}\x00{search_depth}\x00{output_format}".encode("utf-8")).hexdigest()
+
+
+class DiskSearchCache:
+    """
+    On-disk search results, one ``<key>.json`` file per request.
+
+    Files are written atomically, so concurrent workers never read a partial
+    entry; expired entries are deleted when read.
+
+    Args:
+        directory: Cache directory
+        ttl: Seconds after which an entry expires
+    """
+
+    def __init__(self, directory: str, ttl: float):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.ttl = ttl
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return ``{"result", "age"}`` for an unexpired entry, or None."""
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable search cache entry {path}: {str(e)}")
+            return None
+        age = time.time() - entry.get("created_at", 0)
+        if age >= self.ttl:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+        return {"result": entry["result"], "age": age}
+
+    def put(self, key: str, query: str, result: str) -> None:
+        """Store a search result."""
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"query": query, "created_at": time.time(), "result": result}, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Failed to write search cache entry {path}: {str(e)}")
+
+
+class CachedTavilyTools(TavilyTools):
+    """
+    ``TavilyTools`` with result caching, a per-run search budget and a
+    process-wide rate limit.
+
+    Registers one tool, ``web_search_using_tavily``, with the same arguments
+    as the uncached tool.
+
+    Args:
+        api_key: Tavily API key (defaults to ``TAVILY_API_KEY``)
+        cache_size: Maximum number of results kept in memory
+        cache_ttl: Seconds a result stays valid, in memory and on disk
+        cache_dir: Directory of the on-disk tier (None keeps results in memory only)
+        searches_per_run: Maximum searches per agent run (None or 0 disables the budget)
+        rate_limiter: Token bucket for searches (defaults to the shared one)
+        search_depth: Tavily search depth
+        format: ``markdown`` or ``json`` output
+        **kwargs: Passed to ``TavilyTools``
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        cache_size: int = TAVILY_CACHE_SIZE,
+        cache_ttl: float = TAVILY_CACHE_TTL,
+        cache_dir: Optional[str] = TAVILY_CACHE_DIR,
+        searches_per_run: Optional[int] = TAVILY_SEARCHES_PER_RUN,
+        rate_limiter: Optional[RateLimiter] = None,
+        search_depth: Literal["basic", "advanced"] = "advanced",
+        format: Literal["json", "markdown"] = "markdown",
+        **kwargs,
+    ):
+        super().__init__(api_key=api_key, search=False, search_depth=search_depth, format=format, **kwargs)
+        self.cache = LRUCache(maxsize=cache_size, ttl=cache_ttl)
+        self.disk_cache = DiskSearchCache(cache_dir, cache_ttl) if cache_dir else None
+        self.searches_per_run = searches_per_run or None
+        self.rate_limiter = rate_limiter or _rate_limiter
+        self._run_searches = LRUCache(maxsize=TRACKED_RUNS, ttl=cache_ttl)
+        self.register(self.web_search_using_tavily)
+
+    def _cached(self, key: str) -> Any:
+        result = self.cache.get(key)
+        if result is not MISSING or self.disk_cache is None:
+            return result
+        entry = self.disk_cache.get(key)
+        if entry is None:
+            return MISSING
+        self.cache.set(key, entry["result"], ttl=self.cache.ttl - entry["age"])
+        return entry["result"]
+
+    def _take_budget(self, run_id: Optional[str]) -> bool:
+        """Count a search against its run; False once the run's budget is spent."""
+        if self.searches_per_run is None or run_id is None:
+            return True
+        count = self._run_searches.get(run_id, 0)
+        if count >= self.searches_per_run:
+            return False
+        self._run_searches.set(run_id, count + 1)
+        return True
+
+    def web_search_using_tavily(self, query: str, max_results: int = 5, agent: Optional[Any] = None) -> str:
+        """Use this function to search the web for a given query.
+        This function uses the Tavily API to provide realtime online information about the query.
+
+        Args:
+            query (str): Query to search for.
+            max_results (int): Maximum number of results to return. Defaults to 5.
+
+        Returns:
+            str: Results related to the query.
+        """
+        key = search_key(query, max_results, self.search_depth, self.format)
+        result = self._cached(key)
+        if result is not MISSING:
+            metrics.increment("tavily_cache_total", result="hit")
+            logger.debug(f"Web search cache hit for '{query}'")
+            return result
+        metrics.increment("tavily_cache_total", result="miss")
+
+        if not self._take_budget(getattr(agent, "run_id", None)):
+            metrics.increment("tavily_refused_total", reason="budget")
+            logger.info(f"Web search budget of {self.searches_per_run} searches spent, refusing '{query}'")
+            return (
+                f"Web search budget for this request is spent ({self.searches_per_run} searches). "
+                "Answer with the information already gathered."
+            )
+        if not self.rate_limiter.try_acquire():
+            metrics.increment("tavily_refused_total", reason="rate_limit")
+            logger.warning(f"Web search rate limit reached, refusing '{query}'")
+            return "Web search is temporarily unavailable (rate limit). Answer with the information already gathered."
+
+        started = time.perf_counter()
+        try:
+            result = super().web_search_using_tavily(query, max_results=max_results)
+        except Exception as e:
+            metrics.increment("tavily_errors_total")
+            logger.error(f"Web search failed for '{query}': {str(e)}")
+            return f"Web search failed: {str(e)}"
+        finally:
+            metrics.observe("tavily_search_seconds", time.perf_counter() - started)
+
+        self.cache.set(key, result)
+        if self.disk_cache is not None:
+            self.disk_cache.put(key, query, result)
+        return result